@@ -20,6 +20,7 @@ from app.services.authority_resolver import (
     get_all_states,
     AuthorityLevel
 )
+from app.services.executor import run_blocking, ExecutorSaturatedError
 from app.config import get_settings
 
 router = APIRouter()
@@ -158,7 +159,8 @@ class StateInfo(BaseModel):
     responses={
         200: {"description": "Authority resolved successfully"},
         400: {"description": "Invalid category or state"},
-        500: {"description": "Resolution failed"}
+        500: {"description": "Resolution failed"},
+        503: {"description": "Server busy, retry after the Retry-After interval"}
     }
 )
 async def suggest_authority(request: AuthorityRequest) -> AuthorityResponse:
@@ -180,7 +182,9 @@ async def suggest_authority(request: AuthorityRequest) -> AuthorityResponse:
             )
         
         # Resolve authority
-        result = resolve_authority(
+        result = await run_blocking(
+            "authority",
+            resolve_authority,
             category=category,
             state=request.state,
             district=request.district,
@@ -241,7 +245,7 @@ async def suggest_authority(request: AuthorityRequest) -> AuthorityResponse:
         
         return response
         
-    except HTTPException:
+    except (HTTPException, ExecutorSaturatedError):
         raise
     except Exception as e:
         logger.error(f"Authority resolution failed: {str(e)}")
@@ -5,10 +5,12 @@ Exports documents in PDF, DOCX, XLSX formats.
 DESIGN PRINCIPLE:
 - Documents generated on-demand
 - Streamed directly to user
-- NO server-side storage (privacy by design)
+- NO server-side storage (privacy by design): repeated downloads are served
+  from a short-lived, memory-only render cache keyed by hashes of the input
+- Bulk downloads are streamed as a ZIP archive while they are rendered
 """
 
-from fastapi import APIRouter, HTTPException, status
+from fastapi import APIRouter, Header, HTTPException, Response, status
 from fastapi.responses import StreamingResponse
 from pydantic import BaseModel, Field, EmailStr
 from typing import Optional, Dict, Any, List
@@ -16,6 +18,9 @@ from datetime import datetime
 from loguru import logger
 
 from app.services.document_generator import get_document_generator
+from app.services.executor import run_blocking, ExecutorSaturatedError
+from app.services.render_cache import RenderedDocument, compute_etag, etag_matches, get_render_cache
+from app.services.bulk_export import BulkExport, BulkJob
 from app.config import get_settings
 
 router = APIRouter()
@@ -76,6 +81,78 @@ class DownloadRequest(BaseModel):
         }
 
 
+class BulkDraft(BaseModel):
+    """One draft of a bulk download"""
+    draft_text: str = Field(..., min_length=100)
+    document_type: str
+    applicant: ApplicantInfo
+    authority: Optional[AuthorityInfo] = None
+    formats: Optional[List[str]] = Field(
+        default=None,
+        description="Formats for this draft (default: the request's formats)"
+    )
+
+
+class BulkDownloadRequest(BaseModel):
+    """Request body for bulk download"""
+    drafts: List[BulkDraft] = Field(..., min_length=1)
+    formats: List[str] = Field(
+        default=["pdf"],
+        min_length=1,
+        description="Output formats of every draft: pdf, docx, xlsx"
+    )
+
+
+# =============================================================================
+# HELPERS
+# =============================================================================
+
+VALID_FORMATS = ["pdf", "docx", "xlsx"]
+
+
+def _validate_format(format: str) -> str:
+    """Normalized format, or 400 if unknown or disabled"""
+    format_lower = format.lower().strip()
+    
+    if format_lower not in VALID_FORMATS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Invalid format. Supported: {VALID_FORMATS}"
+        )
+    
+    # Check XLSX feature flag
+    if format_lower == "xlsx" and not settings.FEATURE_XLSX_EXPORT:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="XLSX export is currently disabled"
+        )
+    
+    return format_lower
+
+
+def _applicant_details(applicant: ApplicantInfo) -> Dict[str, Any]:
+    """Applicant details for XLSX"""
+    return {
+        "name": applicant.name,
+        "address": applicant.address,
+        "state": applicant.state,
+        "district": applicant.district,
+        "phone": applicant.phone,
+        "email": applicant.email
+    }
+
+
+def _authority_details(authority: Optional[AuthorityInfo]) -> Optional[Dict[str, Any]]:
+    """Authority details for XLSX"""
+    if authority is None:
+        return None
+    return {
+        "department": authority.department_name,
+        "address": authority.department_address,
+        "designation": authority.designation
+    }
+
+
 # =============================================================================
 # API ENDPOINTS
 # =============================================================================
@@ -94,7 +171,11 @@ class DownloadRequest(BaseModel):
     **Privacy:**
     - Document is generated in memory
     - Streamed directly to client
-    - NOT stored on server
+    - NOT stored on server (beyond a short-lived in-memory render cache)
+    
+    **Caching:**
+    - Responses carry a strong `ETag`
+    - Send it back in `If-None-Match` to get `304 Not Modified`
     """,
     responses={
         200: {
@@ -105,83 +186,100 @@ class DownloadRequest(BaseModel):
                 "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet": {}
             }
         },
+        304: {"description": "Document unchanged since the ETag in If-None-Match"},
         400: {"description": "Invalid format or input"},
-        500: {"description": "Document generation failed"}
+        500: {"description": "Document generation failed"},
+        503: {"description": "Server busy, retry after the Retry-After interval"}
     }
 )
-async def download_document(request: DownloadRequest):
+async def download_document(
+    request: DownloadRequest,
+    if_none_match: Optional[str] = Header(default=None)
+):
     """Generate and stream document file"""
     logger.info(f"Download request: format={request.format}, type={request.document_type}")
     
     try:
-        # Validate format
-        valid_formats = ["pdf", "docx", "xlsx"]
-        format_lower = request.format.lower().strip()
-        
-        if format_lower not in valid_formats:
-            raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST,
-                detail=f"Invalid format. Supported: {valid_formats}"
-            )
+        format_lower = _validate_format(request.format)
+        applicant_details = _applicant_details(request.applicant)
+        authority_details = _authority_details(request.authority)
         
-        # Check XLSX feature flag
-        if format_lower == "xlsx" and not settings.FEATURE_XLSX_EXPORT:
-            raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST,
-                detail="XLSX export is currently disabled"
+        # Reuse a recent render of the same input
+        cache = get_render_cache()
+        cache_key = None
+        document = None
+        if cache is not None:
+            cache_key = cache.make_key(
+                format=format_lower,
+                draft_text=request.draft_text,
+                document_type=request.document_type,
+                applicant=applicant_details,
+                authority=authority_details
             )
+            document = cache.get(cache_key)
         
-        # Prepare applicant details for XLSX
-        applicant_details = {
-            "name": request.applicant.name,
-            "address": request.applicant.address,
-            "state": request.applicant.state,
-            "district": request.applicant.district,
-            "phone": request.applicant.phone,
-            "email": request.applicant.email
-        }
+        cache_status = "hit" if document is not None else "miss"
         
-        # Prepare authority details for XLSX
-        authority_details = None
-        if request.authority:
-            authority_details = {
-                "department": request.authority.department_name,
-                "address": request.authority.department_address,
-                "designation": request.authority.designation
+        if document is None:
+            # Metadata
+            generated_at = datetime.now().isoformat()
+            metadata = {
+                "generated_at": generated_at,
+                "document_type": request.document_type
             }
+            
+            # Generate document
+            generator = get_document_generator()
+            buffer, filename, content_type = await run_blocking(
+                "document",
+                generator.generate,
+                format=format_lower,
+                draft_text=request.draft_text,
+                document_type=request.document_type,
+                applicant_name=request.applicant.name,
+                applicant_details=applicant_details,
+                authority_details=authority_details,
+                metadata=metadata
+            )
+            
+            logger.info(f"Document generated: {filename}")
+            
+            if cache is not None:
+                document = cache.put(cache_key, buffer.getvalue(), filename, content_type, generated_at)
+            else:
+                content = buffer.getvalue()
+                document = RenderedDocument(
+                    content=content,
+                    filename=filename,
+                    content_type=content_type,
+                    etag=compute_etag(content),
+                    generated_at=generated_at
+                )
+        else:
+            logger.info(f"Document served from render cache: {document.filename}")
         
-        # Metadata
-        metadata = {
-            "generated_at": datetime.now().isoformat(),
-            "document_type": request.document_type
+        headers = {
+            "ETag": document.etag,
+            # Clients may keep the file but must revalidate; shared caches must not store it
+            "Cache-Control": "private, no-cache",
+            "X-Render-Cache": cache_status
         }
         
-        # Generate document
-        generator = get_document_generator()
-        buffer, filename, content_type = generator.generate(
-            format=format_lower,
-            draft_text=request.draft_text,
-            document_type=request.document_type,
-            applicant_name=request.applicant.name,
-            applicant_details=applicant_details,
-            authority_details=authority_details,
-            metadata=metadata
-        )
+        if etag_matches(if_none_match, document.etag):
+            return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
         
-        logger.info(f"Document generated: {filename}")
-        
-        # Stream response
-        return StreamingResponse(
-            buffer,
-            media_type=content_type,
+        return Response(
+            content=document.content,
+            media_type=document.content_type,
             headers={
-                "Content-Disposition": f'attachment; filename="{filename}"',
+                **headers,
+                "Content-Disposition": f'attachment; filename="{document.filename}"',
                 "X-Document-Type": request.document_type,
-                "X-Generated-At": datetime.now().isoformat()
+                "X-Generated-At": document.generated_at
             }
         )
         
-    except HTTPException:
+    except (HTTPException, ExecutorSaturatedError):
         raise
     except ValueError as e:
         logger.error(f"Invalid request: {str(e)}")
@@ -197,15 +295,87 @@ async def download_document(request: DownloadRequest):
         )
 
 
+@router.post(
+    "/download/bulk",
+    summary="Download many documents as a ZIP archive",
+    description="""
+    Generate several drafts, each in one or more formats, as one ZIP archive.
+    
+    - Documents are rendered in parallel and streamed as they are ready
+      (in request order); the archive is never held in memory as a whole
+    - Entries are numbered: `0001_<filename>`, `0002_<filename>`, ...
+    - `index.xlsx` (last entry) lists every document, its size and status;
+      a document that fails is marked `failed` there instead of aborting the archive
+    - Bulk downloads are not cached
+    """,
+    responses={
+        200: {"description": "ZIP archive stream", "content": {"application/zip": {}}},
+        400: {"description": "Invalid format, input or too many drafts"},
+        503: {"description": "Server busy, retry after the Retry-After interval"}
+    }
+)
+async def download_bulk(request: BulkDownloadRequest):
+    """Render drafts and stream them as a ZIP archive"""
+    if len(request.drafts) > settings.BULK_DOWNLOAD_MAX_DRAFTS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Too many drafts: at most {settings.BULK_DOWNLOAD_MAX_DRAFTS} per request"
+        )
+    
+    jobs = []
+    for draft in request.drafts:
+        formats = dict.fromkeys(_validate_format(f) for f in (draft.formats or request.formats))
+        applicant_details = _applicant_details(draft.applicant)
+        authority_details = _authority_details(draft.authority)
+        for format_lower in formats:
+            jobs.append(BulkJob(
+                format=format_lower,
+                draft_text=draft.draft_text,
+                document_type=draft.document_type,
+                applicant_name=draft.applicant.name,
+                applicant_details=applicant_details,
+                authority_details=authority_details
+            ))
+    
+    logger.info(f"Bulk download request: {len(request.drafts)} drafts, {len(jobs)} documents")
+    
+    export = BulkExport(jobs, concurrency=settings.BULK_DOWNLOAD_CONCURRENCY)
+    stream = export.stream()
+    
+    # Wait for the first entry before answering, so a saturated executor is still a 503
+    first_chunk = await stream.__anext__()
+    
+    async def body():
+        try:
+            yield first_chunk
+            async for chunk in stream:
+                yield chunk
+        finally:
+            await stream.aclose()
+    
+    filename = f"documents_{datetime.now().strftime('%Y%m%d_%H%M%S')}.zip"
+    return StreamingResponse(
+        body(),
+        media_type="application/zip",
+        headers={
+            "Content-Disposition": f'attachment; filename="{filename}"',
+            "X-Document-Count": str(len(jobs))
+        }
+    )
+
+
 @router.post(
     "/download/pdf",
     summary="Download as PDF",
     description="Shortcut endpoint for PDF download"
 )
-async def download_pdf(request: DownloadRequest):
+async def download_pdf(
+    request: DownloadRequest,
+    if_none_match: Optional[str] = Header(default=None)
+):
     """Generate and download PDF document"""
     request.format = "pdf"
-    return await download_document(request)
+    return await download_document(request, if_none_match=if_none_match)
 
 
 @router.post(
@@ -213,10 +383,13 @@ async def download_pdf(request: DownloadRequest):
     summary="Download as DOCX",
     description="Shortcut endpoint for DOCX download"
 )
-async def download_docx(request: DownloadRequest):
+async def download_docx(
+    request: DownloadRequest,
+    if_none_match: Optional[str] = Header(default=None)
+):
     """Generate and download DOCX document"""
     request.format = "docx"
-    return await download_document(request)
+    return await download_document(request, if_none_match=if_none_match)
 
 
 @router.post(
@@ -224,10 +397,13 @@ async def download_docx(request: DownloadRequest):
     summary="Download as XLSX",
     description="Shortcut endpoint for XLSX tracking sheet download"
 )
-async def download_xlsx(request: DownloadRequest):
+async def download_xlsx(
+    request: DownloadRequest,
+    if_none_match: Optional[str] = Header(default=None)
+):
     """Generate and download XLSX tracking sheet"""
     request.format = "xlsx"
-    return await download_document(request)
+    return await download_document(request, if_none_match=if_none_match)
 
 
 @router.get(
@@ -9,16 +9,26 @@ DESIGN PRINCIPLE:
 """
 
 from fastapi import APIRouter, HTTPException, status
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel, Field, EmailStr
-from typing import Optional, Dict, Any, List
+from typing import Optional, Dict, Any, Iterator, List
 from datetime import datetime
+from csv import Error as csv_error
 from loguru import logger
 
 from app.services.draft_assembler import get_draft_assembler, DocumentType
+from app.services.draft_batch import (
+    SharedDraft,
+    draft_suggestions,
+    merge_rows,
+    parse_rows,
+    prepare_shared_draft,
+    translate_inputs,
+)
 from app.services.inference_orchestrator import IntentType
-from app.services.nlp import translate_to_hindi
 from app.utils.text_sanitizer import clean_input, warn_about_pii
 from app.utils.tone import suggest_tone
+from app.services.executor import run_blocking, ExecutorSaturatedError
 from app.config import get_settings
 
 router = APIRouter()
@@ -181,6 +191,48 @@ class DraftResponse(BaseModel):
     enhancement_summary: Optional[str] = Field(None, description="Summary of LLM changes")
 
 
+class BatchDraftRequest(BaseModel):
+    """Request body for mail-merge draft generation: one issue, many recipients"""
+    document_type: str = Field(..., description="Type of document, as for /draft")
+    issue: IssueDetails
+    
+    # Recipients: either a list of objects, or CSV/JSONL text
+    rows: Optional[List[Dict[str, Any]]] = Field(
+        None,
+        description="Recipient rows: name, address, state, district, phone, email, department_name, department_address, designation"
+    )
+    rows_data: Optional[str] = Field(None, description="Recipient rows as CSV (with header) or JSONL text")
+    rows_format: str = Field(default="csv", description="Format of rows_data: csv, jsonl")
+    
+    language: str = Field(default="english", description="Document language")
+    tone: str = Field(default="neutral", description="Document tone: neutral, formal, assertive")
+    additional_context: Optional[Dict[str, str]] = None
+    enable_llm_enhancement: bool = Field(
+        default=False,
+        description="Polish the shared body with the LLM (once for the whole batch)"
+    )
+    
+    class Config:
+        json_schema_extra = {
+            "example": {
+                "document_type": "information_request",
+                "issue": {
+                    "description": "I want to know the expenditure details of road construction work in my locality",
+                    "time_period": "January 2024 to December 2024"
+                },
+                "rows_data": "name,address,state,department_name\nRahul Sharma,\"123, Gandhi Nagar, Jaipur\",Rajasthan,Public Works Department\n",
+                "rows_format": "csv"
+            }
+        }
+
+
+class BatchDraftItem(BaseModel):
+    """One NDJSON line of the batch draft response"""
+    index: int = Field(..., description="Position of the row in the request")
+    result: Optional[DraftResponse] = None
+    error: Optional[str] = None
+
+
 # =============================================================================
 # API ENDPOINT
 # =============================================================================
@@ -209,7 +261,8 @@ class DraftResponse(BaseModel):
         200: {"description": "Draft generated successfully"},
         400: {"description": "Invalid document type or input"},
         422: {"description": "Validation error"},
-        500: {"description": "Draft generation failed"}
+        500: {"description": "Draft generation failed"},
+        503: {"description": "Server busy, retry after the Retry-After interval"}
     }
 )
 async def generate_draft(request: DraftRequest) -> DraftResponse:
@@ -266,26 +319,14 @@ async def generate_draft(request: DraftRequest) -> DraftResponse:
         final_specific = cleaned_specific
         
         if language == "hindi":
-             try:
-                 from app.utils.language_normalizer import detect_language
-                 # Try to detect if input is English and wants Hindi output
-                 if detect_language(cleaned_description) != "hi":
-                     logger.info("Translating description to Hindi")
-                     trans_desc = translate_to_hindi(cleaned_description)
-                     if trans_desc:
-                         final_description = trans_desc
-                         
-                 if cleaned_specific and detect_language(cleaned_specific) != "hi":
-                     logger.info("Translating specific request to Hindi")
-                     trans_spec = translate_to_hindi(cleaned_specific)
-                     if trans_spec:
-                         final_specific = trans_spec
-             except Exception as e:
-                 logger.error(f"Translation preprocessing failed: {e}")
-                 # Fallback to original text matches behavior if translation service fails
+            final_description, final_specific = await run_blocking(
+                "translation", translate_inputs, cleaned_description, cleaned_specific
+            )
         
         # Generate draft
-        result = assembler.assemble_draft(
+        result = await run_blocking(
+            "draft",
+            assembler.assemble_draft,
             document_type=doc_type,
             applicant_name=request.applicant.name,
             applicant_address=request.applicant.address,
@@ -305,23 +346,7 @@ async def generate_draft(request: DraftRequest) -> DraftResponse:
         )
         
         # Build suggestions
-        suggestions = []
-        
-        if result["placeholders_missing"]:
-            suggestions.append(f"Some fields need your attention: {', '.join(result['placeholders_missing'][:3])}")
-        
-        if doc_type in [DocumentType.INFORMATION_REQUEST, DocumentType.RECORDS_REQUEST, DocumentType.INSPECTION_REQUEST]:
-            if language == "hindi":
-                suggestions.append("आरटीआई शुल्क रु. 10/- आईपीओ/डीडी/ऑनलाइन के माध्यम से संलग्न करें")
-                suggestions.append("अपने रिकॉर्ड के लिए इस आवेदन की एक प्रति रखें")
-            else:
-                suggestions.append("Remember to attach RTI fee of Rs. 10/- via IPO/DD/Online")
-                suggestions.append("Keep a copy of this application for your records")
-        else:
-            if language == "hindi":
-                suggestions.append("अनुवर्ती कार्रवाई के लिए पावती/संदर्भ संख्या रखें")
-            else:
-                suggestions.append("Keep the acknowledgment/reference number for follow-up")
+        suggestions = draft_suggestions(doc_type, language, result["placeholders_missing"])
         
         # =====================================================================
         # LLM ENHANCEMENT (Optional - Rules first, then LLM polishes)
@@ -386,7 +411,7 @@ async def generate_draft(request: DraftRequest) -> DraftResponse:
         
         return response
         
-    except HTTPException:
+    except (HTTPException, ExecutorSaturatedError):
         raise
     except Exception as e:
         logger.error(f"Draft generation failed: {str(e)}")
@@ -396,6 +421,103 @@ async def generate_draft(request: DraftRequest) -> DraftResponse:
         )
 
 
+def _stream_batch_drafts(shared: SharedDraft, rows: List) -> Iterator[str]:
+    """Yield one NDJSON line per row, in row order"""
+    failed = 0
+    for item in merge_rows(shared, rows):
+        failed += item["error"] is not None
+        yield BatchDraftItem.model_validate(item).model_dump_json() + "\n"
+    
+    logger.info(f"Batch drafts completed: {len(rows)} rows, {failed} failed")
+
+
+@router.post(
+    "/draft/batch",
+    summary="Generate drafts for many recipients (mail merge)",
+    description="""
+    Generates one draft per row for a single shared issue - the same RTI
+    question to many authorities, or one complaint for many residents.
+    
+    - Rows come as `rows` (list of objects) or `rows_data` (CSV with header, or JSONL)
+    - Cleaning, PII checks, translation, tone and the optional LLM polish of
+      the shared body run once; each row only fills applicant/authority fields
+    - Results stream back as NDJSON (`application/x-ndjson`), one line per row
+      in input order: `{"index": 0, "result": {...}, "error": null}`
+    
+    Invalid rows get an `error` line instead of a result.
+    """,
+    responses={
+        200: {"description": "NDJSON stream of drafts", "content": {"application/x-ndjson": {}}},
+        400: {"description": "Invalid document type, rows or too many rows"},
+        422: {"description": "Validation error"},
+        503: {"description": "Server busy, retry after the Retry-After interval"}
+    }
+)
+async def generate_draft_batch(request: BatchDraftRequest) -> StreamingResponse:
+    """Prepare the shared draft once, then stream one filled draft per row"""
+    try:
+        doc_type = DocumentType(request.document_type)
+    except ValueError:
+        valid_types = [dt.value for dt in DocumentType]
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Invalid document_type. Valid options: {valid_types}"
+        )
+    
+    if (request.rows is None) == (request.rows_data is None):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Provide exactly one of rows or rows_data"
+        )
+    
+    try:
+        if request.rows is not None:
+            rows = [(row, None) for row in request.rows]
+        else:
+            rows = parse_rows(request.rows_data, request.rows_format)
+    except (ValueError, csv_error) as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    
+    if not rows or len(rows) > settings.DRAFT_BATCH_MAX_ROWS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Provide between 1 and {settings.DRAFT_BATCH_MAX_ROWS} rows"
+        )
+    
+    # Same language normalization as /draft
+    language = request.language.lower() if request.language else "english"
+    if language not in ["english", "hindi"]:
+        language = "english"
+    
+    logger.info(f"Batch draft request: type={request.document_type}, rows={len(rows)}")
+    
+    try:
+        shared = await prepare_shared_draft(
+            doc_type,
+            request.issue.description,
+            specific_request=request.issue.specific_request,
+            time_period=request.issue.time_period,
+            category=request.issue.category,
+            additional_context=request.additional_context,
+            language=language,
+            tone=request.tone,
+            enable_llm_enhancement=request.enable_llm_enhancement
+        )
+    except (HTTPException, ExecutorSaturatedError):
+        raise
+    except Exception as e:
+        logger.error(f"Batch draft preparation failed: {str(e)}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Draft generation failed: {str(e)}"
+        )
+    
+    return StreamingResponse(
+        _stream_batch_drafts(shared, rows),
+        media_type="application/x-ndjson"
+    )
+
+
 @router.get(
     "/draft/templates",
     summary="List available templates",
@@ -9,13 +9,23 @@ This endpoint NEVER makes final decisions - it provides suggestions with confide
 """
 
 from fastapi import APIRouter, HTTPException, status
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel, Field
-from typing import Optional, List, Dict, Any
+from typing import Optional, List, Dict, Any, AsyncIterator, Annotated
 from datetime import datetime
 from loguru import logger
+import asyncio
+import time
 
-from app.services.inference_orchestrator import run_inference, IntentType, DocumentType
+from app.services.inference_orchestrator import (
+    run_inference,
+    run_inference_batch,
+    InferenceResult,
+    IntentType,
+    DocumentType,
+)
 from app.services.nlp.confidence_gate import ConfidenceLevel
+from app.services.executor import EXECUTOR_THREAD, get_inference_executor, ExecutorSaturatedError
 from app.utils.text_sanitizer import warn_about_pii, clean_input
 from app.config import get_settings
 
@@ -149,6 +159,107 @@ class InferenceResponse(BaseModel):
         }
 
 
+class BatchInferenceRequest(BaseModel):
+    """Request body for batch inference endpoint"""
+    texts: List[Annotated[str, Field(min_length=10, max_length=5000)]] = Field(
+        ...,
+        min_length=1,
+        max_length=settings.INFER_BATCH_MAX_TEXTS,
+        description="Issue descriptions to analyze, results are returned in the same order"
+    )
+    language: str = Field(
+        default="english",
+        description="Language of all inputs (english, hindi)"
+    )
+    
+    class Config:
+        json_schema_extra = {
+            "example": {
+                "texts": [
+                    "I want to know the expenditure details of road construction in my area",
+                    "The street lights in our colony have not been working for three weeks"
+                ],
+                "language": "english"
+            }
+        }
+
+
+class BatchInferenceItem(BaseModel):
+    """One NDJSON line of the batch inference response"""
+    index: int = Field(..., description="Position of the text in the request")
+    result: Optional[InferenceResponse] = None
+    error: Optional[str] = None
+
+
+# =============================================================================
+# RESPONSE BUILDING
+# =============================================================================
+
+def _build_inference_response(
+    result: InferenceResult,
+    pii_result: Dict[str, Any],
+    processing_time: float
+) -> InferenceResponse:
+    """Convert an orchestrator result into the API response schema"""
+    # Map confidence level to string
+    confidence_level_map = {
+        ConfidenceLevel.HIGH: "high",
+        ConfidenceLevel.MEDIUM: "medium",
+        ConfidenceLevel.LOW: "low",
+        ConfidenceLevel.VERY_LOW: "very_low"
+    }
+    
+    # Build confidence message
+    confidence_messages = {
+        "high": f"High confidence ({result.confidence:.0%}) - auto-applied",
+        "medium": f"Medium confidence ({result.confidence:.0%}) - please verify",
+        "low": f"Low confidence ({result.confidence:.0%}) - please select from options",
+        "very_low": f"Very low confidence ({result.confidence:.0%}) - manual input recommended"
+    }
+    
+    confidence_level = confidence_level_map.get(result.confidence_level, "medium")
+    
+    # Build department mapping
+    dept_mapping = None
+    if result.department_mapping and result.department_mapping.get("primary_category"):
+        dept_mapping = DepartmentMatch(
+            category=result.department_mapping["primary_category"],
+            departments=result.department_mapping.get("primary_departments", []),
+            confidence=result.department_mapping["matches"][0]["confidence"] if result.department_mapping.get("matches") else 0.5
+        )
+    
+    # Build response
+    return InferenceResponse(
+        intent=result.intent.value,
+        document_type=result.document_type.value,
+        confidence=ConfidenceInfo(
+            score=result.confidence,
+            level=confidence_level,
+            requires_confirmation=result.requires_confirmation,
+            message=confidence_messages[confidence_level]
+        ),
+        extracted_entities=result.extracted_entities,
+        key_phrases=result.key_phrases,
+        legal_triggers=LegalTriggers(
+            rti_sections=result.legal_triggers.get("rti_sections", []),
+            grievance_markers=result.legal_triggers.get("grievance_markers", []),
+            suggested_citations=result.legal_triggers.get("suggested_citations", [])
+        ),
+        department_mapping=dept_mapping,
+        sentiment=result.sentiment,
+        suggestions=result.suggestions,
+        explanation=result.explanation,
+        decision_path=result.decision_path,
+        pii_warnings=PIIWarning(
+            has_pii=pii_result["has_pii"],
+            warnings=pii_result.get("warnings", []),
+            types_found=pii_result.get("types_found", [])
+        ),
+        timestamp=datetime.now(),
+        processing_time_ms=processing_time
+    )
+
+
 # =============================================================================
 # API ENDPOINT
 # =============================================================================
@@ -176,7 +287,8 @@ class InferenceResponse(BaseModel):
         200: {"description": "Successful inference"},
         400: {"description": "Invalid input"},
         422: {"description": "Validation error"},
-        500: {"description": "Internal server error"}
+        500: {"description": "Internal server error"},
+        503: {"description": "Server busy, retry after the Retry-After interval"}
     }
 )
 async def infer_intent(request: InferenceRequest) -> InferenceResponse:
@@ -184,7 +296,6 @@ async def infer_intent(request: InferenceRequest) -> InferenceResponse:
     Analyze user input and infer document type and intent.
     Uses rule engine first, then NLP if needed.
     """
-    import time
     start_time = time.time()
     
     logger.info(f"Inference request received, text length: {len(request.text)}")
@@ -199,78 +310,22 @@ async def infer_intent(request: InferenceRequest) -> InferenceResponse:
                 detail="Input text too short after cleaning. Please provide more details."
             )
         
-        # Check for PII
-        pii_result = warn_about_pii(cleaned_text)
-        
         # Run inference
-        result = run_inference(cleaned_text, request.language)
+        result = await get_inference_executor().run("inference", run_inference, cleaned_text, request.language)
+        
+        # Check for PII (spans from the inference's own scan of the text)
+        pii_result = warn_about_pii(cleaned_text, result.text_spans)
         
         # Calculate processing time
         processing_time = (time.time() - start_time) * 1000
         
-        # Map confidence level to string
-        confidence_level_map = {
-            ConfidenceLevel.HIGH: "high",
-            ConfidenceLevel.MEDIUM: "medium",
-            ConfidenceLevel.LOW: "low",
-            ConfidenceLevel.VERY_LOW: "very_low"
-        }
-        
-        # Build confidence message
-        confidence_messages = {
-            "high": f"High confidence ({result.confidence:.0%}) - auto-applied",
-            "medium": f"Medium confidence ({result.confidence:.0%}) - please verify",
-            "low": f"Low confidence ({result.confidence:.0%}) - please select from options",
-            "very_low": f"Very low confidence ({result.confidence:.0%}) - manual input recommended"
-        }
-        
-        confidence_level = confidence_level_map.get(result.confidence_level, "medium")
-        
-        # Build department mapping
-        dept_mapping = None
-        if result.department_mapping and result.department_mapping.get("primary_category"):
-            dept_mapping = DepartmentMatch(
-                category=result.department_mapping["primary_category"],
-                departments=result.department_mapping.get("primary_departments", []),
-                confidence=result.department_mapping["matches"][0]["confidence"] if result.department_mapping.get("matches") else 0.5
-            )
-        
-        # Build response
-        response = InferenceResponse(
-            intent=result.intent.value,
-            document_type=result.document_type.value,
-            confidence=ConfidenceInfo(
-                score=result.confidence,
-                level=confidence_level,
-                requires_confirmation=result.requires_confirmation,
-                message=confidence_messages[confidence_level]
-            ),
-            extracted_entities=result.extracted_entities,
-            key_phrases=result.key_phrases,
-            legal_triggers=LegalTriggers(
-                rti_sections=result.legal_triggers.get("rti_sections", []),
-                grievance_markers=result.legal_triggers.get("grievance_markers", []),
-                suggested_citations=result.legal_triggers.get("suggested_citations", [])
-            ),
-            department_mapping=dept_mapping,
-            sentiment=result.sentiment,
-            suggestions=result.suggestions,
-            explanation=result.explanation,
-            decision_path=result.decision_path,
-            pii_warnings=PIIWarning(
-                has_pii=pii_result["has_pii"],
-                warnings=pii_result.get("warnings", []),
-                types_found=pii_result.get("types_found", [])
-            ),
-            timestamp=datetime.now(),
-            processing_time_ms=processing_time
-        )
+        response = _build_inference_response(result, pii_result, processing_time)
         
         logger.info(f"Inference completed: intent={result.intent.value}, confidence={result.confidence:.2f}, time={processing_time:.2f}ms")
         
         return response
         
-    except HTTPException:
+    except (HTTPException, ExecutorSaturatedError):
         raise
     except Exception as e:
         logger.error(f"Inference failed: {str(e)}")
@@ -279,3 +334,155 @@ async def infer_intent(request: InferenceRequest) -> InferenceResponse:
             detail=f"Inference processing failed: {str(e)}"
         )
 
+
+# A chunk of a running batch waits at most this many Retry-After intervals
+# for an executor slot before the rest of the batch is aborted
+_BATCH_BUSY_RETRIES = 30
+
+
+def _infer_chunk(texts: List[str], language: str, batch_size: int, n_process: int) -> List[InferenceResult]:
+    """One chunk of a batch (module-level so it can run in the inference worker processes)"""
+    return list(run_inference_batch(texts, language, batch_size=batch_size, n_process=n_process))
+
+
+async def _run_chunk(texts: List[str], language: str, wait_if_busy: bool) -> List[InferenceResult]:
+    """Run a chunk on the inference executor, optionally waiting out saturation"""
+    executor = get_inference_executor()
+    # Forked inference workers are daemonic and cannot start spaCy processes
+    n_process = settings.INFER_BATCH_N_PROCESS if executor.kind == EXECUTOR_THREAD else 1
+    
+    for attempt in range(_BATCH_BUSY_RETRIES + 1):
+        try:
+            return await executor.run(
+                "inference_batch", _infer_chunk, texts, language, settings.INFER_BATCH_SIZE, n_process
+            )
+        except ExecutorSaturatedError as e:
+            if not wait_if_busy or attempt == _BATCH_BUSY_RETRIES:
+                raise
+            await asyncio.sleep(e.retry_after)
+
+
+async def _stream_batch_results(request: BatchInferenceRequest) -> AsyncIterator[str]:
+    """
+    Yield one NDJSON line per input text, in input order.
+    
+    Texts run on the inference executor in chunks of
+    INFER_BATCH_SIZE x INFER_BATCH_N_PROCESS; the next chunk is computed
+    while the current one is streamed. The first chunk is admitted before
+    the first line, so a saturated executor raises ExecutorSaturatedError
+    (503) instead of producing a broken stream.
+    """
+    start_time = time.time()
+    
+    cleaned_texts = [clean_input(text) for text in request.texts]
+    valid_texts = [text for text in cleaned_texts if len(text) >= 10]
+    chunk_size = max(settings.INFER_BATCH_SIZE, 1) * max(settings.INFER_BATCH_N_PROCESS, 1)
+    chunks = [valid_texts[i:i + chunk_size] for i in range(0, len(valid_texts), chunk_size)]
+    
+    results: List[InferenceResult] = []
+    position = 0
+    error: Optional[Exception] = None
+    pending: Optional[asyncio.Task] = None
+    
+    if chunks:
+        try:
+            results = await _run_chunk(chunks[0], request.language, wait_if_busy=False)
+        except ExecutorSaturatedError:
+            raise
+        except Exception as e:
+            error = e
+    next_chunk = 1
+    
+    try:
+        for index, text in enumerate(cleaned_texts):
+            if len(text) < 10:
+                yield BatchInferenceItem(
+                    index=index,
+                    error="Input text too short after cleaning. Please provide more details."
+                ).model_dump_json() + "\n"
+                continue
+            
+            if error is None and position == len(results):
+                try:
+                    results = await pending
+                    position = 0
+                except Exception as e:
+                    error = e
+                pending = None
+            
+            if error is not None:
+                logger.error(f"Batch inference failed at index {index}: {str(error)}")
+                yield BatchInferenceItem(index=index, error=f"Inference processing failed: {str(error)}").model_dump_json() + "\n"
+                # The remaining results cannot be produced either
+                for remaining in range(index + 1, len(cleaned_texts)):
+                    yield BatchInferenceItem(index=remaining, error="Batch aborted").model_dump_json() + "\n"
+                return
+            
+            if pending is None and next_chunk < len(chunks):
+                pending = asyncio.ensure_future(_run_chunk(chunks[next_chunk], request.language, wait_if_busy=True))
+                next_chunk += 1
+            
+            result = results[position]
+            position += 1
+            
+            # Elapsed time until this result was available
+            processing_time = (time.time() - start_time) * 1000
+            yield BatchInferenceItem(
+                index=index,
+                result=_build_inference_response(result, warn_about_pii(text, result.text_spans), processing_time)
+            ).model_dump_json() + "\n"
+    finally:
+        if pending is not None:
+            pending.cancel()
+    
+    logger.info(
+        f"Batch inference completed: {len(cleaned_texts)} texts, "
+        f"{len(cleaned_texts) - len(valid_texts)} rejected, time={(time.time() - start_time) * 1000:.2f}ms"
+    )
+
+
+@router.post(
+    "/infer/batch",
+    summary="Analyze many inputs in one request",
+    description="""
+    Runs the same analysis as `/infer` over up to `INFER_BATCH_MAX_TEXTS` texts.
+    
+    - spaCy parses the texts with `nlp.pipe` in batches
+    - DistilBERT runs once per batch, only for low-confidence texts
+    - Results stream back as NDJSON (`application/x-ndjson`), one line per text
+      in input order: `{"index": 0, "result": {...}, "error": null}`
+    - Work runs on the inference executor (or the forked inference workers),
+      chunk by chunk, under the same admission limit as `/infer`
+    
+    Texts that are too short after cleaning get an `error` line instead of a result.
+    """,
+    responses={
+        200: {"description": "NDJSON stream of results", "content": {"application/x-ndjson": {}}},
+        422: {"description": "Validation error"},
+        503: {"description": "Server busy, retry after the Retry-After interval"}
+    }
+)
+async def infer_batch(request: BatchInferenceRequest) -> StreamingResponse:
+    """
+    Analyze many texts for bulk triage.
+    Chunks run on the inference executor, so the event loop stays free.
+    """
+    logger.info(f"Batch inference request received: {len(request.texts)} texts")
+    
+    stream = _stream_batch_results(request)
+    
+    # Run the first chunk before answering, so a saturated executor is still a 503
+    first_line = await stream.__anext__()
+    
+    async def body():
+        try:
+            yield first_line
+            async for line in stream:
+                yield line
+        finally:
+            await stream.aclose()
+    
+    return StreamingResponse(
+        body(),
+        media_type="application/x-ndjson"
+    )
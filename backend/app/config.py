@@ -74,6 +74,45 @@ class Settings(BaseSettings):
     SPACY_MODEL: str = Field(default="en_core_web_sm", description="spaCy model to use")
     ENABLE_DISTILBERT: bool = Field(default=False, description="Enable DistilBERT for semantic analysis (memory intensive)")
     DISTILBERT_MODEL: str = Field(default="distilbert-base-uncased", description="DistilBERT model")
+    EMBEDDING_BACKEND: str = Field(default="torch", description="Embedding runtime: 'torch' or 'onnx' (ONNX Runtime, CPU)")
+    ONNX_MODEL_DIR: str = Field(default="data/models", description="Directory of exported ONNX models")
+    ONNX_QUANTIZE: bool = Field(default=True, description="Use the dynamic int8-quantized ONNX graph")
+    ONNX_NUM_THREADS: int = Field(default=0, description="ONNX Runtime intra-op threads (0 = runtime default)")
+    TEMPLATE_INDEX_DIR: str = Field(default="data/embeddings", description="Directory of prebuilt template embedding indexes")
+    EMBEDDING_CACHE_MAX_MB: float = Field(default=16.0, description="Byte budget of the in-process embedding LRU cache (MB)")
+    EMBEDDING_CACHE_TTL_SECONDS: int = Field(default=0, description="Embedding cache entry TTL in seconds (0 = no expiry)")
+    EMBEDDING_STORE_ENABLED: bool = Field(default=False, description="Share embeddings across workers via an on-disk SQLite store")
+    EMBEDDING_STORE_PATH: str = Field(default="data/embeddings/embeddings.sqlite3", description="Path of the persistent embedding store")
+    TRANSLATION_BACKEND: str = Field(default="torch", description="Translation runtime: 'torch' or 'ctranslate2' (converted model, CPU)")
+    TRANSLATION_MODEL_DIR: str = Field(default="data/models", description="Directory of converted CTranslate2 translation models")
+    TRANSLATION_COMPUTE_TYPE: str = Field(default="int8", description="CTranslate2 weight type: int8, int8_float32, int16 or float32")
+    TRANSLATION_INTRA_THREADS: int = Field(default=0, description="CTranslate2 threads per translation (0 = runtime default)")
+    TRANSLATION_INTER_THREADS: int = Field(default=1, description="CTranslate2 translations run in parallel")
+    TRANSLATION_BATCH_SIZE: int = Field(default=16, description="Sentence segments per translation model batch")
+    TRANSLATION_MAX_SEGMENT_CHARS: int = Field(default=400, description="Longest segment sent to the translation model (longer sentences are split)")
+    TRANSLATION_MEMORY_SIZE: int = Field(default=5000, description="Translated segments kept in the in-process translation memory (0 = disabled)")
+    
+    # ===================
+    # Batch Inference
+    # ===================
+    INFER_BATCH_MAX_TEXTS: int = Field(default=1000, description="Max texts per /api/infer/batch request")
+    INFER_BATCH_SIZE: int = Field(default=32, description="Texts per nlp.pipe / DistilBERT batch")
+    INFER_BATCH_N_PROCESS: int = Field(default=1, description="spaCy worker processes for batch parsing")
+    
+    # ===================
+    # Batch Drafts (mail merge)
+    # ===================
+    DRAFT_BATCH_MAX_ROWS: int = Field(default=5000, description="Max rows per /api/draft/batch mail merge")
+    
+    # ===================
+    # Blocking Work Executor
+    # ===================
+    EXECUTOR_KIND: str = Field(default="thread", description="Pool for CPU-bound calls: 'thread' or 'process'")
+    EXECUTOR_MAX_WORKERS: int = Field(default=0, description="Pool workers (0 = min(4, CPU count))")
+    EXECUTOR_MAX_QUEUE: int = Field(default=32, description="Calls allowed to wait for a worker before returning 503")
+    EXECUTOR_RETRY_AFTER_SECONDS: int = Field(default=1, description="Retry-After sent with 503 when the executor is full")
+    INFERENCE_WORKERS: int = Field(default=0, description="Forked inference worker processes sharing preloaded models (0 = use the shared executor)")
+    INFERENCE_WORKER_QUEUE: int = Field(default=64, description="Inference calls allowed to wait for a worker before returning 503")
     
     # ===================
     # Confidence Thresholds
@@ -88,6 +127,24 @@ class Settings(BaseSettings):
     RATE_LIMIT_ENABLED: bool = Field(default=True, description="Enable rate limiting")
     RATE_LIMIT_REQUESTS: int = Field(default=100, description="Max requests per window")
     RATE_LIMIT_WINDOW_SECONDS: int = Field(default=60, description="Rate limit window in seconds")
+    RATE_LIMIT_BACKEND: str = Field(default="memory", description="Rate limit store: 'memory' (per process) or 'sqlite' (shared by all workers on the host)")
+    RATE_LIMIT_SQLITE_PATH: str = Field(default="data/rate_limits.sqlite3", description="SQLite file of the shared rate limit backend")
+    RATE_LIMIT_MAX_CLIENTS: int = Field(default=100000, description="Max tracked clients per process for the memory backend")
+    
+    # ===================
+    # Render Cache (/api/download)
+    # ===================
+    RENDER_CACHE_ENABLED: bool = Field(default=True, description="Reuse rendered documents for repeated downloads")
+    RENDER_CACHE_MAX_MB: int = Field(default=64, description="Memory budget of the render cache (MB, per process)")
+    RENDER_CACHE_TTL_SECONDS: int = Field(default=300, description="Seconds a rendered document is kept")
+    RENDER_CACHE_DISK_DIR: str = Field(default="", description="Directory of the optional disk tier shared by workers (empty = memory only)")
+    RENDER_CACHE_KEY_SECRET: str = Field(default="", description="Secret for hashing cache keys (empty = random per process; set it to share the disk tier)")
+    
+    # ===================
+    # Bulk Download (/api/download/bulk)
+    # ===================
+    BULK_DOWNLOAD_MAX_DRAFTS: int = Field(default=200, description="Max drafts in one bulk download")
+    BULK_DOWNLOAD_CONCURRENCY: int = Field(default=0, description="Documents rendered at once per bulk download (0 = executor workers)")
     
     # ===================
     # Logging
@@ -100,12 +157,18 @@ class Settings(BaseSettings):
     LOG_TO_FILE: bool = Field(default=False, description="Also log to file")
     LOG_FILE_PATH: str = Field(default="logs/app.log", description="Log file path")
     
+    # ===================
+    # Draft Templates
+    # ===================
+    TEMPLATE_WATCH_INTERVAL_SECONDS: float = Field(default=2.0, description="Seconds between checks of template files for edits (0 = never reload)")
+    
     # ===================
     # Document Generation
     # ===================
     MAX_DOCUMENT_SIZE_MB: int = Field(default=10, description="Max generated document size in MB")
     PDF_FONT: str = Field(default="Helvetica", description="PDF font family")
     PDF_FONT_SIZE: int = Field(default=11, description="PDF base font size")
+    PDF_RENDER_MODE: str = Field(default="platypus", description="PDF renderer: 'platypus' (flowable layout) or 'fast' (direct canvas, same layout; opt-in)")
     
     # ===================
     # Security
@@ -142,6 +205,20 @@ class Settings(BaseSettings):
     OPENAI_TEMPERATURE: float = Field(default=0.3, description="Low temperature for consistent legal language")
     ENABLE_LLM_ENHANCEMENT: bool = Field(default=True, description="Enable LLM text enhancement")
     LLM_ENHANCEMENT_MODE: str = Field(default="polish", description="polish, translate, clarify")
+    OPENAI_BASE_URL: Optional[str] = Field(default=None, description="OpenAI-compatible API base URL (default: api.openai.com)")
+    OPENAI_TIMEOUT_SECONDS: float = Field(default=30.0, description="Per-call LLM request timeout")
+    OPENAI_CONNECT_TIMEOUT_SECONDS: float = Field(default=5.0, description="LLM connection timeout")
+    OPENAI_MAX_CONNECTIONS: int = Field(default=20, description="Pooled HTTP connections to the LLM API")
+    OPENAI_MAX_CONCURRENCY: int = Field(default=8, description="Max LLM calls in flight")
+    OPENAI_QUEUE_TIMEOUT_SECONDS: float = Field(default=10.0, description="Max wait for an LLM call slot before falling back")
+    OPENAI_MAX_RETRIES: int = Field(default=3, description="Retries on 429, 5xx, timeouts and connection errors")
+    OPENAI_RETRY_BASE_SECONDS: float = Field(default=0.5, description="Base of the jittered exponential retry backoff")
+    OPENAI_RETRY_MAX_SECONDS: float = Field(default=8.0, description="Backoff cap; a longer Retry-After falls back instead")
+    LLM_CACHE_ENABLED: bool = Field(default=True, description="Reuse validated LLM enhancements for repeated requests")
+    LLM_CACHE_MAX_MB: int = Field(default=16, description="Memory budget of the LLM response cache (MB, per process)")
+    LLM_CACHE_TTL_SECONDS: int = Field(default=3600, description="Seconds an LLM enhancement is kept")
+    LLM_CACHE_DISK_DIR: str = Field(default="", description="Directory of the optional disk tier shared by workers (empty = memory only)")
+    LLM_CACHE_KEY_SECRET: str = Field(default="", description="Secret for hashing cache keys (empty = random per process; set it to share the disk tier)")
     
     # ===================
     # Feature Flags
@@ -19,13 +19,16 @@ from loguru import logger
 import sys
 
 from app.config import get_settings
-from app.middleware import (
-    ErrorHandlingMiddleware,
-    RequestLoggingMiddleware,
-    RateLimitMiddleware,
-    SecurityHeadersMiddleware,
-    APIKeyMiddleware
+from app.services.executor import (
+    ExecutorSaturatedError,
+    get_executor_stats,
+    shutdown_executor,
+    start_inference_workers
 )
+from app.services.render_cache import get_render_cache
+from app.services.single_flight import get_single_flight_stats
+from app.services.llm.openai_service import close_openai_service, get_openai_service
+from app.middleware import RequestPipelineMiddleware
 
 # Import routers
 from app.api.infer import router as infer_router
@@ -93,16 +96,27 @@ async def lifespan(app: FastAPI):
             logger.info("spaCy model loaded")
             
             if settings.ENABLE_DISTILBERT:
-                from app.services.nlp.distilbert_semantic import get_model
-                get_model()
-                logger.info("DistilBERT model loaded")
+                from app.services.nlp.distilbert_semantic import get_model, get_template_index
+                backend = get_model()
+                logger.info(f"DistilBERT model loaded ({backend.name} backend)")
+                get_template_index()
+                logger.info("Template embedding index ready")
         except Exception as e:
             logger.warning(f"Model pre-loading failed: {e}")
     
+    # Fork the inference workers after preloading, so they share the models
+    if settings.INFERENCE_WORKERS > 0:
+        try:
+            start_inference_workers()
+        except Exception as e:
+            logger.warning(f"Inference workers failed to start: {e}")
+    
     yield
     
     # Shutdown
     logger.info("Shutting down application")
+    await close_openai_service()
+    shutdown_executor()
 
 
 # =============================================================================
@@ -144,25 +158,14 @@ app = FastAPI(
 # MIDDLEWARE (Order matters - last added runs first)
 # =============================================================================
 
-# Security headers
-app.add_middleware(SecurityHeadersMiddleware)
-
-# API key authentication (optional)
-app.add_middleware(APIKeyMiddleware)
-
-# Rate limiting
+# Error handling, request logging, rate limiting, API key and security headers
+# in one pure-ASGI pass
 app.add_middleware(
-    RateLimitMiddleware,
+    RequestPipelineMiddleware,
     requests_per_window=settings.RATE_LIMIT_REQUESTS,
     window_seconds=settings.RATE_LIMIT_WINDOW_SECONDS
 )
 
-# Request logging
-app.add_middleware(RequestLoggingMiddleware)
-
-# Error handling
-app.add_middleware(ErrorHandlingMiddleware)
-
 # CORS
 app.add_middleware(
     CORSMiddleware,
@@ -199,6 +202,21 @@ async def validation_exception_handler(request: Request, exc: RequestValidationE
     )
 
 
+@app.exception_handler(ExecutorSaturatedError)
+async def executor_saturated_handler(request: Request, exc: ExecutorSaturatedError):
+    """All blocking-work slots are taken: shed load instead of queueing unboundedly"""
+    return JSONResponse(
+        status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+        content={
+            "error": "server_busy",
+            "message": "The server is busy. Please retry shortly.",
+            "retry_after_seconds": exc.retry_after,
+            "timestamp": datetime.now().isoformat()
+        },
+        headers={"Retry-After": str(exc.retry_after)}
+    )
+
+
 # =============================================================================
 # ROUTES
 # =============================================================================
@@ -210,10 +228,15 @@ async def health_check():
     Health check endpoint for load balancers and monitoring.
     Returns application status and version.
     """
+    render_cache = get_render_cache()
     return {
         "status": "healthy",
         "version": settings.APP_VERSION,
         "environment": settings.ENVIRONMENT,
+        "executor": get_executor_stats(),
+        "render_cache": render_cache.get_stats() if render_cache is not None else None,
+        "llm": get_openai_service().get_stats(),
+        "single_flight": get_single_flight_stats(),
         "timestamp": datetime.now().isoformat()
     }
 
@@ -1,251 +1,248 @@
 """
 Middleware for the application.
-Includes error handling, logging, and rate limiting.
+Includes error handling, logging, rate limiting, API key checks and security headers.
+
+All of it runs as one pure-ASGI middleware: a single pass over `scope` and the
+`http.response.start` message, with no per-request task or body-stream
+wrapping (streamed downloads are forwarded chunk by chunk untouched).
+
+Order is the same as the former middleware stack (outermost first):
+error handling → request logging/timing → rate limiting → API key → security headers
 """
 
-from fastapi import Request, HTTPException, status
+from fastapi import HTTPException, status
 from fastapi.responses import JSONResponse
-from starlette.middleware.base import BaseHTTPMiddleware
-from typing import Callable
+from starlette.concurrency import run_in_threadpool
+from starlette.datastructures import Headers
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+from typing import List, Optional, Tuple
+import math
 import time
 from datetime import datetime
-from collections import defaultdict
-import asyncio
 from loguru import logger
 
 from app.config import get_settings
+from app.services.rate_limiter import RateLimitBackend, RateLimiter, create_rate_limit_backend
+
+RawHeaders = List[Tuple[bytes, bytes]]
+
 
+def _set_headers(raw: RawHeaders, updates: RawHeaders) -> RawHeaders:
+    """Set headers, replacing any existing values of the same names"""
+    if not updates:
+        return raw
+    names = {name for name, _ in updates}
+    return [(name, value) for name, value in raw if name.lower() not in names] + updates
 
-# =============================================================================
-# ERROR HANDLING MIDDLEWARE
-# =============================================================================
 
-class ErrorHandlingMiddleware(BaseHTTPMiddleware):
+class RequestPipelineMiddleware:
     """
-    Global error handling middleware.
-    Catches all unhandled exceptions and returns consistent error responses.
+    Error handling, request logging, rate limiting, optional API key
+    authentication and security headers for every HTTP request.
     """
-    
-    async def dispatch(self, request: Request, call_next: Callable):
-        try:
-            response = await call_next(request)
-            return response
-        except HTTPException as exc:
-            # Re-raise HTTP exceptions (they have their own handlers)
-            raise exc
-        except Exception as exc:
-            # Log the error
-            logger.error(f"Unhandled exception: {str(exc)}", exc_info=True)
-            
-            # Return generic error response
-            return JSONResponse(
-                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-                content={
-                    "error": "internal_server_error",
-                    "message": "An unexpected error occurred. Please try again later.",
-                    "timestamp": datetime.now().isoformat(),
-                    "path": str(request.url.path)
-                }
-            )
 
+    # Don't log health checks
+    SKIP_LOGGING_PATHS = {"/health"}
 
-# =============================================================================
-# LOGGING MIDDLEWARE
-# =============================================================================
+    # Never rate limited
+    RATE_LIMIT_EXEMPT_PATHS = {"/health"}
 
-class RequestLoggingMiddleware(BaseHTTPMiddleware):
-    """
-    Logs all incoming requests and outgoing responses.
-    Sanitizes sensitive data before logging.
-    """
-    
-    SENSITIVE_HEADERS = {"authorization", "x-api-key", "cookie"}
-    SENSITIVE_PATHS = {"/health"}  # Don't log health checks
-    
-    async def dispatch(self, request: Request, call_next: Callable):
-        # Skip logging for certain paths
-        if request.url.path in self.SENSITIVE_PATHS:
-            return await call_next(request)
-        
-        # Start timer
-        start_time = time.time()
-        
-        # Log request
-        logger.info(
-            f"Request: {request.method} {request.url.path} "
-            f"client={request.client.host if request.client else 'unknown'}"
-        )
-        
-        # Process request
-        response = await call_next(request)
-        
-        # Calculate duration
-        duration = (time.time() - start_time) * 1000
-        
-        # Log response
-        logger.info(
-            f"Response: {request.method} {request.url.path} "
-            f"status={response.status_code} duration={duration:.2f}ms"
-        )
-        
-        # Add timing header
-        response.headers["X-Process-Time-Ms"] = f"{duration:.2f}"
-        
-        return response
-
-
-# =============================================================================
-# RATE LIMITING MIDDLEWARE
-# =============================================================================
-
-class RateLimitMiddleware(BaseHTTPMiddleware):
-    """
-    Simple in-memory rate limiting.
-    For production, use Redis-based rate limiting.
-    """
-    
-    def __init__(self, app, requests_per_window: int = 100, window_seconds: int = 60):
-        super().__init__(app)
+    # Paths that don't require API key
+    PUBLIC_PATHS = {"/health", "/docs", "/redoc", "/openapi.json"}
+
+    SECURITY_HEADERS: RawHeaders = [
+        (b"x-content-type-options", b"nosniff"),
+        (b"x-frame-options", b"DENY"),
+        (b"x-xss-protection", b"1; mode=block"),
+        (b"referrer-policy", b"strict-origin-when-cross-origin"),
+    ]
+
+    # Don't cache API responses (unless the endpoint sets its own Cache-Control)
+    NO_CACHE_HEADERS: RawHeaders = [
+        (b"cache-control", b"no-store, no-cache, must-revalidate"),
+        (b"pragma", b"no-cache"),
+    ]
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        requests_per_window: int = 100,
+        window_seconds: int = 60,
+        rate_limit_backend: Optional[RateLimitBackend] = None
+    ):
+        self.app = app
         self.requests_per_window = requests_per_window
         self.window_seconds = window_seconds
-        self.request_counts = defaultdict(list)
-        self._lock = asyncio.Lock()
-    
-    def _get_client_id(self, request: Request) -> str:
+
+        if rate_limit_backend is None:
+            settings = get_settings()
+            rate_limit_backend = create_rate_limit_backend(
+                settings.RATE_LIMIT_BACKEND,
+                settings.RATE_LIMIT_SQLITE_PATH,
+                settings.RATE_LIMIT_MAX_CLIENTS
+            )
+        self.limiter = RateLimiter(rate_limit_backend, requests_per_window, window_seconds)
+
+    @staticmethod
+    def _get_client_id(scope: Scope, headers: Headers) -> str:
         """Get client identifier (IP address)"""
         # Check for forwarded header (behind proxy)
-        forwarded = request.headers.get("x-forwarded-for")
+        forwarded = headers.get("x-forwarded-for")
         if forwarded:
             return forwarded.split(",")[0].strip()
-        
-        if request.client:
-            return request.client.host
-        
+
+        client = scope.get("client")
+        if client:
+            return client[0]
+
         return "unknown"
-    
-    async def dispatch(self, request: Request, call_next: Callable):
-        settings = get_settings()
-        
-        # Skip if rate limiting is disabled
-        if not settings.RATE_LIMIT_ENABLED:
-            return await call_next(request)
-        
-        # Skip rate limiting for health checks
-        if request.url.path == "/health":
-            return await call_next(request)
-        
-        client_id = self._get_client_id(request)
-        current_time = time.time()
-        
-        async with self._lock:
-            # Clean old entries
-            window_start = current_time - self.window_seconds
-            self.request_counts[client_id] = [
-                t for t in self.request_counts[client_id] if t > window_start
-            ]
-            
-            # Check rate limit
-            if len(self.request_counts[client_id]) >= self.requests_per_window:
-                logger.warning(f"Rate limit exceeded for client: {client_id}")
-                return JSONResponse(
-                    status_code=status.HTTP_429_TOO_MANY_REQUESTS,
-                    content={
-                        "error": "rate_limit_exceeded",
-                        "message": f"Too many requests. Limit: {self.requests_per_window} requests per {self.window_seconds} seconds.",
-                        "retry_after_seconds": self.window_seconds
-                    },
-                    headers={
-                        "Retry-After": str(self.window_seconds),
-                        "X-RateLimit-Limit": str(self.requests_per_window),
-                        "X-RateLimit-Remaining": "0",
-                        "X-RateLimit-Reset": str(int(window_start + self.window_seconds))
-                    }
-                )
-            
-            # Record this request
-            self.request_counts[client_id].append(current_time)
-            remaining = self.requests_per_window - len(self.request_counts[client_id])
-        
-        # Process request
-        response = await call_next(request)
-        
-        # Add rate limit headers
-        response.headers["X-RateLimit-Limit"] = str(self.requests_per_window)
-        response.headers["X-RateLimit-Remaining"] = str(remaining)
-        
-        return response
-
-
-# =============================================================================
-# SECURITY HEADERS MIDDLEWARE
-# =============================================================================
-
-class SecurityHeadersMiddleware(BaseHTTPMiddleware):
-    """
-    Adds security headers to all responses.
-    """
-    
-    async def dispatch(self, request: Request, call_next: Callable):
-        response = await call_next(request)
-        
-        # Add security headers
-        response.headers["X-Content-Type-Options"] = "nosniff"
-        response.headers["X-Frame-Options"] = "DENY"
-        response.headers["X-XSS-Protection"] = "1; mode=block"
-        response.headers["Referrer-Policy"] = "strict-origin-when-cross-origin"
-        
-        # Don't cache API responses
-        if request.url.path.startswith("/api"):
-            response.headers["Cache-Control"] = "no-store, no-cache, must-revalidate"
-            response.headers["Pragma"] = "no-cache"
-        
-        return response
-
-
-# =============================================================================
-# API KEY AUTHENTICATION MIDDLEWARE (Optional)
-# =============================================================================
-
-class APIKeyMiddleware(BaseHTTPMiddleware):
-    """
-    Optional API key authentication.
-    Enable via API_KEY_ENABLED config.
-    """
-    
-    # Paths that don't require API key
-    PUBLIC_PATHS = {"/health", "/docs", "/redoc", "/openapi.json"}
-    
-    async def dispatch(self, request: Request, call_next: Callable):
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
         settings = get_settings()
-        
-        # Skip if API key auth is disabled
-        if not settings.API_KEY_ENABLED:
-            return await call_next(request)
-        
-        # Skip for public paths
-        if request.url.path in self.PUBLIC_PATHS:
-            return await call_next(request)
-        
-        # Check for API key
-        api_key = request.headers.get(settings.API_KEY_HEADER)
-        
-        if not api_key:
-            return JSONResponse(
-                status_code=status.HTTP_401_UNAUTHORIZED,
-                content={
-                    "error": "missing_api_key",
-                    "message": f"API key required. Provide via {settings.API_KEY_HEADER} header."
-                }
-            )
-        
-        if api_key not in settings.API_KEYS:
-            logger.warning(f"Invalid API key attempt from {request.client.host if request.client else 'unknown'}")
-            return JSONResponse(
-                status_code=status.HTTP_403_FORBIDDEN,
+        path = scope["path"]
+        method = scope["method"]
+        headers = Headers(scope=scope)
+
+        # ---------------------------------------------------------------------
+        # Request logging
+        # ---------------------------------------------------------------------
+        log_request = path not in self.SKIP_LOGGING_PATHS
+        start_time = time.perf_counter()
+        if log_request:
+            client = scope.get("client")
+            logger.info(f"Request: {method} {path} client={client[0] if client else 'unknown'}")
+
+        response_started = False
+        from_app = False
+        extra_headers: RawHeaders = []
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal response_started
+
+            if message["type"] == "http.response.start":
+                response_started = True
+                raw = list(message.get("headers", []))
+
+                # Security headers (responses produced by the application only)
+                if from_app:
+                    raw = _set_headers(raw, self.SECURITY_HEADERS)
+                    if path.startswith("/api") and not any(name.lower() == b"cache-control" for name, _ in raw):
+                        raw = _set_headers(raw, self.NO_CACHE_HEADERS)
+
+                # Rate limit headers
+                raw = _set_headers(raw, extra_headers)
+
+                # Timing header and response log
+                if log_request:
+                    duration = (time.perf_counter() - start_time) * 1000
+                    logger.info(
+                        f"Response: {method} {path} "
+                        f"status={message['status']} duration={duration:.2f}ms"
+                    )
+                    raw = _set_headers(raw, [(b"x-process-time-ms", f"{duration:.2f}".encode())])
+
+                message = {**message, "headers": raw}
+
+            await send(message)
+
+        try:
+            # -----------------------------------------------------------------
+            # Rate limiting
+            # -----------------------------------------------------------------
+            if settings.RATE_LIMIT_ENABLED and path not in self.RATE_LIMIT_EXEMPT_PATHS:
+                client_id = self._get_client_id(scope, headers)
+                try:
+                    if self.limiter.backend.blocking:
+                        # Shared store (SQLite): keep its lock waits off the event loop
+                        decision = await run_in_threadpool(self.limiter.check, client_id)
+                    else:
+                        decision = self.limiter.check(client_id)
+                except Exception as e:
+                    # Fail open: a broken limiter store must not take the API down
+                    logger.warning(f"Rate limiter unavailable, allowing request: {e}")
+                    decision = None
+
+                if decision is not None and not decision.allowed:
+                    retry_after = max(1, math.ceil(decision.retry_after))
+                    logger.warning(f"Rate limit exceeded for client: {client_id}")
+                    response = JSONResponse(
+                        status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+                        content={
+                            "error": "rate_limit_exceeded",
+                            "message": f"Too many requests. Limit: {self.requests_per_window} requests per {self.window_seconds} seconds.",
+                            "retry_after_seconds": retry_after
+                        },
+                        headers={
+                            "Retry-After": str(retry_after),
+                            "X-RateLimit-Limit": str(self.requests_per_window),
+                            "X-RateLimit-Remaining": "0",
+                            "X-RateLimit-Reset": str(math.ceil(time.time() + decision.reset_after))
+                        }
+                    )
+                    await response(scope, receive, send_wrapper)
+                    return
+
+                if decision is not None:
+                    extra_headers = [
+                        (b"x-ratelimit-limit", str(self.requests_per_window).encode()),
+                        (b"x-ratelimit-remaining", str(decision.remaining).encode())
+                    ]
+
+            # -----------------------------------------------------------------
+            # API key authentication (optional)
+            # -----------------------------------------------------------------
+            if settings.API_KEY_ENABLED and path not in self.PUBLIC_PATHS:
+                api_key = headers.get(settings.API_KEY_HEADER)
+
+                if not api_key:
+                    response = JSONResponse(
+                        status_code=status.HTTP_401_UNAUTHORIZED,
+                        content={
+                            "error": "missing_api_key",
+                            "message": f"API key required. Provide via {settings.API_KEY_HEADER} header."
+                        }
+                    )
+                    await response(scope, receive, send_wrapper)
+                    return
+
+                if api_key not in settings.API_KEYS:
+                    client = scope.get("client")
+                    logger.warning(f"Invalid API key attempt from {client[0] if client else 'unknown'}")
+                    response = JSONResponse(
+                        status_code=status.HTTP_403_FORBIDDEN,
+                        content={
+                            "error": "invalid_api_key",
+                            "message": "Invalid API key."
+                        }
+                    )
+                    await response(scope, receive, send_wrapper)
+                    return
+
+            from_app = True
+            await self.app(scope, receive, send_wrapper)
+
+        except HTTPException:
+            # Re-raise HTTP exceptions (they have their own handlers)
+            raise
+        except Exception as exc:
+            if response_started:
+                raise
+
+            # Log the error
+            logger.error(f"Unhandled exception: {str(exc)}", exc_info=True)
+
+            # Return generic error response
+            response = JSONResponse(
+                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
                 content={
-                    "error": "invalid_api_key",
-                    "message": "Invalid API key."
+                    "error": "internal_server_error",
+                    "message": "An unexpected error occurred. Please try again later.",
+                    "timestamp": datetime.now().isoformat(),
+                    "path": path
                 }
             )
-        
-        return await call_next(request)
+            await response(scope, receive, send)
@@ -7,11 +7,20 @@ Package Structure:
 - rule_engine/: Primary decision layer (intent, issues, legal triggers)
 - inference_orchestrator.py: Main control flow coordinator
 - draft_assembler.py: Template-based document generation
+- draft_batch.py: Mail-merge drafts for many recipients (API and CLI)
 - authority_resolver.py: Department and authority mapping
 - document_generator.py: PDF/DOCX/XLSX generation
+- office_templates.py: DOCX/XLSX rendering from prebuilt base packages
+- executor.py: Bounded thread/process pool for blocking CPU work
+- rate_limiter.py: GCRA rate limiter with in-process and SQLite backends
+- byte_budget_cache.py: Byte-bounded LRU/TTL cache with an optional disk tier
+- render_cache.py: Short-lived cache of rendered downloads (ETag support)
+- single_flight.py: Coalesces concurrent identical model/API calls into one
+- zip_writer.py: Minimal incremental ZIP writer for pre-compressed entries
+- bulk_export.py: Streaming ZIP export of many documents with an index sheet
 """
 
-from .inference_orchestrator import InferenceResult, run_inference, IntentType, DocumentType
+from .inference_orchestrator import InferenceResult, run_inference, run_inference_batch, IntentType, DocumentType
 from .draft_assembler import DraftAssembler, get_draft_assembler
 from .authority_resolver import resolve_authority, Authority, AuthorityMatch, ResolutionResult
 from .document_generator import DocumentGenerator, get_document_generator
@@ -38,6 +47,7 @@ __all__ = [
     # Main services
     "InferenceResult",
     "run_inference",
+    "run_inference_batch",
     "IntentType",
     "DocumentType",
     "DraftAssembler",
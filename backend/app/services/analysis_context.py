@@ -0,0 +1,81 @@
+"""
+Analysis Context - Per-request cache of derived text representations
+Created once per request by the inference orchestrator and passed to every
+rule engine and NLP function, so the same text is never lowercased, tokenized,
+keyword-scanned or parsed by spaCy more than once.
+
+Every representation is computed lazily on first access:
+- text_lower: str.lower() of the input
+- tokens: whitespace tokens of the lowercased text
+- keyword_hits: one keyword index scan over all rule engine tables
+- spans: one PII/reference number scan (utils.text_sanitizer.scan_text)
+- doc: one spaCy Doc (only parsed if an NLP function asks for it)
+"""
+
+from functools import cached_property
+from typing import Any, Dict, List, Optional, TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from spacy.tokens import Doc
+    from app.services.rule_engine.keyword_index import KeywordHit
+    from app.utils.text_sanitizer import Span
+
+
+class AnalysisContext:
+    """Lazily computed views of a single input text"""
+
+    def __init__(self, text: str, language: str = "english", doc: Optional["Doc"] = None):
+        self.text = text
+        self.language = language
+        if doc is not None:
+            # Parsed ahead of time (e.g. by nlp.pipe in batch inference)
+            self.__dict__["doc"] = doc
+
+    @classmethod
+    def for_text(cls, text: str, context: Optional["AnalysisContext"] = None) -> "AnalysisContext":
+        """Reuse the given context if it belongs to this text, otherwise create one"""
+        if context is not None and context.text == text:
+            return context
+        return cls(text)
+
+    @cached_property
+    def text_lower(self) -> str:
+        """Lowercased text used by all keyword matching"""
+        return self.text.lower()
+
+    @cached_property
+    def tokens(self) -> List[str]:
+        """Whitespace tokens of the lowercased text"""
+        return self.text_lower.split()
+
+    @cached_property
+    def keyword_hits(self) -> List["KeywordHit"]:
+        """All rule engine keyword hits from a single scan"""
+        from app.services.rule_engine.keyword_index import scan_keywords
+        return scan_keywords(self.text_lower)
+
+    @cached_property
+    def spans(self) -> List["Span"]:
+        """PII and reference number spans of the original text"""
+        from app.utils.text_sanitizer import scan_text
+        return scan_text(self.text)
+
+    @cached_property
+    def doc(self) -> "Doc":
+        """spaCy Doc of the original text (parsed once, on first use)"""
+        from app.services.nlp.spacy_engine import get_nlp
+        return get_nlp()(self.text)
+
+    def has_doc(self) -> bool:
+        """Whether the spaCy parse has already been computed"""
+        return "doc" in self.__dict__
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Which representations have been computed (for audit/debugging)"""
+        return {
+            "length": len(self.text),
+            "computed": [
+                name for name in ("text_lower", "tokens", "keyword_hits", "spans", "doc")
+                if name in self.__dict__
+            ]
+        }
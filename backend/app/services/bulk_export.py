@@ -0,0 +1,215 @@
+"""
+Bulk Export
+Renders many drafts into one ZIP archive, streamed while it is produced
+
+- Documents are rendered on the shared blocking executor, at most
+  `concurrency` at a time, and written to the archive in request order
+- Each entry is sent as soon as it (and every entry before it) is ready:
+  only the in-flight window is held in memory, never the whole archive
+- Entries are stored, not deflated (PDF/DOCX/XLSX are already compressed)
+- A failed document does not abort the archive: it is marked in the index
+- index.xlsx, written last, lists every entry. It is built with openpyxl's
+  write-only mode, which spools rows to a temporary file as they are added;
+  the file is removed when the index is finished (or the export aborted)
+
+Nothing is cached: bulk renders bypass the render cache.
+"""
+
+from typing import Any, AsyncIterator, Deque, Dict, List, Optional, Tuple
+from collections import deque
+from dataclasses import dataclass
+from datetime import datetime
+from io import BytesIO
+from loguru import logger
+import asyncio
+import re
+
+from openpyxl import Workbook
+from openpyxl.cell import WriteOnlyCell
+from openpyxl.styles import Font
+
+from app.services.document_generator import get_document_generator
+from app.services.executor import BoundedExecutor, ExecutorSaturatedError, get_executor
+from app.services.zip_writer import ZipStreamWriter, store_part
+
+INDEX_FILENAME = "index.xlsx"
+
+STATUS_OK = "ok"
+STATUS_FAILED = "failed"
+STATUS_BUSY = "failed (server busy)"
+
+# Columns of the index sheet: (header, width)
+INDEX_COLUMNS = [
+    ("#", 6),
+    ("File", 48),
+    ("Format", 8),
+    ("Document Type", 24),
+    ("Applicant", 24),
+    ("State", 16),
+    ("Department", 32),
+    ("Size (bytes)", 12),
+    ("Status", 20),
+]
+
+# Times an entry is retried when the executor is full mid-stream, and the
+# shortest wait between tries
+_MAX_BUSY_RETRIES = 30
+_MIN_BUSY_WAIT_SECONDS = 0.1
+
+_UNSAFE_NAME_CHARS = re.compile(r"[^\w.-]+")
+
+
+@dataclass
+class BulkJob:
+    """One document of a bulk export"""
+    format: str
+    draft_text: str
+    document_type: str
+    applicant_name: str
+    applicant_details: Optional[Dict[str, Any]] = None
+    authority_details: Optional[Dict[str, Any]] = None
+
+
+def _render_job(job: BulkJob, generated_at: str) -> Tuple[bytes, str]:
+    """Render one job (runs on the executor; module-level so process pools can pickle it)"""
+    buffer, filename, _ = get_document_generator().generate(
+        format=job.format,
+        draft_text=job.draft_text,
+        document_type=job.document_type,
+        applicant_name=job.applicant_name,
+        applicant_details=job.applicant_details,
+        authority_details=job.authority_details,
+        metadata={"generated_at": generated_at, "document_type": job.document_type}
+    )
+    return buffer.getvalue(), filename
+
+
+def entry_name(number: int, filename: str) -> str:
+    """Archive path of an entry: numbered (names repeat across drafts) and path-safe"""
+    return f"{number:04d}_{_UNSAFE_NAME_CHARS.sub('_', filename).lstrip('.')}"
+
+
+class IndexSheet:
+    """The index.xlsx summary, written row by row in write-only mode"""
+
+    def __init__(self):
+        self._workbook = Workbook(write_only=True)
+        self._sheet = self._workbook.create_sheet("Index")
+        self._finished = False
+
+        for column, (_, width) in enumerate(INDEX_COLUMNS):
+            self._sheet.column_dimensions[chr(ord("A") + column)].width = width
+        self._sheet.freeze_panes = "A2"
+
+        bold = Font(bold=True)
+        header = []
+        for title, _ in INDEX_COLUMNS:
+            cell = WriteOnlyCell(self._sheet, value=title)
+            cell.font = bold
+            header.append(cell)
+        self._sheet.append(header)
+
+    def add(self, number: int, name: Optional[str], job: BulkJob, size: Optional[int], status: str) -> None:
+        details = job.applicant_details or {}
+        authority = job.authority_details or {}
+        self._sheet.append([
+            number,
+            name,
+            job.format,
+            job.document_type,
+            job.applicant_name,
+            details.get("state"),
+            authority.get("department"),
+            size,
+            status
+        ])
+
+    def finish(self) -> bytes:
+        buffer = BytesIO()
+        self._workbook.save(buffer)
+        self._finished = True
+        return buffer.getvalue()
+
+    def discard(self) -> None:
+        """Finish an abandoned index so openpyxl removes its temporary file"""
+        if not self._finished:
+            try:
+                self.finish()
+            except Exception as e:
+                logger.warning(f"Bulk export: could not discard index: {e}")
+
+
+class BulkExport:
+    """Streams the ZIP archive of a list of jobs"""
+
+    def __init__(
+        self,
+        jobs: List[BulkJob],
+        concurrency: int = 0,
+        executor: Optional[BoundedExecutor] = None,
+        stage: str = "bulk_document"
+    ):
+        self.jobs = jobs
+        self.executor = executor or get_executor()
+        self.concurrency = max(1, concurrency or self.executor.max_workers)
+        self.stage = stage
+        self.failed = 0
+
+    async def _render(self, job: BulkJob, retry_when_busy: bool) -> Tuple[bytes, str]:
+        generated_at = datetime.now().isoformat()
+        for attempt in range(_MAX_BUSY_RETRIES + 1):
+            try:
+                return await self.executor.run(self.stage, _render_job, job, generated_at)
+            except ExecutorSaturatedError as e:
+                if not retry_when_busy or attempt == _MAX_BUSY_RETRIES:
+                    raise
+                await asyncio.sleep(max(e.retry_after, _MIN_BUSY_WAIT_SECONDS))
+
+    async def stream(self) -> AsyncIterator[bytes]:
+        """
+        Archive bytes, entry by entry.
+
+        The first document is not retried when the executor is full, so the
+        caller can still answer 503 before any byte is sent; later ones wait
+        for capacity.
+        """
+        writer = ZipStreamWriter()
+        index = IndexSheet()
+        pending: Deque[Tuple[int, BulkJob, "asyncio.Future"]] = deque()
+        queued = iter(enumerate(self.jobs, 1))
+
+        def submit() -> None:
+            for number, job in queued:
+                pending.append((number, job, asyncio.ensure_future(self._render(job, retry_when_busy=number > 1))))
+                if len(pending) >= self.concurrency:
+                    return
+
+        try:
+            submit()
+            while pending:
+                number, job, task = pending.popleft()
+                try:
+                    content, filename = await task
+                except ExecutorSaturatedError:
+                    if number == 1:
+                        raise
+                    index.add(number, None, job, None, STATUS_BUSY)
+                    self.failed += 1
+                    logger.warning(f"Bulk export: entry {number} dropped, executor saturated")
+                except Exception as e:
+                    index.add(number, None, job, None, STATUS_FAILED)
+                    self.failed += 1
+                    logger.error(f"Bulk export: entry {number} ({job.format}) failed: {e}")
+                else:
+                    name = entry_name(number, filename)
+                    index.add(number, name, job, len(content), STATUS_OK)
+                    yield writer.entry(store_part(name, content))
+                submit()
+
+            yield writer.entry(store_part(INDEX_FILENAME, index.finish()))
+            yield writer.finish()
+            logger.info(f"Bulk export: {len(self.jobs)} documents, {self.failed} failed")
+        finally:
+            for _, _, task in pending:
+                task.cancel()
+            index.discard()
@@ -0,0 +1,241 @@
+"""
+Byte-Budget Cache
+Byte-bounded LRU with TTL and an optional disk tier, shared by the render
+cache (rendered downloads) and the LLM response cache (enhancements)
+
+- Entries are evicted least-recently-used once max_bytes is exceeded;
+  single entries larger than a quarter of the budget are not cached
+- Entries expire ttl_seconds after they were stored
+- The optional disk tier is a directory shared by every worker on the host:
+  one file per key, written to a temp name and renamed, with the file's
+  mtime as its store time. Expired files are deleted
+
+Privacy:
+- Keys are keyed BLAKE2b hashes of the inputs, never the inputs themselves.
+  The hash key is the configured secret, or a random per-process secret
+  (which also makes disk entries unreadable to other processes)
+- The disk tier holds cached content, so callers leave it off unless it is
+  explicitly configured; the directory is created private (0700)
+
+Subclasses define the entry type and its on-disk encoding.
+"""
+
+from typing import Any, Callable, Dict, Generic, Iterable, Optional, TypeVar
+from collections import OrderedDict
+from pathlib import Path
+from loguru import logger
+import hashlib
+import json
+import os
+import secrets
+import tempfile
+import threading
+import time
+
+# Single entries larger than this fraction of the budget are not cached
+_MAX_ENTRY_FRACTION = 0.25
+
+# Disk tier files are scanned for expired entries at most this often
+_DISK_PURGE_INTERVAL_SECONDS = 60.0
+
+# Entry type: any object with a `size` (bytes) and a `stored_at` (clock time)
+E = TypeVar("E")
+
+
+class ByteBudgetCache(Generic[E]):
+    """
+    Byte-bounded LRU of entries with TTL, plus an optional directory of
+    files shared by every worker on the host.
+    """
+
+    name = "Cache"              # Used in log messages
+    disk_suffix = ".bin"
+
+    def __init__(
+        self,
+        max_bytes: int,
+        ttl_seconds: float,
+        disk_dir: Optional[str] = None,
+        key_secret: Optional[str] = None,
+        clock: Callable[[], float] = time.time
+    ):
+        self.max_bytes = max_bytes
+        self.ttl_seconds = ttl_seconds
+        self.clock = clock
+        self._secret = key_secret.encode("utf-8") if key_secret else secrets.token_bytes(32)
+        self._entries: "OrderedDict[str, E]" = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+
+        self.disk_dir: Optional[Path] = None
+        self._next_disk_purge = 0.0
+        if disk_dir:
+            self.disk_dir = Path(disk_dir)
+            self.disk_dir.mkdir(parents=True, exist_ok=True)
+            os.chmod(self.disk_dir, 0o700)
+
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def make_key(self, **fields: Any) -> str:
+        """Keyed hash of everything that determines the cached content"""
+        canonical = json.dumps(fields, sort_keys=True, ensure_ascii=False, separators=(",", ":"), default=str)
+        return hashlib.blake2b(canonical.encode("utf-8"), key=self._secret, digest_size=32).hexdigest()
+
+    # =========================================================================
+    # DISK ENCODING (subclasses)
+    # =========================================================================
+
+    def _encode(self, entry: E) -> bytes:
+        """File content for an entry (its stored_at is the file's mtime)"""
+        raise NotImplementedError
+
+    def _decode(self, data: bytes, stored_at: float) -> E:
+        """Entry from file content; raises ValueError/TypeError/KeyError if malformed"""
+        raise NotImplementedError
+
+    # =========================================================================
+    # LOOKUP / STORE
+    # =========================================================================
+
+    def get(self, key: str) -> Optional[E]:
+        """Fresh entry for key (memory first, then disk), or None"""
+        now = self.clock()
+
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                if now - entry.stored_at < self.ttl_seconds:
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return entry
+                self._remove(key)
+
+        entry = self._disk_get(key, now)
+        with self._lock:
+            if entry is None:
+                self.misses += 1
+                return None
+            self.disk_hits += 1
+            self._insert(key, entry)
+        return entry
+
+    def put_entry(self, key: str, entry: E) -> bool:
+        """Store an entry; returns False if it is too large to cache"""
+        if entry.size > self.max_bytes * _MAX_ENTRY_FRACTION:
+            return False
+
+        with self._lock:
+            self._insert(key, entry)
+        self._disk_put(key, entry)
+        return True
+
+    def _insert(self, key: str, entry: E) -> None:
+        if key in self._entries:
+            self._remove(key)
+        self._entries[key] = entry
+        self._bytes += entry.size
+        while self._bytes > self.max_bytes and self._entries:
+            oldest = next(iter(self._entries))
+            self._remove(oldest)
+            self.evictions += 1
+
+    def _remove(self, key: str) -> None:
+        entry = self._entries.pop(key)
+        self._bytes -= entry.size
+
+    # =========================================================================
+    # DISK TIER
+    # =========================================================================
+
+    def _disk_path(self, key: str) -> Path:
+        return self.disk_dir / f"{key}{self.disk_suffix}"
+
+    def _disk_get(self, key: str, now: float) -> Optional[E]:
+        if self.disk_dir is None:
+            return None
+
+        path = self._disk_path(key)
+        try:
+            stored_at = path.stat().st_mtime
+            if now - stored_at >= self.ttl_seconds:
+                path.unlink(missing_ok=True)
+                return None
+            return self._decode(path.read_bytes(), stored_at)
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError, TypeError, KeyError) as e:
+            logger.warning(f"{self.name}: unreadable disk entry dropped: {e}")
+            path.unlink(missing_ok=True)
+            return None
+
+    def _disk_put(self, key: str, entry: E) -> None:
+        if self.disk_dir is None:
+            return
+
+        try:
+            data = self._encode(entry)
+            # Write then rename, so other workers never read a partial file
+            fd, tmp_path = tempfile.mkstemp(dir=self.disk_dir, suffix=".tmp")
+            try:
+                with os.fdopen(fd, "wb") as f:
+                    f.write(data)
+                os.replace(tmp_path, self._disk_path(key))
+            except OSError:
+                Path(tmp_path).unlink(missing_ok=True)
+                raise
+        except OSError as e:
+            logger.warning(f"{self.name}: disk write failed: {e}")
+            return
+
+        self._purge_disk(entry.stored_at)
+
+    def _purge_disk(self, now: float) -> None:
+        """Delete expired files (at most every _DISK_PURGE_INTERVAL_SECONDS)"""
+        if now < self._next_disk_purge:
+            return
+        self._next_disk_purge = now + _DISK_PURGE_INTERVAL_SECONDS
+
+        removed = 0
+        for path in self._disk_files():
+            try:
+                if now - path.stat().st_mtime >= self.ttl_seconds:
+                    path.unlink()
+                    removed += 1
+            except OSError:
+                continue
+        if removed:
+            logger.debug(f"{self.name}: purged {removed} expired disk entries")
+
+    def _disk_files(self) -> Iterable[Path]:
+        return self.disk_dir.glob(f"*{self.disk_suffix}") if self.disk_dir is not None else ()
+
+    # =========================================================================
+    # MAINTENANCE
+    # =========================================================================
+
+    def clear(self) -> None:
+        """Drop every entry, in memory and on disk"""
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+        for path in self._disk_files():
+            path.unlink(missing_ok=True)
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self.hits + self.disk_hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "bytes": self._bytes,
+                "max_bytes": self.max_bytes,
+                "ttl_seconds": self.ttl_seconds,
+                "disk_tier": self.disk_dir is not None,
+                "hits": self.hits,
+                "disk_hits": self.disk_hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hit_rate": round((self.hits + self.disk_hits) / lookups, 4) if lookups else 0.0
+            }
@@ -6,7 +6,7 @@ Documents are generated on-demand and streamed directly to user.
 NO SERVER-SIDE STORAGE - privacy by design.
 """
 
-from typing import Dict, Any, Optional, Tuple
+from typing import Dict, Any, List, NamedTuple, Optional, Tuple
 from io import BytesIO
 from datetime import datetime
 from loguru import logger
@@ -18,21 +18,343 @@ from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
 from reportlab.lib.units import inch, mm
 from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, Table, TableStyle
 from reportlab.lib.enums import TA_LEFT, TA_CENTER, TA_JUSTIFY
+from reportlab.lib.fonts import tt2ps
+from reportlab.pdfbase import pdfmetrics
+from reportlab.pdfgen.canvas import Canvas
 
-# DOCX Generation
-from docx import Document
-from docx.shared import Pt, Inches
-from docx.enum.text import WD_ALIGN_PARAGRAPH
-from docx.styles.style import _CharacterStyle
-
-# XLSX Generation
-from openpyxl import Workbook
-from openpyxl.styles import Font, Alignment, Border, Side
-from openpyxl.worksheet.worksheet import Worksheet
+# DOCX / XLSX Generation (prebuilt packages, no python-docx / openpyxl objects)
+from app.services.office_templates import SheetWriter, render_docx, render_xlsx
 
 from app.config import get_settings
 
 
+PDF_MODE_PLATYPUS = "platypus"
+PDF_MODE_FAST = "fast"
+
+
+# =============================================================================
+# PDF LAYOUT
+# =============================================================================
+
+# Page geometry shared by both PDF renderers. Platypus frames add 6pt of
+# padding inside the 1 inch margins.
+_PAGE_WIDTH, _PAGE_HEIGHT = A4
+_MARGIN = 1.0 * inch
+_FRAME_PADDING = 6
+_FRAME_LEFT = _MARGIN + _FRAME_PADDING
+_FRAME_TOP = _PAGE_HEIGHT - _MARGIN - _FRAME_PADDING
+_FRAME_BOTTOM = _MARGIN + _FRAME_PADDING
+_FRAME_WIDTH = _PAGE_WIDTH - 2 * _MARGIN - 2 * _FRAME_PADDING
+
+_BLANK_LINE_SPACE = 6
+_FOOTER_SPACE = 30
+
+# Same tolerance Platypus frames use when checking whether a flowable fits
+_FIT_FUZZ = 1e-6
+
+_pdf_styles: Optional[Dict[str, ParagraphStyle]] = None
+
+
+def _get_pdf_styles() -> Dict[str, ParagraphStyle]:
+    """
+    Paragraph styles of the letter layout, built once per process.
+    The letter uses the standard Type 1 fonts, so no fonts need registering.
+    """
+    global _pdf_styles
+    
+    if _pdf_styles is None:
+        styles = getSampleStyleSheet()
+        _pdf_styles = {
+            "title": ParagraphStyle(
+                'CustomTitle',
+                parent=styles['Heading1'],
+                fontSize=14,
+                spaceAfter=20,
+                alignment=TA_CENTER,
+                fontName='Times-Bold'
+            ),
+            "body": ParagraphStyle(
+                'CustomBody',
+                parent=styles['Normal'],
+                fontSize=12,
+                leading=18,  # 1.5 line spacing
+                alignment=TA_JUSTIFY,
+                fontName='Times-Roman',
+                spaceAfter=12
+            ),
+            "subject": ParagraphStyle(
+                'Subject',
+                parent=styles['Normal'],
+                fontSize=12,
+                fontName='Times-Bold',
+                spaceAfter=12,
+                spaceBefore=12
+            ),
+            "footer": ParagraphStyle(
+                'Footer',
+                parent=styles['Normal'],
+                fontSize=8,
+                textColor=colors.grey
+            ),
+        }
+    
+    return _pdf_styles
+
+
+def _render_pdf_platypus(buffer: BytesIO, draft_text: str, metadata: Optional[Dict[str, Any]]) -> None:
+    """Lay out the letter with Platypus flowables (reference renderer)"""
+    styles = _get_pdf_styles()
+    body_style = styles["body"]
+    subject_style = styles["subject"]
+    
+    # Create document
+    doc = SimpleDocTemplate(
+        buffer,
+        pagesize=A4,
+        rightMargin=_MARGIN,
+        leftMargin=_MARGIN,
+        topMargin=_MARGIN,
+        bottomMargin=_MARGIN
+    )
+    
+    # Build content
+    story = []
+    
+    # Process draft text line by line
+    lines = draft_text.strip().split('\n')
+    
+    for line in lines:
+        line = line.strip()
+        
+        if not line:
+            story.append(Spacer(1, _BLANK_LINE_SPACE))
+            continue
+        
+        # Escape special characters for ReportLab
+        safe_line = line.replace('&', '&amp;').replace('<', '&lt;').replace('>', '&gt;')
+        
+        # Detect subject line
+        if line.lower().startswith('subject:'):
+            story.append(Paragraph(safe_line, subject_style))
+        # Detect "To," header
+        elif line == 'To,' or line == 'To':
+            story.append(Paragraph('<b>To,</b>', body_style))
+        # Regular paragraphs
+        else:
+            story.append(Paragraph(safe_line, body_style))
+    
+    # Add metadata footer
+    if metadata:
+        story.append(Spacer(1, _FOOTER_SPACE))
+        story.append(Paragraph(
+            f"<i>Generated on: {metadata.get('generated_at', datetime.now().isoformat())}</i>",
+            styles["footer"]
+        ))
+    
+    # Build PDF
+    doc.build(story)
+
+
+class _LineStyle(NamedTuple):
+    """Precomputed metrics of one paragraph style for the canvas renderer"""
+    font_name: str
+    font_size: float
+    leading: float
+    space_before: float
+    space_after: float
+    justify: bool
+    color: Any
+    space_width: float
+    # Platypus lets a line overrun by this much per word already on it
+    shrink_per_word: float
+
+
+_line_styles: Optional[Dict[str, _LineStyle]] = None
+
+
+def _get_line_styles() -> Dict[str, _LineStyle]:
+    """Canvas metrics mirroring the Platypus styles (bold/italic markup resolved)"""
+    global _line_styles
+    
+    if _line_styles is None:
+        styles = _get_pdf_styles()
+        
+        def metrics(style: ParagraphStyle, font_name: str) -> _LineStyle:
+            space_width = pdfmetrics.stringWidth(' ', font_name, style.fontSize)
+            return _LineStyle(
+                font_name=font_name,
+                font_size=style.fontSize,
+                leading=style.leading,
+                space_before=style.spaceBefore,
+                space_after=style.spaceAfter,
+                justify=style.alignment == TA_JUSTIFY,
+                color=style.textColor,
+                space_width=space_width,
+                shrink_per_word=style.spaceShrinkage * space_width
+            )
+        
+        _line_styles = {
+            "body": metrics(styles["body"], styles["body"].fontName),
+            "to": metrics(styles["body"], tt2ps(styles["body"].fontName, 1, 0)),
+            "subject": metrics(styles["subject"], styles["subject"].fontName),
+            "footer": metrics(styles["footer"], tt2ps(styles["footer"].fontName, 0, 1)),
+        }
+    
+    return _line_styles
+
+
+def _wrap_words(words: List[str], style: _LineStyle) -> Optional[List[Tuple[List[str], float]]]:
+    """
+    Greedy line breaking identical to Platypus for single-font text.
+    Returns [(words, width)], or None if a word is wider than the line
+    (Platypus splits such words; the canvas renderer does not).
+    """
+    lines = []
+    current: List[str] = []
+    current_width = -style.space_width
+    
+    for word in words:
+        word_width = pdfmetrics.stringWidth(word, style.font_name, style.font_size)
+        if word_width > _FRAME_WIDTH:
+            return None
+        new_width = current_width + style.space_width + word_width
+        if new_width <= _FRAME_WIDTH + style.shrink_per_word * len(current) or not current:
+            current.append(word)
+            current_width = new_width
+        else:
+            lines.append((current, current_width))
+            current = [word]
+            current_width = word_width
+    
+    if current:
+        lines.append((current, current_width))
+    return lines
+
+
+def _pdf_blocks(draft_text: str, metadata: Optional[Dict[str, Any]]) -> Optional[List[Tuple[Optional[_LineStyle], Any]]]:
+    """
+    The letter as (style, wrapped lines) paragraphs and (None, height)
+    spacers, or None if it needs Platypus features.
+    """
+    line_styles = _get_line_styles()
+    rows: List[Tuple[str, str]] = []
+    
+    for line in draft_text.strip().split('\n'):
+        line = line.strip()
+        
+        if not line:
+            rows.append(("", ""))
+        elif line.lower().startswith('subject:'):
+            rows.append(("subject", line))
+        elif line == 'To,' or line == 'To':
+            rows.append(("to", "To,"))
+        else:
+            rows.append(("body", line))
+    
+    if metadata:
+        rows.append(("", "footer"))
+        rows.append(("footer", f"Generated on: {metadata.get('generated_at', datetime.now().isoformat())}"))
+    
+    blocks: List[Tuple[Optional[_LineStyle], Any]] = []
+    for kind, text in rows:
+        if not kind:
+            blocks.append((None, _FOOTER_SPACE if text == "footer" else _BLANK_LINE_SPACE))
+            continue
+        
+        # Soft hyphens and non-breaking spaces change Platypus line breaking
+        if '\xad' in text or '\xa0' in text:
+            return None
+        
+        style = line_styles[kind]
+        wrapped = _wrap_words(text.split(), style)
+        if wrapped is None:
+            return None
+        blocks.append((style, wrapped))
+    
+    return blocks
+
+
+def _render_pdf_fast(buffer: BytesIO, draft_text: str, metadata: Optional[Dict[str, Any]]) -> bool:
+    """
+    Draw the letter straight onto a canvas, with the same layout as
+    _render_pdf_platypus (spacing, justification, page breaks, orphan
+    control) but no flowable objects.
+    
+    Returns False, writing nothing, for text it does not model (over-long
+    words, soft hyphens, non-breaking spaces); use Platypus then.
+    """
+    blocks = _pdf_blocks(draft_text, metadata)
+    if blocks is None:
+        return False
+    
+    canvas = Canvas(buffer, pagesize=A4)
+    y = _FRAME_TOP
+    at_top = True
+    prev_space_after = 0.0
+    
+    def new_page() -> None:
+        nonlocal y, at_top, prev_space_after
+        canvas.showPage()
+        y = _FRAME_TOP
+        at_top = True
+        prev_space_after = 0.0
+    
+    def draw_lines(style: _LineStyle, lines: List[Tuple[List[str], float]], top: float, justify_last: bool) -> None:
+        text = canvas.beginText(_FRAME_LEFT, top - style.font_size)
+        text.setFont(style.font_name, style.font_size, style.leading)
+        text.setFillColor(style.color)
+        last = len(lines) - 1
+        for i, (words, width) in enumerate(lines):
+            extra = _FRAME_WIDTH - width
+            # Lines that overrun the frame are always squeezed; justified lines
+            # (except the last) are stretched
+            if style.justify and not (i == last and not justify_last):
+                adjust = not -1e-8 < extra <= 1e-8
+            else:
+                adjust = extra <= -1e-8
+            if adjust and len(words) > 1:
+                text.setWordSpace(extra / (len(words) - 1))
+                text.textLine(' '.join(words))
+                text.setWordSpace(0)
+            else:
+                text.textLine(' '.join(words))
+        canvas.drawText(text)
+    
+    for style, content in blocks:
+        if style is None:
+            # Spacer
+            if y - _FRAME_BOTTOM <= 0 or y - content < _FRAME_BOTTOM - _FIT_FUZZ:
+                new_page()
+            y -= content
+            at_top = at_top and content == 0
+            prev_space_after = 0.0
+            continue
+        
+        lines = content
+        while lines:
+            space_before = 0.0 if at_top else max(style.space_before - prev_space_after, 0)
+            available = y - _FRAME_BOTTOM - space_before
+            height = len(lines) * style.leading
+            
+            if available > 0 and y - space_before - height >= _FRAME_BOTTOM - _FIT_FUZZ:
+                draw_lines(style, lines, y - space_before, justify_last=False)
+                y -= space_before + height + style.space_after
+                prev_space_after = style.space_after
+                at_top = False
+                break
+            
+            # Split across pages; a single line left at the bottom (an orphan)
+            # moves the whole paragraph to the next page instead
+            fit = int(available / style.leading) if available > 0 else 0
+            if fit > 1:
+                draw_lines(style, lines[:fit], y - space_before, justify_last=True)
+                lines = lines[fit:]
+            new_page()
+    
+    canvas.save()
+    return True
+
+
 class DocumentGenerator:
     """
     Generates documents in multiple formats.
@@ -74,83 +396,11 @@ class DocumentGenerator:
         
         buffer = BytesIO()
         
-        # Create document
-        doc = SimpleDocTemplate(
-            buffer,
-            pagesize=A4,
-            rightMargin=1.0 * inch,
-            leftMargin=1.0 * inch,
-            topMargin=1.0 * inch,
-            bottomMargin=1.0 * inch
-        )
-        
-        # Styles
-        styles = getSampleStyleSheet()
-        
-        # Custom styles
-        title_style = ParagraphStyle(
-            'CustomTitle',
-            parent=styles['Heading1'],
-            fontSize=14,
-            spaceAfter=20,
-            alignment=TA_CENTER,
-            fontName='Times-Bold'
-        )
-        
-        body_style = ParagraphStyle(
-            'CustomBody',
-            parent=styles['Normal'],
-            fontSize=12,
-            leading=18,  # 1.5 line spacing
-            alignment=TA_JUSTIFY,
-            fontName='Times-Roman',
-            spaceAfter=12
-        )
-        
-        subject_style = ParagraphStyle(
-            'Subject',
-            parent=styles['Normal'],
-            fontSize=12,
-            fontName='Times-Bold',
-            spaceAfter=12,
-            spaceBefore=12
-        )
-        
-        # Build content
-        story = []
-        
-        # Process draft text line by line
-        lines = draft_text.strip().split('\n')
-        
-        for line in lines:
-            line = line.strip()
-            
-            if not line:
-                story.append(Spacer(1, 6))
-                continue
-            
-            # Detect subject line
-            if line.lower().startswith('subject:'):
-                story.append(Paragraph(line, subject_style))
-            # Detect "To," header
-            elif line == 'To,' or line == 'To':
-                story.append(Paragraph('<b>To,</b>', body_style))
-            # Regular paragraphs
-            else:
-                # Escape special characters for ReportLab
-                safe_line = line.replace('&', '&amp;').replace('<', '&lt;').replace('>', '&gt;')
-                story.append(Paragraph(safe_line, body_style))
-        
-        # Add metadata footer
-        if metadata:
-            story.append(Spacer(1, 30))
-            story.append(Paragraph(
-                f"<i>Generated on: {metadata.get('generated_at', datetime.now().isoformat())}</i>",
-                ParagraphStyle('Footer', parent=styles['Normal'], fontSize=8, textColor=colors.grey)
-            ))
-        
-        # Build PDF
-        doc.build(story)
+        rendered = False
+        if self.settings.PDF_RENDER_MODE == PDF_MODE_FAST:
+            rendered = _render_pdf_fast(buffer, draft_text, metadata)
+        if not rendered:
+            _render_pdf_platypus(buffer, draft_text, metadata)
         
         # Reset buffer position
         buffer.seek(0)
@@ -190,58 +440,13 @@ class DocumentGenerator:
         """
         logger.info(f"Generating DOCX for {document_type}")
         
-        # Create document
-        doc = Document()
-        
-        # Set default font
-        style = doc.styles['Normal']
-        if hasattr(style, 'font'):
-            style.font.name = 'Times New Roman'  # type: ignore[union-attr]
-            style.font.size = Pt(12)  # type: ignore[union-attr]
-        
-        # Process draft text
-        lines = draft_text.strip().split('\n')
-        current_paragraph = None
-        
-        for line in lines:
-            line = line.strip()
-            
-            if not line:
-                # Empty line - add spacing
-                doc.add_paragraph()
-                current_paragraph = None
-                continue
-            
-            # Detect subject line
-            if line.lower().startswith('subject:'):
-                para = doc.add_paragraph()
-                run = para.add_run(line)
-                run.bold = True
-                para.paragraph_format.space_after = Pt(12)
-                current_paragraph = None
-            # Detect "To," header
-            elif line == 'To,' or line == 'To':
-                para = doc.add_paragraph()
-                run = para.add_run('To,')
-                run.bold = True
-                current_paragraph = None
-            # Regular text
-            else:
-                para = doc.add_paragraph(line)
-                para.paragraph_format.line_spacing = 1.5
-        
-        # Add metadata
+        generated_on = None
         if metadata:
-            doc.add_paragraph()
-            para = doc.add_paragraph()
-            run = para.add_run(f"Generated on: {metadata.get('generated_at', datetime.now().isoformat())}")
-            run.italic = True
-            run.font.size = Pt(9)
-            run.font.color.rgb = None  # Grey color
-        
-        # Save to buffer
+            generated_on = metadata.get('generated_at', datetime.now().isoformat())
+        
+        # Only the body XML is generated; the rest comes from the base package
         buffer = BytesIO()
-        doc.save(buffer)
+        render_docx(buffer, draft_text, generated_on)
         buffer.seek(0)
         
         # Generate filename
@@ -286,87 +491,53 @@ class DocumentGenerator:
         """
         logger.info(f"Generating XLSX tracking sheet for {document_type}")
         
-        wb = Workbook()
-        ws: Worksheet = wb.active  # type: ignore[assignment]
-        ws.title = "Application Tracker"
-        
-        # Styles
-        header_font = Font(bold=True, size=12)
-        title_font = Font(bold=True, size=14)
-        border = Border(
-            left=Side(style='thin'),
-            right=Side(style='thin'),
-            top=Side(style='thin'),
-            bottom=Side(style='thin')
-        )
+        # Column widths and cell styles come from the base package
+        ws = SheetWriter()
         
         # Title
-        ws['A1'] = f"{document_type.upper()} APPLICATION TRACKING SHEET"
-        ws['A1'].font = title_font
-        ws.merge_cells('A1:D1')
+        ws.row(1, [('A', f"{document_type.upper()} APPLICATION TRACKING SHEET", "title")])
+        ws.merge('A1:D1')
         
-        # Application Details Section
-        row = 3
-        ws[f'A{row}'] = "APPLICATION DETAILS"
-        ws[f'A{row}'].font = header_font
-        ws.merge_cells(f'A{row}:D{row}')
+        def section(row: int, title: str) -> int:
+            ws.row(row, [('A', title, "header")])
+            ws.merge(f'A{row}:D{row}')
+            return row + 1
         
-        row += 1
+        # Application Details Section
+        row = section(3, "APPLICATION DETAILS")
+        now = datetime.now()
         details = [
             ("Application Type", document_type.replace("_", " ").title()),
-            ("Date Generated", datetime.now().strftime("%d/%m/%Y")),
-            ("Time Generated", datetime.now().strftime("%H:%M:%S")),
+            ("Date Generated", now.strftime("%d/%m/%Y")),
+            ("Time Generated", now.strftime("%H:%M:%S")),
         ]
         
         for label, value in details:
-            ws[f'A{row}'] = label
-            ws[f'A{row}'].font = Font(bold=True)
-            ws[f'B{row}'] = value
+            ws.row(row, [('A', label, "label"), ('B', value, None)])
             row += 1
         
         # Applicant Details Section
-        row += 1
-        ws[f'A{row}'] = "APPLICANT DETAILS"
-        ws[f'A{row}'].font = header_font
-        ws.merge_cells(f'A{row}:D{row}')
-        
-        row += 1
+        row = section(row + 1, "APPLICANT DETAILS")
         if applicant_details:
             for key, value in applicant_details.items():
-                ws[f'A{row}'] = key.replace("_", " ").title()
-                ws[f'A{row}'].font = Font(bold=True)
-                ws[f'B{row}'] = str(value) if value else ""
+                ws.row(row, [('A', key.replace("_", " ").title(), "label"), ('B', str(value) if value else "", None)])
                 row += 1
         else:
-            ws[f'A{row}'] = "Name"
-            ws[f'A{row}'].font = Font(bold=True)
-            ws[f'B{row}'] = applicant_name
+            ws.row(row, [('A', "Name", "label"), ('B', applicant_name, None)])
             row += 1
         
         # Authority Details Section
-        row += 1
-        ws[f'A{row}'] = "AUTHORITY DETAILS"
-        ws[f'A{row}'].font = header_font
-        ws.merge_cells(f'A{row}:D{row}')
-        
-        row += 1
+        row = section(row + 1, "AUTHORITY DETAILS")
         if authority_details:
             for key, value in authority_details.items():
-                ws[f'A{row}'] = key.replace("_", " ").title()
-                ws[f'A{row}'].font = Font(bold=True)
-                ws[f'B{row}'] = str(value) if value else ""
+                ws.row(row, [('A', key.replace("_", " ").title(), "label"), ('B', str(value) if value else "", None)])
                 row += 1
         else:
-            ws[f'A{row}'] = "To be filled"
+            ws.row(row, [('A', "To be filled", None)])
             row += 1
         
         # Tracking Section
-        row += 1
-        ws[f'A{row}'] = "SUBMISSION TRACKING"
-        ws[f'A{row}'].font = header_font
-        ws.merge_cells(f'A{row}:D{row}')
-        
-        row += 1
+        row = section(row + 1, "SUBMISSION TRACKING")
         tracking_fields = [
             ("Date Submitted", ""),
             ("Mode of Submission", "(Post/Online/In-Person)"),
@@ -380,33 +551,20 @@ class DocumentGenerator:
         ]
         
         for label, hint in tracking_fields:
-            ws[f'A{row}'] = label
-            ws[f'A{row}'].font = Font(bold=True)
-            ws[f'B{row}'] = hint
-            ws[f'B{row}'].font = Font(italic=True, color="808080")
+            ws.row(row, [('A', label, "label"), ('B', hint, "hint")])
             row += 1
         
         # Draft Content (in a separate sheet)
-        ws2 = wb.create_sheet("Draft Content")
-        ws2['A1'] = "DRAFT CONTENT"
-        ws2['A1'].font = title_font
+        ws2 = SheetWriter()
+        ws2.row(1, [('A', "DRAFT CONTENT", "title")])
         
         # Split draft into rows
         lines = draft_text.strip().split('\n')
         for i, line in enumerate(lines, start=3):
-            ws2[f'A{i}'] = line
-        
-        # Adjust column widths
-        ws.column_dimensions['A'].width = 25
-        ws.column_dimensions['B'].width = 40
-        ws.column_dimensions['C'].width = 20
-        ws.column_dimensions['D'].width = 20
-        
-        ws2.column_dimensions['A'].width = 100
+            ws2.row(i, [('A', line, None)])
         
-        # Save to buffer
         buffer = BytesIO()
-        wb.save(buffer)
+        render_xlsx(buffer, ws, ws2)
         buffer.seek(0)
         
         # Generate filename
@@ -3,12 +3,19 @@ Draft Assembler
 Fills legal templates with user data and extracted entities.
 AI ONLY fills placeholders - NEVER generates legal language.
 Supports English and Hindi templates.
+
+Templates are compiled once, at load time, into literal and placeholder
+segments, so filling one is a single join. Template files are watched by
+mtime (TEMPLATE_WATCH_INTERVAL_SECONDS): an edited file is recompiled and
+swapped in without a restart.
 """
 
-from typing import Dict, Any, Optional, List
+from typing import Dict, Any, NamedTuple, Optional, List, Tuple, Union
 from datetime import datetime
 from pathlib import Path
 import re
+import threading
+import time
 from loguru import logger
 
 from app.services.inference_orchestrator import DocumentType, IntentType
@@ -17,6 +24,126 @@ from app.services.inference_orchestrator import DocumentType, IntentType
 # Template directory
 TEMPLATE_DIR = Path(__file__).parent.parent / "templates"
 
+PLACEHOLDER_PATTERN = re.compile(r'\{([A-Z_]+)\}')
+
+# Placeholders removed together with their line break when empty
+REMOVABLE_PLACEHOLDERS = {"APPLICANT_CONTACT"}
+
+# Placeholders that differ per recipient in a mail merge
+ROW_PLACEHOLDERS = frozenset({
+    "APPLICANT_NAME", "APPLICANT_ADDRESS", "APPLICANT_CONTACT",
+    "DEPARTMENT_NAME", "DEPARTMENT_ADDRESS", "AUTHORITY_DESIGNATION", "PLACE",
+})
+
+
+class Placeholder(NamedTuple):
+    """A placeholder segment of a compiled template"""
+    name: str
+    token: str                # "{NAME}", kept when there is no value
+    default: Optional[str]    # Language default, if any
+    suffix: str = ""          # Line break dropped with an empty removable placeholder
+
+
+class CompiledTemplate(NamedTuple):
+    """A template split into literal text and placeholders"""
+    text: str
+    segments: Tuple[Union[str, Placeholder], ...]
+    placeholders: Tuple[str, ...]
+
+
+def compile_template(text: str, defaults: Dict[str, str]) -> CompiledTemplate:
+    """Split a template into segments, resolving each placeholder's default"""
+    segments: List[Union[str, Placeholder]] = []
+    position = 0
+
+    for match in PLACEHOLDER_PATTERN.finditer(text):
+        if match.start() > position:
+            segments.append(text[position:match.start()])
+
+        name = match.group(1)
+        position = match.end()
+        suffix = ""
+        if name in REMOVABLE_PLACEHOLDERS and text.startswith("\n", position):
+            suffix = "\n"
+            position += 1
+        segments.append(Placeholder(name, match.group(0), defaults.get(name), suffix))
+
+    if position < len(text):
+        segments.append(text[position:])
+
+    return CompiledTemplate(
+        text=text,
+        segments=tuple(segments),
+        placeholders=tuple(s.name for s in segments if isinstance(s, Placeholder))
+    )
+
+
+def fill_template(
+    template: CompiledTemplate,
+    values: Dict[str, Any],
+    keep: frozenset = frozenset()
+) -> Tuple[str, Dict[str, Any], List[str]]:
+    """
+    Fill a compiled template in one pass.
+    
+    Returns (text, filled placeholders, placeholders that used a default or
+    were left unfilled). Placeholders named in keep are left as they are.
+    """
+    parts = []
+    filled = {}
+    missing = []
+    
+    for segment in template.segments:
+        if segment.__class__ is str:
+            parts.append(segment)
+            continue
+        
+        value = values.get(segment.name)
+        if segment.name in keep:
+            parts.append(segment.token)
+            parts.append(segment.suffix)
+        elif value:
+            parts.append(value)
+            parts.append(segment.suffix)
+            filled[segment.name] = value
+        elif segment.default is not None:
+            parts.append(segment.default)
+            parts.append(segment.suffix)
+            missing.append(segment.name)
+        elif segment.name in REMOVABLE_PLACEHOLDERS:
+            # Remove empty placeholder entirely, with its line break
+            continue
+        else:
+            # Leave as is for user to fill
+            parts.append(segment.token)
+            parts.append(segment.suffix)
+            missing.append(segment.name)
+    
+    return "".join(parts), filled, missing
+
+
+class MergeTemplate(NamedTuple):
+    """
+    A draft with everything but the per-recipient placeholders filled
+    (see DraftAssembler.prepare_merge). The template text has had tone
+    (and optionally LLM polish) applied once, for every row.
+    """
+    template: CompiledTemplate
+    document_type: DocumentType
+    language: str
+    tone: str
+    placeholders_filled: Dict[str, Any]
+    placeholders_missing: List[str]
+    editable_sections: Dict[str, str]
+    generated_at: str
+
+
+class TemplateSet(NamedTuple):
+    """Loaded templates; replaced as a whole when a file changes"""
+    texts: Dict[str, str]                                   # key: "doctype_lang"
+    compiled: Dict[Tuple[str, str], CompiledTemplate]       # key: (doctype, language)
+    mtimes: Dict[Path, Optional[float]]
+
 
 class DraftAssembler:
     """
@@ -69,40 +196,100 @@ class DraftAssembler:
         "START_DATE": "कुछ समय पहले",
     }
     
-    def __init__(self):
-        self.templates: Dict[str, str] = {}  # key: "doctype_lang"
-        self._load_templates()
+    LANGUAGES = ("english", "hindi")
     
-    def _load_templates(self):
-        """Load all templates from disk (English and Hindi)"""
-        # Load English templates
-        for doc_type, template_path in self.TEMPLATE_MAP.items():
-            full_path = TEMPLATE_DIR / template_path
-            try:
-                if full_path.exists():
-                    key = f"{doc_type.value}_english"
-                    self.templates[key] = full_path.read_text(encoding="utf-8")
-                    logger.info(f"Loaded template: {template_path}")
-                else:
-                    logger.warning(f"Template not found: {template_path}")
-            except Exception as e:
-                logger.error(f"Failed to load template {template_path}: {e}")
+    def __init__(self, template_dir: Path = TEMPLATE_DIR, watch_interval: Optional[float] = None):
+        if watch_interval is None:
+            from app.config import get_settings
+            watch_interval = get_settings().TEMPLATE_WATCH_INTERVAL_SECONDS
         
-        # Load Hindi templates
+        self.template_dir = template_dir
+        self.watch_interval = watch_interval
+        self._next_check = time.monotonic() + watch_interval
+        self._reload_lock = threading.Lock()
+        self._template_set = self._load_templates()
+    
+    @property
+    def templates(self) -> Dict[str, str]:
+        """Template text by "doctype_lang" key"""
+        return self._template_set.texts
+    
+    def _template_paths(self) -> Dict[str, Path]:
+        paths = {}
+        for doc_type, template_path in self.TEMPLATE_MAP.items():
+            paths[f"{doc_type.value}_english"] = self.template_dir / template_path
         for doc_type, template_path in self.TEMPLATE_MAP_HINDI.items():
-            full_path = TEMPLATE_DIR / template_path
+            paths[f"{doc_type.value}_hindi"] = self.template_dir / template_path
+        return paths
+    
+    @staticmethod
+    def _mtime(path: Path) -> Optional[float]:
+        try:
+            return path.stat().st_mtime
+        except OSError:
+            return None
+    
+    def _load_templates(self, previous: Optional[TemplateSet] = None) -> TemplateSet:
+        """
+        Load and compile all templates from disk (English and Hindi).
+        On reload, a file that is missing or cannot be read keeps its previous version.
+        """
+        texts: Dict[str, str] = {}
+        mtimes: Dict[Path, Optional[float]] = {}
+        
+        for key, full_path in self._template_paths().items():
+            label = "Hindi template" if key.endswith("_hindi") else "template"
+            relative = full_path.relative_to(self.template_dir)
+            mtime = self._mtime(full_path)
+            mtimes[full_path] = mtime
+            
+            if previous is not None and previous.mtimes.get(full_path) == mtime and key in previous.texts:
+                texts[key] = previous.texts[key]
+                continue
+            
             try:
-                if full_path.exists():
-                    key = f"{doc_type.value}_hindi"
-                    self.templates[key] = full_path.read_text(encoding="utf-8")
-                    logger.info(f"Loaded Hindi template: {template_path}")
-                else:
-                    logger.warning(f"Hindi template not found: {template_path}")
+                if mtime is not None:
+                    texts[key] = full_path.read_text(encoding="utf-8")
+                    logger.info(f"Loaded {label}: {relative}")
+                    continue
+                logger.warning(f"{label.capitalize()} not found: {relative}")
             except Exception as e:
-                logger.error(f"Failed to load Hindi template {template_path}: {e}")
+                logger.error(f"Failed to load {label} {relative}: {e}")
+            
+            if previous is not None and key in previous.texts:
+                texts[key] = previous.texts[key]
+        
+        # Compile each (document type, language) pair, English template as
+        # fallback, with that language's defaults
+        compiled: Dict[Tuple[str, str], CompiledTemplate] = {}
+        for doc_type in self.TEMPLATE_MAP:
+            for language in self.LANGUAGES:
+                text = texts.get(f"{doc_type.value}_{language}") or texts.get(f"{doc_type.value}_english")
+                if text:
+                    defaults = self.DEFAULT_PLACEHOLDERS_HINDI if language == "hindi" else self.DEFAULT_PLACEHOLDERS
+                    compiled[(doc_type.value, language)] = compile_template(text, defaults)
+        
+        return TemplateSet(texts, compiled, mtimes)
+    
+    def _check_for_changes(self) -> None:
+        """Recompile templates whose files changed (at most every watch_interval)"""
+        if self.watch_interval <= 0:
+            return
+        now = time.monotonic()
+        if now < self._next_check or not self._reload_lock.acquire(blocking=False):
+            return
+        try:
+            self._next_check = now + self.watch_interval
+            current = self._template_set
+            if any(self._mtime(path) != mtime for path, mtime in current.mtimes.items()):
+                self._template_set = self._load_templates(previous=current)
+                logger.info("Templates changed on disk, recompiled")
+        finally:
+            self._reload_lock.release()
     
     def _get_template(self, document_type: DocumentType, language: str) -> Optional[str]:
         """Get template for document type and language, with fallback to English"""
+        self._check_for_changes()
         key = f"{document_type.value}_{language}"
         if key in self.templates:
             return self.templates[key]
@@ -110,9 +297,15 @@ class DraftAssembler:
         fallback_key = f"{document_type.value}_english"
         return self.templates.get(fallback_key)
     
+    def _get_compiled(self, document_type: DocumentType, language: str) -> Optional[CompiledTemplate]:
+        """Compiled template for document type and language (English defaults unless Hindi)"""
+        self._check_for_changes()
+        language = "hindi" if language == "hindi" else "english"
+        return self._template_set.compiled.get((document_type.value, language))
+    
     def _extract_placeholders(self, template: str) -> List[str]:
         """Extract all placeholder names from a template"""
-        return re.findall(r'\{([A-Z_]+)\}', template)
+        return PLACEHOLDER_PATTERN.findall(template)
     
     def _format_applicant_details(
         self,
@@ -170,6 +363,44 @@ class DraftAssembler:
             "PLACE": state,
         }
     
+    def _add_issue_placeholders(
+        self,
+        placeholders: Dict[str, Any],
+        document_type: DocumentType,
+        issue_description: str,
+        specific_request: Optional[str],
+        time_period: Optional[str],
+        issue_category: Optional[str],
+        additional_context: Optional[Dict[str, str]],
+        language: str,
+        reserved: frozenset = frozenset()
+    ) -> None:
+        """Add issue placeholders, then additional context fields not already set (or reserved)"""
+        # Select default placeholders based on language
+        defaults = self.DEFAULT_PLACEHOLDERS_HINDI if language == "hindi" else self.DEFAULT_PLACEHOLDERS
+        
+        if document_type in [DocumentType.INFORMATION_REQUEST, DocumentType.RECORDS_REQUEST, DocumentType.INSPECTION_REQUEST]:
+            # RTI-specific placeholders
+            placeholders["INFORMATION_REQUESTED"] = specific_request or issue_description
+            placeholders["TIME_PERIOD"] = time_period or defaults["TIME_PERIOD"]
+            placeholders["PAYMENT_MODE"] = defaults["PAYMENT_MODE"]
+        else:
+            # Complaint-specific placeholders
+            placeholders["GRIEVANCE_DESCRIPTION"] = issue_description
+            placeholders["ISSUE_CATEGORY"] = issue_category or ("सार्वजनिक सेवा समस्या" if language == "hindi" else "Public Service Issue")
+            placeholders["AFFECTED_LOCATION"] = additional_context.get("location") if additional_context else defaults["AFFECTED_LOCATION"]
+            placeholders["PROBLEM_DURATION"] = time_period or defaults["PROBLEM_DURATION"]
+            placeholders["IMPACT_DESCRIPTION"] = additional_context.get("impact") if additional_context else defaults["IMPACT_DESCRIPTION"]
+            placeholders["START_DATE"] = additional_context.get("start_date") if additional_context else defaults["START_DATE"]
+            placeholders["PREVIOUS_ATTEMPTS"] = additional_context.get("previous_attempts") if additional_context else defaults["PREVIOUS_ATTEMPTS"]
+        
+        # Add any additional context
+        if additional_context:
+            for key, value in additional_context.items():
+                placeholder_key = key.upper().replace(" ", "_")
+                if placeholder_key not in placeholders and placeholder_key not in reserved:
+                    placeholders[placeholder_key] = value
+    
     def assemble_draft(
         self,
         document_type: DocumentType,
@@ -204,15 +435,12 @@ class DraftAssembler:
             - language: Language used for the draft
         """
         # Get template for the specified language
-        template = self._get_template(document_type, language)
+        template = self._get_compiled(document_type, language)
         
         if not template:
             logger.error(f"No template for document type: {document_type}, language: {language}")
             raise ValueError(f"Template not found for {document_type}")
         
-        # Select default placeholders based on language
-        defaults = self.DEFAULT_PLACEHOLDERS_HINDI if language == "hindi" else self.DEFAULT_PLACEHOLDERS
-        
         # Build placeholder values
         placeholders = {}
         
@@ -230,50 +458,14 @@ class DraftAssembler:
         # Date and place
         placeholders.update(self._format_date_and_place(applicant_state))
         
-        # Issue-specific content
-        if document_type in [DocumentType.INFORMATION_REQUEST, DocumentType.RECORDS_REQUEST, DocumentType.INSPECTION_REQUEST]:
-            # RTI-specific placeholders
-            placeholders["INFORMATION_REQUESTED"] = specific_request or issue_description
-            placeholders["TIME_PERIOD"] = time_period or defaults["TIME_PERIOD"]
-            placeholders["PAYMENT_MODE"] = defaults["PAYMENT_MODE"]
-        else:
-            # Complaint-specific placeholders
-            placeholders["GRIEVANCE_DESCRIPTION"] = issue_description
-            placeholders["ISSUE_CATEGORY"] = issue_category or ("सार्वजनिक सेवा समस्या" if language == "hindi" else "Public Service Issue")
-            placeholders["AFFECTED_LOCATION"] = additional_context.get("location") if additional_context else defaults["AFFECTED_LOCATION"]
-            placeholders["PROBLEM_DURATION"] = time_period or defaults["PROBLEM_DURATION"]
-            placeholders["IMPACT_DESCRIPTION"] = additional_context.get("impact") if additional_context else defaults["IMPACT_DESCRIPTION"]
-            placeholders["START_DATE"] = additional_context.get("start_date") if additional_context else defaults["START_DATE"]
-            placeholders["PREVIOUS_ATTEMPTS"] = additional_context.get("previous_attempts") if additional_context else defaults["PREVIOUS_ATTEMPTS"]
-        
-        # Add any additional context
-        if additional_context:
-            for key, value in additional_context.items():
-                placeholder_key = key.upper().replace(" ", "_")
-                if placeholder_key not in placeholders:
-                    placeholders[placeholder_key] = value
+        # Issue-specific content and additional context
+        self._add_issue_placeholders(
+            placeholders, document_type, issue_description, specific_request,
+            time_period, issue_category, additional_context, language
+        )
         
-        # Track which placeholders were filled vs defaulted
-        template_placeholders = self._extract_placeholders(template)
-        placeholders_filled = {}
-        placeholders_missing = []
-        
-        # Fill the template
-        draft_text = template
-        for placeholder in template_placeholders:
-            if placeholder in placeholders and placeholders[placeholder]:
-                draft_text = draft_text.replace(f"{{{placeholder}}}", placeholders[placeholder])
-                placeholders_filled[placeholder] = placeholders[placeholder]
-            elif placeholder in defaults:
-                draft_text = draft_text.replace(f"{{{placeholder}}}", defaults[placeholder])
-                placeholders_missing.append(placeholder)
-            elif placeholder == "APPLICANT_CONTACT":
-                # Remove empty contact placeholder entirely
-                draft_text = draft_text.replace(f"{{{placeholder}}}\n", "")
-                draft_text = draft_text.replace(f"{{{placeholder}}}", "")
-            else:
-                # Leave as is for user to fill
-                placeholders_missing.append(placeholder)
+        # Fill the template, tracking which placeholders were filled vs defaulted
+        draft_text, placeholders_filled, placeholders_missing = fill_template(template, placeholders)
         
         # Apply tone adjustments
         if tone != "neutral":
@@ -303,6 +495,99 @@ class DraftAssembler:
             "llm_enhancement_available": True,
         }
     
+    # =========================================================================
+    # MAIL MERGE
+    # =========================================================================
+    
+    def prepare_merge(
+        self,
+        document_type: DocumentType,
+        issue_description: str,
+        specific_request: Optional[str] = None,
+        time_period: Optional[str] = None,
+        issue_category: Optional[str] = None,
+        additional_context: Optional[Dict[str, str]] = None,
+        tone: str = "neutral",
+        language: str = "english"
+    ) -> MergeTemplate:
+        """
+        Fill everything shared by all recipients of a mail merge (issue,
+        defaults, date, tone), leaving the ROW_PLACEHOLDERS for fill_merge.
+        """
+        template = self._get_compiled(document_type, language)
+        
+        if not template:
+            logger.error(f"No template for document type: {document_type}, language: {language}")
+            raise ValueError(f"Template not found for {document_type}")
+        
+        placeholders = {"DATE": self._format_date_and_place("")["DATE"]}
+        self._add_issue_placeholders(
+            placeholders, document_type, issue_description, specific_request,
+            time_period, issue_category, additional_context, language,
+            reserved=ROW_PLACEHOLDERS
+        )
+        
+        text, filled, missing = fill_template(template, placeholders, keep=ROW_PLACEHOLDERS)
+        
+        if tone != "neutral":
+            from app.utils.tone import adjust_tone
+            text = adjust_tone(text, tone)
+        
+        return MergeTemplate(
+            template=compile_template(text, {}),
+            document_type=document_type,
+            language=language,
+            tone=tone,
+            placeholders_filled=filled,
+            placeholders_missing=missing,
+            editable_sections={
+                "issue_description": issue_description,
+                "specific_request": specific_request or "",
+                "time_period": time_period or "",
+            },
+            generated_at=datetime.now().isoformat()
+        )
+    
+    def fill_merge(
+        self,
+        merge: MergeTemplate,
+        applicant_name: str,
+        applicant_address: str,
+        applicant_state: str,
+        applicant_phone: Optional[str] = None,
+        applicant_email: Optional[str] = None,
+        department_name: str = "The Concerned Department",
+        department_address: str = "[Department Address]",
+        authority_designation: Optional[str] = None
+    ) -> Dict[str, Any]:
+        """Fill one recipient into a prepared merge; same result shape as assemble_draft"""
+        placeholders = self._format_applicant_details(
+            applicant_name, applicant_address, applicant_state,
+            applicant_phone, applicant_email
+        )
+        placeholders.update(self._format_authority_details(
+            department_name, department_address, authority_designation
+        ))
+        placeholders["PLACE"] = applicant_state
+        
+        draft_text, filled, missing = fill_template(merge.template, placeholders)
+        
+        return {
+            "draft_text": draft_text,
+            "document_type": merge.document_type.value,
+            "template_used": self.TEMPLATE_MAP.get(merge.document_type, f"{merge.document_type.value}_template"),
+            "language": merge.language,
+            "tone": merge.tone,
+            "placeholders_filled": {**merge.placeholders_filled, **filled},
+            # Unfilled shared placeholders are already listed in the merge
+            "placeholders_missing": merge.placeholders_missing + [name for name in missing if name in ROW_PLACEHOLDERS],
+            "word_count": len(draft_text.split()),
+            "editable_sections": merge.editable_sections,
+            "generated_at": merge.generated_at,
+            "llm_enhanced": False,
+            "llm_enhancement_available": True,
+        }
+    
     def get_template_preview(self, document_type: DocumentType, language: str = "english") -> Optional[str]:
         """Get a template preview for display"""
         return self._get_template(document_type, language)
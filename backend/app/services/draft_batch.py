@@ -0,0 +1,348 @@
+"""
+Draft Batch (Mail Merge)
+One issue, many recipients: drafts for rows of applicant/authority fields
+
+Used by POST /api/draft/batch and the command line:
+
+    python -m app.services.draft_batch rows.csv --document-type information_request \
+        --description "..." [--specific-request "..."] [--language hindi] [--tone formal]
+
+Work shared by every row is done once: cleaning and PII checks of the issue,
+translation, template filling, tone and the optional LLM polish. The result
+is a MergeTemplate holding only the per-row placeholders (applicant,
+authority, place), so each row is a single template join.
+
+Rows are CSV (header names as in MergeRow) or JSONL (one object per line).
+Invalid rows produce an error item instead of stopping the batch.
+"""
+
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+from dataclasses import dataclass, field
+from pydantic import BaseModel, EmailStr, Field, ValidationError
+from loguru import logger
+import csv
+import io
+import json
+
+from app.services.draft_assembler import DocumentType, MergeTemplate, compile_template, get_draft_assembler
+from app.services.executor import run_blocking
+from app.services.nlp import translate_many
+from app.utils.text_sanitizer import clean_input, warn_about_pii
+from app.utils.tone import suggest_tone
+
+ROW_FORMATS = ("csv", "jsonl")
+
+RTI_DOCUMENT_TYPES = (DocumentType.INFORMATION_REQUEST, DocumentType.RECORDS_REQUEST, DocumentType.INSPECTION_REQUEST)
+
+
+class MergeRow(BaseModel):
+    """One recipient: applicant and authority fields (same limits as /api/draft)"""
+    name: str = Field(..., min_length=2, max_length=100)
+    address: str = Field(..., min_length=10, max_length=500)
+    state: str = Field(..., min_length=2, max_length=50)
+    district: Optional[str] = Field(None, max_length=50)
+    phone: Optional[str] = Field(None, pattern=r'^[6-9]\d{9}$')
+    email: Optional[EmailStr] = None
+    department_name: str = "The Concerned Department"
+    department_address: str = "[Department Address]"
+    designation: Optional[str] = None
+
+
+@dataclass
+class SharedDraft:
+    """Everything computed once for a batch"""
+    merge: MergeTemplate
+    warnings: List[str] = field(default_factory=list)
+    llm_enhanced: bool = False
+    original: Optional[MergeTemplate] = None      # Rule-based merge, if the LLM polished it
+    enhancement_summary: Optional[str] = None
+
+
+# =============================================================================
+# SHARED HELPERS (also used by /api/draft)
+# =============================================================================
+
+def translate_inputs(description: str, specific: Optional[str]) -> Tuple[str, Optional[str]]:
+    """
+    Translate English inputs for a Hindi draft (runs on the blocking executor).
+    Both fields go through one batched translation call.
+    Falls back to the original text if the translation service fails.
+    """
+    try:
+        from app.utils.language_normalizer import detect_language
+        # Only English (non-Hindi) fields are translated
+        fields = [text if text and detect_language(text) != "hi" else None for text in (description, specific)]
+        if any(fields):
+            logger.info(f"Translating {sum(1 for text in fields if text)} input field(s) to Hindi")
+            translated = translate_many(fields)
+            if fields[0] and translated[0]:
+                description = translated[0]
+            if fields[1] and translated[1]:
+                specific = translated[1]
+    except Exception as e:
+        logger.error(f"Translation preprocessing failed: {e}")
+
+    return description, specific
+
+
+def draft_suggestions(document_type: DocumentType, language: str, placeholders_missing: List[str]) -> List[str]:
+    """Filing suggestions shown with a draft"""
+    suggestions = []
+
+    if placeholders_missing:
+        suggestions.append(f"Some fields need your attention: {', '.join(placeholders_missing[:3])}")
+
+    if document_type in RTI_DOCUMENT_TYPES:
+        if language == "hindi":
+            suggestions.append("आरटीआई शुल्क रु. 10/- आईपीओ/डीडी/ऑनलाइन के माध्यम से संलग्न करें")
+            suggestions.append("अपने रिकॉर्ड के लिए इस आवेदन की एक प्रति रखें")
+        else:
+            suggestions.append("Remember to attach RTI fee of Rs. 10/- via IPO/DD/Online")
+            suggestions.append("Keep a copy of this application for your records")
+    else:
+        if language == "hindi":
+            suggestions.append("अनुवर्ती कार्रवाई के लिए पावती/संदर्भ संख्या रखें")
+        else:
+            suggestions.append("Keep the acknowledgment/reference number for follow-up")
+
+    return suggestions
+
+
+# =============================================================================
+# ROWS
+# =============================================================================
+
+def parse_rows(data: str, format: str) -> List[Tuple[Optional[Dict[str, Any]], Optional[str]]]:
+    """
+    Split CSV or JSONL text into (row, error) pairs.
+    Empty CSV cells become None; blank JSONL lines are skipped.
+    """
+    format = format.lower().strip()
+    rows: List[Tuple[Optional[Dict[str, Any]], Optional[str]]] = []
+
+    if format == "csv":
+        for record in csv.DictReader(io.StringIO(data)):
+            rows.append(({
+                key.strip(): (value.strip() or None) if isinstance(value, str) else value
+                for key, value in record.items()
+                if key is not None
+            }, None))
+    elif format == "jsonl":
+        for number, line in enumerate(data.splitlines(), 1):
+            if not line.strip():
+                continue
+            try:
+                row = json.loads(line)
+            except json.JSONDecodeError as e:
+                rows.append((None, f"Invalid JSON on line {number}: {e.msg}"))
+                continue
+            if isinstance(row, dict):
+                rows.append((row, None))
+            else:
+                rows.append((None, f"Line {number} is not a JSON object"))
+    else:
+        raise ValueError(f"Invalid rows format. Supported: {list(ROW_FORMATS)}")
+
+    return rows
+
+
+def _validation_message(error: ValidationError) -> str:
+    return "; ".join(
+        f"{'.'.join(str(part) for part in e['loc']) or 'row'}: {e['msg']}"
+        for e in error.errors()
+    )
+
+
+# =============================================================================
+# MERGE
+# =============================================================================
+
+async def prepare_shared_draft(
+    document_type: DocumentType,
+    description: str,
+    specific_request: Optional[str] = None,
+    time_period: Optional[str] = None,
+    category: Optional[str] = None,
+    additional_context: Optional[Dict[str, str]] = None,
+    language: str = "english",
+    tone: str = "neutral",
+    enable_llm_enhancement: bool = False
+) -> SharedDraft:
+    """Clean, check, translate, fill, tone and (optionally) polish the shared body once"""
+    from app.config import get_settings
+    settings = get_settings()
+
+    cleaned_description = clean_input(description)
+    cleaned_specific = clean_input(specific_request) if specific_request else None
+
+    warnings = warn_about_pii(cleaned_description).get("warnings", [])
+    additional = additional_context or {}
+    if tone == "neutral" and category:
+        suggested = suggest_tone(category, additional.get("urgency", "normal"))
+        if suggested != "neutral":
+            warnings.append(f"Suggested tone: '{suggested}' based on issue type")
+
+    if language == "hindi":
+        cleaned_description, cleaned_specific = await run_blocking(
+            "translation", translate_inputs, cleaned_description, cleaned_specific
+        )
+
+    merge = await run_blocking(
+        "draft",
+        get_draft_assembler().prepare_merge,
+        document_type=document_type,
+        issue_description=cleaned_description,
+        specific_request=cleaned_specific,
+        time_period=time_period,
+        issue_category=category,
+        additional_context=additional,
+        tone=tone,
+        language=language
+    )
+    shared = SharedDraft(merge=merge, warnings=warnings)
+
+    if enable_llm_enhancement and settings.FEATURE_LLM_ASSIST:
+        try:
+            from app.services.llm import enhance_draft_text, is_llm_available
+
+            if is_llm_available():
+                # Per-row placeholders are {TOKENS}: the enhancer reverts if any is lost
+                enhancement = await enhance_draft_text(
+                    draft_text=merge.template.text,
+                    language=language,
+                    tone=tone,
+                    preserve_placeholders=True
+                )
+                if enhancement.was_enhanced:
+                    shared.original = merge
+                    shared.merge = merge._replace(template=compile_template(enhancement.enhanced_text, {}))
+                    shared.llm_enhanced = True
+                    shared.enhancement_summary = enhancement.changes_summary
+                    logger.info(f"LLM enhancement applied to batch body: {enhancement.tokens_used} tokens")
+        except Exception as e:
+            logger.warning(f"LLM enhancement failed (using rule-based): {e}")
+
+    return shared
+
+
+def merge_rows(
+    shared: SharedDraft,
+    rows: Iterable[Tuple[Optional[Dict[str, Any]], Optional[str]]]
+) -> Iterator[Dict[str, Any]]:
+    """
+    One item per row, in order: {"index", "result", "error"}.
+    result has the fields of the /api/draft response.
+    """
+    assembler = get_draft_assembler()
+    merge = shared.merge
+
+    for index, (row, error) in enumerate(rows):
+        if error is not None:
+            yield {"index": index, "result": None, "error": error}
+            continue
+
+        try:
+            recipient = MergeRow.model_validate(row)
+        except ValidationError as e:
+            yield {"index": index, "result": None, "error": _validation_message(e)}
+            continue
+
+        recipient_fields = dict(
+            applicant_name=recipient.name,
+            applicant_address=recipient.address,
+            applicant_state=recipient.state,
+            applicant_phone=recipient.phone,
+            applicant_email=recipient.email,
+            department_name=recipient.department_name,
+            department_address=recipient.department_address,
+            authority_designation=recipient.designation
+        )
+        result = assembler.fill_merge(merge, **recipient_fields)
+
+        suggestions = draft_suggestions(merge.document_type, merge.language, result["placeholders_missing"])
+        original_draft = None
+        if shared.llm_enhanced:
+            original_draft = assembler.fill_merge(shared.original, **recipient_fields)["draft_text"]
+            suggestions.append("✨ AI-enhanced for better clarity (original preserved)")
+
+        yield {
+            "index": index,
+            "result": {
+                "draft_text": result["draft_text"],
+                "document_type": result["document_type"],
+                "template_used": result["template_used"],
+                "language": result["language"],
+                "word_count": result["word_count"],
+                "generated_at": result["generated_at"],
+                "placeholders": {
+                    "filled": result["placeholders_filled"],
+                    "missing": result["placeholders_missing"]
+                },
+                "editable_sections": result["editable_sections"],
+                "warnings": list(shared.warnings),
+                "suggestions": suggestions,
+                "llm_enhanced": shared.llm_enhanced,
+                "original_draft": original_draft,
+                "enhancement_summary": shared.enhancement_summary
+            },
+            "error": None
+        }
+
+
+# =============================================================================
+# COMMAND LINE
+# =============================================================================
+
+def main() -> None:
+    """Mail merge from a CSV/JSONL file to NDJSON"""
+    import argparse
+    import asyncio
+    import sys
+    from pathlib import Path
+    from app.services.executor import shutdown_executor
+
+    parser = argparse.ArgumentParser(description="Generate one draft per CSV/JSONL row for a shared issue (NDJSON output)")
+    parser.add_argument("rows", help="CSV or JSONL file of applicant/authority fields")
+    parser.add_argument("--format", choices=ROW_FORMATS, help="Rows format (default: from the file extension)")
+    parser.add_argument("--document-type", required=True, choices=[t.value for t in DocumentType])
+    parser.add_argument("--description", required=True, help="Issue description shared by every row")
+    parser.add_argument("--specific-request")
+    parser.add_argument("--time-period")
+    parser.add_argument("--category")
+    parser.add_argument("--language", default="english", choices=["english", "hindi"])
+    parser.add_argument("--tone", default="neutral", choices=["neutral", "formal", "assertive"])
+    parser.add_argument("--llm", action="store_true", help="Polish the shared body with the LLM")
+    parser.add_argument("--output", "-o", help="Output file (default: stdout)")
+    args = parser.parse_args()
+
+    path = Path(args.rows)
+    rows_format = args.format or ("csv" if path.suffix.lower() == ".csv" else "jsonl")
+    rows = parse_rows(path.read_text(encoding="utf-8-sig"), rows_format)
+
+    shared = asyncio.run(prepare_shared_draft(
+        DocumentType(args.document_type),
+        args.description,
+        specific_request=args.specific_request,
+        time_period=args.time_period,
+        category=args.category,
+        language=args.language,
+        tone=args.tone,
+        enable_llm_enhancement=args.llm
+    ))
+
+    out = open(args.output, "w", encoding="utf-8") if args.output else sys.stdout
+    failed = 0
+    try:
+        for item in merge_rows(shared, rows):
+            failed += item["error"] is not None
+            out.write(json.dumps(item, ensure_ascii=False) + "\n")
+    finally:
+        if out is not sys.stdout:
+            out.close()
+        shutdown_executor()
+
+    print(f"{len(rows)} rows, {failed} failed", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,362 @@
+"""
+Blocking Work Executor
+Runs synchronous, CPU-bound service calls off the asyncio event loop
+
+Inference, draft assembly, translation and document generation are plain
+functions. Calling them directly from an `async def` handler blocks every
+other request on that worker (including /health) until they return.
+
+- Calls are dispatched to a bounded thread or process pool
+- At most max_workers calls run and max_queue wait; beyond that the call is
+  rejected immediately with ExecutorSaturatedError (served as 503 + Retry-After)
+- Queue wait and run time are recorded per stage for monitoring
+
+Process pools need picklable (module-level) callables, arguments and results.
+
+Inference workers (INFERENCE_WORKERS > 0): a separate process pool for
+run_inference. The parent preloads spaCy (pipeline, phrase and pattern
+matchers), the keyword index and, if enabled, DistilBERT, then forks the
+workers, so they share the model pages copy-on-write instead of each
+loading its own copy. spaCy and DistilBERT hold the GIL for much of their
+work, so threads alone do not scale inference across cores.
+"""
+
+from typing import Any, Callable, Deque, Dict, Optional
+from collections import deque
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from dataclasses import dataclass, field
+from loguru import logger
+import asyncio
+import gc
+import multiprocessing
+import os
+import sys
+import threading
+import time
+
+EXECUTOR_THREAD = "thread"
+EXECUTOR_PROCESS = "process"
+
+# Recent samples kept per stage for percentiles
+_SAMPLE_WINDOW = 512
+
+
+class ExecutorSaturatedError(RuntimeError):
+    """All workers are busy and the wait queue is full"""
+
+    def __init__(self, stage: str, retry_after: int):
+        super().__init__(f"Server busy: no capacity for '{stage}'")
+        self.stage = stage
+        self.retry_after = retry_after
+
+
+def _percentile(samples: Deque[float], pct: float) -> float:
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(pct / 100 * len(ordered)))]
+
+
+@dataclass
+class StageStats:
+    """Queue wait and run time counters for one stage"""
+    calls: int = 0
+    errors: int = 0
+    rejected: int = 0
+    wait_ms_total: float = 0.0
+    run_ms_total: float = 0.0
+    wait_ms: Deque[float] = field(default_factory=lambda: deque(maxlen=_SAMPLE_WINDOW))
+    run_ms: Deque[float] = field(default_factory=lambda: deque(maxlen=_SAMPLE_WINDOW))
+
+    def record(self, wait_ms: float, run_ms: float, failed: bool) -> None:
+        self.calls += 1
+        self.errors += int(failed)
+        self.wait_ms_total += wait_ms
+        self.run_ms_total += run_ms
+        self.wait_ms.append(wait_ms)
+        self.run_ms.append(run_ms)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "calls": self.calls,
+            "errors": self.errors,
+            "rejected": self.rejected,
+            "wait_ms_avg": round(self.wait_ms_total / self.calls, 2) if self.calls else 0.0,
+            "wait_ms_p95": round(_percentile(self.wait_ms, 95), 2),
+            "run_ms_avg": round(self.run_ms_total / self.calls, 2) if self.calls else 0.0,
+            "run_ms_p50": round(_percentile(self.run_ms, 50), 2),
+            "run_ms_p95": round(_percentile(self.run_ms, 95), 2)
+        }
+
+
+def _timed_call(fn: Callable, args: tuple, kwargs: dict) -> tuple:
+    """
+    Runs inside the worker: returns (started_at, run_seconds, result, error).
+    Module-level so it can be sent to a process pool.
+    """
+    started_at = time.monotonic()
+    try:
+        result = fn(*args, **kwargs)
+    except Exception as e:
+        return started_at, time.monotonic() - started_at, None, e
+    return started_at, time.monotonic() - started_at, result, None
+
+
+def _init_worker(preload: Optional[Callable[[], None]]) -> None:
+    """
+    Initializer of each pool process.
+    Forked workers inherit the parent's preloaded models; spawned workers
+    (platforms without fork) have to load their own.
+    """
+    if preload is not None:
+        preload()
+
+    # The pool provides the parallelism: one intra-op thread per worker
+    torch = sys.modules.get("torch")
+    if torch is not None:
+        torch.set_num_threads(1)
+
+
+def _worker_pid() -> int:
+    return os.getpid()
+
+
+class BoundedExecutor:
+    """Thread or process pool with an admission limit and per-stage timings"""
+
+    def __init__(
+        self,
+        kind: str = EXECUTOR_THREAD,
+        max_workers: int = 4,
+        max_queue: int = 32,
+        retry_after: int = 1,
+        preload: Optional[Callable[[], None]] = None
+    ):
+        if kind not in (EXECUTOR_THREAD, EXECUTOR_PROCESS):
+            raise ValueError(f"Unknown executor kind: {kind!r} (expected 'thread' or 'process')")
+
+        self.kind = kind
+        self.max_workers = max_workers
+        self.max_queue = max_queue
+        self.retry_after = retry_after
+        self.preload = preload
+        self._pool: Optional[Executor] = None
+        self._in_flight = 0
+        self._lock = threading.Lock()
+        self._stages: Dict[str, StageStats] = {}
+
+    def _get_pool(self) -> Executor:
+        if self._pool is None:
+            if self.kind == EXECUTOR_PROCESS:
+                if "fork" in multiprocessing.get_all_start_methods():
+                    context, preload = multiprocessing.get_context("fork"), None
+                else:
+                    context, preload = multiprocessing.get_context(), self.preload
+                self._pool = ProcessPoolExecutor(
+                    max_workers=self.max_workers,
+                    mp_context=context,
+                    initializer=_init_worker,
+                    initargs=(preload,)
+                )
+            else:
+                self._pool = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="blocking")
+        return self._pool
+
+    def start(self) -> None:
+        """
+        Create the pool up front.
+        Process pools run the preload hook in this process first, then fork
+        every worker (a fork-context pool launches all workers on first use).
+        """
+        if self._pool is not None:
+            return
+
+        if self.kind == EXECUTOR_PROCESS and self.preload is not None:
+            started = time.monotonic()
+            self.preload()
+            # Keep the preloaded objects out of future collections, so the
+            # GC in the workers does not write to (and copy) their pages
+            gc.freeze()
+            logger.info(f"Worker models preloaded in {(time.monotonic() - started) * 1000:.0f}ms")
+
+        pool = self._get_pool()
+        if self.kind == EXECUTOR_PROCESS:
+            pool.submit(_worker_pid).result()
+            logger.info(f"{self.max_workers} worker processes forked from pid {os.getpid()}")
+
+    def _reset_broken_pool(self) -> None:
+        """A worker died (e.g. OOM-killed): drop the pool so the next call re-forks it"""
+        logger.error("Worker process pool is broken, recreating it on next use")
+        pool, self._pool = self._pool, None
+        if pool is not None:
+            pool.shutdown(wait=False, cancel_futures=True)
+
+    def _stage(self, stage: str) -> StageStats:
+        stats = self._stages.get(stage)
+        if stats is None:
+            stats = self._stages.setdefault(stage, StageStats())
+        return stats
+
+    def _admit(self, stage: str) -> None:
+        with self._lock:
+            if self._in_flight >= self.max_workers + self.max_queue:
+                self._stage(stage).rejected += 1
+                logger.warning(f"Executor saturated, rejecting '{stage}' ({self._in_flight} in flight)")
+                raise ExecutorSaturatedError(stage, self.retry_after)
+            self._in_flight += 1
+
+    def _release(self) -> None:
+        with self._lock:
+            self._in_flight -= 1
+
+    async def run(self, stage: str, fn: Callable, *args: Any, **kwargs: Any) -> Any:
+        """
+        Run fn(*args, **kwargs) in the pool and await its result.
+
+        Raises:
+            ExecutorSaturatedError: if max_workers + max_queue calls are already in flight
+        """
+        self._admit(stage)
+        submitted_at = time.monotonic()
+        try:
+            future = self._get_pool().submit(_timed_call, fn, args, kwargs)
+        except Exception as e:
+            self._release()
+            if isinstance(e, BrokenProcessPool):
+                self._reset_broken_pool()
+            raise
+
+        # Free the slot when the work finishes, even if the awaiting request
+        # was cancelled (the worker keeps running until then)
+        future.add_done_callback(lambda _: self._release())
+        try:
+            started_at, run_seconds, result, error = await asyncio.wrap_future(future)
+        except BrokenProcessPool:
+            self._reset_broken_pool()
+            raise
+
+        wait_ms = max(0.0, started_at - submitted_at) * 1000
+        run_ms = run_seconds * 1000
+        with self._lock:
+            self._stage(stage).record(wait_ms, run_ms, failed=error is not None)
+        logger.debug(f"Executor stage '{stage}': wait={wait_ms:.2f}ms run={run_ms:.2f}ms")
+
+        if error is not None:
+            raise error
+        return result
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Pool configuration, current load and per-stage timings"""
+        with self._lock:
+            return {
+                "kind": self.kind,
+                "max_workers": self.max_workers,
+                "max_queue": self.max_queue,
+                "in_flight": self._in_flight,
+                "queued": max(0, self._in_flight - self.max_workers),
+                "stages": {name: stats.to_dict() for name, stats in self._stages.items()}
+            }
+
+    def shutdown(self, wait: bool = True) -> None:
+        if self._pool is not None:
+            self._pool.shutdown(wait=wait, cancel_futures=True)
+            self._pool = None
+
+
+_executor: Optional[BoundedExecutor] = None
+_executor_lock = threading.Lock()
+
+
+def get_executor() -> BoundedExecutor:
+    """Get the shared executor (configured from settings on first use)"""
+    global _executor
+
+    if _executor is None:
+        with _executor_lock:
+            if _executor is None:
+                from app.config import get_settings
+                settings = get_settings()
+                _executor = BoundedExecutor(
+                    kind=settings.EXECUTOR_KIND,
+                    max_workers=settings.EXECUTOR_MAX_WORKERS or min(4, os.cpu_count() or 1),
+                    max_queue=settings.EXECUTOR_MAX_QUEUE,
+                    retry_after=settings.EXECUTOR_RETRY_AFTER_SECONDS
+                )
+                logger.info(
+                    f"Blocking executor: {_executor.kind} pool, "
+                    f"{_executor.max_workers} workers, queue {_executor.max_queue}"
+                )
+
+    return _executor
+
+
+def _preload_inference_models() -> None:
+    """Load everything run_inference touches (parent of the inference workers)"""
+    from app.config import get_settings
+    from app.services.nlp import preload_all_models
+    from app.services.rule_engine.keyword_index import get_keyword_index
+
+    get_keyword_index()
+    preload_all_models(include_distilbert=get_settings().ENABLE_DISTILBERT)
+
+
+_inference_executor: Optional[BoundedExecutor] = None
+
+
+def get_inference_executor() -> BoundedExecutor:
+    """
+    Get the executor for run_inference: the forked worker pool if
+    INFERENCE_WORKERS > 0, otherwise the shared executor.
+    """
+    global _inference_executor
+
+    from app.config import get_settings
+    settings = get_settings()
+    if settings.INFERENCE_WORKERS <= 0:
+        return get_executor()
+
+    if _inference_executor is None:
+        with _executor_lock:
+            if _inference_executor is None:
+                _inference_executor = BoundedExecutor(
+                    kind=EXECUTOR_PROCESS,
+                    max_workers=settings.INFERENCE_WORKERS,
+                    max_queue=settings.INFERENCE_WORKER_QUEUE,
+                    retry_after=settings.EXECUTOR_RETRY_AFTER_SECONDS,
+                    preload=_preload_inference_models
+                )
+
+    return _inference_executor
+
+
+def start_inference_workers() -> None:
+    """Preload models and fork the inference workers (application startup)"""
+    executor = get_inference_executor()
+    if executor.kind == EXECUTOR_PROCESS:
+        executor.start()
+
+
+async def run_blocking(stage: str, fn: Callable, *args: Any, **kwargs: Any) -> Any:
+    """Run a blocking call on the shared executor"""
+    return await get_executor().run(stage, fn, *args, **kwargs)
+
+
+def get_executor_stats() -> Dict[str, Any]:
+    """Shared executor stats, plus the inference workers when enabled"""
+    return {
+        **get_executor().get_stats(),
+        "inference_workers": _inference_executor.get_stats() if _inference_executor is not None else None
+    }
+
+
+def shutdown_executor() -> None:
+    """Stop the shared pool and the inference workers (application shutdown)"""
+    global _executor, _inference_executor
+
+    with _executor_lock:
+        for executor in (_executor, _inference_executor):
+            if executor is not None:
+                executor.shutdown()
+        _executor = None
+        _inference_executor = None
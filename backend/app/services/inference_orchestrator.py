@@ -4,17 +4,20 @@ Implements the core control flow: Rule Engine → spaCy NLP → Confidence Gate
 This is the SINGLE source of truth for inference decisions.
 """
 
-from typing import Dict, Any, Optional, List, Tuple
-from dataclasses import dataclass
+from typing import Dict, Any, Optional, List, Tuple, Iterator
+from dataclasses import dataclass, field
+import itertools
 from enum import Enum
 from loguru import logger
 
+from app.services.analysis_context import AnalysisContext
 from app.services.rule_engine.intent_rules import classify_intent
 from app.services.rule_engine.legal_triggers import detect_legal_triggers
 from app.services.rule_engine.issue_rules import map_issue_to_department
-from app.services.nlp.spacy_engine import extract_entities, extract_key_phrases, analyze_sentiment_basic
+from app.services.nlp.spacy_engine import extract_entities, extract_key_phrases, analyze_sentiment_basic, parse_many
 from app.services.nlp.confidence_gate import gate_result, should_use_nlp, GatedResult, ConfidenceLevel
-from app.services.nlp.distilbert_semantic import rank_by_similarity, compute_similarity
+from app.services.nlp.distilbert_semantic import score_templates
+from app.utils.text_sanitizer import Span
 
 
 class DocumentType(str, Enum):
@@ -53,6 +56,7 @@ class InferenceResult:
     suggestions: List[str]
     explanation: str
     decision_path: List[str]  # Audit trail
+    text_spans: List[Span] = field(default_factory=list)  # PII/reference scan, reused for warnings
 
 
 # RTI document type indicators
@@ -88,12 +92,16 @@ COMPLAINT_DOCUMENT_INDICATORS = {
 }
 
 
-def _determine_document_type(text: str, intent: IntentType) -> Tuple[DocumentType, float]:
+def _determine_document_type(
+    text: str,
+    intent: IntentType,
+    context: Optional[AnalysisContext] = None
+) -> Tuple[DocumentType, float]:
     """
     Determine specific document type based on intent and text analysis.
     Uses keyword matching - NO AI decision making.
     """
-    text_lower = text.lower()
+    text_lower = AnalysisContext.for_text(text, context).text_lower
     
     if intent == IntentType.RTI:
         indicators = RTI_DOCUMENT_INDICATORS
@@ -174,19 +182,28 @@ def _build_explanation(decision_path: List[str], confidence: float) -> str:
     return f"Decision made with {confidence_text} ({confidence:.0%}). Path: {path_text}"
 
 
-def run_inference(text: str, language: str = "english") -> InferenceResult:
-    """
-    Main inference orchestrator.
-    
-    CONTROL FLOW (as per specification):
-    1. Rule Engine (keyword matching) - PRIMARY
-    2. spaCy NLP (entity extraction, phrases)
-    3. Confidence Gate (decide if more analysis needed)
-    4. DistilBERT (only if confidence is low)
-    5. Return result with confidence level
-    
-    This function NEVER makes final legal decisions - it only assists.
-    """
+@dataclass
+class _InferenceState:
+    """Intermediate state between the inference steps (one per input text)"""
+    context: AnalysisContext
+    intent: IntentType
+    confidence: float
+    legal_triggers: Dict[str, Any]
+    department_mapping: Dict[str, Any]
+    entities: Dict[str, List[str]]
+    key_phrases: List[str]
+    sentiment: str
+    decision_path: List[str]
+
+
+# Template groups used by the DistilBERT semantic boost (Step 4)
+SEMANTIC_RTI_GROUP = "intent_rti"
+SEMANTIC_COMPLAINT_GROUP = "intent_complaint"
+
+
+def _run_rules_and_nlp(context: AnalysisContext) -> _InferenceState:
+    """Steps 1-3: rule engine, spaCy NLP and the rule-based confidence adjustments"""
+    text = context.text
     decision_path = []
     
     # ============================================
@@ -195,17 +212,17 @@ def run_inference(text: str, language: str = "english") -> InferenceResult:
     logger.info("Step 1: Running rule engine")
     decision_path.append("Rule Engine")
     
-    intent_str, rule_confidence = classify_intent(text)
+    intent_str, rule_confidence = classify_intent(text, context)
     intent = IntentType(intent_str) if intent_str != "unknown" else IntentType.UNKNOWN
     
     logger.info(f"Rule engine result: intent={intent}, confidence={rule_confidence}")
     
     # Detect legal triggers
-    legal_triggers = detect_legal_triggers(text)
+    legal_triggers = detect_legal_triggers(text, context)
     decision_path.append(f"Legal Triggers ({len(legal_triggers.get('rti_sections', []))} RTI, {len(legal_triggers.get('grievance_markers', []))} Grievance)")
     
     # Map to departments
-    department_mapping = map_issue_to_department(text)
+    department_mapping = map_issue_to_department(text, context)
     
     # ============================================
     # STEP 2: spaCy NLP (Entity Extraction)
@@ -213,9 +230,9 @@ def run_inference(text: str, language: str = "english") -> InferenceResult:
     logger.info("Step 2: Running spaCy NLP")
     decision_path.append("spaCy NLP")
     
-    entities = extract_entities(text)
-    key_phrases = extract_key_phrases(text)
-    sentiment = analyze_sentiment_basic(text)
+    entities = extract_entities(text, context)
+    key_phrases = extract_key_phrases(text, context=context)
+    sentiment = analyze_sentiment_basic(text, context)
     
     logger.info(f"spaCy extracted {len(entities)} entity types, {len(key_phrases)} phrases")
     
@@ -236,60 +253,52 @@ def run_inference(text: str, language: str = "english") -> InferenceResult:
         adjusted_confidence = min(0.95, adjusted_confidence + 0.1)
         decision_path.append("Grievance markers confirmed (+10%)")
     
-    # ============================================
-    # STEP 4: DistilBERT (ONLY if confidence is low)
-    # ============================================
-    if should_use_nlp(adjusted_confidence):
-        logger.info("Step 4: Confidence low, invoking DistilBERT for semantic analysis")
-        decision_path.append("DistilBERT (semantic boost)")
-        
-        # Use semantic similarity to boost confidence
-        rti_templates = [
-            "I want to request information about government records",
-            "Please provide copies of documents under RTI Act",
-            "I am seeking information about public expenditure"
-        ]
-        complaint_templates = [
-            "I want to file a complaint about poor service",
-            "I am facing problems with government department",
-            "I want to report corruption and misconduct"
-        ]
-        
-        try:
-            rti_scores = [compute_similarity(text, t) for t in rti_templates]
-            complaint_scores = [compute_similarity(text, t) for t in complaint_templates]
-            
-            max_rti = max(rti_scores) if rti_scores else 0
-            max_complaint = max(complaint_scores) if complaint_scores else 0
-            
-            # Use semantic results to refine intent if rule engine was uncertain
-            if intent == IntentType.UNKNOWN:
-                if max_rti > max_complaint and max_rti > 0.6:
-                    intent = IntentType.RTI
-                    adjusted_confidence = max_rti * 0.8  # Scale down for safety
-                    decision_path.append(f"DistilBERT suggests RTI ({max_rti:.2f})")
-                elif max_complaint > max_rti and max_complaint > 0.6:
-                    intent = IntentType.COMPLAINT
-                    adjusted_confidence = max_complaint * 0.8
-                    decision_path.append(f"DistilBERT suggests Complaint ({max_complaint:.2f})")
-                else:
-                    decision_path.append("DistilBERT inconclusive")
-            else:
-                # Boost existing confidence slightly
-                boost = max(max_rti, max_complaint) * 0.1
-                adjusted_confidence = min(0.9, adjusted_confidence + boost)
-                decision_path.append(f"DistilBERT boosted confidence (+{boost:.2f})")
-        except Exception as e:
-            logger.warning(f"DistilBERT analysis failed: {e}")
-            decision_path.append("DistilBERT skipped (error)")
+    return _InferenceState(
+        context=context,
+        intent=intent,
+        confidence=adjusted_confidence,
+        legal_triggers=legal_triggers,
+        department_mapping=department_mapping,
+        entities=entities,
+        key_phrases=key_phrases,
+        sentiment=sentiment,
+        decision_path=decision_path
+    )
+
+
+def _apply_semantic_scores(state: _InferenceState, max_rti: float, max_complaint: float) -> None:
+    """Step 4: use DistilBERT template similarities to refine an uncertain result"""
+    decision_path = state.decision_path
+    
+    # Use semantic results to refine intent if rule engine was uncertain
+    if state.intent == IntentType.UNKNOWN:
+        if max_rti > max_complaint and max_rti > 0.6:
+            state.intent = IntentType.RTI
+            state.confidence = max_rti * 0.8  # Scale down for safety
+            decision_path.append(f"DistilBERT suggests RTI ({max_rti:.2f})")
+        elif max_complaint > max_rti and max_complaint > 0.6:
+            state.intent = IntentType.COMPLAINT
+            state.confidence = max_complaint * 0.8
+            decision_path.append(f"DistilBERT suggests Complaint ({max_complaint:.2f})")
+        else:
+            decision_path.append("DistilBERT inconclusive")
     else:
-        logger.info("Step 4: Confidence sufficient, skipping DistilBERT")
-        decision_path.append("DistilBERT skipped (confidence sufficient)")
+        # Boost existing confidence slightly
+        boost = max(max_rti, max_complaint) * 0.1
+        state.confidence = min(0.9, state.confidence + boost)
+        decision_path.append(f"DistilBERT boosted confidence (+{boost:.2f})")
+
+
+def _finalize_inference(state: _InferenceState) -> InferenceResult:
+    """Steps 5-6: document type, final gating, suggestions and explanation"""
+    text = state.context.text
+    intent = state.intent
+    decision_path = state.decision_path
     
     # ============================================
     # STEP 5: Determine document type
     # ============================================
-    document_type, doc_type_confidence = _determine_document_type(text, intent)
+    document_type, doc_type_confidence = _determine_document_type(text, intent, state.context)
     decision_path.append(f"Document type: {document_type.value}")
     
     # ============================================
@@ -297,29 +306,128 @@ def run_inference(text: str, language: str = "english") -> InferenceResult:
     # ============================================
     gated = gate_result(
         value=intent,
-        confidence=adjusted_confidence,
+        confidence=state.confidence,
         alternatives=[{"type": t.value, "confidence": 0.0} for t in [IntentType.RTI, IntentType.COMPLAINT, IntentType.APPEAL]] if intent == IntentType.UNKNOWN else [],
         context=text[:100]
     )
     
     # Generate suggestions
-    suggestions = _generate_suggestions(intent, entities, legal_triggers)
+    suggestions = _generate_suggestions(intent, state.entities, state.legal_triggers)
     
     # Build explanation
-    explanation = _build_explanation(decision_path, adjusted_confidence)
+    explanation = _build_explanation(decision_path, state.confidence)
     
     return InferenceResult(
         intent=intent,
         document_type=document_type,
-        confidence=adjusted_confidence,
+        confidence=state.confidence,
         confidence_level=gated.level,
         requires_confirmation=gated.requires_confirmation,
-        extracted_entities=entities,
-        key_phrases=key_phrases,
-        legal_triggers=legal_triggers,
-        department_mapping=department_mapping,
-        sentiment=sentiment,
+        extracted_entities=state.entities,
+        key_phrases=state.key_phrases,
+        legal_triggers=state.legal_triggers,
+        department_mapping=state.department_mapping,
+        sentiment=state.sentiment,
         suggestions=suggestions,
         explanation=explanation,
-        decision_path=decision_path
+        decision_path=decision_path,
+        text_spans=state.context.spans
     )
+
+
+def run_inference(text: str, language: str = "english") -> InferenceResult:
+    """
+    Main inference orchestrator.
+    
+    CONTROL FLOW (as per specification):
+    1. Rule Engine (keyword matching) - PRIMARY
+    2. spaCy NLP (entity extraction, phrases)
+    3. Confidence Gate (decide if more analysis needed)
+    4. DistilBERT (only if confidence is low)
+    5. Return result with confidence level
+    
+    This function NEVER makes final legal decisions - it only assists.
+    """
+    # Shared by every step: the text is lowercased, keyword-scanned
+    # and parsed by spaCy at most once per request
+    context = AnalysisContext(text, language)
+    state = _run_rules_and_nlp(context)
+    
+    # ============================================
+    # STEP 4: DistilBERT (ONLY if confidence is low)
+    # ============================================
+    if should_use_nlp(state.confidence):
+        logger.info("Step 4: Confidence low, invoking DistilBERT for semantic analysis")
+        state.decision_path.append("DistilBERT (semantic boost)")
+        
+        try:
+            # One query embedding against the precomputed template index
+            index, scores = score_templates([text])
+            max_rti = float(index.group_scores(scores[0], SEMANTIC_RTI_GROUP).max())
+            max_complaint = float(index.group_scores(scores[0], SEMANTIC_COMPLAINT_GROUP).max())
+            
+            _apply_semantic_scores(state, max_rti, max_complaint)
+        except Exception as e:
+            logger.warning(f"DistilBERT analysis failed: {e}")
+            state.decision_path.append("DistilBERT skipped (error)")
+    else:
+        logger.info("Step 4: Confidence sufficient, skipping DistilBERT")
+        state.decision_path.append("DistilBERT skipped (confidence sufficient)")
+    
+    return _finalize_inference(state)
+
+
+def run_inference_batch(
+    texts: List[str],
+    language: str = "english",
+    batch_size: int = 32,
+    n_process: int = 1
+) -> Iterator[InferenceResult]:
+    """
+    Run the same control flow as run_inference over many texts.
+    
+    Texts are parsed with spaCy's nlp.pipe, and DistilBERT is called once
+    per batch for only the texts whose confidence is low. Results are
+    yielded in input order as each batch completes, so callers can stream
+    them without holding the whole job in memory.
+    """
+    docs = parse_many(texts, batch_size=batch_size, n_process=n_process)
+    
+    for batch_start in range(0, len(texts), batch_size):
+        batch_texts = texts[batch_start:batch_start + batch_size]
+        
+        # Steps 1-3 with the pre-parsed docs
+        states = [
+            _run_rules_and_nlp(AnalysisContext(text, language, doc=doc))
+            for text, doc in zip(batch_texts, itertools.islice(docs, len(batch_texts)))
+        ]
+        
+        # Step 4: one DistilBERT call for the low-confidence subset
+        low_confidence = []
+        for state in states:
+            if should_use_nlp(state.confidence):
+                state.decision_path.append("DistilBERT (semantic boost)")
+                low_confidence.append(state)
+            else:
+                state.decision_path.append("DistilBERT skipped (confidence sufficient)")
+        
+        if low_confidence:
+            logger.info(f"Step 4: Invoking DistilBERT for {len(low_confidence)}/{len(states)} texts in batch")
+            try:
+                index, scores = score_templates(
+                    [state.context.text for state in low_confidence],
+                    batch_size=batch_size
+                )
+                for state, row in zip(low_confidence, scores):
+                    _apply_semantic_scores(
+                        state,
+                        float(index.group_scores(row, SEMANTIC_RTI_GROUP).max()),
+                        float(index.group_scores(row, SEMANTIC_COMPLAINT_GROUP).max())
+                    )
+            except Exception as e:
+                logger.warning(f"DistilBERT batch analysis failed: {e}")
+                for state in low_confidence:
+                    state.decision_path.append("DistilBERT skipped (error)")
+        
+        for state in states:
+            yield _finalize_inference(state)
@@ -12,6 +12,8 @@ CRITICAL DESIGN PRINCIPLES:
 
 Components:
 - openai_service: Core OpenAI API wrapper with safety guardrails
+  (async, pooled connections, bounded concurrency, retries, histograms)
+- response_cache: Exact-match cache of validated enhancements (memory + optional disk)
 - text_enhancer: Polishes draft text while preserving legal accuracy
 - smart_translator: Better translation than rule-based models
 """
@@ -20,10 +22,14 @@ from .openai_service import (
     OpenAIService,
     get_openai_service,
     is_llm_available,
+    close_openai_service,
+    LLMBusyError,
     LLMResponse,
     LLMMode,
 )
 
+from .response_cache import LLMResponseCache
+
 from .text_enhancer import (
     enhance_draft_text,
     clarify_issue_description,
@@ -37,8 +43,11 @@ __all__ = [
     "OpenAIService",
     "get_openai_service",
     "is_llm_available",
+    "close_openai_service",
+    "LLMBusyError",
     "LLMResponse",
     "LLMMode",
+    "LLMResponseCache",
     
     # Text Enhancer
     "enhance_draft_text",
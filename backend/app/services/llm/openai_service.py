@@ -12,23 +12,58 @@ This service provides controlled access to OpenAI's API with:
 4. Fallback to rule-based output if LLM fails
 
 The LLM is NEVER the authority - it assists within controlled boundaries.
+
+Calls never block the event loop: the service uses AsyncOpenAI on one
+shared, pooled HTTP client (kept-alive connections, per-call timeouts).
+At most OPENAI_MAX_CONCURRENCY calls are in flight; the rest wait up to
+OPENAI_QUEUE_TIMEOUT_SECONDS and then fall back. 429, 5xx, timeouts and
+connection errors are retried with jittered exponential backoff that
+respects Retry-After. Latency and token histograms are reported on /health.
+
+Repeated requests are answered from an exact-match response cache
+(response_cache.py) when a caller has stored a validated result for them.
+Identical requests in flight at the same moment share one API call.
 """
 
-import os
 from enum import Enum
-from typing import Optional, Dict, Any, List
+from typing import Optional, Dict, Any, List, Mapping, Sequence
+from bisect import bisect_left
 from dataclasses import dataclass, field
-from datetime import datetime
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
 from loguru import logger
+import asyncio
+import hashlib
+import json
+import random
+import time
 
 try:
-    from openai import OpenAI
+    from openai import (
+        AsyncOpenAI,
+        DefaultAsyncHttpxClient,
+        Timeout,
+        APIStatusError,
+        APIConnectionError,
+    )
+    from openai._constants import DEFAULT_CONNECTION_LIMITS
+    # httpx.Limits (httpx2.Limits in newer openai releases)
+    Limits = type(DEFAULT_CONNECTION_LIMITS)
     OPENAI_AVAILABLE = True
 except ImportError:
     OPENAI_AVAILABLE = False
     logger.warning("OpenAI package not installed. LLM features disabled.")
 
-from app.config import get_settings
+from app.config import Settings, get_settings
+from app.services.single_flight import get_single_flight
+from .response_cache import LLMResponseCache, create_response_cache
+
+# Histogram bucket upper bounds (the last bucket is open-ended)
+LATENCY_BUCKETS_MS = (100, 250, 500, 1000, 2500, 5000, 10000, 30000)
+TOKEN_BUCKETS = (100, 250, 500, 1000, 2000, 4000)
+
+# Retried status codes (besides 5xx)
+RETRY_STATUS_CODES = {408, 409, 429}
 
 
 class LLMMode(str, Enum):
@@ -52,10 +87,104 @@ class LLMResponse:
     changes_made: List[str] = field(default_factory=list)
     confidence: float = 1.0
     fallback_used: bool = False
+    cached: bool = False
     error: Optional[str] = None
     timestamp: datetime = field(default_factory=datetime.utcnow)
 
 
+class LLMBusyError(RuntimeError):
+    """No call slot freed up within OPENAI_QUEUE_TIMEOUT_SECONDS"""
+
+
+class Histogram:
+    """Fixed-bucket histogram: counts per bucket, sum and count"""
+
+    def __init__(self, bounds: Sequence[float]):
+        self.bounds = tuple(bounds)
+        self.counts = [0] * (len(self.bounds) + 1)
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect_left(self.bounds, value)] += 1
+        self.count += 1
+        self.sum += value
+
+    def quantile(self, q: float) -> float:
+        """Upper bound of the bucket holding the q-quantile (inf for the last one)"""
+        if not self.count:
+            return 0.0
+        rank = q * self.count
+        seen = 0
+        for bound, count in zip(self.bounds, self.counts):
+            seen += count
+            if seen >= rank:
+                return bound
+        return float("inf")
+
+    def to_dict(self) -> Dict[str, Any]:
+        buckets = {f"le_{bound}": count for bound, count in zip(self.bounds, self.counts)}
+        buckets["inf"] = self.counts[-1]
+        return {
+            "count": self.count,
+            "sum": round(self.sum, 2),
+            "avg": round(self.sum / self.count, 2) if self.count else 0.0,
+            "p50": self.quantile(0.5),
+            "p95": self.quantile(0.95),
+            "buckets": buckets
+        }
+
+
+@dataclass
+class LLMStats:
+    """Call counters and histograms (updated on the event loop)"""
+    calls: int = 0
+    errors: int = 0
+    retries: int = 0
+    rejected: int = 0
+    in_flight: int = 0
+    latency_ms: Histogram = field(default_factory=lambda: Histogram(LATENCY_BUCKETS_MS))
+    prompt_tokens: Histogram = field(default_factory=lambda: Histogram(TOKEN_BUCKETS))
+    completion_tokens: Histogram = field(default_factory=lambda: Histogram(TOKEN_BUCKETS))
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "calls": self.calls,
+            "errors": self.errors,
+            "retries": self.retries,
+            "rejected": self.rejected,
+            "in_flight": self.in_flight,
+            "latency_ms": self.latency_ms.to_dict(),
+            "prompt_tokens": self.prompt_tokens.to_dict(),
+            "completion_tokens": self.completion_tokens.to_dict()
+        }
+
+
+def parse_retry_after(headers: Mapping[str, str]) -> Optional[float]:
+    """Seconds to wait from retry-after-ms or Retry-After (seconds or HTTP date)"""
+    value = headers.get("retry-after-ms")
+    if value:
+        try:
+            return max(float(value) / 1000, 0.0)
+        except ValueError:
+            pass
+
+    value = headers.get("retry-after")
+    if not value:
+        return None
+    try:
+        return max(float(value), 0.0)
+    except ValueError:
+        pass
+    try:
+        retry_at = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if retry_at.tzinfo is None:
+        retry_at = retry_at.replace(tzinfo=timezone.utc)
+    return max((retry_at - datetime.now(timezone.utc)).total_seconds(), 0.0)
+
+
 # =============================================================================
 # SYSTEM PROMPTS - The guardrails that control LLM behavior
 # =============================================================================
@@ -134,6 +263,15 @@ STRICT RULES:
 OUTPUT: Return ONLY the summary, nothing else."""
 }
 
+# Part of response cache keys: bump when the user message format in
+# enhance_text changes (system prompt edits change the hash by themselves)
+PROMPT_VERSION = 1
+
+PROMPT_VERSIONS = {
+    mode: f"{PROMPT_VERSION}-{hashlib.blake2b(prompt.encode('utf-8'), digest_size=8).hexdigest()}"
+    for mode, prompt in SYSTEM_PROMPTS.items()
+}
+
 
 class OpenAIService:
     """
@@ -143,11 +281,15 @@ class OpenAIService:
     not as a replacement for it.
     """
     
-    def __init__(self):
-        self.settings = get_settings()
-        self.client: Optional[OpenAI] = None
+    def __init__(self, settings: Optional[Settings] = None, cache: Optional[LLMResponseCache] = None):
+        self.settings = settings or get_settings()
+        self.client: Optional["AsyncOpenAI"] = None
         self._initialized = False
         self._audit_log: List[Dict[str, Any]] = []
+        self._slots = asyncio.Semaphore(max(self.settings.OPENAI_MAX_CONCURRENCY, 1))
+        self.stats = LLMStats()
+        self.cache = cache if cache is not None else create_response_cache(self.settings)
+        self._flight = get_single_flight("llm")
         
     def _initialize(self) -> bool:
         """Lazy initialization of OpenAI client"""
@@ -166,7 +308,21 @@ class OpenAIService:
             return False
             
         try:
-            self.client = OpenAI(api_key=api_key)
+            settings = self.settings
+            # One pooled HTTP client for every call; retries are done here
+            # (with jitter) rather than by the SDK
+            self.client = AsyncOpenAI(
+                api_key=api_key,
+                base_url=settings.OPENAI_BASE_URL or None,
+                max_retries=0,
+                http_client=DefaultAsyncHttpxClient(
+                    timeout=Timeout(settings.OPENAI_TIMEOUT_SECONDS, connect=settings.OPENAI_CONNECT_TIMEOUT_SECONDS),
+                    limits=Limits(
+                        max_connections=settings.OPENAI_MAX_CONNECTIONS,
+                        max_keepalive_connections=settings.OPENAI_MAX_CONNECTIONS
+                    )
+                )
+            )
             self._initialized = True
             logger.info("OpenAI service initialized successfully")
             return True
@@ -198,7 +354,6 @@ class OpenAIService:
         Returns:
             LLMResponse with enhanced text and audit trail
         """
-        import time
         start_time = time.time()
         
         # Ensure initialized
@@ -214,6 +369,35 @@ class OpenAIService:
                 error="LLM service not available"
             )
         
+        cache_key = self.cache_key(text, mode, context)
+        cached = self.cache.get(cache_key) if cache_key else None
+        if cached is not None:
+            result = LLMResponse(
+                original_text=text,
+                enhanced_text=cached.enhanced_text,
+                mode=mode,
+                model_used=cached.model_used,
+                tokens_used=0,  # No API call
+                processing_time_ms=(time.time() - start_time) * 1000,
+                changes_made=list(cached.changes_made),
+                confidence=0.95,
+                cached=True
+            )
+            self._log_interaction(result, context)
+            return result
+        
+        # Identical requests in flight at the same time share one API call
+        flight_key = (id(self), mode.value, text, json.dumps(context or {}, sort_keys=True, default=str))
+        return await self._flight.do_async(flight_key, self._call_llm, text, mode, context, start_time)
+    
+    async def _call_llm(
+        self,
+        text: str,
+        mode: LLMMode,
+        context: Optional[Dict[str, Any]],
+        start_time: float
+    ) -> LLMResponse:
+        """The API part of enhance_text (fallback response on failure)"""
         # Get appropriate system prompt
         system_prompt = SYSTEM_PROMPTS.get(mode, SYSTEM_PROMPTS[LLMMode.POLISH])
         
@@ -229,15 +413,10 @@ class OpenAIService:
             if self.client is None:
                 raise ValueError("OpenAI client not initialized")
             
-            response = self.client.chat.completions.create(
-                model=self.settings.OPENAI_MODEL,
-                messages=[
-                    {"role": "system", "content": system_prompt},
-                    {"role": "user", "content": user_message}
-                ],
-                max_tokens=self.settings.OPENAI_MAX_TOKENS,
-                temperature=self.settings.OPENAI_TEMPERATURE,
-            )
+            response = await self._complete([
+                {"role": "system", "content": system_prompt},
+                {"role": "user", "content": user_message}
+            ])
             
             content = response.choices[0].message.content
             enhanced_text = content.strip() if content else text
@@ -278,6 +457,130 @@ class OpenAIService:
                 error=str(e)
             )
     
+    def cache_key(self, text: str, mode: LLMMode, context: Optional[Dict[str, Any]] = None) -> Optional[str]:
+        """Response cache key of a request (None if the cache is off)"""
+        if self.cache is None:
+            return None
+        return self.cache.make_key(
+            text,
+            mode=mode.value,
+            model=self.settings.OPENAI_MODEL,
+            temperature=self.settings.OPENAI_TEMPERATURE,
+            max_tokens=self.settings.OPENAI_MAX_TOKENS,
+            prompt_version=PROMPT_VERSIONS.get(mode, PROMPT_VERSIONS[LLMMode.POLISH]),
+            context=context or {}
+        )
+
+    def cache_response(self, response: LLMResponse, context: Optional[Dict[str, Any]] = None) -> bool:
+        """
+        Store a validated enhancement for repeats of the same request.
+        Callers store a response only after their own checks pass; fallbacks
+        and responses that came from the cache are not stored.
+        """
+        if response.fallback_used or response.cached:
+            return False
+        cache_key = self.cache_key(response.original_text, response.mode, context)
+        if cache_key is None:
+            return False
+        self.cache.put(
+            cache_key,
+            enhanced_text=response.enhanced_text,
+            model_used=response.model_used,
+            tokens_used=response.tokens_used,
+            changes_made=response.changes_made
+        )
+        return True
+
+    async def _complete(self, messages: List[Dict[str, str]]) -> Any:
+        """
+        One chat completion: waits for a call slot, then retries 429, 5xx,
+        timeouts and connection errors up to OPENAI_MAX_RETRIES times.
+        The slot is held while backing off, so a rate-limited API sees fewer calls.
+        """
+        settings = self.settings
+        try:
+            await asyncio.wait_for(self._slots.acquire(), timeout=settings.OPENAI_QUEUE_TIMEOUT_SECONDS)
+        except asyncio.TimeoutError:
+            self.stats.rejected += 1
+            raise LLMBusyError(f"LLM busy: {settings.OPENAI_MAX_CONCURRENCY} calls already in flight")
+
+        self.stats.calls += 1
+        self.stats.in_flight += 1
+        start = time.monotonic()
+        try:
+            attempt = 0
+            while True:
+                try:
+                    response = await self.client.chat.completions.create(
+                        model=settings.OPENAI_MODEL,
+                        messages=messages,
+                        max_tokens=settings.OPENAI_MAX_TOKENS,
+                        temperature=settings.OPENAI_TEMPERATURE,
+                    )
+                    break
+                except Exception as e:
+                    delay = self._retry_delay(e, attempt)
+                    if delay is None:
+                        raise
+                    attempt += 1
+                    self.stats.retries += 1
+                    logger.warning(f"LLM call failed ({e.__class__.__name__}), retry {attempt} in {delay:.2f}s")
+                    await asyncio.sleep(delay)
+        except Exception:
+            self.stats.errors += 1
+            raise
+        finally:
+            self.stats.in_flight -= 1
+            self._slots.release()
+
+        self.stats.latency_ms.observe((time.monotonic() - start) * 1000)
+        if response.usage:
+            self.stats.prompt_tokens.observe(response.usage.prompt_tokens)
+            self.stats.completion_tokens.observe(response.usage.completion_tokens)
+        return response
+
+    def _retry_delay(self, error: Exception, attempt: int) -> Optional[float]:
+        """
+        Seconds before the next attempt, or None to give up.
+        Full-jitter exponential backoff, but never sooner than Retry-After;
+        a Retry-After beyond OPENAI_RETRY_MAX_SECONDS falls back instead of stalling the request.
+        """
+        settings = self.settings
+        if attempt >= settings.OPENAI_MAX_RETRIES:
+            return None
+
+        retry_after = None
+        if isinstance(error, APIStatusError):
+            status = error.status_code
+            if status < 500 and status not in RETRY_STATUS_CODES:
+                return None
+            retry_after = parse_retry_after(error.response.headers)
+        elif not isinstance(error, APIConnectionError):  # Includes APITimeoutError
+            return None
+
+        backoff = random.uniform(0, min(settings.OPENAI_RETRY_MAX_SECONDS, settings.OPENAI_RETRY_BASE_SECONDS * 2 ** attempt))
+        if retry_after is None:
+            return backoff
+        if retry_after > settings.OPENAI_RETRY_MAX_SECONDS:
+            return None
+        return max(retry_after, backoff)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Call counters, latency and token histograms"""
+        return {
+            "available": self.client is not None,
+            "max_concurrency": self.settings.OPENAI_MAX_CONCURRENCY,
+            **self.stats.to_dict(),
+            "cache": self.cache.get_stats() if self.cache is not None else None
+        }
+
+    async def aclose(self) -> None:
+        """Close the pooled HTTP client"""
+        if self.client is not None:
+            await self.client.close()
+            self.client = None
+            self._initialized = False
+
     def _detect_changes(self, original: str, enhanced: str) -> List[str]:
         """Detect what changes were made (for transparency)"""
         changes = []
@@ -307,6 +610,7 @@ class OpenAIService:
             "processing_ms": response.processing_time_ms,
             "changes": response.changes_made,
             "fallback": response.fallback_used,
+            "cached": response.cached,
             "context": context,
             # Don't log full text for privacy, just lengths
             "original_length": len(response.original_text),
@@ -343,3 +647,9 @@ def get_openai_service() -> OpenAIService:
 def is_llm_available() -> bool:
     """Quick check if LLM features are available"""
     return get_openai_service().is_available()
+
+
+async def close_openai_service() -> None:
+    """Close the singleton's HTTP connections (application shutdown)"""
+    if _service_instance is not None:
+        await _service_instance.aclose()
@@ -0,0 +1,116 @@
+"""
+LLM Response Cache
+Exact-match cache of LLM enhancements in front of OpenAIService.enhance_text
+
+Drafts from the template assembler are highly repetitive: the same filled
+template is often polished again minutes later. A repeated request is
+answered from here instead of a new API call (no latency, no tokens).
+
+- Keys cover everything that determines the completion: mode, model,
+  temperature, max tokens, system prompt version, context and the input
+  text with whitespace normalized
+- Only validated results are stored (enhance_draft_text stores a polish
+  after its placeholder-integrity check passes); fallbacks never are
+- Byte-bounded LRU with TTL in memory, plus an optional disk tier
+  (byte_budget_cache, shared with the render cache)
+
+Privacy (as for the render cache): memory-only by default; keys are keyed
+BLAKE2b hashes, never the text. The disk tier (LLM_CACHE_DISK_DIR) stores
+enhanced text, so it is off unless explicitly configured.
+"""
+
+from typing import Any, Callable, List, Optional
+from dataclasses import asdict, dataclass, field
+from loguru import logger
+import json
+import re
+import time
+
+from app.services.byte_budget_cache import ByteBudgetCache
+
+_SPACES = re.compile(r'[ \t\f\v]+')
+_BLANK_LINES = re.compile(r'\n{3,}')
+
+
+def normalize_prompt_text(text: str) -> str:
+    """
+    Input text as used in cache keys: line endings unified, runs of spaces
+    collapsed, lines and ends stripped. Paragraph breaks are kept.
+    """
+    text = text.replace("\r\n", "\n").replace("\r", "\n")
+    text = "\n".join(_SPACES.sub(" ", line).strip() for line in text.split("\n"))
+    return _BLANK_LINES.sub("\n\n", text).strip()
+
+
+@dataclass
+class CachedCompletion:
+    """One stored enhancement"""
+    enhanced_text: str
+    model_used: str
+    tokens_used: int
+    changes_made: List[str] = field(default_factory=list)
+    stored_at: float = 0.0
+
+    @property
+    def size(self) -> int:
+        return len(self.enhanced_text.encode("utf-8"))
+
+
+class LLMResponseCache(ByteBudgetCache[CachedCompletion]):
+    """
+    Byte-bounded LRU of LLM enhancements with TTL, plus an optional
+    directory of JSON files shared by every worker on the host.
+    """
+
+    name = "LLM cache"
+    disk_suffix = ".json"
+
+    def __init__(
+        self,
+        max_bytes: int = 16 * 1024 * 1024,
+        ttl_seconds: float = 3600.0,
+        disk_dir: Optional[str] = None,
+        key_secret: Optional[str] = None,
+        clock: Callable[[], float] = time.time
+    ):
+        super().__init__(max_bytes, ttl_seconds, disk_dir, key_secret, clock)
+
+    def make_key(self, text: str, **fields: Any) -> str:
+        """Keyed hash of the normalized input and the completion settings"""
+        return super().make_key(text=normalize_prompt_text(text), **fields)
+
+    def put(self, key: str, enhanced_text: str, model_used: str, tokens_used: int, changes_made: List[str]) -> None:
+        self.put_entry(key, CachedCompletion(
+            enhanced_text=enhanced_text,
+            model_used=model_used,
+            tokens_used=tokens_used,
+            changes_made=list(changes_made),
+            stored_at=self.clock()
+        ))
+
+    def _encode(self, entry: CachedCompletion) -> bytes:
+        data = asdict(entry)
+        del data["stored_at"]   # The file's mtime
+        return json.dumps(data, ensure_ascii=False).encode("utf-8")
+
+    def _decode(self, data: bytes, stored_at: float) -> CachedCompletion:
+        return CachedCompletion(stored_at=stored_at, **json.loads(data))
+
+
+def create_response_cache(settings: Any) -> Optional[LLMResponseCache]:
+    """Response cache configured by settings, or None if LLM_CACHE_ENABLED is off"""
+    if not settings.LLM_CACHE_ENABLED:
+        return None
+
+    cache = LLMResponseCache(
+        max_bytes=settings.LLM_CACHE_MAX_MB * 1024 * 1024,
+        ttl_seconds=settings.LLM_CACHE_TTL_SECONDS,
+        disk_dir=settings.LLM_CACHE_DISK_DIR or None,
+        key_secret=settings.LLM_CACHE_KEY_SECRET or None
+    )
+    logger.info(
+        f"LLM response cache: {settings.LLM_CACHE_MAX_MB}MB, "
+        f"TTL {settings.LLM_CACHE_TTL_SECONDS}s, "
+        f"disk tier {'on' if cache.disk_dir else 'off'}"
+    )
+    return cache
@@ -63,7 +63,7 @@ async def enhance_draft_text(
         draft_text: The rule-based generated draft
         language: Target language (english/hindi)
         tone: Desired tone (neutral/formal/assertive)
-        preserve_placeholders: Keep [PLACEHOLDER] markers intact
+        preserve_placeholders: Keep [PLACEHOLDER] and {PLACEHOLDER} markers intact
         
     Returns:
         EnhancementResult with both original and enhanced versions
@@ -97,7 +97,7 @@ async def enhance_draft_text(
     placeholders = []
     if preserve_placeholders:
         import re
-        placeholders = re.findall(r'\[([A-Z_]+)\]', draft_text)
+        placeholders = re.findall(r'\[[A-Z_]+\]|\{[A-Z_]+\}', draft_text)
     
     try:
         response: LLMResponse = await service.enhance_text(
@@ -111,8 +111,8 @@ async def enhance_draft_text(
         # Verify placeholders are preserved (safety check)
         if preserve_placeholders and placeholders:
             for ph in placeholders:
-                if f"[{ph}]" not in enhanced:
-                    logger.warning(f"LLM removed placeholder [{ph}], reverting to original")
+                if ph not in enhanced:
+                    logger.warning(f"LLM removed placeholder {ph}, reverting to original")
                     return EnhancementResult(
                         original_text=draft_text,
                         enhanced_text=draft_text,
@@ -124,6 +124,9 @@ async def enhance_draft_text(
                         error="Placeholder integrity check failed"
                     )
         
+        # Passed the checks: reuse this polish for repeats of the same draft
+        service.cache_response(response, context)
+        
         # Build changes summary
         if response.changes_made:
             changes_summary = "; ".join(response.changes_made)
@@ -5,6 +5,13 @@ Handles all NLP/ML operations following MODEL_USAGE_POLICY
 Components:
 - spacy_engine: Named Entity Recognition and phrase matching
 - distilbert_semantic: Semantic similarity ranking (NOT generation)
+- template_index: Precomputed, memory-mapped template embeddings
+- embedding_cache: LRU embedding cache with byte budget and pinned tier
+- embedding_store: Optional SQLite embedding store shared across workers
+- embedding_backend: torch or ONNX Runtime (int8) runtime for DistilBERT
+- translator: English -> Hindi (opus-mt), sentence-segmented and batched
+- translation_memory: LRU cache of translated sentence segments
+- translation_backend: torch or CTranslate2 (int8) runtime for the translator
 - confidence_gate: Controls when AI predictions require user confirmation
 """
 
@@ -17,6 +24,7 @@ from .spacy_engine import (
     analyze_sentiment_basic,
     analyze_urgency,
     full_analysis,
+    parse_many,
     preload_models as preload_spacy,
     get_nlp,
     NLPResult,
@@ -30,12 +38,20 @@ from .distilbert_semantic import (
     rank_by_similarity,
     rank_by_similarity_detailed,
     batch_compute_similarities,
+    compute_similarity_matrix,
     classify_query_type,
+    score_templates,
+    get_template_index,
+    build_template_index,
     preload_model as preload_distilbert,
     get_embedding,
+    embed_many,
     is_model_loaded,
     clear_cache,
     get_cache_stats,
+    get_embedding_cache,
+    get_embedding_store,
+    get_embedding_backend,
     SimilarityResult,
     SemanticAnalysisResult,
 )
@@ -51,7 +67,10 @@ from .confidence_gate import (
 # Import translator functions
 from .translator import (
     translate_to_hindi,
+    translate_many,
+    segment_text,
     get_translator,
+    get_translation_memory,
 )
 
 # Export main functions
@@ -68,6 +87,7 @@ __all__ = [
     "preload_spacy",
     "preload_all_models",
     "translate_to_hindi",
+    "translate_many",
     "get_translator",
 ]
 
@@ -98,6 +118,7 @@ __all__ = [
     "analyze_sentiment_basic",
     "analyze_urgency",
     "full_analysis",
+    "parse_many",
     "preload_spacy",
     "get_nlp",
     "NLPResult",
@@ -109,18 +130,29 @@ __all__ = [
     "rank_by_similarity",
     "rank_by_similarity_detailed",
     "batch_compute_similarities",
+    "compute_similarity_matrix",
     "classify_query_type",
+    "score_templates",
+    "get_template_index",
+    "build_template_index",
     "preload_distilbert",
     "get_embedding",
+    "embed_many",
     "is_model_loaded",
     "clear_cache",
     "get_cache_stats",
+    "get_embedding_cache",
+    "get_embedding_store",
+    "get_embedding_backend",
     "SimilarityResult",
     "SemanticAnalysisResult",
 
     # Translation
     "translate_to_hindi",
+    "translate_many",
+    "segment_text",
     "get_translator",
+    "get_translation_memory",
     
     # Confidence gate
     "ConfidenceLevel",
@@ -141,7 +173,7 @@ __all__ = [
 ]
 
 
-def preload_all_models():
+def preload_all_models(include_distilbert: bool = True):
     """Preload all NLP models for faster inference"""
     import logging
     logger = logging.getLogger(__name__)
@@ -154,10 +186,11 @@ def preload_all_models():
     except Exception as e:
         logger.error(f"✗ spaCy loading failed: {e}")
     
-    try:
-        preload_distilbert()
-        logger.info("✓ DistilBERT model loaded")
-    except Exception as e:
-        logger.error(f"✗ DistilBERT loading failed: {e}")
+    if include_distilbert:
+        try:
+            preload_distilbert()
+            logger.info("✓ DistilBERT model loaded")
+        except Exception as e:
+            logger.error(f"✗ DistilBERT loading failed: {e}")
     
     logger.info("NLP model preloading complete")
@@ -15,15 +15,35 @@ from dataclasses import dataclass, field
 import numpy as np
 import logging
 from functools import lru_cache
-import hashlib
+import threading
+
+from app.services.single_flight import get_single_flight
+
+from .embedding_backend import EmbeddingBackend, create_backend
+from .embedding_cache import EmbeddingCache, make_cache_key
+from .embedding_store import PersistentEmbeddingStore
+from .template_index import (
+    TemplateIndex,
+    create_template_index,
+    load_template_index,
+    save_template_index,
+)
 
 logger = logging.getLogger(__name__)
 
-# Model will be loaded on first use
-_model = None
-_tokenizer = None
-_embedding_cache: Dict[str, np.ndarray] = {}
-_cache_max_size = 1000
+MODEL_NAME = "distilbert-base-uncased"
+EMBEDDING_DIM = 768
+
+# Backend is created from settings and loaded on first use
+_backend: Optional[EmbeddingBackend] = None
+_backend_lock = threading.Lock()
+
+_template_index: Optional[TemplateIndex] = None
+_template_index_lock = threading.Lock()
+_embedding_cache: Optional[EmbeddingCache] = None
+_embedding_cache_lock = threading.Lock()
+_embedding_store: Optional[PersistentEmbeddingStore] = None
+_embedding_store_checked = False
 
 
 @dataclass
@@ -64,109 +84,210 @@ class SemanticAnalysisResult:
         }
 
 
-def get_model():
-    """Lazy load DistilBERT model with proper error handling"""
-    global _model, _tokenizer
+def get_embedding_backend() -> EmbeddingBackend:
+    """Get the configured embedding backend (created, not loaded)"""
+    global _backend
     
-    if _model is None:
-        try:
-            from transformers import DistilBertModel, DistilBertTokenizer
-            import torch
-            
-            logger.info("Loading DistilBERT model...")
-            _tokenizer = DistilBertTokenizer.from_pretrained('distilbert-base-uncased')
-            _model = DistilBertModel.from_pretrained('distilbert-base-uncased')
-            
-            # Set to evaluation mode
-            _model.eval()
-            
-            # Move to GPU if available
-            if torch.cuda.is_available():
-                _model = _model.cuda()
-                logger.info("DistilBERT loaded on GPU")
-            else:
-                logger.info("DistilBERT loaded on CPU")
-                
-        except Exception as e:
-            logger.error(f"Failed to load DistilBERT: {e}")
-            raise RuntimeError(f"Failed to load DistilBERT: {e}")
+    if _backend is None:
+        with _backend_lock:
+            if _backend is None:
+                from app.config import get_settings
+                settings = get_settings()
+                _backend = create_backend(
+                    settings.EMBEDDING_BACKEND,
+                    MODEL_NAME,
+                    onnx_model_dir=settings.ONNX_MODEL_DIR,
+                    quantize=settings.ONNX_QUANTIZE,
+                    num_threads=settings.ONNX_NUM_THREADS
+                )
     
-    return _model, _tokenizer
+    return _backend
 
 
-def is_model_loaded() -> bool:
-    """Check if model is already loaded"""
-    return _model is not None
+def get_model() -> EmbeddingBackend:
+    """Lazy load the embedding model on the configured backend"""
+    backend = get_embedding_backend()
+    
+    if not backend.is_loaded():
+        with _backend_lock:
+            backend.load()
+    
+    return backend
 
 
-def _get_cache_key(text: str) -> str:
-    """Generate cache key for text"""
-    return hashlib.md5(text.encode()).hexdigest()
+def get_model_id() -> str:
+    """Identifier of the weights in use; keys the persistent store and template index"""
+    return get_embedding_backend().model_id
 
 
-def _manage_cache():
-    """Manage cache size"""
-    global _embedding_cache
-    if len(_embedding_cache) > _cache_max_size:
-        # Remove oldest entries (first half)
-        keys = list(_embedding_cache.keys())
-        for key in keys[:len(keys)//2]:
-            del _embedding_cache[key]
-        logger.debug(f"Cache trimmed to {len(_embedding_cache)} entries")
+def is_model_loaded() -> bool:
+    """Check if model is already loaded"""
+    return _backend is not None and _backend.is_loaded()
 
 
-def get_embedding(text: str, use_cache: bool = True) -> Tuple[np.ndarray, bool]:
-    """
-    Get sentence embedding using DistilBERT.
-    Uses mean pooling of last hidden states.
-    
-    Returns: (embedding, cache_hit)
-    """
-    import torch
+def get_embedding_cache() -> EmbeddingCache:
+    """Get the in-process embedding cache (sized from settings on first use)"""
+    global _embedding_cache
     
-    cache_key = _get_cache_key(text)
+    if _embedding_cache is None:
+        with _embedding_cache_lock:
+            if _embedding_cache is None:
+                from app.config import get_settings
+                settings = get_settings()
+                _embedding_cache = EmbeddingCache(
+                    max_bytes=int(settings.EMBEDDING_CACHE_MAX_MB * 1024 * 1024),
+                    ttl_seconds=settings.EMBEDDING_CACHE_TTL_SECONDS
+                )
     
-    # Check cache
-    if use_cache and cache_key in _embedding_cache:
-        return _embedding_cache[cache_key], True
+    return _embedding_cache
+
+
+def get_embedding_store() -> Optional[PersistentEmbeddingStore]:
+    """Get the shared on-disk embedding store, or None if disabled/unavailable"""
+    global _embedding_store, _embedding_store_checked
     
-    model, tokenizer = get_model()
+    if not _embedding_store_checked:
+        with _embedding_cache_lock:
+            if not _embedding_store_checked:
+                from app.config import get_settings
+                settings = get_settings()
+                if settings.EMBEDDING_STORE_ENABLED:
+                    try:
+                        _embedding_store = PersistentEmbeddingStore(settings.EMBEDDING_STORE_PATH, get_model_id())
+                        logger.info(f"Persistent embedding store enabled: {settings.EMBEDDING_STORE_PATH}")
+                    except Exception as e:
+                        logger.warning(f"Persistent embedding store unavailable: {e}")
+                _embedding_store_checked = True
     
-    # Tokenize with truncation
-    inputs = tokenizer(
-        text, 
-        return_tensors="pt", 
-        truncation=True, 
-        max_length=512,
-        padding=True
-    )
+    return _embedding_store
+
+
+def _forward_pooled(texts: List[str], batch_size: int = 32) -> np.ndarray:
+    """
+    Mean-pooled embeddings for texts that are not cached.
+    Returns raw (unnormalized) float32 embeddings in input order.
+    """
+    return get_model().encode(texts, batch_size)
+
+
+def _normalize_rows(matrix: np.ndarray) -> np.ndarray:
+    """L2-normalize rows, leaving zero rows at zero"""
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    return matrix / np.where(norms == 0, 1.0, norms)
+
+
+def _get_raw_embeddings(
+    texts: List[str],
+    batch_size: int = 32,
+    use_cache: bool = True,
+    pin: bool = False
+) -> Tuple[List[np.ndarray], List[bool]]:
+    """
+    Raw embeddings for texts via, in order: the in-process LRU, the
+    persistent store (if enabled), then one batched forward pass over the
+    distinct remaining texts. Returns (embeddings, cache_hit flags).
+    """
+    cache = get_embedding_cache()
+    keys = [make_cache_key(text) for text in texts]
+    rows: Dict[str, np.ndarray] = {}
     
-    # Move to GPU if available
-    if torch.cuda.is_available():
-        inputs = {k: v.cuda() for k, v in inputs.items()}
+    # In-process LRU first
+    if use_cache:
+        for key in keys:
+            if key not in rows:
+                cached = cache.get(key)
+                if cached is not None:
+                    rows[key] = cached
+                    if pin:
+                        cache.put(key, cached, pin=True)
+    
+    # Distinct texts still missing
+    misses: Dict[str, str] = {}
+    for key, text in zip(keys, texts):
+        if key not in rows and key not in misses:
+            misses[key] = text
+    
+    # Then the shared on-disk store
+    store = get_embedding_store() if use_cache else None
+    if store is not None and misses:
+        try:
+            for key, embedding in store.get_many(list(misses)).items():
+                rows[key] = embedding
+                cache.put(key, embedding, pin=pin)
+                del misses[key]
+        except Exception as e:
+            logger.warning(f"Embedding store lookup failed: {e}")
     
-    # Get embeddings without gradient computation
-    with torch.no_grad():
-        outputs = model(**inputs)
+    hits = [key in rows for key in keys]
     
-    # Mean pooling with attention mask
-    attention_mask = inputs['attention_mask']
-    token_embeddings = outputs.last_hidden_state
+    # One batched forward pass over whatever is left (shared with an
+    # identical pass already running for a duplicate request)
+    if misses:
+        embedded = get_single_flight("embedding").do(
+            tuple(misses), _forward_pooled, list(misses.values()), batch_size
+        )
+        for key, embedding in zip(misses, embedded):
+            rows[key] = embedding
+            if use_cache:
+                cache.put(key, embedding, pin=pin)
+        
+        if store is not None:
+            try:
+                store.put_many((key, rows[key]) for key in misses)
+            except Exception as e:
+                logger.warning(f"Embedding store write failed: {e}")
+    
+    return [rows[key] for key in keys], hits
+
+
+def _embed_many_with_hits(
+    texts: List[str],
+    batch_size: int = 32,
+    use_cache: bool = True,
+    pin: bool = False
+) -> Tuple[np.ndarray, List[bool]]:
+    """embed_many plus a per-text cache-hit flag (for audit trails)"""
+    if not texts:
+        return np.zeros((0, EMBEDDING_DIM), dtype=np.float32), []
+    
+    embeddings, hits = _get_raw_embeddings(texts, batch_size, use_cache, pin)
+    matrix = np.stack(embeddings).astype(np.float32, copy=False)
+    return _normalize_rows(matrix), hits
+
+
+def embed_many(
+    texts: List[str],
+    batch_size: int = 32,
+    use_cache: bool = True,
+    pin: bool = False
+) -> np.ndarray:
+    """
+    Embed many texts with as few forward passes as possible.
     
-    # Expand attention mask for broadcasting
-    input_mask_expanded = attention_mask.unsqueeze(-1).expand(token_embeddings.size()).float()
+    Cache hits (in-process LRU, then the persistent store) are served
+    first; the remaining distinct texts are embedded in length-bucketed
+    mini-batches on the configured backend (torch or ONNX Runtime).
     
-    # Sum embeddings where mask is 1, then divide by count
-    sum_embeddings = torch.sum(token_embeddings * input_mask_expanded, 1)
-    sum_mask = torch.clamp(input_mask_expanded.sum(1), min=1e-9)
-    embedding = (sum_embeddings / sum_mask).squeeze().cpu().numpy()
+    Args:
+        pin: Keep these embeddings in the never-evicted cache tier
+            (for fixed templates and authority names)
     
-    # Cache result
-    if use_cache:
-        _manage_cache()
-        _embedding_cache[cache_key] = embedding
+    Returns:
+        (len(texts), 768) float32 matrix with L2-normalized rows, so cosine
+        similarity is a plain dot product
+    """
+    return _embed_many_with_hits(texts, batch_size, use_cache, pin)[0]
+
+
+def get_embedding(text: str, use_cache: bool = True) -> Tuple[np.ndarray, bool]:
+    """
+    Get sentence embedding using DistilBERT.
+    Uses mean pooling of last hidden states.
     
-    return embedding, False
+    Returns: (embedding, cache_hit)
+    """
+    embeddings, hits = _get_raw_embeddings([text], use_cache=use_cache)
+    return embeddings[0], hits[0]
 
 
 def compute_similarity(text1: str, text2: str) -> float:
@@ -174,21 +295,18 @@ def compute_similarity(text1: str, text2: str) -> float:
     Compute cosine similarity between two texts.
     Returns value between 0 and 1.
     """
-    emb1, _ = get_embedding(text1)
-    emb2, _ = get_embedding(text2)
-    
-    # Cosine similarity
-    dot_product = np.dot(emb1, emb2)
-    norm1 = np.linalg.norm(emb1)
-    norm2 = np.linalg.norm(emb2)
-    
-    if norm1 == 0 or norm2 == 0:
-        return 0.0
-    
-    similarity = dot_product / (norm1 * norm2)
+    embeddings = embed_many([text1, text2])
+    similarity = float(embeddings[0] @ embeddings[1])
     
     # Clamp to [0, 1] to handle floating point errors
-    return float(max(0.0, min(1.0, similarity)))
+    return max(0.0, min(1.0, similarity))
+
+
+def _rank_candidates(query: str, candidates: List[str]) -> Tuple[np.ndarray, List[bool]]:
+    """Clamped similarity of each candidate to the query, plus cache-hit flags"""
+    embeddings, hits = _embed_many_with_hits([query] + list(candidates))
+    scores = np.clip(embeddings[1:] @ embeddings[0], 0.0, 1.0)
+    return scores, hits
 
 
 def rank_by_similarity(
@@ -206,24 +324,8 @@ def rank_by_similarity(
     import time
     start_time = time.time()
     
-    query_emb, query_cached = get_embedding(query)
-    
-    results = []
-    for candidate in candidates:
-        cand_emb, _ = get_embedding(candidate)
-        
-        # Cosine similarity
-        dot_product = np.dot(query_emb, cand_emb)
-        norm1 = np.linalg.norm(query_emb)
-        norm2 = np.linalg.norm(cand_emb)
-        
-        if norm1 == 0 or norm2 == 0:
-            score = 0.0
-        else:
-            score = float(dot_product / (norm1 * norm2))
-            score = max(0.0, min(1.0, score))
-        
-        results.append((candidate, score))
+    scores, _ = _rank_candidates(query, candidates)
+    results = [(candidate, float(score)) for candidate, score in zip(candidates, scores)]
     
     # Sort by score descending
     results.sort(key=lambda x: x[1], reverse=True)
@@ -260,38 +362,29 @@ def rank_by_similarity_detailed(
     
     audit_trail = []
     
-    # Get query embedding
-    query_emb, query_cached = get_embedding(query)
+    # Query and candidates embedded together, scored with one product
+    scores, hits = _rank_candidates(query, candidates)
+    query_cached = hits[0]
     audit_trail.append({
         "step": "query_embedding",
         "cache_hit": query_cached,
-        "embedding_dim": len(query_emb)
+        "embedding_dim": EMBEDDING_DIM
     })
     
-    # Get candidate embeddings
     results = []
-    cache_hits = 0
-    
     for i, candidate in enumerate(candidates):
-        cand_emb, cached = get_embedding(candidate)
-        if cached:
-            cache_hits += 1
-        
-        # Compute similarity
-        score = compute_similarity(query, candidate)
-        
         label = candidate_labels[i] if candidate_labels else candidate
         results.append({
             "candidate": label,
             "original": candidate,
-            "score": score,
-            "cached": cached
+            "score": float(scores[i]),
+            "cached": hits[i + 1]
         })
     
     audit_trail.append({
         "step": "candidate_embeddings",
         "total_candidates": len(candidates),
-        "cache_hits": cache_hits
+        "cache_hits": sum(hits[1:])
     })
     
     # Sort and rank
@@ -320,7 +413,7 @@ def rank_by_similarity_detailed(
         query=query,
         top_matches=top_matches,
         processing_time_ms=processing_time,
-        model_used="distilbert-base-uncased",
+        model_used=get_model_id(),
         cache_hit=query_cached,
         audit_trail=audit_trail
     )
@@ -349,54 +442,33 @@ def batch_compute_similarities(
     Compute similarities in batches for efficiency.
     Useful for large candidate sets.
     """
-    import torch
+    if not candidates:
+        return []
     
-    model, tokenizer = get_model()
+    embeddings = embed_many([query] + list(candidates), batch_size)
     
-    # Get query embedding
-    query_emb, _ = get_embedding(query)
+    # Cosine similarities (not clamped)
+    return [float(score) for score in embeddings[1:] @ embeddings[0]]
+
+
+def compute_similarity_matrix(
+    queries: List[str],
+    candidates: List[str],
+    batch_size: int = 32
+) -> np.ndarray:
+    """
+    Cosine similarity of every query against every candidate.
     
-    scores = []
+    Returns:
+        Array of shape (len(queries), len(candidates)) clamped to [0, 1]
+    """
+    if not queries or not candidates:
+        return np.zeros((len(queries), len(candidates)))
     
-    # Process candidates in batches
-    for i in range(0, len(candidates), batch_size):
-        batch = candidates[i:i + batch_size]
-        
-        # Tokenize batch
-        inputs = tokenizer(
-            batch,
-            return_tensors="pt",
-            truncation=True,
-            max_length=512,
-            padding=True
-        )
-        
-        if torch.cuda.is_available():
-            inputs = {k: v.cuda() for k, v in inputs.items()}
-        
-        with torch.no_grad():
-            outputs = model(**inputs)
-        
-        # Mean pooling
-        attention_mask = inputs['attention_mask']
-        token_embeddings = outputs.last_hidden_state
-        input_mask_expanded = attention_mask.unsqueeze(-1).expand(token_embeddings.size()).float()
-        sum_embeddings = torch.sum(token_embeddings * input_mask_expanded, 1)
-        sum_mask = torch.clamp(input_mask_expanded.sum(1), min=1e-9)
-        batch_embeddings = (sum_embeddings / sum_mask).cpu().numpy()
-        
-        # Compute cosine similarities
-        for emb in batch_embeddings:
-            dot = np.dot(query_emb, emb)
-            norm1 = np.linalg.norm(query_emb)
-            norm2 = np.linalg.norm(emb)
-            
-            if norm1 == 0 or norm2 == 0:
-                scores.append(0.0)
-            else:
-                scores.append(float(dot / (norm1 * norm2)))
+    embeddings = embed_many(list(queries) + list(candidates), batch_size)
+    query_embs, cand_embs = embeddings[:len(queries)], embeddings[len(queries):]
     
-    return scores
+    return np.clip(query_embs @ cand_embs.T, 0.0, 1.0)
 
 
 # Pre-defined templates for common civic queries
@@ -434,6 +506,91 @@ CIVIC_TEMPLATES = {
 }
 
 
+# Templates used by the inference orchestrator's semantic boost
+INTENT_TEMPLATES = {
+    "intent_rti": [
+        "I want to request information about government records",
+        "Please provide copies of documents under RTI Act",
+        "I am seeking information about public expenditure"
+    ],
+    "intent_complaint": [
+        "I want to file a complaint about poor service",
+        "I am facing problems with government department",
+        "I want to report corruption and misconduct"
+    ]
+}
+
+
+def get_template_groups() -> Dict[str, List[str]]:
+    """All fixed template sentences, grouped (order defines the index layout)"""
+    return {**INTENT_TEMPLATES, **CIVIC_TEMPLATES}
+
+
+def _get_template_index_dir() -> str:
+    from app.config import get_settings
+    return get_settings().TEMPLATE_INDEX_DIR
+
+
+def build_template_index(directory: Optional[str] = None) -> TemplateIndex:
+    """
+    Build step: embed every template sentence and save the index to disk.
+    The saved index is also installed for this process.
+    """
+    global _template_index
+    
+    index = create_template_index(
+        get_template_groups(), get_model_id(),
+        lambda texts: embed_many(texts, use_cache=False)
+    )
+    save_template_index(index, directory or _get_template_index_dir())
+    
+    with _template_index_lock:
+        _template_index = index
+    return index
+
+
+def get_template_index() -> TemplateIndex:
+    """
+    Get the template embedding index.
+    Memory-maps the prebuilt file if one matches the current model and
+    templates; otherwise embeds the templates once in this process.
+    """
+    global _template_index
+    
+    if _template_index is None:
+        with _template_index_lock:
+            if _template_index is None:
+                groups = get_template_groups()
+                index = load_template_index(groups, get_model_id(), _get_template_index_dir())
+                if index is None:
+                    logger.warning(
+                        "No prebuilt template index found, embedding templates in-process. "
+                        "Run `python -m app.services.nlp.template_index` during the build."
+                    )
+                    index = create_template_index(
+                        groups, get_model_id(),
+                        lambda texts: embed_many(texts, pin=True)
+                    )
+                _template_index = index
+    
+    return _template_index
+
+
+def score_templates(queries: List[str], batch_size: int = 32) -> Tuple[TemplateIndex, np.ndarray]:
+    """
+    Similarity of each query against every template sentence.
+    
+    Queries go through embed_many (cache first, then batched forward
+    passes). Templates come from the precomputed index.
+    
+    Returns:
+        (index, scores) where scores has shape (len(queries), n_templates)
+        and is clamped to [0, 1]. Use index.group_scores() to slice groups.
+    """
+    index = get_template_index()
+    return index, index.scores(embed_many(queries, batch_size))
+
+
 def classify_query_type(query: str) -> Dict[str, float]:
     """
     Classify query into civic document types using semantic similarity.
@@ -443,12 +600,13 @@ def classify_query_type(query: str) -> Dict[str, float]:
     
     Returns dict of template_type -> similarity_score
     """
-    results = {}
+    index, scores = score_templates([query])
     
-    for template_type, templates in CIVIC_TEMPLATES.items():
-        # Average similarity across templates
-        scores = [compute_similarity(query, t) for t in templates]
-        results[template_type] = sum(scores) / len(scores)
+    # Average similarity across templates
+    results = {
+        template_type: float(index.group_scores(scores[0], template_type).mean())
+        for template_type in CIVIC_TEMPLATES
+    }
     
     return dict(sorted(results.items(), key=lambda x: x[1], reverse=True))
 
@@ -461,20 +619,26 @@ def preload_model():
     # Warm up with a test embedding
     _ = get_embedding("test query for model warmup")
     
+    # Map (or build) the template index so requests never embed templates
+    get_template_index()
+    
     logger.info("DistilBERT model loaded and ready")
 
 
-def clear_cache():
-    """Clear embedding cache"""
-    global _embedding_cache
-    _embedding_cache = {}
+def clear_cache(include_pinned: bool = False):
+    """Clear embedding cache (pinned template embeddings are kept by default)"""
+    get_embedding_cache().clear(include_pinned=include_pinned)
     logger.info("Embedding cache cleared")
 
 
 def get_cache_stats() -> Dict[str, Any]:
     """Get cache statistics"""
+    cache = get_embedding_cache()
     return {
-        "cache_size": len(_embedding_cache),
-        "max_size": _cache_max_size,
-        "model_loaded": is_model_loaded()
+        "cache_size": len(cache),
+        **cache.get_stats(),
+        "model_loaded": is_model_loaded(),
+        "embedding_backend": get_embedding_backend().get_info(),
+        "template_index": _template_index.to_dict() if _template_index is not None else None,
+        "persistent_store": _embedding_store.get_stats() if _embedding_store is not None else None
     }
@@ -0,0 +1,350 @@
+"""
+Embedding Backends
+Interchangeable runtimes for the DistilBERT sentence encoder
+
+- torch: PyTorch DistilBertModel (default, GPU if available)
+- onnx: ONNX Runtime on CPU, optionally with a dynamic int8-quantized graph.
+  Serving needs only onnxruntime + a tokenizer, no torch.
+
+Both backends tokenize the same way, bucket texts by token length and mean-pool
+the last hidden state over the attention mask, so their embeddings are
+interchangeable up to numerical (and quantization) error.
+
+Export step for the onnx backend (needs torch, run once per deploy):
+    python -m app.services.nlp.embedding_backend
+"""
+
+from typing import Any, Dict, List
+from pathlib import Path
+import logging
+import os
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+# Hidden size of distilbert-base (used before a model is loaded)
+DEFAULT_EMBEDDING_DIM = 768
+
+BACKEND_TORCH = "torch"
+BACKEND_ONNX = "onnx"
+
+ONNX_OPSET = 14
+ONNX_FP32_FILE = "model.onnx"
+ONNX_INT8_FILE = "model.int8.onnx"
+
+try:
+    import onnxruntime
+    ONNXRUNTIME_AVAILABLE = True
+except ImportError:
+    ONNXRUNTIME_AVAILABLE = False
+
+
+def mean_pool(hidden_state: np.ndarray, attention_mask: np.ndarray) -> np.ndarray:
+    """Mean of token embeddings over the attention mask, as float32"""
+    mask = attention_mask[..., None].astype(np.float32)
+    summed = (hidden_state * mask).sum(axis=1)
+    return (summed / np.clip(mask.sum(axis=1), 1e-9, None)).astype(np.float32)
+
+
+def get_onnx_model_dir(directory: str, model_name: str) -> Path:
+    """Directory holding the exported graph(s) and tokenizer for a model"""
+    return Path(directory) / model_name.replace("/", "--")
+
+
+class EmbeddingBackend:
+    """
+    Base class: tokenization, length bucketing and pooling.
+    Subclasses load a model and run one padded batch.
+    """
+
+    name = "base"
+    tensor_type = "np"
+
+    def __init__(self, model_name: str):
+        self.model_name = model_name
+        self.dim = DEFAULT_EMBEDDING_DIM
+        self.tokenizer = None
+
+    @property
+    def model_id(self) -> str:
+        """Identifier of the exact weights in use (keys caches and indexes)"""
+        return self.model_name
+
+    def is_loaded(self) -> bool:
+        return self.tokenizer is not None
+
+    def load(self) -> "EmbeddingBackend":
+        raise NotImplementedError
+
+    def _run_batch(self, inputs: Dict[str, Any]) -> np.ndarray:
+        """Mean-pooled (batch, dim) float32 embeddings of one padded batch"""
+        raise NotImplementedError
+
+    def encode(self, texts: List[str], batch_size: int = 32) -> np.ndarray:
+        """
+        Raw (unnormalized) mean-pooled float32 embeddings in input order.
+
+        Texts are tokenized once, sorted by token length and padded per
+        mini-batch, so each batch pads only to its own longest text.
+        """
+        self.load()
+        if not texts:
+            return np.zeros((0, self.dim), dtype=np.float32)
+
+        encoded = self.tokenizer(texts, truncation=True, max_length=512)
+        order = sorted(range(len(texts)), key=lambda i: len(encoded["input_ids"][i]))
+
+        embeddings = np.zeros((len(texts), self.dim), dtype=np.float32)
+
+        for i in range(0, len(order), batch_size):
+            bucket = order[i:i + batch_size]
+            inputs = self.tokenizer.pad(
+                {
+                    "input_ids": [encoded["input_ids"][j] for j in bucket],
+                    "attention_mask": [encoded["attention_mask"][j] for j in bucket]
+                },
+                return_tensors=self.tensor_type
+            )
+            embeddings[bucket] = self._run_batch(inputs)
+
+        return embeddings
+
+    def get_info(self) -> Dict[str, Any]:
+        return {
+            "backend": self.name,
+            "model_id": self.model_id,
+            "dim": self.dim,
+            "loaded": self.is_loaded()
+        }
+
+
+class TorchEmbeddingBackend(EmbeddingBackend):
+    """PyTorch DistilBertModel, moved to GPU when one is available"""
+
+    name = BACKEND_TORCH
+    tensor_type = "pt"
+
+    def __init__(self, model_name: str):
+        super().__init__(model_name)
+        self.model = None
+        self.device = "cpu"
+
+    def is_loaded(self) -> bool:
+        return self.model is not None
+
+    def load(self) -> "TorchEmbeddingBackend":
+        if self.model is not None:
+            return self
+
+        try:
+            from transformers import DistilBertModel, DistilBertTokenizer
+            import torch
+
+            logger.info("Loading DistilBERT model...")
+            tokenizer = DistilBertTokenizer.from_pretrained(self.model_name)
+            model = DistilBertModel.from_pretrained(self.model_name)
+
+            # Set to evaluation mode
+            model.eval()
+
+            # Move to GPU if available
+            if torch.cuda.is_available():
+                model = model.cuda()
+                self.device = "cuda"
+                logger.info("DistilBERT loaded on GPU")
+            else:
+                logger.info("DistilBERT loaded on CPU")
+
+        except Exception as e:
+            logger.error(f"Failed to load DistilBERT: {e}")
+            raise RuntimeError(f"Failed to load DistilBERT: {e}")
+
+        self.dim = model.config.dim
+        self.tokenizer = tokenizer
+        self.model = model
+        return self
+
+    def _run_batch(self, inputs: Dict[str, Any]) -> np.ndarray:
+        import torch
+
+        if self.device != "cpu":
+            inputs = {k: v.to(self.device) for k, v in inputs.items()}
+
+        with torch.inference_mode():
+            outputs = self.model(**inputs)
+
+            # Mean pooling with attention mask
+            token_embeddings = outputs.last_hidden_state
+            input_mask_expanded = inputs["attention_mask"].unsqueeze(-1).expand(token_embeddings.size()).float()
+            sum_embeddings = torch.sum(token_embeddings * input_mask_expanded, 1)
+            sum_mask = torch.clamp(input_mask_expanded.sum(1), min=1e-9)
+            return (sum_embeddings / sum_mask).cpu().numpy()
+
+
+class OnnxEmbeddingBackend(EmbeddingBackend):
+    """ONNX Runtime CPU session over an exported (optionally int8) graph"""
+
+    name = BACKEND_ONNX
+    tensor_type = "np"
+
+    def __init__(self, model_name: str, model_dir: str, quantize: bool = True, num_threads: int = 0):
+        super().__init__(model_name)
+        self.model_dir = get_onnx_model_dir(model_dir, model_name)
+        self.quantize = quantize
+        self.num_threads = num_threads
+        self.session = None
+
+    @property
+    def model_path(self) -> Path:
+        return self.model_dir / (ONNX_INT8_FILE if self.quantize else ONNX_FP32_FILE)
+
+    @property
+    def model_id(self) -> str:
+        return f"{self.model_name}@onnx-{'int8' if self.quantize else 'fp32'}"
+
+    def is_loaded(self) -> bool:
+        return self.session is not None
+
+    def load(self) -> "OnnxEmbeddingBackend":
+        if self.session is not None:
+            return self
+
+        if not ONNXRUNTIME_AVAILABLE:
+            raise RuntimeError("onnxruntime is not installed (required for EMBEDDING_BACKEND=onnx)")
+        if not self.model_path.exists():
+            raise RuntimeError(
+                f"ONNX model not found at {self.model_path}; "
+                f"run `python -m app.services.nlp.embedding_backend` to export it"
+            )
+
+        try:
+            from transformers import AutoTokenizer
+
+            logger.info(f"Loading DistilBERT ONNX model: {self.model_path}")
+            options = onnxruntime.SessionOptions()
+            options.graph_optimization_level = onnxruntime.GraphOptimizationLevel.ORT_ENABLE_ALL
+            if self.num_threads:
+                options.intra_op_num_threads = self.num_threads
+            session = onnxruntime.InferenceSession(
+                str(self.model_path), options, providers=["CPUExecutionProvider"]
+            )
+            tokenizer = AutoTokenizer.from_pretrained(str(self.model_dir))
+        except Exception as e:
+            logger.error(f"Failed to load DistilBERT ONNX model: {e}")
+            raise RuntimeError(f"Failed to load DistilBERT ONNX model: {e}")
+
+        hidden_dim = session.get_outputs()[0].shape[-1]
+        if isinstance(hidden_dim, int):
+            self.dim = hidden_dim
+        self.tokenizer = tokenizer
+        self.session = session
+        logger.info("DistilBERT ONNX model loaded on CPU")
+        return self
+
+    def _run_batch(self, inputs: Dict[str, Any]) -> np.ndarray:
+        input_ids = inputs["input_ids"].astype(np.int64)
+        attention_mask = inputs["attention_mask"].astype(np.int64)
+        (hidden_state,) = self.session.run(
+            ["last_hidden_state"],
+            {"input_ids": input_ids, "attention_mask": attention_mask}
+        )
+        return mean_pool(hidden_state, attention_mask)
+
+    def get_info(self) -> Dict[str, Any]:
+        return {
+            **super().get_info(),
+            "model_path": str(self.model_path),
+            "quantized": self.quantize
+        }
+
+
+def create_backend(
+    backend: str,
+    model_name: str,
+    onnx_model_dir: str = "data/models",
+    quantize: bool = True,
+    num_threads: int = 0
+) -> EmbeddingBackend:
+    """Instantiate (without loading) the named embedding backend"""
+    if backend == BACKEND_TORCH:
+        return TorchEmbeddingBackend(model_name)
+    if backend == BACKEND_ONNX:
+        return OnnxEmbeddingBackend(model_name, onnx_model_dir, quantize=quantize, num_threads=num_threads)
+    raise ValueError(f"Unknown embedding backend: {backend!r} (expected 'torch' or 'onnx')")
+
+
+def export_onnx_model(model_name: str, directory: str, quantize: bool = True) -> Path:
+    """
+    Export DistilBERT to ONNX (last_hidden_state, dynamic batch and sequence
+    axes), save the tokenizer alongside it and optionally write a dynamic
+    int8-quantized copy. Requires torch and transformers.
+
+    Returns the path of the graph the onnx backend will load.
+    """
+    import torch
+    from transformers import DistilBertModel, DistilBertTokenizerFast
+
+    output_dir = get_onnx_model_dir(directory, model_name)
+    output_dir.mkdir(parents=True, exist_ok=True)
+
+    tokenizer = DistilBertTokenizerFast.from_pretrained(model_name)
+    model = DistilBertModel.from_pretrained(model_name)
+    model.eval()
+
+    sample = tokenizer(["export sample"], return_tensors="pt")
+    fp32_path = output_dir / ONNX_FP32_FILE
+    tmp_path = output_dir / f".{ONNX_FP32_FILE}.{os.getpid()}.tmp"
+
+    with torch.inference_mode():
+        torch.onnx.export(
+            model,
+            (sample["input_ids"], sample["attention_mask"]),
+            str(tmp_path),
+            input_names=["input_ids", "attention_mask"],
+            output_names=["last_hidden_state"],
+            dynamic_axes={
+                "input_ids": {0: "batch", 1: "sequence"},
+                "attention_mask": {0: "batch", 1: "sequence"},
+                "last_hidden_state": {0: "batch", 1: "sequence"}
+            },
+            opset_version=ONNX_OPSET
+        )
+    os.replace(tmp_path, fp32_path)
+    tokenizer.save_pretrained(str(output_dir))
+    logger.info(f"ONNX model exported: {fp32_path}")
+
+    if not quantize:
+        return fp32_path
+
+    from onnxruntime.quantization import QuantType, quantize_dynamic
+
+    int8_path = output_dir / ONNX_INT8_FILE
+    tmp_path = output_dir / f".{ONNX_INT8_FILE}.{os.getpid()}.tmp"
+    quantize_dynamic(str(fp32_path), str(tmp_path), weight_type=QuantType.QInt8)
+    os.replace(tmp_path, int8_path)
+    logger.info(f"ONNX model quantized (int8): {int8_path}")
+    return int8_path
+
+
+def main() -> None:
+    """Export step: write the ONNX graph(s) used by EMBEDDING_BACKEND=onnx"""
+    import argparse
+    from app.config import get_settings
+    from app.services.nlp.distilbert_semantic import MODEL_NAME
+
+    settings = get_settings()
+    parser = argparse.ArgumentParser(description="Export DistilBERT to ONNX for the onnx embedding backend")
+    parser.add_argument("--output-dir", default=settings.ONNX_MODEL_DIR, help="Directory for exported models")
+    parser.add_argument("--model", default=MODEL_NAME, help="Hugging Face model name")
+    parser.add_argument("--no-quantize", action="store_true", help="Skip the int8-quantized copy")
+    args = parser.parse_args()
+    quantize = settings.ONNX_QUANTIZE and not args.no_quantize
+
+    logging.basicConfig(level=logging.INFO)
+    path = export_onnx_model(args.model, args.output_dir, quantize=quantize)
+    print(f"ONNX model for {args.model}: {path}")
+
+
+if __name__ == "__main__":
+    main()
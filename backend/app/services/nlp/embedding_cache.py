@@ -0,0 +1,149 @@
+"""
+Embedding Cache
+In-process LRU cache for DistilBERT sentence embeddings
+
+- Evicts least-recently-used entries once a byte budget is exceeded
+- Optional TTL per entry
+- Keys are normalized (case, whitespace) before hashing; the model is
+  uncased, so normalized variants always share one embedding
+- Pinned tier for template/authority embeddings that are never evicted
+- Hit, miss, eviction and expiration counters for monitoring
+"""
+
+from typing import Any, Callable, Dict, Optional, Tuple
+from collections import OrderedDict
+import hashlib
+import logging
+import threading
+import time
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+
+def normalize_cache_text(text: str) -> str:
+    """Lowercase and collapse whitespace (matches the uncased tokenizer)"""
+    return " ".join(text.lower().split())
+
+
+def make_cache_key(text: str) -> str:
+    """Hash of the normalized text"""
+    return hashlib.blake2b(normalize_cache_text(text).encode("utf-8"), digest_size=16).hexdigest()
+
+
+class EmbeddingCache:
+    """
+    Thread-safe LRU embedding cache with a byte budget and a pinned tier.
+
+    Pinned entries do not count towards the byte budget and are only
+    removed by clear(include_pinned=True).
+    """
+
+    def __init__(
+        self,
+        max_bytes: int,
+        ttl_seconds: Optional[float] = None,
+        clock: Callable[[], float] = time.monotonic
+    ):
+        self.max_bytes = max_bytes
+        self.ttl_seconds = ttl_seconds or None
+        self.clock = clock
+        self._entries: "OrderedDict[str, Tuple[np.ndarray, Optional[float]]]" = OrderedDict()
+        self._pinned: Dict[str, np.ndarray] = {}
+        self._bytes = 0
+        self._pinned_bytes = 0
+        self._lock = threading.Lock()
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    def get(self, key: str) -> Optional[np.ndarray]:
+        """Look up an embedding by cache key, refreshing its LRU position"""
+        with self._lock:
+            pinned = self._pinned.get(key)
+            if pinned is not None:
+                self.hits += 1
+                return pinned
+
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+
+            embedding, expires_at = entry
+            if expires_at is not None and expires_at <= self.clock():
+                self._remove(key)
+                self.expirations += 1
+                self.misses += 1
+                return None
+
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return embedding
+
+    def put(self, key: str, embedding: np.ndarray, pin: bool = False) -> None:
+        """Store an embedding; pinned entries are never evicted"""
+        with self._lock:
+            if pin:
+                if key in self._entries:
+                    self._remove(key)
+                if key not in self._pinned:
+                    self._pinned[key] = embedding
+                    self._pinned_bytes += embedding.nbytes
+                return
+
+            if key in self._pinned:
+                return
+            if key in self._entries:
+                self._remove(key)
+
+            expires_at = self.clock() + self.ttl_seconds if self.ttl_seconds else None
+            self._entries[key] = (embedding, expires_at)
+            self._bytes += embedding.nbytes
+
+            # Evict least recently used entries until within budget
+            while self._bytes > self.max_bytes and self._entries:
+                oldest = next(iter(self._entries))
+                self._remove(oldest)
+                self.evictions += 1
+
+    def _remove(self, key: str) -> None:
+        embedding, _ = self._entries.pop(key)
+        self._bytes -= embedding.nbytes
+
+    def __contains__(self, key: str) -> bool:
+        with self._lock:
+            return key in self._pinned or key in self._entries
+
+    def __len__(self) -> int:
+        return len(self._entries) + len(self._pinned)
+
+    def clear(self, include_pinned: bool = False) -> None:
+        """Drop cached entries (and optionally the pinned tier)"""
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+            if include_pinned:
+                self._pinned.clear()
+                self._pinned_bytes = 0
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Cache size and hit/miss/eviction counters"""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "bytes": self._bytes,
+                "max_bytes": self.max_bytes,
+                "pinned_entries": len(self._pinned),
+                "pinned_bytes": self._pinned_bytes,
+                "ttl_seconds": self.ttl_seconds,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "expirations": self.expirations,
+                "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0
+            }
@@ -0,0 +1,125 @@
+"""
+Persistent Embedding Store
+Optional on-disk embedding cache shared by all worker processes on a host
+
+Sits behind the in-process LRU (embedding_cache): lookups that miss the LRU
+are tried here before running the model, and new embeddings are written
+back. Backed by SQLite in WAL mode, so many workers can read concurrently
+while one writes.
+
+Rows are keyed by (model name, content hash). Opening the store with a
+different model name drops rows of other models, so a model swap can never
+serve stale vectors.
+"""
+
+from typing import Any, Dict, Iterable, List, Tuple
+from pathlib import Path
+import logging
+import sqlite3
+import threading
+import time
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS embeddings (
+    model TEXT NOT NULL,
+    key TEXT NOT NULL,
+    vector BLOB NOT NULL,
+    created_at REAL NOT NULL,
+    PRIMARY KEY (model, key)
+) WITHOUT ROWID
+"""
+
+# SQLite limits the number of bound parameters per statement
+_MAX_KEYS_PER_QUERY = 500
+
+
+class PersistentEmbeddingStore:
+    """SQLite-backed float32 embedding store, one connection per thread"""
+
+    def __init__(self, path: str, model_name: str):
+        self.path = Path(path)
+        self.model_name = model_name
+        self._local = threading.local()
+        self.hits = 0
+        self.misses = 0
+        self.writes = 0
+
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        conn = self._connect()
+        with conn:
+            conn.execute(_SCHEMA)
+            removed = conn.execute(
+                "DELETE FROM embeddings WHERE model != ?", (model_name,)
+            ).rowcount
+        if removed:
+            logger.info(f"Embedding store: dropped {removed} vectors of other models")
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(str(self.path), timeout=5.0)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def get_many(self, keys: List[str]) -> Dict[str, np.ndarray]:
+        """Fetch stored embeddings for the given cache keys"""
+        found: Dict[str, np.ndarray] = {}
+        conn = self._connect()
+
+        for i in range(0, len(keys), _MAX_KEYS_PER_QUERY):
+            chunk = keys[i:i + _MAX_KEYS_PER_QUERY]
+            placeholders = ",".join("?" * len(chunk))
+            rows = conn.execute(
+                f"SELECT key, vector FROM embeddings WHERE model = ? AND key IN ({placeholders})",
+                (self.model_name, *chunk)
+            )
+            for key, blob in rows:
+                found[key] = np.frombuffer(blob, dtype=np.float32)
+
+        self.hits += len(found)
+        self.misses += len(keys) - len(found)
+        return found
+
+    def put_many(self, items: Iterable[Tuple[str, np.ndarray]]) -> None:
+        """Store embeddings (existing rows are left untouched)"""
+        now = time.time()
+        rows = [
+            (self.model_name, key, np.ascontiguousarray(embedding, dtype=np.float32).tobytes(), now)
+            for key, embedding in items
+        ]
+        if not rows:
+            return
+
+        conn = self._connect()
+        with conn:
+            conn.executemany(
+                "INSERT OR IGNORE INTO embeddings (model, key, vector, created_at) VALUES (?, ?, ?, ?)",
+                rows
+            )
+        self.writes += len(rows)
+
+    def clear(self) -> None:
+        """Delete all stored embeddings of this model"""
+        conn = self._connect()
+        with conn:
+            conn.execute("DELETE FROM embeddings WHERE model = ?", (self.model_name,))
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Store size and hit/miss counters for this process"""
+        count = self._connect().execute(
+            "SELECT COUNT(*) FROM embeddings WHERE model = ?", (self.model_name,)
+        ).fetchone()[0]
+        return {
+            "path": str(self.path),
+            "model_name": self.model_name,
+            "entries": count,
+            "hits": self.hits,
+            "misses": self.misses,
+            "writes": self.writes
+        }
@@ -11,15 +11,18 @@ Following MODEL_USAGE_POLICY:
 
 import spacy
 from spacy.matcher import PhraseMatcher, Matcher
+from spacy.tokens import Doc
 import logging
 
 logger = logging.getLogger(__name__)
 
-from typing import Dict, List, Optional, Tuple, Any
+from typing import Dict, List, Optional, Tuple, Any, Iterable, Iterator
 from dataclasses import dataclass, field
 from enum import Enum
 import re
 
+from ..analysis_context import AnalysisContext
+
 # spaCy availability flag - True since we're using Python 3.13 compatible version
 SPACY_AVAILABLE = True
 
@@ -195,7 +198,21 @@ INDIAN_CITIES = [
 ]
 
 
-def extract_entities(text: str) -> Dict[str, List[str]]:
+def parse_many(
+    texts: Iterable[str],
+    batch_size: int = 32,
+    n_process: int = 1
+) -> Iterator[Doc]:
+    """
+    Parse many texts with nlp.pipe.
+    Docs are yielded lazily in input order; with n_process > 1 the worker
+    processes stay alive for the whole stream.
+    """
+    nlp = get_nlp()
+    return nlp.pipe(texts, batch_size=batch_size, n_process=n_process)
+
+
+def extract_entities(text: str, context: Optional[AnalysisContext] = None) -> Dict[str, List[str]]:
     """
     Extract named entities from text using spaCy + custom patterns.
     
@@ -210,6 +227,8 @@ def extract_entities(text: str) -> Dict[str, List[str]]:
     - Indian location recognition
     - Reference number extraction
     - Phone/email patterns
+    
+    Pass the request's AnalysisContext to reuse its spaCy parse.
     """
     if not SPACY_AVAILABLE:
         logger.warning("spaCy not available, returning empty entities")
@@ -224,8 +243,8 @@ def extract_entities(text: str) -> Dict[str, List[str]]:
             "EMAIL": []
         }
     
-    nlp = get_nlp()
-    doc = nlp(text)
+    context = AnalysisContext.for_text(text, context)
+    doc = context.doc
     
     entities: Dict[str, List[str]] = {}
     
@@ -238,7 +257,7 @@ def extract_entities(text: str) -> Dict[str, List[str]]:
             entities[label].append(ent.text)
     
     # Enhance with Indian locations
-    text_lower = text.lower()
+    text_lower = context.text_lower
     
     if "GPE" not in entities:
         entities["GPE"] = []
@@ -255,43 +274,38 @@ def extract_entities(text: str) -> Dict[str, List[str]]:
             if formatted not in entities["GPE"]:
                 entities["GPE"].append(formatted)
     
-    # Extract reference numbers via regex
-    ref_patterns = [
-        r'(?:ref|reference|complaint|application)[\s.:#-]*(?:no|number|id)?[\s.:#-]*([A-Z0-9/-]+)',
-        r'\b([A-Z]{2,}/\d+/\d{4})\b',
-        r'\b(\d{4}/[A-Z]+/\d+)\b'
-    ]
-    
+    # Reference numbers, phones and emails from the context's single scan
     entities["REFERENCE"] = []
-    for pattern in ref_patterns:
-        matches = re.findall(pattern, text, re.IGNORECASE)
-        for match in matches:
-            if match and match not in entities["REFERENCE"]:
-                entities["REFERENCE"].append(match.upper())
-    
-    # Extract phone numbers
-    phone_pattern = r'(?:\+91[\s-]?)?[6-9]\d{9}'
-    phones = re.findall(phone_pattern, text)
-    if phones:
-        entities["PHONE"] = list(set(phones))
+    phones: List[str] = []
+    emails: List[str] = []
+    for span in context.spans:
+        if span.kind in ("reference", "reference_code"):
+            reference = span.text.upper()
+            if reference not in entities["REFERENCE"]:
+                entities["REFERENCE"].append(reference)
+        elif span.kind == "phone":
+            phones.append(span.text)
+        elif span.kind == "email":
+            emails.append(span.text)
     
-    # Extract emails
-    email_pattern = r'[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Z|a-z]{2,}'
-    emails = re.findall(email_pattern, text)
+    if phones:
+        entities["PHONE"] = list(dict.fromkeys(phones))
     if emails:
-        entities["EMAIL"] = list(set(emails))
+        entities["EMAIL"] = list(dict.fromkeys(emails))
     
     return entities
 
 
-def extract_entities_detailed(text: str) -> List[ExtractedEntity]:
+def extract_entities_detailed(
+    text: str,
+    context: Optional[AnalysisContext] = None
+) -> List[ExtractedEntity]:
     """
     Extract entities with full metadata for audit trail.
     Returns list of ExtractedEntity objects with confidence scores.
     """
-    import time
-    nlp = get_nlp()
-    doc = nlp(text)
+    context = AnalysisContext.for_text(text, context)
+    doc = context.doc
     
     entities: List[ExtractedEntity] = []
     
@@ -317,7 +331,7 @@ def extract_entities_detailed(text: str) -> List[ExtractedEntity]:
             ))
     
     # Pattern-based extraction with regex
-    text_lower = text.lower()
+    text_lower = context.text_lower
     
     # Indian states with positions
     for state in INDIAN_STATES:
@@ -331,39 +345,24 @@ def extract_entities_detailed(text: str) -> List[ExtractedEntity]:
                 source="pattern_indian_state"
             ))
     
-    # Phone numbers
-    for match in re.finditer(r'(?:\+91[\s-]?)?[6-9]\d{9}', text):
-        entities.append(ExtractedEntity(
-            text=match.group(),
-            entity_type=EntityType.PHONE,
-            confidence=0.9,
-            start_char=match.start(),
-            end_char=match.end(),
-            source="regex_phone"
-        ))
-    
-    # Email addresses
-    for match in re.finditer(r'[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Z|a-z]{2,}', text):
-        entities.append(ExtractedEntity(
-            text=match.group(),
-            entity_type=EntityType.EMAIL,
-            confidence=0.95,
-            start_char=match.start(),
-            end_char=match.end(),
-            source="regex_email"
-        ))
-    
-    # Reference numbers
-    ref_pattern = r'(?:ref|reference|complaint|application)[\s.:#-]*(?:no|number|id)?[\s.:#-]*([A-Z0-9/-]+)'
-    for match in re.finditer(ref_pattern, text, re.IGNORECASE):
-        entities.append(ExtractedEntity(
-            text=match.group(1).upper(),
-            entity_type=EntityType.REFERENCE_NUMBER,
-            confidence=0.8,
-            start_char=match.start(1),
-            end_char=match.end(1),
-            source="regex_reference"
-        ))
+    # Phones, emails and reference numbers from the context's single scan
+    span_types = {
+        "phone": (EntityType.PHONE, 0.9, "regex_phone"),
+        "email": (EntityType.EMAIL, 0.95, "regex_email"),
+        "reference": (EntityType.REFERENCE_NUMBER, 0.8, "regex_reference"),
+        "reference_code": (EntityType.REFERENCE_NUMBER, 0.8, "regex_reference"),
+    }
+    for span in context.spans:
+        if span.kind in span_types:
+            entity_type, confidence, source = span_types[span.kind]
+            entities.append(ExtractedEntity(
+                text=span.text.upper() if entity_type == EntityType.REFERENCE_NUMBER else span.text,
+                entity_type=entity_type,
+                confidence=confidence,
+                start_char=span.start,
+                end_char=span.end,
+                source=source
+            ))
     
     # Deduplicate by position
     seen_spans = set()
@@ -377,7 +376,11 @@ def extract_entities_detailed(text: str) -> List[ExtractedEntity]:
     return unique_entities
 
 
-def extract_key_phrases(text: str, top_n: int = 10) -> List[str]:
+def extract_key_phrases(
+    text: str,
+    top_n: int = 10,
+    context: Optional[AnalysisContext] = None
+) -> List[str]:
     """
     Extract key noun phrases from text.
     Enhanced with better filtering and ranking.
@@ -388,8 +391,7 @@ def extract_key_phrases(text: str, top_n: int = 10) -> List[str]:
         words = text.split()
         return [word for word in words if len(word) > 4][:top_n]
     
-    nlp = get_nlp()
-    doc = nlp(text)
+    doc = AnalysisContext.for_text(text, context).doc
     
     # Extract noun chunks with scoring
     phrases_with_scores = []
@@ -425,14 +427,16 @@ def extract_key_phrases(text: str, top_n: int = 10) -> List[str]:
     return unique_phrases
 
 
-def extract_matched_phrases(text: str) -> Dict[str, List[str]]:
+def extract_matched_phrases(
+    text: str,
+    context: Optional[AnalysisContext] = None
+) -> Dict[str, List[str]]:
     """
     Extract civic-specific phrases using PhraseMatcher.
     Returns categorized matches.
     """
-    nlp = get_nlp()
     matcher = get_phrase_matcher()
-    doc = nlp(text)
+    doc = AnalysisContext.for_text(text, context).doc
     
     matches = matcher(doc)
     
@@ -443,7 +447,7 @@ def extract_matched_phrases(text: str) -> Dict[str, List[str]]:
     }
     
     for match_id, start, end in matches:
-        label = nlp.vocab.strings[match_id]
+        label = doc.vocab.strings[match_id]
         span_text = doc[start:end].text
         if span_text.lower() not in [m.lower() for m in results.get(label, [])]:
             results[label].append(span_text)
@@ -451,7 +455,7 @@ def extract_matched_phrases(text: str) -> Dict[str, List[str]]:
     return results
 
 
-def analyze_sentiment_basic(text: str) -> str:
+def analyze_sentiment_basic(text: str, context: Optional[AnalysisContext] = None) -> str:
     """
     Basic sentiment analysis using keyword matching.
     Returns: 'urgent', 'frustrated', 'neutral', 'formal'
@@ -459,7 +463,7 @@ def analyze_sentiment_basic(text: str) -> str:
     Note: This is rule-based, not ML-based (per MODEL_USAGE_POLICY).
     """
     # This function doesn't use spaCy, so it works without it
-    text_lower = text.lower()
+    text_lower = AnalysisContext.for_text(text, context).text_lower
     
     urgent_words = [
         "urgent", "immediately", "emergency", "asap", "critical",
@@ -493,14 +497,14 @@ def analyze_sentiment_basic(text: str) -> str:
         return "neutral"
 
 
-def analyze_urgency(text: str) -> Tuple[str, float]:
+def analyze_urgency(text: str, context: Optional[AnalysisContext] = None) -> Tuple[str, float]:
     """
     Analyze urgency level of the text.
     Returns (urgency_level, confidence)
     
     Levels: 'critical', 'high', 'medium', 'low'
     """
-    text_lower = text.lower()
+    text_lower = AnalysisContext.for_text(text, context).text_lower
     
     # Critical indicators
     critical_patterns = [
@@ -544,7 +548,7 @@ def analyze_urgency(text: str) -> Tuple[str, float]:
         return ("low", 0.7)
 
 
-def full_analysis(text: str) -> NLPResult:
+def full_analysis(text: str, context: Optional[AnalysisContext] = None) -> NLPResult:
     """
     Perform complete NLP analysis on text.
     Returns comprehensive result with audit trail.
@@ -552,15 +556,16 @@ def full_analysis(text: str) -> NLPResult:
     import time
     start_time = time.time()
     
-    nlp = get_nlp()
-    doc = nlp(text)
+    # Every step below shares this single parse
+    context = AnalysisContext.for_text(text, context)
+    doc = context.doc
     
     # Collect all analysis
-    entities = extract_entities_detailed(text)
-    key_phrases = extract_key_phrases(text, top_n=10)
-    sentiment = analyze_sentiment_basic(text)
-    urgency_level, urgency_conf = analyze_urgency(text)
-    matched_phrases = extract_matched_phrases(text)
+    entities = extract_entities_detailed(text, context)
+    key_phrases = extract_key_phrases(text, top_n=10, context=context)
+    sentiment = analyze_sentiment_basic(text, context)
+    urgency_level, urgency_conf = analyze_urgency(text, context)
+    matched_phrases = extract_matched_phrases(text, context)
     
     processing_time = (time.time() - start_time) * 1000
     
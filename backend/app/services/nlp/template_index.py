@@ -0,0 +1,214 @@
+"""
+Template Embedding Index
+Precomputed DistilBERT embeddings for the fixed template sentences
+
+Following MODEL_USAGE_POLICY:
+- Used ONLY for semantic similarity ranking against fixed templates
+- Embeddings are built offline, so no template forward passes at request time
+- Every index file is tied to a model name and template hash for auditability
+
+The index is a normalized float32 matrix saved as `.npy` and memory-mapped on
+load, so all workers on a host share the same pages. Scoring a query is one
+query embedding plus one matrix-vector product.
+
+Build step (run once per deploy, e.g. from build.sh):
+    python -m app.services.nlp.template_index
+"""
+
+from typing import Callable, Dict, List, Optional, Tuple
+from dataclasses import dataclass
+from pathlib import Path
+import hashlib
+import json
+import logging
+import os
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+# Bump when the on-disk layout changes
+INDEX_FORMAT_VERSION = 1
+
+
+@dataclass
+class TemplateIndex:
+    """Normalized template embedding matrix with per-group row ranges"""
+    model_name: str
+    version: str                          # Hash of model name + templates
+    sentences: List[str]
+    groups: Dict[str, Tuple[int, int]]    # group -> (start, end) row range
+    matrix: np.ndarray                    # (n_sentences, dim) float32, rows L2-normalized
+
+    def scores(self, query_embeddings: np.ndarray) -> np.ndarray:
+        """
+        Cosine similarity of normalized query embeddings against every template.
+
+        Args:
+            query_embeddings: (dim,) or (n_queries, dim) normalized embeddings
+
+        Returns:
+            Similarities clamped to [0, 1], shape (n_sentences,) or (n_queries, n_sentences)
+        """
+        return np.clip(query_embeddings @ self.matrix.T, 0.0, 1.0)
+
+    def group_scores(self, scores: np.ndarray, group: str) -> np.ndarray:
+        """Slice the columns of one template group out of a score array"""
+        start, end = self.groups[group]
+        return scores[..., start:end]
+
+    def to_dict(self) -> Dict:
+        return {
+            "model_name": self.model_name,
+            "version": self.version,
+            "templates": len(self.sentences),
+            "groups": {name: end - start for name, (start, end) in self.groups.items()},
+            "memory_mapped": isinstance(self.matrix, np.memmap)
+        }
+
+
+def compute_template_hash(model_name: str, template_groups: Dict[str, List[str]]) -> str:
+    """Stable hash of the model name and every template sentence (in group order)"""
+    payload = json.dumps(
+        {
+            "format": INDEX_FORMAT_VERSION,
+            "model": model_name,
+            "groups": [[name, list(sentences)] for name, sentences in template_groups.items()]
+        },
+        ensure_ascii=False
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()[:16]
+
+
+def get_index_paths(directory: str, model_name: str, version: str) -> Tuple[Path, Path]:
+    """Paths of the matrix (.npy) and metadata (.json) files for an index version"""
+    model_slug = model_name.replace("/", "--")
+    base = Path(directory) / f"templates_{model_slug}_{version}"
+    return base.with_suffix(".npy"), base.with_suffix(".json")
+
+
+def _flatten_groups(template_groups: Dict[str, List[str]]) -> Tuple[List[str], Dict[str, Tuple[int, int]]]:
+    """Flatten template groups into one sentence list plus row ranges"""
+    sentences: List[str] = []
+    groups: Dict[str, Tuple[int, int]] = {}
+    for name, group_sentences in template_groups.items():
+        groups[name] = (len(sentences), len(sentences) + len(group_sentences))
+        sentences.extend(group_sentences)
+    return sentences, groups
+
+
+def _normalize(matrix: np.ndarray) -> np.ndarray:
+    """L2-normalize rows as float32, leaving zero rows at zero"""
+    matrix = np.asarray(matrix, dtype=np.float32)
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    return matrix / np.where(norms == 0, 1.0, norms)
+
+
+def create_template_index(
+    template_groups: Dict[str, List[str]],
+    model_name: str,
+    embed_fn: Callable[[List[str]], np.ndarray]
+) -> TemplateIndex:
+    """
+    Embed all template sentences in memory.
+
+    Args:
+        template_groups: group name -> template sentences
+        model_name: Name of the embedding model (recorded in the index version)
+        embed_fn: Returns a (len(texts), dim) embedding matrix for a list of texts
+    """
+    sentences, groups = _flatten_groups(template_groups)
+    return TemplateIndex(
+        model_name=model_name,
+        version=compute_template_hash(model_name, template_groups),
+        sentences=sentences,
+        groups=groups,
+        matrix=_normalize(embed_fn(sentences))
+    )
+
+
+def save_template_index(index: TemplateIndex, directory: str) -> Path:
+    """
+    Write an index to disk.
+    Files are written to a temp name and renamed, so concurrent readers never
+    see a partial file.
+    """
+    matrix_path, meta_path = get_index_paths(directory, index.model_name, index.version)
+    matrix_path.parent.mkdir(parents=True, exist_ok=True)
+
+    tmp_matrix = matrix_path.with_name(f".{matrix_path.name}.{os.getpid()}.tmp")
+    with open(tmp_matrix, "wb") as f:
+        np.save(f, np.ascontiguousarray(index.matrix, dtype=np.float32))
+    os.replace(tmp_matrix, matrix_path)
+
+    tmp_meta = meta_path.with_name(f".{meta_path.name}.{os.getpid()}.tmp")
+    with open(tmp_meta, "w", encoding="utf-8") as f:
+        json.dump({
+            "format": INDEX_FORMAT_VERSION,
+            "model_name": index.model_name,
+            "version": index.version,
+            "sentences": index.sentences,
+            "groups": index.groups
+        }, f, ensure_ascii=False, indent=2)
+    os.replace(tmp_meta, meta_path)
+
+    logger.info(f"Template index saved: {matrix_path} ({len(index.sentences)} templates)")
+    return matrix_path
+
+
+def load_template_index(
+    template_groups: Dict[str, List[str]],
+    model_name: str,
+    directory: str
+) -> Optional[TemplateIndex]:
+    """
+    Memory-map a prebuilt index matching the current model and templates.
+    Returns None if no matching, valid index file exists.
+    """
+    version = compute_template_hash(model_name, template_groups)
+    matrix_path, meta_path = get_index_paths(directory, model_name, version)
+
+    if not matrix_path.exists() or not meta_path.exists():
+        return None
+
+    try:
+        with open(meta_path, encoding="utf-8") as f:
+            meta = json.load(f)
+        matrix = np.load(matrix_path, mmap_mode="r")
+    except (OSError, ValueError) as e:
+        logger.warning(f"Template index {matrix_path} unreadable: {e}")
+        return None
+
+    sentences, groups = _flatten_groups(template_groups)
+    if meta.get("sentences") != sentences or matrix.shape[0] != len(sentences) or matrix.dtype != np.float32:
+        logger.warning(f"Template index {matrix_path} does not match current templates, ignoring")
+        return None
+
+    logger.info(f"Template index loaded (memory-mapped): {matrix_path}")
+    return TemplateIndex(
+        model_name=model_name,
+        version=version,
+        sentences=sentences,
+        groups=groups,
+        matrix=matrix
+    )
+
+
+def main() -> None:
+    """Build step: embed all fixed templates and write the index file"""
+    import argparse
+    from app.config import get_settings
+    from app.services.nlp import distilbert_semantic
+
+    settings = get_settings()
+    parser = argparse.ArgumentParser(description="Build the DistilBERT template embedding index")
+    parser.add_argument("--output-dir", default=settings.TEMPLATE_INDEX_DIR, help="Directory for the index files")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    index = distilbert_semantic.build_template_index(args.output_dir)
+    print(f"Template index {index.version}: {len(index.sentences)} templates for {index.model_name}")
+
+
+if __name__ == "__main__":
+    main()
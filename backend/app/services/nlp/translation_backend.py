@@ -0,0 +1,336 @@
+"""
+Translation Backends
+Interchangeable runtimes for the opus-mt English -> Hindi model
+
+- torch: transformers pipeline over the PyTorch Marian model (default)
+- ctranslate2: the same model converted once to a CTranslate2 artifact
+  (int8 weights by default) and run on CPU with configurable intra- and
+  inter-op threads. Serving needs ctranslate2 + the tokenizer
+  (transformers, sentencepiece), no torch, and a fraction of the memory.
+
+Both backends decode with the model's own beam size and length limit, so
+their outputs agree up to quantization error. Check that on the fixed
+sample set before switching a deploy:
+    python -m benchmarks.translation_backends
+
+Conversion step for the ctranslate2 backend (needs torch, run once per deploy):
+    python -m app.services.nlp.translation_backend
+"""
+
+from typing import Any, Dict, List, Optional, Sequence
+from collections import Counter
+from pathlib import Path
+from loguru import logger
+import json
+import math
+import os
+import shutil
+
+BACKEND_TORCH = "torch"
+BACKEND_CTRANSLATE2 = "ctranslate2"
+
+# Decoding settings saved next to a converted model (from the Marian config)
+GENERATION_FILE = "generation.json"
+DEFAULT_BEAM_SIZE = 4
+DEFAULT_MAX_LENGTH = 512
+
+try:
+    import ctranslate2
+    CTRANSLATE2_AVAILABLE = True
+except ImportError:
+    CTRANSLATE2_AVAILABLE = False
+
+
+def get_ctranslate2_model_dir(directory: str, model_name: str, compute_type: str) -> Path:
+    """Directory holding a converted model and its tokenizer"""
+    return Path(directory) / f"{model_name.replace('/', '--')}-ct2-{compute_type}"
+
+
+class TranslationBackend:
+    """Base class: load a model and translate a batch of sentence segments"""
+
+    name = "base"
+
+    def __init__(self, model_name: str):
+        self.model_name = model_name
+
+    @property
+    def model_id(self) -> str:
+        """Identifier of the exact weights in use"""
+        return self.model_name
+
+    def is_loaded(self) -> bool:
+        raise NotImplementedError
+
+    def load(self) -> "TranslationBackend":
+        raise NotImplementedError
+
+    def translate(self, segments: List[str], batch_size: int = 16) -> List[Optional[str]]:
+        """Translations in input order (None where the model returned nothing)"""
+        raise NotImplementedError
+
+    def get_info(self) -> Dict[str, Any]:
+        return {
+            "backend": self.name,
+            "model_id": self.model_id,
+            "loaded": self.is_loaded()
+        }
+
+
+class TorchTranslationBackend(TranslationBackend):
+    """transformers translation pipeline over the PyTorch Marian model"""
+
+    name = BACKEND_TORCH
+
+    def __init__(self, model_name: str):
+        super().__init__(model_name)
+        self.pipeline = None
+
+    def is_loaded(self) -> bool:
+        return self.pipeline is not None
+
+    def load(self) -> "TorchTranslationBackend":
+        if self.pipeline is not None:
+            return self
+
+        from transformers import pipeline, AutoModelForSeq2SeqLM, AutoTokenizer
+
+        logger.info(f"Loading translation model: {self.model_name}")
+        tokenizer = AutoTokenizer.from_pretrained(self.model_name)
+        model = AutoModelForSeq2SeqLM.from_pretrained(self.model_name)
+        self.pipeline = pipeline("translation", model=model, tokenizer=tokenizer)  # type: ignore[call-overload]
+        logger.info("Translation model loaded successfully")
+        return self
+
+    def translate(self, segments: List[str], batch_size: int = 16) -> List[Optional[str]]:
+        self.load()
+
+        # Pipeline output is [{'translation_text': '...'}, ...] in input order
+        translations: List[Optional[str]] = []
+        for result in self.pipeline(segments, batch_size=batch_size, truncation=True):
+            if isinstance(result, list):
+                result = result[0] if result else None
+            if isinstance(result, dict) and result.get("translation_text"):
+                translations.append(result["translation_text"])
+            else:
+                translations.append(None)
+        return translations
+
+
+class CTranslate2TranslationBackend(TranslationBackend):
+    """CTranslate2 translator over a converted (int8 by default) Marian model, CPU only"""
+
+    name = BACKEND_CTRANSLATE2
+
+    def __init__(
+        self,
+        model_name: str,
+        model_dir: str,
+        compute_type: str = "int8",
+        intra_threads: int = 0,
+        inter_threads: int = 1
+    ):
+        super().__init__(model_name)
+        self.model_dir = get_ctranslate2_model_dir(model_dir, model_name, compute_type)
+        self.compute_type = compute_type
+        self.intra_threads = intra_threads
+        self.inter_threads = inter_threads
+        self.beam_size = DEFAULT_BEAM_SIZE
+        self.max_length = DEFAULT_MAX_LENGTH
+        self.translator = None
+        self.tokenizer = None
+
+    @property
+    def model_id(self) -> str:
+        return f"{self.model_name}@ct2-{self.compute_type}"
+
+    def is_loaded(self) -> bool:
+        return self.translator is not None
+
+    def load(self) -> "CTranslate2TranslationBackend":
+        if self.translator is not None:
+            return self
+
+        if not CTRANSLATE2_AVAILABLE:
+            raise RuntimeError("ctranslate2 is not installed (required for TRANSLATION_BACKEND=ctranslate2)")
+        if not (self.model_dir / "model.bin").exists():
+            raise RuntimeError(
+                f"CTranslate2 model not found at {self.model_dir}; "
+                f"run `python -m app.services.nlp.translation_backend` to convert it"
+            )
+
+        from transformers import AutoTokenizer
+
+        logger.info(f"Loading CTranslate2 translation model: {self.model_dir}")
+        generation_path = self.model_dir / GENERATION_FILE
+        if generation_path.exists():
+            generation = json.loads(generation_path.read_text(encoding="utf-8"))
+            self.beam_size = generation.get("num_beams") or DEFAULT_BEAM_SIZE
+            self.max_length = generation.get("max_length") or DEFAULT_MAX_LENGTH
+
+        translator = ctranslate2.Translator(
+            str(self.model_dir),
+            device="cpu",
+            compute_type=self.compute_type,
+            intra_threads=self.intra_threads,
+            inter_threads=self.inter_threads
+        )
+        self.tokenizer = AutoTokenizer.from_pretrained(str(self.model_dir))
+        self.translator = translator
+        logger.info(
+            f"CTranslate2 translation model loaded ({self.compute_type}, "
+            f"intra_threads={self.intra_threads or 'auto'}, inter_threads={self.inter_threads})"
+        )
+        return self
+
+    def translate(self, segments: List[str], batch_size: int = 16) -> List[Optional[str]]:
+        self.load()
+
+        source = [
+            self.tokenizer.convert_ids_to_tokens(self.tokenizer.encode(segment, truncation=True, max_length=self.max_length))
+            for segment in segments
+        ]
+        results = self.translator.translate_batch(
+            source,
+            max_batch_size=batch_size,
+            beam_size=self.beam_size,
+            max_decoding_length=self.max_length
+        )
+
+        translations: List[Optional[str]] = []
+        for result in results:
+            tokens = result.hypotheses[0] if result.hypotheses else []
+            text = self.tokenizer.decode(self.tokenizer.convert_tokens_to_ids(tokens), skip_special_tokens=True)
+            translations.append(text or None)
+        return translations
+
+    def get_info(self) -> Dict[str, Any]:
+        return {
+            **super().get_info(),
+            "model_path": str(self.model_dir),
+            "compute_type": self.compute_type,
+            "intra_threads": self.intra_threads,
+            "inter_threads": self.inter_threads
+        }
+
+
+def create_backend(
+    backend: str,
+    model_name: str,
+    model_dir: str = "data/models",
+    compute_type: str = "int8",
+    intra_threads: int = 0,
+    inter_threads: int = 1
+) -> TranslationBackend:
+    """Instantiate (without loading) the named translation backend"""
+    if backend == BACKEND_TORCH:
+        return TorchTranslationBackend(model_name)
+    if backend == BACKEND_CTRANSLATE2:
+        return CTranslate2TranslationBackend(
+            model_name, model_dir, compute_type=compute_type,
+            intra_threads=intra_threads, inter_threads=inter_threads
+        )
+    raise ValueError(f"Unknown translation backend: {backend!r} (expected 'torch' or 'ctranslate2')")
+
+
+def convert_ctranslate2_model(model_name: str, directory: str, compute_type: str = "int8") -> Path:
+    """
+    Convert the Marian model to CTranslate2 with the given weight
+    quantization and save the tokenizer and decoding settings alongside it.
+    Requires torch, transformers and ctranslate2.
+
+    Returns the directory the ctranslate2 backend will load.
+    """
+    from ctranslate2.converters import TransformersConverter
+    from transformers import AutoConfig, AutoTokenizer
+
+    output_dir = get_ctranslate2_model_dir(directory, model_name, compute_type)
+    tmp_dir = output_dir.with_name(f".{output_dir.name}.{os.getpid()}.tmp")
+    if tmp_dir.exists():
+        shutil.rmtree(tmp_dir)
+
+    TransformersConverter(model_name).convert(str(tmp_dir), quantization=compute_type)
+    AutoTokenizer.from_pretrained(model_name).save_pretrained(str(tmp_dir))
+    config = AutoConfig.from_pretrained(model_name)
+    (tmp_dir / GENERATION_FILE).write_text(json.dumps({
+        "num_beams": getattr(config, "num_beams", None) or DEFAULT_BEAM_SIZE,
+        "max_length": getattr(config, "max_length", None) or DEFAULT_MAX_LENGTH
+    }), encoding="utf-8")
+
+    if output_dir.exists():
+        shutil.rmtree(output_dir)
+    os.replace(tmp_dir, output_dir)
+    logger.info(f"CTranslate2 model converted ({compute_type}): {output_dir}")
+    return output_dir
+
+
+# =============================================================================
+# REGRESSION CHECK
+# =============================================================================
+
+def _ngrams(tokens: Sequence[str], n: int) -> Counter:
+    return Counter(tuple(tokens[i:i + n]) for i in range(len(tokens) - n + 1))
+
+
+def corpus_bleu(hypotheses: Sequence[str], references: Sequence[str], max_n: int = 4) -> float:
+    """
+    Corpus BLEU (0-100) with one reference per sentence, whitespace tokens,
+    uniform n-gram weights and the standard brevity penalty. Unsmoothed, so
+    it is 0 when a corpus shares no n-gram of some order with its references.
+    """
+    matches = [0] * max_n
+    totals = [0] * max_n
+    hypothesis_length = reference_length = 0
+
+    for hypothesis, reference in zip(hypotheses, references):
+        hypothesis_tokens = hypothesis.split()
+        reference_tokens = reference.split()
+        hypothesis_length += len(hypothesis_tokens)
+        reference_length += len(reference_tokens)
+        for n in range(1, max_n + 1):
+            hypothesis_ngrams = _ngrams(hypothesis_tokens, n)
+            reference_ngrams = _ngrams(reference_tokens, n)
+            matches[n - 1] += sum(min(count, reference_ngrams[gram]) for gram, count in hypothesis_ngrams.items())
+            totals[n - 1] += max(len(hypothesis_tokens) - n + 1, 0)
+
+    if not hypothesis_length or not all(matches):
+        return 0.0
+
+    log_precision = sum(math.log(m / t) for m, t in zip(matches, totals)) / max_n
+    brevity = 1.0 if hypothesis_length > reference_length else math.exp(1 - reference_length / hypothesis_length)
+    return round(100 * brevity * math.exp(log_precision), 2)
+
+
+def compare_translations(candidate: Sequence[str], reference: Sequence[str]) -> Dict[str, Any]:
+    """Exact-match rate and BLEU of one backend's output against another's"""
+    normalized = [(" ".join(c.split()), " ".join(r.split())) for c, r in zip(candidate, reference)]
+    exact = sum(1 for c, r in normalized if c == r)
+    return {
+        "samples": len(normalized),
+        "exact_match": round(exact / len(normalized), 4) if normalized else 0.0,
+        "bleu": corpus_bleu([c for c, _ in normalized], [r for _, r in normalized])
+    }
+
+
+def main() -> None:
+    """Conversion step: write the model used by TRANSLATION_BACKEND=ctranslate2"""
+    import argparse
+    from app.config import get_settings
+    from app.services.nlp.translator import MODEL_NAME
+
+    settings = get_settings()
+    parser = argparse.ArgumentParser(description="Convert the opus-mt translation model for the ctranslate2 backend")
+    parser.add_argument("--output-dir", default=settings.TRANSLATION_MODEL_DIR, help="Directory for converted models")
+    parser.add_argument("--model", default=MODEL_NAME, help="Hugging Face model name")
+    parser.add_argument(
+        "--compute-type", default=settings.TRANSLATION_COMPUTE_TYPE,
+        help="Weight quantization: int8, int8_float32, int16, float16 or float32"
+    )
+    args = parser.parse_args()
+
+    path = convert_ctranslate2_model(args.model, args.output_dir, compute_type=args.compute_type)
+    print(f"CTranslate2 model for {args.model}: {path}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,74 @@
+"""
+Translation Memory
+In-process LRU cache of translated sentence segments
+
+- Keys are source segments with whitespace collapsed (case is kept: it
+  changes the translation of names and acronyms)
+- Bounded by entry count; least-recently-used segments are evicted first
+- Boilerplate sentences ("Kindly provide the information at the earliest")
+  recur in most drafts, so repeated requests skip the seq2seq model
+- Hit, miss and eviction counters for monitoring
+"""
+
+from typing import Any, Dict, Optional
+from collections import OrderedDict
+import threading
+
+
+def normalize_segment(segment: str) -> str:
+    """Collapse whitespace (the model input and the cache key)"""
+    return " ".join(segment.split())
+
+
+class TranslationMemory:
+    """Thread-safe LRU map of normalized source segment -> translation"""
+
+    def __init__(self, max_entries: int):
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[str, str]" = OrderedDict()
+        self._lock = threading.Lock()
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, segment: str) -> Optional[str]:
+        """Translation of a normalized segment, refreshing its LRU position"""
+        with self._lock:
+            translation = self._entries.get(segment)
+            if translation is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(segment)
+            self.hits += 1
+            return translation
+
+    def put(self, segment: str, translation: str) -> None:
+        if self.max_entries <= 0:
+            return
+        with self._lock:
+            self._entries[segment] = translation
+            self._entries.move_to_end(segment)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Memory size and hit/miss/eviction counters"""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0
+            }
@@ -2,52 +2,255 @@
 Translator Service
 Handles translation between supported languages using Hugging Face Transformers.
 Specifically designed for English <-> Hindi translation.
+The model runs on the backend chosen by TRANSLATION_BACKEND (see
+translation_backend: PyTorch, or an int8 CTranslate2 conversion).
+
+Text is split on sentence boundaries (segment_text), so no segment is cut
+mid-sentence or overruns the model's token window. All segments of all
+texts of a request go through one batched model call (translate_many),
+and translated segments are kept in a bounded translation memory, so
+recurring boilerplate sentences are not translated again. Concurrent
+identical model calls (duplicate requests) run once.
 
 Note: Requires transformers package. Falls back to original text if unavailable.
 """
 
+from typing import List, Optional, Tuple
 from loguru import logger
-import functools
-import os
+import re
+import textwrap
+import threading
+
+from app.services.single_flight import get_single_flight
+
+from .translation_memory import TranslationMemory, normalize_segment
+
+from .translation_backend import TranslationBackend, create_backend
 
 # Try to import transformers, but don't fail if it's not available
 try:
-    from transformers import pipeline, AutoModelForSeq2SeqLM, AutoTokenizer
+    import transformers  # noqa: F401 (tokenizers for every backend)
     TRANSFORMERS_AVAILABLE = True
 except ImportError:
     TRANSFORMERS_AVAILABLE = False
     logger.warning("transformers package not available. Translation features disabled.")
 
-# Global cache for pipeline
-_translator_pipeline = None
-_model_name = "Helsinki-NLP/opus-mt-en-hi"
+MODEL_NAME = "Helsinki-NLP/opus-mt-en-hi"
+
+# Global cache for the backend (torch pipeline or CTranslate2)
+_backend: Optional[TranslationBackend] = None
+_backend_lock = threading.Lock()
+
+_translation_memory: Optional[TranslationMemory] = None
+_translation_memory_lock = threading.Lock()
+
+# Sentence end (., !, ?, Devanagari danda; closing quotes/brackets) before
+# whitespace, or a line break
+_SEGMENT_BREAK = re.compile(r'[.!?\u0964]+["\')\]]*(?P<space>\s+)|(?P<newline>\s*\n\s*)')
+_CLAUSE_BREAK = re.compile(r'(?<=[,;:])\s+')
+_LAST_WORD = re.compile(r'[\w.]+$')
+
+# Words whose trailing "." does not end a sentence ("No. 45", "Rs. 10/-")
+ABBREVIATIONS = frozenset({
+    "no", "nos", "rs", "mr", "mrs", "ms", "dr", "sh", "smt", "shri", "st", "sr", "jr",
+    "vs", "etc", "govt", "dept", "ref", "approx", "e.g", "i.e", "w.e.f", "u/s", "sec"
+})
 
-def get_translator():
+def get_translation_backend() -> TranslationBackend:
+    """Get the configured translation backend (not loaded yet)"""
+    global _backend
+
+    if _backend is None:
+        with _backend_lock:
+            if _backend is None:
+                from app.config import get_settings
+                settings = get_settings()
+                _backend = create_backend(
+                    settings.TRANSLATION_BACKEND,
+                    MODEL_NAME,
+                    model_dir=settings.TRANSLATION_MODEL_DIR,
+                    compute_type=settings.TRANSLATION_COMPUTE_TYPE,
+                    intra_threads=settings.TRANSLATION_INTRA_THREADS,
+                    inter_threads=settings.TRANSLATION_INTER_THREADS
+                )
+
+    return _backend
+
+
+def get_translator() -> Optional[TranslationBackend]:
     """
-    Get or load the translation pipeline.
+    Get or load the translation backend.
     Uses Singleton pattern to avoid reloading model.
-    Returns None if transformers not available.
+    Returns None if transformers not available or the model fails to load.
     """
-    global _translator_pipeline
-    
     if not TRANSFORMERS_AVAILABLE:
         return None
-    
-    if _translator_pipeline is not None:
-        return _translator_pipeline
-        
+
+    backend = get_translation_backend()
+    if backend.is_loaded():
+        return backend
+
     try:
-        logger.info(f"Loading translation model: {_model_name}")
-        # Use a local cache directory if possible to be nice to the filesystem
-        tokenizer = AutoTokenizer.from_pretrained(_model_name)
-        model = AutoModelForSeq2SeqLM.from_pretrained(_model_name)
-        _translator_pipeline = pipeline("translation", model=model, tokenizer=tokenizer)  # type: ignore[call-overload]
-        logger.info("Translation model loaded successfully")
-        return _translator_pipeline
+        with _backend_lock:
+            backend.load()
+        return backend
     except Exception as e:
-        logger.error(f"Failed to load translation model {_model_name}: {e}")
+        logger.error(f"Failed to load translation model {backend.model_id}: {e}")
         return None
 
+
+def get_translation_memory() -> TranslationMemory:
+    """Get the in-process translation memory (sized from settings on first use)"""
+    global _translation_memory
+
+    if _translation_memory is None:
+        with _translation_memory_lock:
+            if _translation_memory is None:
+                from app.config import get_settings
+                _translation_memory = TranslationMemory(get_settings().TRANSLATION_MEMORY_SIZE)
+
+    return _translation_memory
+
+
+def _is_sentence_end(text: str, start: int, match: "re.Match") -> bool:
+    """Whether a "." break is a real sentence end, not an abbreviation or initial"""
+    punctuation = match.group()[:match.start("space") - match.start()]
+    following = text[match.end():match.end() + 1]
+    if punctuation.rstrip("\"')]") != ".":
+        return True
+    if following.islower() or following.isdigit():
+        return False
+    word = _LAST_WORD.search(text, start, match.start())
+    if word is None:
+        return True
+    word = word.group().lower()
+    return word not in ABBREVIATIONS and not (len(word) == 1 and word.isalpha())
+
+
+def _add_segment(segments: List[Tuple[str, str]], sentence: str, separator: str, max_chars: int) -> None:
+    """Append a sentence, splitting it at clauses (then words) if it is too long"""
+    if len(sentence) <= max_chars:
+        segments.append((sentence, separator))
+        return
+
+    pieces: List[str] = []
+    for clause in _CLAUSE_BREAK.split(sentence):
+        if pieces and len(pieces[-1]) + 1 + len(clause) <= max_chars:
+            pieces[-1] += " " + clause
+        elif len(clause) <= max_chars:
+            pieces.append(clause)
+        else:
+            pieces.extend(textwrap.wrap(clause, width=max_chars, break_long_words=False))
+
+    segments.extend((piece, " ") for piece in pieces[:-1])
+    segments.append((pieces[-1], separator))
+
+
+def segment_text(text: str, max_chars: int = 400) -> List[Tuple[str, str]]:
+    """
+    Split text into (segment, following whitespace) pairs.
+    Segments are sentences or lines, at most max_chars long (longer
+    sentences are split at clauses, then words). Joining the pairs gives
+    back the text, except for whitespace between the parts of a split sentence.
+    """
+    segments: List[Tuple[str, str]] = []
+    start = 0
+
+    for match in _SEGMENT_BREAK.finditer(text):
+        if match.group("newline") is not None:
+            end = match.start()
+        elif "\n" in match.group("space") or _is_sentence_end(text, start, match):
+            end = match.start("space")
+        else:
+            continue
+        if end > start:
+            _add_segment(segments, text[start:end], match.group(match.lastgroup), max_chars)
+        elif segments:
+            segments[-1] = (segments[-1][0], segments[-1][1] + match.group(match.lastgroup))
+        else:
+            segments.append(("", match.group(match.lastgroup)))
+        start = match.end()
+
+    if start < len(text):
+        tail = text[start:]
+        sentence = tail.rstrip()
+        _add_segment(segments, sentence, tail[len(sentence):], max_chars)
+
+    return segments
+
+
+def _needs_translation(segment: str) -> bool:
+    # Numbers, separators and the like are kept as they are
+    return sum(c.isalpha() for c in segment) >= 2
+
+
+def _translate_segments(segments: List[str]) -> List[Optional[str]]:
+    """One batched model call; None for segments that could not be translated"""
+    backend = get_translator()
+    if not backend:
+        return [None] * len(segments)
+
+    from app.config import get_settings
+
+    try:
+        return backend.translate(segments, batch_size=get_settings().TRANSLATION_BATCH_SIZE)
+    except Exception as e:
+        logger.error(f"Translation error during processing: {e}")
+        return [None] * len(segments)
+
+
+def translate_many(texts: List[Optional[str]]) -> List[Optional[str]]:
+    """
+    Translate several English texts to Hindi with one batched model call.
+    Segments already in the translation memory are not sent to the model.
+    A text is returned unchanged if any of its segments fails to translate.
+    """
+    from app.config import get_settings
+    max_chars = get_settings().TRANSLATION_MAX_SEGMENT_CHARS
+    memory = get_translation_memory()
+
+    segmented = [segment_text(text, max_chars) if text and _needs_translation(text) else None for text in texts]
+
+    translated = {}
+    pending: List[str] = []
+    for segments in segmented:
+        for segment, _ in segments or ():
+            key = normalize_segment(segment)
+            if key in translated or not _needs_translation(key):
+                continue
+            translated[key] = memory.get(key)
+            if translated[key] is None:
+                pending.append(key)
+
+    if pending:
+        results = get_single_flight("translation").do(tuple(pending), _translate_segments, pending)
+        for key, translation in zip(pending, results):
+            translated[key] = translation
+            if translation is not None:
+                memory.put(key, translation)
+        logger.debug(f"Translated {len(pending)} segments ({len(translated) - len(pending)} from memory)")
+
+    outputs: List[Optional[str]] = []
+    for text, segments in zip(texts, segmented):
+        if segments is None:
+            outputs.append(text)
+            continue
+        parts = []
+        for segment, separator in segments:
+            key = normalize_segment(segment)
+            if _needs_translation(key):
+                if translated[key] is None:
+                    parts = None
+                    break
+                parts.append(translated[key])
+            else:
+                parts.append(segment)
+            parts.append(separator)
+        outputs.append("".join(parts) if parts is not None else text)
+
+    return outputs
+
+
 def translate_to_hindi(text: str) -> str:
     """
     Translate English text to Hindi.
@@ -55,39 +258,5 @@ def translate_to_hindi(text: str) -> str:
     """
     if not text or not text.strip():
         return text
-    
-    # If text contains very few alphabetic characters, return as is (e.g. numbers, separators)
-    if sum(c.isalpha() for c in text) < 2:
-        return text
 
-    pipeline_instance = get_translator()
-    if not pipeline_instance:
-        return text
-    
-    try:
-        # Handle long text by splitting if necessary, 
-        # but for now we rely on the pipeline's truncation or simple usage headers.
-        # Check text length - opus-mt usually handles ~512 tokens.
-        # If text is very long, we might just translate the first chunk or need a splitter.
-        # For typical description (5000 chars), we might need chunking.
-        
-        # Simple chunking by newlines or crude length
-        import textwrap
-        chunks = textwrap.wrap(text, width=1000, break_long_words=False, replace_whitespace=False)
-        
-        translated_chunks = []
-        for chunk in chunks:
-            # Pipeline is typically [ {'translation_text': '...'} ]
-            result = pipeline_instance(chunk)
-            if result and isinstance(result, list) and 'translation_text' in result[0]:
-                # Clean up the output slightly
-                trans = result[0]['translation_text']
-                translated_chunks.append(trans)
-            else:
-                translated_chunks.append(chunk) # Fallback for chunk
-        
-        return " ".join(translated_chunks)
-        
-    except Exception as e:
-        logger.error(f"Translation error during processing: {e}")
-        return text
+    return translate_many([text])[0]
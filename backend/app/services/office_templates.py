@@ -0,0 +1,308 @@
+"""
+Office Templates
+Renders DOCX and XLSX downloads from prebuilt base packages
+
+DOCX and XLSX files are ZIP archives of XML parts. Everything except the
+document body (word/document.xml) and the two tracker sheets
+(xl/worksheets/sheet1.xml, sheet2.xml) is identical for every download:
+styles, theme, fonts, settings, relationships.
+
+The base packages in app/templates/office/ hold those parts. They are
+loaded once: each unchanged part is deflated once and its compressed bytes
+are copied verbatim into every output ZIP. Only the body / sheet XML is
+generated (escaped text, no python-docx or openpyxl objects) and deflated
+per document.
+
+Rebuild the base packages (needs python-docx and openpyxl):
+    python -m app.services.office_templates --build
+"""
+
+from typing import Any, BinaryIO, Dict, Iterable, List, Optional, Tuple
+from pathlib import Path
+from xml.sax.saxutils import escape
+import argparse
+import re
+import threading
+import zipfile
+
+from app.services.zip_writer import ZipPart, deflate_part, write_zip
+
+OFFICE_TEMPLATE_DIR = Path(__file__).parent.parent / "templates" / "office"
+BASE_DOCX = "base.docx"
+BASE_XLSX = "base.xlsx"
+
+DOCX_BODY_PART = "word/document.xml"
+XLSX_SHEET_PARTS = ("xl/worksheets/sheet1.xml", "xl/worksheets/sheet2.xml")
+
+# Where generated XML goes in each replaceable part
+_BODY_MARKER = "<w:sectPr"
+_SHEET_DATA_MARKER = "<sheetData/>"
+
+# Cell style (cellXfs) indices of the base workbook, fixed by build_base_packages()
+XLSX_STYLES = {"title": 1, "header": 2, "label": 3, "hint": 4}
+
+# Font used for Devanagari (complex script) text in DOCX
+DOCX_COMPLEX_SCRIPT_FONT = "Mangal"
+
+# Characters XML 1.0 does not allow (python-docx / openpyxl reject them)
+_ILLEGAL_XML_CHARS = re.compile("[\x00-\x08\x0b\x0c\x0e-\x1f\ufffe\uffff]")
+
+# =============================================================================
+# BASE PACKAGES
+# =============================================================================
+
+class BasePackage:
+    """A base DOCX/XLSX: pre-deflated unchanged parts plus the XML of replaceable parts"""
+
+    def __init__(self, path: Path, replaceable: Dict[str, str]):
+        self.path = path
+        self.parts: List[Tuple[str, Optional[ZipPart]]] = []
+        self.templates: Dict[str, str] = {}
+
+        with zipfile.ZipFile(path) as archive:
+            for info in archive.infolist():
+                data = archive.read(info)
+                if info.filename in replaceable:
+                    xml = data.decode("utf-8")
+                    if replaceable[info.filename] not in xml:
+                        raise ValueError(f"{path.name}:{info.filename} has no {replaceable[info.filename]} marker")
+                    self.templates[info.filename] = xml
+                    self.parts.append((info.filename, None))
+                else:
+                    self.parts.append((info.filename, deflate_part(info.filename, data)))
+
+        missing = set(replaceable) - set(self.templates)
+        if missing:
+            raise ValueError(f"Base package {path.name} is missing parts: {sorted(missing)}")
+
+    def render(self, out: BinaryIO, generated: Dict[str, str]) -> None:
+        """Write the package with the replaceable parts set to generated XML"""
+        write_zip(out, (
+            part if part is not None else deflate_part(name, generated[name].encode("utf-8"))
+            for name, part in self.parts
+        ))
+
+
+_packages: Dict[str, BasePackage] = {}
+_packages_lock = threading.Lock()
+
+
+def get_base_package(name: str) -> BasePackage:
+    """Load a base package once per process"""
+    package = _packages.get(name)
+    if package is None:
+        with _packages_lock:
+            package = _packages.get(name)
+            if package is None:
+                if name == BASE_DOCX:
+                    replaceable = {DOCX_BODY_PART: _BODY_MARKER}
+                else:
+                    replaceable = {part: _SHEET_DATA_MARKER for part in XLSX_SHEET_PARTS}
+                package = BasePackage(OFFICE_TEMPLATE_DIR / name, replaceable)
+                _packages[name] = package
+    return package
+
+
+def xml_text(value: Any) -> str:
+    """Escape text for an XML element, dropping characters XML cannot hold"""
+    return escape(_ILLEGAL_XML_CHARS.sub("", str(value)))
+
+
+# =============================================================================
+# DOCX
+# =============================================================================
+
+_BODY_LINE_SPACING = '<w:pPr><w:spacing w:line="360" w:lineRule="auto"/></w:pPr>'
+_SUBJECT_SPACING = '<w:pPr><w:spacing w:after="240"/></w:pPr>'
+_BOLD = '<w:rPr><w:b/><w:bCs/></w:rPr>'
+_FOOTER = '<w:rPr><w:i/><w:iCs/><w:sz w:val="18"/><w:szCs w:val="18"/></w:rPr>'
+
+
+def _docx_run(text: str, run_properties: str = "") -> str:
+    """A run; tabs become <w:tab/> as python-docx does"""
+    pieces = [
+        f'<w:t xml:space="preserve">{xml_text(piece)}</w:t>' if piece else ""
+        for piece in text.split("\t")
+    ]
+    return f'<w:r>{run_properties}{"<w:tab/>".join(pieces)}</w:r>'
+
+
+def docx_body(draft_text: str, generated_on: Optional[str]) -> str:
+    """
+    Paragraph XML of the letter: same structure as the former python-docx
+    output (bold "To," and subject, 1.5 line spacing, small italic footer).
+    """
+    paragraphs = []
+
+    for line in draft_text.strip().split('\n'):
+        line = line.strip()
+
+        if not line:
+            paragraphs.append('<w:p/>')
+        elif line.lower().startswith('subject:'):
+            paragraphs.append(f'<w:p>{_SUBJECT_SPACING}{_docx_run(line, _BOLD)}</w:p>')
+        elif line == 'To,' or line == 'To':
+            paragraphs.append(f'<w:p>{_docx_run("To,", _BOLD)}</w:p>')
+        else:
+            paragraphs.append(f'<w:p>{_BODY_LINE_SPACING}{_docx_run(line)}</w:p>')
+
+    if generated_on is not None:
+        paragraphs.append('<w:p/>')
+        paragraphs.append(f'<w:p>{_docx_run(f"Generated on: {generated_on}", _FOOTER)}</w:p>')
+
+    return "".join(paragraphs)
+
+
+def render_docx(out: BinaryIO, draft_text: str, generated_on: Optional[str]) -> None:
+    """Write a DOCX of the letter to out"""
+    package = get_base_package(BASE_DOCX)
+    template = package.templates[DOCX_BODY_PART]
+
+    # The base body holds only the section properties; paragraphs go before them
+    split_at = template.index(_BODY_MARKER)
+    document = template[:split_at] + docx_body(draft_text, generated_on) + template[split_at:]
+
+    package.render(out, {DOCX_BODY_PART: document})
+
+
+# =============================================================================
+# XLSX
+# =============================================================================
+
+class SheetWriter:
+    """Builds <sheetData> and <mergeCells> of one worksheet"""
+
+    def __init__(self):
+        self.rows: List[str] = []
+        self.merges: List[str] = []
+
+    def row(self, number: int, cells: Iterable[Tuple[str, Any, Optional[str]]]) -> None:
+        """Add row `number` with (column, value, style) cells; empty values keep only their style"""
+        xml = []
+        for column, value, style in cells:
+            ref = f"{column}{number}"
+            style_attr = f' s="{XLSX_STYLES[style]}"' if style else ""
+            if value is None or value == "":
+                if style:
+                    xml.append(f'<c r="{ref}"{style_attr}/>')
+                continue
+            text = xml_text(value)
+            space = ' xml:space="preserve"' if text != text.strip() else ""
+            xml.append(f'<c r="{ref}"{style_attr} t="inlineStr"><is><t{space}>{text}</t></is></c>')
+        if xml:
+            self.rows.append(f'<row r="{number}">{"".join(xml)}</row>')
+
+    def merge(self, ref: str) -> None:
+        self.merges.append(f'<mergeCell ref="{ref}"/>')
+
+    def render(self, template: str) -> str:
+        """The worksheet XML: the base sheet with its empty <sheetData/> filled in"""
+        data = f'<sheetData>{"".join(self.rows)}</sheetData>'
+        if self.merges:
+            data += f'<mergeCells count="{len(self.merges)}">{"".join(self.merges)}</mergeCells>'
+        return template.replace(_SHEET_DATA_MARKER, data, 1)
+
+
+def render_xlsx(out: BinaryIO, tracker: SheetWriter, draft: SheetWriter) -> None:
+    """Write the tracker workbook (tracking sheet + draft content sheet) to out"""
+    package = get_base_package(BASE_XLSX)
+    package.render(out, {
+        name: sheet.render(package.templates[name])
+        for name, sheet in zip(XLSX_SHEET_PARTS, (tracker, draft))
+    })
+
+
+# =============================================================================
+# BUILDING THE BASE PACKAGES
+# =============================================================================
+
+def build_base_packages(directory: Path = OFFICE_TEMPLATE_DIR) -> None:
+    """
+    Create base.docx and base.xlsx with python-docx / openpyxl.
+    Only needed when the fixed parts (styles, fonts, column widths) change.
+    """
+    from docx import Document
+    from docx.oxml.ns import qn
+    from docx.oxml import OxmlElement
+    from docx.shared import Pt
+    from openpyxl import Workbook
+    from openpyxl.styles import Font
+
+    directory.mkdir(parents=True, exist_ok=True)
+
+    # DOCX: default template, Times New Roman 12pt, Devanagari font for Hindi
+    doc = Document()
+    normal = doc.styles['Normal']
+    normal.font.name = 'Times New Roman'  # type: ignore[union-attr]
+    normal.font.size = Pt(12)  # type: ignore[union-attr]
+    rpr = normal.element.get_or_add_rPr()
+    rpr.get_or_add_rFonts().set(qn('w:cs'), DOCX_COMPLEX_SCRIPT_FONT)
+    size_cs = OxmlElement('w:szCs')
+    size_cs.set(qn('w:val'), '24')
+    rpr.append(size_cs)
+    lang = OxmlElement('w:lang')
+    lang.set(qn('w:bidi'), 'hi-IN')
+    rpr.append(lang)
+    doc.core_properties.author = "RTI & Public Complaint Generator"
+    doc.save(str(directory / BASE_DOCX))
+
+    # XLSX: two empty sheets with column widths, plus the cell styles
+    wb = Workbook()
+    tracker = wb.active
+    tracker.title = "Application Tracker"
+    for column, width in (('A', 25), ('B', 40), ('C', 20), ('D', 20)):
+        tracker.column_dimensions[column].width = width
+    draft = wb.create_sheet("Draft Content")
+    draft.column_dimensions['A'].width = 100
+
+    # Register the styles in XLSX_STYLES order on a scratch sheet, then drop it
+    scratch = wb.create_sheet("styles")
+    fonts = {
+        "title": Font(bold=True, size=14),
+        "header": Font(bold=True, size=12),
+        "label": Font(bold=True),
+        "hint": Font(italic=True, color="808080"),
+    }
+    for row, (name, font) in enumerate(fonts.items(), start=1):
+        cell = scratch.cell(row=row, column=1, value=name)
+        cell.font = font
+        if cell.style_id != XLSX_STYLES[name]:
+            raise RuntimeError(f"Style {name} got index {cell.style_id}, expected {XLSX_STYLES[name]}")
+    wb.remove(scratch)
+    wb.properties.creator = "RTI & Public Complaint Generator"
+    wb.save(str(directory / BASE_XLSX))
+
+    # Drop the placeholder dimension of the empty sheets (it is optional) and
+    # leave a single <sheetData/> marker for SheetWriter to fill in
+    _rewrite_parts(directory / BASE_XLSX, {
+        name: lambda xml: re.sub(r'<dimension ref="[^"]*"/>', "", xml).replace("<sheetData></sheetData>", _SHEET_DATA_MARKER)
+        for name in XLSX_SHEET_PARTS
+    })
+
+
+def _rewrite_parts(path: Path, rewrites: Dict[str, Any]) -> None:
+    with zipfile.ZipFile(path) as archive:
+        entries = [(info.filename, archive.read(info)) for info in archive.infolist()]
+    with zipfile.ZipFile(path, "w", zipfile.ZIP_DEFLATED) as archive:
+        for name, data in entries:
+            if name in rewrites:
+                data = rewrites[name](data.decode("utf-8")).encode("utf-8")
+            archive.writestr(name, data)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Build the base DOCX/XLSX packages used for downloads")
+    parser.add_argument("--build", action="store_true", help="(Re)build the base packages")
+    parser.add_argument("--output-dir", default=str(OFFICE_TEMPLATE_DIR), help="Directory to write them to")
+    args = parser.parse_args()
+
+    if not args.build:
+        parser.print_help()
+        return
+
+    build_base_packages(Path(args.output_dir))
+    print(f"Base packages written to {args.output_dir}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,284 @@
+"""
+Rate Limiter
+GCRA (generic cell rate algorithm) limiter with constant per-client state
+
+Each client is one float, its theoretical arrival time (TAT). A request is
+allowed if it does not push the TAT more than one window ahead of now,
+which is equivalent to a token bucket of `limit` tokens refilled evenly over
+`window` seconds. No per-request timestamps are kept.
+
+Backends (RATE_LIMIT_BACKEND):
+- memory: in-process, sharded dicts with one lock per shard, LRU-capped
+- sqlite: one SQLite file shared by every worker process on the host;
+  checks block on the file lock, so callers run them off the event loop
+
+Entries whose TAT has passed carry no state (a fresh client looks the same),
+so they are evicted periodically without changing any decision.
+"""
+
+from typing import Any, Callable, Dict, List, Optional, Tuple
+from collections import OrderedDict
+from dataclasses import dataclass
+from pathlib import Path
+from loguru import logger
+import math
+import sqlite3
+import threading
+import time
+import zlib
+
+DEFAULT_SHARDS = 16
+
+
+@dataclass
+class RateLimitDecision:
+    """Outcome of one rate limit check"""
+    allowed: bool
+    limit: int
+    remaining: int
+    retry_after: float      # Seconds until the next request would be allowed (0 if allowed)
+    reset_after: float      # Seconds until the full quota is available again
+
+
+def gcra_update(tat: Optional[float], now: float, limit: int, window: float) -> Tuple[RateLimitDecision, Optional[float]]:
+    """
+    Apply one request to a client's TAT.
+
+    Returns the decision and the new TAT to store (None if rejected, in which
+    case the stored TAT is left unchanged).
+    """
+    interval = window / limit
+    tat = max(tat if tat is not None else now, now)
+    new_tat = tat + interval
+    allow_at = new_tat - window
+
+    if now < allow_at:
+        return RateLimitDecision(
+            allowed=False,
+            limit=limit,
+            remaining=0,
+            retry_after=allow_at - now,
+            reset_after=tat - now
+        ), None
+
+    remaining = int(math.floor((window - (new_tat - now)) / interval + 1e-9))
+    return RateLimitDecision(
+        allowed=True,
+        limit=limit,
+        remaining=max(0, remaining),
+        retry_after=0.0,
+        reset_after=new_tat - now
+    ), new_tat
+
+
+class RateLimitBackend:
+    """Storage of client TATs; implementations must make check() atomic per key"""
+
+    name = "base"
+
+    # True if check()/evict_idle() block on I/O or locks held by other
+    # processes (async callers then run them in a worker thread)
+    blocking = False
+
+    def check(self, key: str, now: float, limit: int, window: float) -> RateLimitDecision:
+        raise NotImplementedError
+
+    def evict_idle(self, now: float) -> int:
+        """Remove entries whose TAT has passed; returns the number removed"""
+        raise NotImplementedError
+
+    def __len__(self) -> int:
+        raise NotImplementedError
+
+    def close(self) -> None:
+        pass
+
+
+class InMemoryRateLimitBackend(RateLimitBackend):
+    """
+    Per-process backend: the client key hashes to one of N shards, each an
+    LRU-ordered dict with its own lock. Each shard holds at most
+    max_keys / N clients; beyond that the least recently seen are dropped.
+    Also the stand-in for the shared backend in tests.
+    """
+
+    name = "memory"
+
+    def __init__(self, max_keys: int = 100_000, shards: int = DEFAULT_SHARDS):
+        self.max_keys_per_shard = max(1, max_keys // shards)
+        self._shards: List["OrderedDict[str, float]"] = [OrderedDict() for _ in range(shards)]
+        self._locks = [threading.Lock() for _ in range(shards)]
+        self.overflow_evictions = 0
+
+    def _shard(self, key: str) -> int:
+        return zlib.crc32(key.encode("utf-8")) % len(self._shards)
+
+    def check(self, key: str, now: float, limit: int, window: float) -> RateLimitDecision:
+        index = self._shard(key)
+        shard = self._shards[index]
+
+        with self._locks[index]:
+            decision, new_tat = gcra_update(shard.get(key), now, limit, window)
+            if new_tat is not None:
+                shard[key] = new_tat
+                shard.move_to_end(key)
+                if len(shard) > self.max_keys_per_shard:
+                    shard.popitem(last=False)
+                    self.overflow_evictions += 1
+            return decision
+
+    def evict_idle(self, now: float) -> int:
+        removed = 0
+        for shard, lock in zip(self._shards, self._locks):
+            with lock:
+                # Shards are in last-seen order, not TAT order: a recent client
+                # with a far-future TAT can precede expired ones, so scan it all
+                expired = [key for key, tat in shard.items() if tat <= now]
+                for key in expired:
+                    del shard[key]
+                removed += len(expired)
+        return removed
+
+    def __len__(self) -> int:
+        return sum(len(shard) for shard in self._shards)
+
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS rate_limits (
+    key TEXT PRIMARY KEY,
+    tat REAL NOT NULL
+) WITHOUT ROWID
+"""
+
+# Idle eviction deletes by TAT
+_TAT_INDEX = "CREATE INDEX IF NOT EXISTS rate_limits_tat ON rate_limits (tat)"
+
+
+class SQLiteRateLimitBackend(RateLimitBackend):
+    """
+    Host-wide backend: one SQLite file (WAL) shared by all uvicorn workers.
+    Each check is a short BEGIN IMMEDIATE transaction, so concurrent
+    workers never both admit against the same TAT.
+    """
+
+    name = "sqlite"
+    blocking = True
+
+    def __init__(self, path: str):
+        self.path = Path(path)
+        self._local = threading.local()
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        conn = self._connect()
+        with conn:
+            conn.execute(_SCHEMA)
+            conn.execute(_TAT_INDEX)
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(str(self.path), timeout=2.0, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def check(self, key: str, now: float, limit: int, window: float) -> RateLimitDecision:
+        conn = self._connect()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            row = conn.execute("SELECT tat FROM rate_limits WHERE key = ?", (key,)).fetchone()
+            decision, new_tat = gcra_update(row[0] if row else None, now, limit, window)
+            if new_tat is not None:
+                conn.execute(
+                    "INSERT INTO rate_limits (key, tat) VALUES (?, ?) "
+                    "ON CONFLICT(key) DO UPDATE SET tat = excluded.tat",
+                    (key, new_tat)
+                )
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+        return decision
+
+    def evict_idle(self, now: float) -> int:
+        conn = self._connect()
+        with conn:
+            return conn.execute("DELETE FROM rate_limits WHERE tat <= ?", (now,)).rowcount
+
+    def __len__(self) -> int:
+        return self._connect().execute("SELECT COUNT(*) FROM rate_limits").fetchone()[0]
+
+    def close(self) -> None:
+        conn = getattr(self._local, "conn", None)
+        if conn is not None:
+            conn.close()
+            self._local.conn = None
+
+
+class RateLimiter:
+    """
+    Fixed limit per client over a window, on any backend.
+    Idle entries are evicted at most every evict_interval seconds, from
+    whichever request comes first after that (no extra thread or task).
+    """
+
+    def __init__(
+        self,
+        backend: RateLimitBackend,
+        limit: int,
+        window: float,
+        evict_interval: float = 60.0,
+        clock: Callable[[], float] = time.time
+    ):
+        self.backend = backend
+        self.limit = limit
+        self.window = window
+        self.evict_interval = evict_interval
+        self.clock = clock
+        self._next_eviction = clock() + evict_interval
+        self._evict_lock = threading.Lock()
+        self.allowed = 0
+        self.rejected = 0
+        self.evicted = 0
+
+    def check(self, key: str) -> RateLimitDecision:
+        now = self.clock()
+        self._maybe_evict(now)
+
+        decision = self.backend.check(key, now, self.limit, self.window)
+        if decision.allowed:
+            self.allowed += 1
+        else:
+            self.rejected += 1
+        return decision
+
+    def _maybe_evict(self, now: float) -> None:
+        if now < self._next_eviction or not self._evict_lock.acquire(blocking=False):
+            return
+        try:
+            self._next_eviction = now + self.evict_interval
+            self.evicted += self.backend.evict_idle(now)
+        except Exception as e:
+            logger.warning(f"Rate limit eviction failed: {e}")
+        finally:
+            self._evict_lock.release()
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            "backend": self.backend.name,
+            "limit": self.limit,
+            "window_seconds": self.window,
+            "clients": len(self.backend),
+            "allowed": self.allowed,
+            "rejected": self.rejected,
+            "evicted": self.evicted
+        }
+
+
+def create_rate_limit_backend(backend: str, sqlite_path: str, max_keys: int) -> RateLimitBackend:
+    """Instantiate the configured backend"""
+    if backend == InMemoryRateLimitBackend.name:
+        return InMemoryRateLimitBackend(max_keys=max_keys)
+    if backend == SQLiteRateLimitBackend.name:
+        return SQLiteRateLimitBackend(sqlite_path)
+    raise ValueError(f"Unknown rate limit backend: {backend!r} (expected 'memory' or 'sqlite')")
@@ -0,0 +1,143 @@
+"""
+Render Cache
+Short-lived cache of generated PDF/DOCX/XLSX files for /api/download
+
+Users often download the same draft several times, and in several formats.
+A repeated download is answered from here instead of a fresh ReportLab /
+python-docx / openpyxl build.
+
+Privacy: keys are keyed BLAKE2b hashes (RENDER_CACHE_KEY_SECRET, or a
+random per-process secret); memory-only by default with a short TTL. The
+optional disk tier (RENDER_CACHE_DISK_DIR) stores rendered files, so it is
+off unless explicitly configured. See byte_budget_cache for the mechanics.
+
+ETags are strong: a hash of the rendered bytes, so they change whenever the
+file does (including its "Generated on" timestamp after a re-render).
+"""
+
+from typing import Callable, Optional
+from dataclasses import dataclass
+from loguru import logger
+import hashlib
+import json
+import threading
+import time
+
+from app.services.byte_budget_cache import ByteBudgetCache
+
+
+@dataclass
+class RenderedDocument:
+    """One rendered file and its response metadata"""
+    content: bytes
+    filename: str
+    content_type: str
+    etag: str
+    generated_at: str
+    stored_at: float = 0.0
+
+    @property
+    def size(self) -> int:
+        return len(self.content)
+
+
+def compute_etag(content: bytes) -> str:
+    """Strong ETag of a rendered file"""
+    return '"' + hashlib.blake2b(content, digest_size=16).hexdigest() + '"'
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """
+    If-None-Match evaluation (weak comparison, as RFC 9110 requires for it):
+    true if any listed tag, or "*", matches.
+    """
+    if not if_none_match:
+        return False
+
+    for candidate in if_none_match.split(","):
+        candidate = candidate.strip()
+        if candidate == "*":
+            return True
+        if candidate.startswith("W/"):
+            candidate = candidate[2:]
+        if candidate == etag:
+            return True
+    return False
+
+
+class RenderCache(ByteBudgetCache[RenderedDocument]):
+    """
+    Byte-bounded LRU of rendered documents with TTL, plus an optional
+    directory of files shared by every worker on the host.
+    """
+
+    name = "Render cache"
+    disk_suffix = ".bin"
+
+    def __init__(
+        self,
+        max_bytes: int = 64 * 1024 * 1024,
+        ttl_seconds: float = 300.0,
+        disk_dir: Optional[str] = None,
+        key_secret: Optional[str] = None,
+        clock: Callable[[], float] = time.time
+    ):
+        super().__init__(max_bytes, ttl_seconds, disk_dir, key_secret, clock)
+
+    def put(self, key: str, content: bytes, filename: str, content_type: str, generated_at: str) -> RenderedDocument:
+        """Store a freshly rendered file and return it as a cache entry"""
+        entry = RenderedDocument(
+            content=content,
+            filename=filename,
+            content_type=content_type,
+            etag=compute_etag(content),
+            generated_at=generated_at,
+            stored_at=self.clock()
+        )
+        self.put_entry(key, entry)
+        return entry
+
+    def _encode(self, entry: RenderedDocument) -> bytes:
+        # One JSON header line, then the file itself
+        header = {
+            "filename": entry.filename,
+            "content_type": entry.content_type,
+            "etag": entry.etag,
+            "generated_at": entry.generated_at
+        }
+        return json.dumps(header).encode("utf-8") + b"\n" + entry.content
+
+    def _decode(self, data: bytes, stored_at: float) -> RenderedDocument:
+        header, _, content = data.partition(b"\n")
+        return RenderedDocument(content=content, stored_at=stored_at, **json.loads(header))
+
+
+_render_cache: Optional[RenderCache] = None
+_render_cache_checked = False
+_render_cache_lock = threading.Lock()
+
+
+def get_render_cache() -> Optional[RenderCache]:
+    """Get the render cache, or None if RENDER_CACHE_ENABLED is off"""
+    global _render_cache, _render_cache_checked
+
+    if not _render_cache_checked:
+        with _render_cache_lock:
+            if not _render_cache_checked:
+                from app.config import get_settings
+                settings = get_settings()
+                if settings.RENDER_CACHE_ENABLED:
+                    _render_cache = RenderCache(
+                        max_bytes=settings.RENDER_CACHE_MAX_MB * 1024 * 1024,
+                        ttl_seconds=settings.RENDER_CACHE_TTL_SECONDS,
+                        disk_dir=settings.RENDER_CACHE_DISK_DIR or None,
+                        key_secret=settings.RENDER_CACHE_KEY_SECRET or None
+                    )
+                    logger.info(
+                        f"Render cache: {settings.RENDER_CACHE_MAX_MB}MB, "
+                        f"TTL {settings.RENDER_CACHE_TTL_SECONDS}s, "
+                        f"disk tier {'on' if _render_cache.disk_dir else 'off'}"
+                    )
+                _render_cache_checked = True
+
+    return _render_cache
@@ -11,8 +11,18 @@ Components:
 - intent_rules: Document type classification (RTI/Complaint/Appeal)
 - issue_rules: Issue-to-department mapping
 - legal_triggers: RTI Act sections and grievance markers
+- keyword_index: Single-pass keyword automaton shared by all rule tables
 """
 
+from .keyword_index import (
+    KeywordIndex,
+    KeywordHit,
+    get_keyword_index,
+    scan_keywords,
+)
+
+from ..analysis_context import AnalysisContext
+
 from .intent_rules import (
     IntentType,
     DocumentSubType,
@@ -54,6 +64,12 @@ from .legal_triggers import (
 )
 
 __all__ = [
+    # Keyword index
+    "KeywordIndex",
+    "KeywordHit",
+    "get_keyword_index",
+    "scan_keywords",
+    
     # Intent rules
     "IntentType",
     "DocumentSubType",
@@ -100,9 +116,11 @@ def analyze_complete(text: str) -> dict:
     Returns:
         dict with intent, issue_mapping, and legal_analysis
     """
-    intent_result = classify_intent_detailed(text)
-    issue_result = map_issue_detailed(text)
-    legal_result = analyze_legal_context(text)
+    # One shared context so the text is lowercased and scanned once
+    context = AnalysisContext(text)
+    intent_result = classify_intent_detailed(text, context)
+    issue_result = map_issue_detailed(text, context)
+    legal_result = analyze_legal_context(text, context)
     
     return {
         "intent": intent_result.to_dict(),
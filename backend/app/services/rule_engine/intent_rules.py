@@ -11,9 +11,17 @@ Following MODEL_USAGE_POLICY:
 from typing import Tuple, Optional, List, Dict, Any
 from dataclasses import dataclass, field
 from enum import Enum
-import re
 import logging
 
+from .keyword_index import (
+    get_keyword_index,
+    group_hits,
+    KeywordHit,
+    TABLE_INTENT,
+    TABLE_SUB_TYPE,
+)
+from ..analysis_context import AnalysisContext
+
 logger = logging.getLogger(__name__)
 
 
@@ -215,27 +223,51 @@ SUB_TYPE_INDICATORS = {
 }
 
 
-def _find_keyword_matches(text: str, keywords: Dict[str, float], category: str) -> List[IntentMatch]:
-    """Find all keyword matches in text with positions"""
-    text_lower = text.lower()
-    matches = []
-    
-    for keyword, weight in keywords.items():
-        # Use word boundary matching for single words
-        if ' ' not in keyword:
-            pattern = rf'\b{re.escape(keyword)}\b'
-        else:
-            pattern = re.escape(keyword)
-        
-        for match in re.finditer(pattern, text_lower):
-            matches.append(IntentMatch(
-                keyword=keyword,
-                category=category,
-                weight=weight,
-                position=match.start()
-            ))
+# Keyword tables per intent category, in scoring order
+INTENT_KEYWORD_TABLES = {
+    "rti": RTI_KEYWORDS,
+    "complaint": COMPLAINT_KEYWORDS,
+    "appeal": APPEAL_KEYWORDS,
+    "follow_up": FOLLOW_UP_KEYWORDS,
+    "escalation": ESCALATION_KEYWORDS,
+}
+
+# Register tables with the shared keyword index
+get_keyword_index().register(
+    TABLE_INTENT,
+    [
+        (category, keyword, weight)
+        for category, keywords in INTENT_KEYWORD_TABLES.items()
+        for keyword, weight in keywords.items()
+    ],
+    word_boundary=True
+)
+get_keyword_index().register(
+    TABLE_SUB_TYPE,
+    [
+        (sub_type.value, indicator, 0.0)
+        for sub_type, indicators in SUB_TYPE_INDICATORS.items()
+        for indicator in indicators
+    ]
+)
+
+
+def _find_keyword_matches(hits: List[KeywordHit]) -> Dict[str, List[IntentMatch]]:
+    """Convert keyword index hits into intent matches, grouped by category"""
+    grouped = group_hits(hits, TABLE_INTENT)
     
-    return matches
+    return {
+        category: [
+            IntentMatch(
+                keyword=hit.keyword,
+                category=category,
+                weight=hit.weight,
+                position=hit.position
+            )
+            for hit in grouped.get(category, [])
+        ]
+        for category in INTENT_KEYWORD_TABLES
+    }
 
 
 def _calculate_weighted_score(matches: List[IntentMatch]) -> float:
@@ -255,35 +287,34 @@ def _calculate_weighted_score(matches: List[IntentMatch]) -> float:
     return confidence
 
 
-def _determine_sub_type(text: str, intent: IntentType) -> DocumentSubType:
+def _determine_sub_type(hits: List[KeywordHit], intent: IntentType) -> DocumentSubType:
     """Determine document sub-type based on content"""
-    text_lower = text.lower()
+    found = set(group_hits(hits, TABLE_SUB_TYPE))
     
     if intent == IntentType.RTI:
         for sub_type in [DocumentSubType.INSPECTION_REQUEST, 
                          DocumentSubType.RECORDS_REQUEST,
                          DocumentSubType.INFORMATION_REQUEST]:
-            indicators = SUB_TYPE_INDICATORS.get(sub_type, [])
-            if any(ind in text_lower for ind in indicators):
+            if sub_type.value in found:
                 return sub_type
         return DocumentSubType.INFORMATION_REQUEST
     
     elif intent == IntentType.COMPLAINT:
-        if any(ind in text_lower for ind in SUB_TYPE_INDICATORS[DocumentSubType.CORRUPTION_COMPLAINT]):
+        if DocumentSubType.CORRUPTION_COMPLAINT.value in found:
             return DocumentSubType.CORRUPTION_COMPLAINT
-        elif any(ind in text_lower for ind in SUB_TYPE_INDICATORS[DocumentSubType.SERVICE_COMPLAINT]):
+        elif DocumentSubType.SERVICE_COMPLAINT.value in found:
             return DocumentSubType.SERVICE_COMPLAINT
         return DocumentSubType.GRIEVANCE
     
     elif intent == IntentType.APPEAL:
-        if any(ind in text_lower for ind in SUB_TYPE_INDICATORS[DocumentSubType.SECOND_APPEAL]):
+        if DocumentSubType.SECOND_APPEAL.value in found:
             return DocumentSubType.SECOND_APPEAL
         return DocumentSubType.FIRST_APPEAL
     
     return DocumentSubType.GENERAL
 
 
-def classify_intent(text: str) -> Tuple[str, float]:
+def classify_intent(text: str, context: Optional[AnalysisContext] = None) -> Tuple[str, float]:
     """
     Classify user intent based on weighted keyword matching.
     Returns (intent, confidence)
@@ -295,23 +326,27 @@ def classify_intent(text: str) -> Tuple[str, float]:
     1. Weighted keyword match = confidence based on weights
     2. No match = unknown (defer to NLP)
     """
-    result = classify_intent_detailed(text)
+    result = classify_intent_detailed(text, context)
     return (result.intent.value, result.confidence)
 
 
-def classify_intent_detailed(text: str) -> IntentResult:
+def classify_intent_detailed(text: str, context: Optional[AnalysisContext] = None) -> IntentResult:
     """
     Detailed intent classification with full audit trail.
     Returns IntentResult with all decision information.
     """
     decision_path = []
     
+    # Keyword hits come from the shared per-request scan
+    hits = AnalysisContext.for_text(text, context).keyword_hits
+    
     # Find matches for each intent type
-    rti_matches = _find_keyword_matches(text, RTI_KEYWORDS, "rti")
-    complaint_matches = _find_keyword_matches(text, COMPLAINT_KEYWORDS, "complaint")
-    appeal_matches = _find_keyword_matches(text, APPEAL_KEYWORDS, "appeal")
-    follow_up_matches = _find_keyword_matches(text, FOLLOW_UP_KEYWORDS, "follow_up")
-    escalation_matches = _find_keyword_matches(text, ESCALATION_KEYWORDS, "escalation")
+    intent_matches = _find_keyword_matches(hits)
+    rti_matches = intent_matches["rti"]
+    complaint_matches = intent_matches["complaint"]
+    appeal_matches = intent_matches["appeal"]
+    follow_up_matches = intent_matches["follow_up"]
+    escalation_matches = intent_matches["escalation"]
     
     decision_path.append(f"Found {len(rti_matches)} RTI matches")
     decision_path.append(f"Found {len(complaint_matches)} complaint matches")
@@ -352,7 +387,7 @@ def classify_intent_detailed(text: str) -> IntentResult:
         decision_path.append("Score too low - marking as unknown")
     
     # Determine sub-type
-    sub_type = _determine_sub_type(text, best_intent)
+    sub_type = _determine_sub_type(hits, best_intent)
     decision_path.append(f"Sub-type determined: {sub_type.value}")
     
     # Should NLP be invoked?
@@ -370,18 +405,20 @@ def classify_intent_detailed(text: str) -> IntentResult:
     )
 
 
-def get_intent_suggestions(text: str, top_n: int = 3) -> List[Dict[str, Any]]:
+def get_intent_suggestions(
+    text: str,
+    top_n: int = 3,
+    context: Optional[AnalysisContext] = None
+) -> List[Dict[str, Any]]:
     """
     Get top intent suggestions with scores.
     Useful when confidence is low and user needs to choose.
     """
     # Find matches for each intent type
+    intent_matches = _find_keyword_matches(AnalysisContext.for_text(text, context).keyword_hits)
     scores = {
-        "rti": _calculate_weighted_score(_find_keyword_matches(text, RTI_KEYWORDS, "rti")),
-        "complaint": _calculate_weighted_score(_find_keyword_matches(text, COMPLAINT_KEYWORDS, "complaint")),
-        "appeal": _calculate_weighted_score(_find_keyword_matches(text, APPEAL_KEYWORDS, "appeal")),
-        "follow_up": _calculate_weighted_score(_find_keyword_matches(text, FOLLOW_UP_KEYWORDS, "follow_up")),
-        "escalation": _calculate_weighted_score(_find_keyword_matches(text, ESCALATION_KEYWORDS, "escalation")),
+        category: _calculate_weighted_score(matches)
+        for category, matches in intent_matches.items()
     }
     
     # Sort by score
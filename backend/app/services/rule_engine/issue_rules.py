@@ -11,9 +11,16 @@ Following MODEL_USAGE_POLICY:
 from typing import Dict, List, Optional, Tuple, Any
 from dataclasses import dataclass, field
 from enum import Enum
-import re
 import logging
 
+from .keyword_index import (
+    get_keyword_index,
+    group_hits,
+    unique_keywords,
+    TABLE_ISSUE,
+)
+from ..analysis_context import AnalysisContext
+
 logger = logging.getLogger(__name__)
 
 
@@ -435,14 +442,25 @@ ISSUE_DEPARTMENT_MAP = {
 }
 
 
-def map_issue_to_department(text: str) -> Dict:
+# Register keyword tables with the shared keyword index
+get_keyword_index().register(
+    TABLE_ISSUE,
+    [
+        (category.value, keyword, weight)
+        for category, data in ISSUE_DEPARTMENT_MAP.items()
+        for keyword, weight in data["keywords"]
+    ]
+)
+
+
+def map_issue_to_department(text: str, context: Optional[AnalysisContext] = None) -> Dict:
     """
     Map user's issue description to relevant departments.
     Returns matched departments with confidence.
     
     This is the PRIMARY decision function for issue categorization.
     """
-    result = map_issue_detailed(text)
+    result = map_issue_detailed(text, context)
     
     return {
         "matches": [m.to_dict() for m in result[:3]],
@@ -451,22 +469,22 @@ def map_issue_to_department(text: str) -> Dict:
     }
 
 
-def map_issue_detailed(text: str) -> List[IssueMatch]:
+def map_issue_detailed(text: str, context: Optional[AnalysisContext] = None) -> List[IssueMatch]:
     """
     Detailed issue mapping with full audit trail.
     Returns list of IssueMatch objects sorted by confidence.
     """
-    text_lower = text.lower()
+    grouped = group_hits(AnalysisContext.for_text(text, context).keyword_hits, TABLE_ISSUE)
     matches = []
     
     for category, data in ISSUE_DEPARTMENT_MAP.items():
-        keywords_found = []
-        total_weight = 0.0
+        category_hits = grouped.get(category.value)
+        if not category_hits:
+            continue
         
-        for keyword, weight in data["keywords"]:
-            if keyword in text_lower:
-                keywords_found.append(keyword)
-                total_weight += weight
+        keywords_found = unique_keywords(category_hits)
+        weights = {hit.keyword: hit.weight for hit in category_hits}
+        total_weight = sum(weights[keyword] for keyword in keywords_found)
         
         if keywords_found:
             # Calculate confidence (base + weights, capped at 0.95)
@@ -548,12 +566,16 @@ def get_all_categories() -> List[Dict[str, str]]:
     ]
 
 
-def suggest_categories(text: str, top_n: int = 3) -> List[Dict[str, Any]]:
+def suggest_categories(
+    text: str,
+    top_n: int = 3,
+    context: Optional[AnalysisContext] = None
+) -> List[Dict[str, Any]]:
     """
     Suggest categories for user selection.
     Useful when confidence is low.
     """
-    matches = map_issue_detailed(text)
+    matches = map_issue_detailed(text, context)
     
     suggestions = []
     for match in matches[:top_n]:
@@ -0,0 +1,242 @@
+"""
+Keyword Index - Single-pass multi-pattern matcher for the rule engine
+Compiles every rule-engine keyword table into one Aho-Corasick automaton
+
+Following MODEL_USAGE_POLICY:
+- Pure rule-based matching, no AI/NLP involved
+- Matching semantics are identical to the per-keyword checks it replaces
+- Every hit is tagged with its table, category and weight for the audit trail
+
+Each rule module registers its tables at import time. The automaton is
+compiled lazily on the first scan after a registration, so scanning a text
+costs one pass over its characters regardless of how many keywords exist.
+"""
+
+from typing import Dict, List, NamedTuple, Optional, Iterable, Tuple
+from dataclasses import dataclass
+from collections import deque
+import threading
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+# Table names used by the rule engine modules
+TABLE_INTENT = "intent"
+TABLE_SUB_TYPE = "sub_type"
+TABLE_ISSUE = "issue"
+TABLE_RTI_SECTION = "rti_section"
+TABLE_GRIEVANCE = "grievance"
+
+
+@dataclass(frozen=True)
+class KeywordEntry:
+    """A registered keyword with its table metadata"""
+    keyword: str
+    table: str
+    category: str
+    weight: float
+    word_boundary: bool  # Require \b on both sides (regex-style matching)
+    order: int           # Registration order, used to keep table ordering stable
+
+
+class KeywordHit(NamedTuple):
+    """A keyword occurrence found in the scanned text (tuple for cheap construction)"""
+    keyword: str
+    table: str
+    category: str
+    weight: float
+    position: int  # Start offset in the lowercased text
+    order: int
+
+
+def _is_word_char(char: str) -> bool:
+    """Mirror of the regex \\w class for str patterns"""
+    return char.isalnum() or char == "_"
+
+
+class KeywordIndex:
+    """
+    Aho-Corasick automaton over all registered keyword tables.
+
+    Overlapping keywords (e.g. "rti" inside "rti act") are all reported,
+    which a single alternation regex cannot do.
+    """
+
+    def __init__(self):
+        self._entries: List[KeywordEntry] = []
+        self._tables: Dict[str, int] = {}
+        self._goto: List[Dict[str, int]] = [{}]
+        self._fail: List[int] = [0]
+        self._output: List[Tuple[int, ...]] = [()]
+        self._compiled = True
+        self._lock = threading.Lock()
+
+    def register(
+        self,
+        table: str,
+        entries: Iterable[Tuple[str, str, float]],
+        word_boundary: bool = False
+    ) -> None:
+        """
+        Register a keyword table.
+
+        Args:
+            table: Table name (one of the TABLE_* constants)
+            entries: (category, keyword, weight) tuples in table order
+            word_boundary: If True, single-word keywords only match on word
+                boundaries (same as the intent rules' `\\bkeyword\\b` regex)
+        """
+        with self._lock:
+            for category, keyword, weight in entries:
+                keyword = keyword.lower()
+                self._entries.append(KeywordEntry(
+                    keyword=keyword,
+                    table=table,
+                    category=category,
+                    weight=weight,
+                    word_boundary=word_boundary and " " not in keyword,
+                    order=len(self._entries)
+                ))
+                self._tables[table] = self._tables.get(table, 0) + 1
+            self._compiled = False
+
+    def _compile(self) -> None:
+        """Build the goto/fail/output functions of the automaton"""
+        goto: List[Dict[str, int]] = [{}]
+        output: List[List[int]] = [[]]
+
+        for entry_id, entry in enumerate(self._entries):
+            state = 0
+            for char in entry.keyword:
+                next_state = goto[state].get(char)
+                if next_state is None:
+                    next_state = len(goto)
+                    goto[state][char] = next_state
+                    goto.append({})
+                    output.append([])
+                state = next_state
+            output[state].append(entry_id)
+
+        # Breadth-first construction of failure links
+        fail = [0] * len(goto)
+        queue = deque(goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for char, next_state in goto[state].items():
+                queue.append(next_state)
+                fallback = fail[state]
+                while fallback and char not in goto[fallback]:
+                    fallback = fail[fallback]
+                fail[next_state] = goto[fallback].get(char, 0)
+                output[next_state].extend(output[fail[next_state]])
+
+        self._goto = goto
+        self._fail = fail
+        self._output = [tuple(ids) for ids in output]
+        self._compiled = True
+
+        logger.debug(
+            f"Keyword index compiled: {len(self._entries)} keywords, "
+            f"{len(goto)} states, tables={self._tables}"
+        )
+
+    def scan(self, text_lower: str, tables: Optional[Iterable[str]] = None) -> List[KeywordHit]:
+        """
+        Scan lowercased text once and return every keyword hit.
+
+        Args:
+            text_lower: Text already converted with str.lower()
+            tables: Optional subset of tables to report
+
+        Returns:
+            Hits in order of their end position in the text
+        """
+        if not self._compiled:
+            with self._lock:
+                if not self._compiled:
+                    self._compile()
+
+        goto, fail, output = self._goto, self._fail, self._output
+        entries = self._entries
+        wanted = set(tables) if tables is not None else None
+        text_length = len(text_lower)
+
+        hits: List[KeywordHit] = []
+        state = 0
+        for index, char in enumerate(text_lower):
+            while state and char not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(char, 0)
+
+            if not output[state]:
+                continue
+
+            for entry_id in output[state]:
+                entry = entries[entry_id]
+                if wanted is not None and entry.table not in wanted:
+                    continue
+
+                start = index - len(entry.keyword) + 1
+                if entry.word_boundary:
+                    end = index + 1
+                    if start > 0 and _is_word_char(text_lower[start - 1]):
+                        continue
+                    if end < text_length and _is_word_char(text_lower[end]):
+                        continue
+
+                hits.append(KeywordHit(
+                    entry.keyword, entry.table, entry.category,
+                    entry.weight, start, entry.order
+                ))
+
+        return hits
+
+    def get_stats(self) -> Dict[str, int]:
+        """Get index statistics"""
+        return {
+            "keywords": len(self._entries),
+            "states": len(self._goto),
+            **{f"table_{name}": count for name, count in self._tables.items()}
+        }
+
+
+def group_hits(hits: Iterable[KeywordHit], table: str) -> Dict[str, List[KeywordHit]]:
+    """
+    Group hits of one table by category.
+    Hits within a category follow table order, then text position.
+    """
+    grouped: Dict[str, List[KeywordHit]] = {}
+    for hit in hits:
+        if hit.table == table:
+            grouped.setdefault(hit.category, []).append(hit)
+
+    for category_hits in grouped.values():
+        category_hits.sort(key=lambda h: (h.order, h.position))
+
+    return grouped
+
+
+def unique_keywords(hits: Iterable[KeywordHit]) -> List[str]:
+    """Distinct keywords of an already-ordered hit list"""
+    seen = set()
+    keywords = []
+    for hit in hits:
+        if hit.keyword not in seen:
+            seen.add(hit.keyword)
+            keywords.append(hit.keyword)
+    return keywords
+
+
+# Shared index for all rule engine tables
+_keyword_index = KeywordIndex()
+
+
+def get_keyword_index() -> KeywordIndex:
+    """Get the shared rule engine keyword index"""
+    return _keyword_index
+
+
+def scan_keywords(text_lower: str, tables: Optional[Iterable[str]] = None) -> List[KeywordHit]:
+    """Scan lowercased text against every registered keyword table"""
+    return _keyword_index.scan(text_lower, tables)
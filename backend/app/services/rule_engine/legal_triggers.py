@@ -11,9 +11,17 @@ Following MODEL_USAGE_POLICY:
 from typing import List, Dict, Any, Optional
 from dataclasses import dataclass, field
 from enum import Enum
-import re
 import logging
 
+from .keyword_index import (
+    get_keyword_index,
+    group_hits,
+    unique_keywords,
+    TABLE_RTI_SECTION,
+    TABLE_GRIEVANCE,
+)
+from ..analysis_context import AnalysisContext
+
 logger = logging.getLogger(__name__)
 
 
@@ -308,14 +316,33 @@ SERVICE_TIMELINES = {
 }
 
 
-def detect_legal_triggers(text: str) -> Dict:
+# Register trigger tables with the shared keyword index
+get_keyword_index().register(
+    TABLE_RTI_SECTION,
+    [
+        (section_id, trigger, 0.0)
+        for section_id, triggers in RTI_SECTION_TRIGGERS.items()
+        for trigger in triggers
+    ]
+)
+get_keyword_index().register(
+    TABLE_GRIEVANCE,
+    [
+        (marker_id, trigger, 0.0)
+        for marker_id, marker_data in GRIEVANCE_MARKERS.items()
+        for trigger in marker_data["triggers"]
+    ]
+)
+
+
+def detect_legal_triggers(text: str, context: Optional[AnalysisContext] = None) -> Dict:
     """
     Detect legal triggers in user text.
     Returns relevant sections and markers.
     
     Simple interface for backward compatibility.
     """
-    result = analyze_legal_context(text)
+    result = analyze_legal_context(text, context)
     
     return {
         "rti_sections": [
@@ -337,32 +364,33 @@ def detect_legal_triggers(text: str) -> Dict:
     }
 
 
-def analyze_legal_context(text: str) -> LegalAnalysisResult:
+def analyze_legal_context(text: str, context: Optional[AnalysisContext] = None) -> LegalAnalysisResult:
     """
     Comprehensive legal analysis of text.
     Returns full LegalAnalysisResult with all details.
     """
-    text_lower = text.lower()
+    context = AnalysisContext.for_text(text, context)
+    hits = context.keyword_hits
     
     # Find RTI sections
     rti_sections = []
     suggested_citations = []
+    section_hits = group_hits(hits, TABLE_RTI_SECTION)
     
-    for section_id, triggers in RTI_SECTION_TRIGGERS.items():
-        for trigger in triggers:
-            if trigger in text_lower:
-                section = RTI_SECTIONS.get(section_id)
-                if section and section not in rti_sections:
-                    rti_sections.append(section)
-                    suggested_citations.append(section.citation)
-                break
+    for section_id in RTI_SECTION_TRIGGERS:
+        if section_id in section_hits:
+            section = RTI_SECTIONS.get(section_id)
+            if section and section not in rti_sections:
+                rti_sections.append(section)
+                suggested_citations.append(section.citation)
     
     # Find grievance markers
     grievance_markers = []
     max_severity = SeverityLevel.LOW
+    marker_hits = group_hits(hits, TABLE_GRIEVANCE)
     
     for marker_id, marker_data in GRIEVANCE_MARKERS.items():
-        triggers_found = [t for t in marker_data["triggers"] if t in text_lower]
+        triggers_found = unique_keywords(marker_hits.get(marker_id, []))
         if triggers_found:
             severity = marker_data["severity"]
             grievance_markers.append(GrievanceMarker(
@@ -385,12 +413,12 @@ def analyze_legal_context(text: str) -> LegalAnalysisResult:
     
     # Determine applicable timeline
     timeline = None
-    if any("life" in t or "liberty" in t or "emergency" in t for t in text_lower.split()):
+    if any("life" in t or "liberty" in t or "emergency" in t for t in context.tokens):
         timeline = "48 hours (Section 7(1) proviso - life/liberty)"
     elif any(s.section == "Section 6" for s in rti_sections):
         timeline = "30 days (Section 7(1))"
     elif any(s.section == "Section 19" for s in rti_sections):
-        if "second appeal" in text_lower:
+        if "second appeal" in context.text_lower:
             timeline = "90 days from First Appeal (Section 19(3))"
         else:
             timeline = "30 days from decision (Section 19(1))"
@@ -473,9 +501,9 @@ def should_escalate(markers: List[GrievanceMarker]) -> bool:
     return any(m.escalation_needed for m in markers)
 
 
-def get_recommended_actions(text: str) -> List[str]:
+def get_recommended_actions(text: str, context: Optional[AnalysisContext] = None) -> List[str]:
     """Get list of recommended actions based on content analysis"""
-    result = analyze_legal_context(text)
+    result = analyze_legal_context(text, context)
     
     actions = []
     
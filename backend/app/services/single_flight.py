@@ -0,0 +1,143 @@
+"""
+Single Flight
+Coalesces concurrent identical calls into one
+
+A double-submitted form, a retrying frontend or a batch with duplicate
+rows sends the same work several times at once. With single flight the
+first caller for a key runs the call and later callers with the same key
+wait for its result (or its exception) instead of repeating it.
+
+- do(): blocking calls from worker threads (model forward passes)
+- do_async(): coroutines on the event loop (LLM API calls). The call runs
+  as its own task: a cancelled caller stops waiting without cancelling it
+  for the others; it is cancelled only when no caller is left waiting
+- Only calls in flight at the same moment are coalesced; a key is
+  forgotten as soon as its call finishes (caching is done elsewhere)
+- Coalescing is per process (each process-pool worker has its own groups)
+
+Groups are named (get_single_flight) and their counters are reported on
+/health.
+"""
+
+from typing import Any, Awaitable, Callable, Dict, Hashable
+from concurrent.futures import Future
+from loguru import logger
+import asyncio
+import threading
+
+
+class _Flight:
+    """A running async call and the number of callers awaiting it"""
+    __slots__ = ("task", "waiters")
+
+    def __init__(self, task: "asyncio.Task"):
+        self.task = task
+        self.waiters = 0
+
+
+class SingleFlight:
+    """One call per key at a time; concurrent callers share its outcome"""
+
+    def __init__(self, name: str):
+        self.name = name
+        self._futures: Dict[Hashable, Future] = {}
+        self._flights: Dict[Hashable, _Flight] = {}
+        self._lock = threading.Lock()
+
+        self.calls = 0          # Calls actually run
+        self.coalesced = 0      # Calls answered by another caller's run
+        self.cancelled = 0      # Async runs cancelled after every caller left
+
+    def do(self, key: Hashable, fn: Callable[..., Any], *args: Any, **kwargs: Any) -> Any:
+        """fn(*args, **kwargs), or the result of the identical call already running"""
+        with self._lock:
+            future = self._futures.get(key)
+            leader = future is None
+            if leader:
+                future = self._futures[key] = Future()
+                self.calls += 1
+            else:
+                self.coalesced += 1
+
+        if not leader:
+            return future.result()
+
+        try:
+            result = fn(*args, **kwargs)
+        except BaseException as e:
+            self._forget_future(key)
+            future.set_exception(e)
+            raise
+        self._forget_future(key)
+        future.set_result(result)
+        return result
+
+    def _forget_future(self, key: Hashable) -> None:
+        with self._lock:
+            del self._futures[key]
+
+    async def do_async(self, key: Hashable, fn: Callable[..., Awaitable[Any]], *args: Any, **kwargs: Any) -> Any:
+        """await fn(*args, **kwargs), or the result of the identical call already running"""
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            flight = self._flights.get(key)
+            if flight is None or flight.task.get_loop() is not loop:
+                flight = _Flight(loop.create_task(fn(*args, **kwargs)))
+                flight.task.add_done_callback(lambda _, key=key, flight=flight: self._forget_flight(key, flight))
+                self._flights[key] = flight
+                self.calls += 1
+            else:
+                self.coalesced += 1
+            flight.waiters += 1
+
+        try:
+            return await asyncio.shield(flight.task)
+        finally:
+            # Still running here only if this caller was cancelled
+            with self._lock:
+                flight.waiters -= 1
+                abandoned = flight.waiters == 0 and not flight.task.done()
+                if abandoned:
+                    self.cancelled += 1
+                    # Later callers start a new run instead of joining this one
+                    if self._flights.get(key) is flight:
+                        del self._flights[key]
+            if abandoned:
+                logger.debug(f"Single flight '{self.name}': call cancelled, no callers left")
+                flight.task.cancel()
+
+    def _forget_flight(self, key: Hashable, flight: _Flight) -> None:
+        with self._lock:
+            if self._flights.get(key) is flight:
+                del self._flights[key]
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            requested = self.calls + self.coalesced
+            return {
+                "calls": self.calls,
+                "coalesced": self.coalesced,
+                "cancelled": self.cancelled,
+                "in_flight": len(self._futures) + len(self._flights),
+                "coalesced_rate": round(self.coalesced / requested, 4) if requested else 0.0
+            }
+
+
+_groups: Dict[str, SingleFlight] = {}
+_groups_lock = threading.Lock()
+
+
+def get_single_flight(name: str) -> SingleFlight:
+    """Get or create the named single-flight group"""
+    with _groups_lock:
+        group = _groups.get(name)
+        if group is None:
+            group = _groups[name] = SingleFlight(name)
+        return group
+
+
+def get_single_flight_stats() -> Dict[str, Dict[str, Any]]:
+    """Counters of every group, by name"""
+    with _groups_lock:
+        groups = list(_groups.values())
+    return {group.name: group.get_stats() for group in groups}
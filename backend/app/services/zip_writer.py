@@ -0,0 +1,96 @@
+"""
+ZIP Writer
+Minimal ZIP archive writer for generated downloads
+
+Unlike zipfile, entries are handed over already compressed (or stored), so
+prebuilt parts can be copied without re-deflating them, and the archive can
+be produced incrementally: each entry's bytes are returned as soon as it is
+added, and the central directory at the end.
+
+No ZIP64: archives are limited to 65535 entries and 4 GiB.
+"""
+
+from typing import BinaryIO, Iterable, List, NamedTuple
+import struct
+import zlib
+
+ZIP_STORED = 0
+ZIP_DEFLATED = 8
+
+_ZIP32_LIMIT = 0xFFFFFFFF
+_MAX_ENTRIES = 0xFFFF
+
+# UTF-8 file names
+_FLAGS = 0x0800
+
+# DOS timestamp of every entry (1980-01-01 00:00): output depends only on content
+_DOS_TIME = 0
+_DOS_DATE = (0 << 9) | (1 << 5) | 1
+
+
+class ZipPart(NamedTuple):
+    """One entry, ready to be copied into an archive"""
+    name: str
+    crc: int
+    size: int
+    compressed: bytes
+    method: int = ZIP_DEFLATED
+
+
+def deflate_part(name: str, data: bytes, level: int = 6) -> ZipPart:
+    """Raw-deflate a part (ZIP method 8)"""
+    compressor = zlib.compressobj(level, zlib.DEFLATED, -15)
+    compressed = compressor.compress(data) + compressor.flush()
+    return ZipPart(name, zlib.crc32(data) & 0xFFFFFFFF, len(data), compressed)
+
+
+def store_part(name: str, data: bytes) -> ZipPart:
+    """Store a part uncompressed (for content that is already compressed: PDF, DOCX, XLSX)"""
+    return ZipPart(name, zlib.crc32(data) & 0xFFFFFFFF, len(data), data, ZIP_STORED)
+
+
+class ZipStreamWriter:
+    """Builds an archive entry by entry; concatenate everything it returns"""
+
+    def __init__(self):
+        self._central: List[bytes] = []
+        self._offset = 0
+
+    def entry(self, part: ZipPart) -> bytes:
+        """Local header and data of one entry"""
+        if len(self._central) >= _MAX_ENTRIES:
+            raise ValueError("Too many entries for a ZIP archive without ZIP64")
+
+        name = part.name.encode("utf-8")
+        header = struct.pack(
+            "<IHHHHHIIIHH",
+            0x04034B50, 20, _FLAGS, part.method, _DOS_TIME, _DOS_DATE,
+            part.crc, len(part.compressed), part.size, len(name), 0
+        )
+        self._central.append(struct.pack(
+            "<IHHHHHHIIIHHHHHII",
+            0x02014B50, 20, 20, _FLAGS, part.method, _DOS_TIME, _DOS_DATE,
+            part.crc, len(part.compressed), part.size, len(name), 0, 0, 0, 0, 0, self._offset
+        ) + name)
+
+        data = header + name + part.compressed
+        self._offset += len(data)
+        if self._offset > _ZIP32_LIMIT:
+            raise ValueError("ZIP archive exceeds 4 GiB")
+        return data
+
+    def finish(self) -> bytes:
+        """Central directory and end record"""
+        directory = b"".join(self._central)
+        return directory + struct.pack(
+            "<IHHHHIIH",
+            0x06054B50, 0, 0, len(self._central), len(self._central), len(directory), self._offset, 0
+        )
+
+
+def write_zip(out: BinaryIO, parts: Iterable[ZipPart]) -> None:
+    """Write a complete archive of parts to out"""
+    writer = ZipStreamWriter()
+    for part in parts:
+        out.write(writer.entry(part))
+    out.write(writer.finish())
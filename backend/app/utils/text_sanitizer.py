@@ -1,92 +1,234 @@
 """
 Text Sanitizer
 PII safety and text cleanup utilities
+
+PII and reference numbers are found by one precompiled scanner
+(scan_text) that returns typed spans in a single pass. The same spans
+feed the PII warnings, log masking and the phone/email/reference entities
+of the NLP engine, so a text is scanned once per request.
+
+StreamScanner scans text that arrives in chunks (large uploads, batch
+jobs) and reports spans with offsets into the whole stream.
 """
 
 import re
-from typing import List, Tuple
+from typing import Iterable, Iterator, List, NamedTuple, Optional, Tuple
 
 
 # Patterns for PII detection (for warning, not storage)
 PII_PATTERNS = {
     "aadhaar": r'\b\d{4}\s?\d{4}\s?\d{4}\b',
     "pan": r'\b[A-Z]{5}\d{4}[A-Z]\b',
-    "phone": r'\b(?:\+91[\-\s]?)?[6-9]\d{9}\b',
+    "phone": r'(?:\+91[\-\s]?|\b)[6-9]\d{9}\b',
     "email": r'\b[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Z|a-z]{2,}\b',
     "bank_account": r'\b\d{9,18}\b',
     "ifsc": r'\b[A-Z]{4}0[A-Z0-9]{6}\b'
 }
 
+# Reference numbers (entities, not PII)
+REFERENCE_PATTERNS = {
+    # "Complaint No. 123": only the number is the span
+    "reference": r'(?:ref|reference|complaint|application)[\s.:#-]*(?:no|number|id)?[\s.:#-]*',
+    # RTI/123/2024, 2024/PWD/55
+    "reference_code": r'\b(?:[A-Z]{2,}/\d+/\d{4}|\d{4}/[A-Z]+/\d+)\b'
+}
+
+PII_KINDS = frozenset(PII_PATTERNS)
+
+# Where two kinds could match at the same position, the first listed wins
+# (an email's local part is not also a phone number, a 12-digit Aadhaar is
+# not also a bank account)
+SCAN_ORDER = ["email", "reference_code", "pan", "ifsc", "aadhaar", "phone", "bank_account"]
+
+# "Complaint No." references are matched in a lookahead: they do not consume
+# text, so a phone number or code after the keyword is still found. They
+# never overlap each other, like the matches of a separate finditer. A
+# keyword inside another span ("xyz.complaint@mail.com") starts no reference.
+def _build_scan_pattern() -> "re.Pattern":
+    branches = [r'(?=[rca])(?=' + REFERENCE_PATTERNS["reference"] + r'(?P<reference>[A-Z0-9/-]+))']
+    word_start = []
+    for kind in SCAN_ORDER + [None]:
+        pattern = PII_PATTERNS.get(kind) or REFERENCE_PATTERNS.get(kind)
+        if pattern and pattern.startswith(r'\b'):
+            word_start.append(f"(?P<{kind}>{pattern[2:]})")
+            continue
+        # One \b check for a run of word-start kinds, skipping word ends
+        if word_start:
+            branches.append(r'\b(?=[\w.%+-])(?:' + "|".join(word_start) + ")")
+            word_start = []
+        if pattern:
+            branches.append(f"(?P<{kind}>{pattern})")
+    return re.compile("|".join(branches), re.IGNORECASE)
+
+
+SCAN_PATTERN = _build_scan_pattern()
+
+# Characters a streamed span may still depend on past its end. Longer spans
+# (far beyond a 254-character email address) can be split between chunks.
+SCAN_HOLDBACK = 256
+
+PII_WARNINGS = {
+    "aadhaar": "⚠️ Aadhaar number detected. Consider if this is necessary.",
+    "pan": "⚠️ PAN number detected. Consider if this is necessary.",
+    "phone": "📱 Phone number detected. This will be included in your application.",
+    "email": "📧 Email detected. This will be included in your application.",
+    "bank_account": "⚠️ Possible bank account number detected. Remove if not required.",
+    "ifsc": "⚠️ IFSC code detected. Remove if not required."
+}
+
+
+class Span(NamedTuple):
+    """One scanner hit: kind is a PII_PATTERNS or REFERENCE_PATTERNS key"""
+    kind: str
+    start: int
+    end: int
+    text: str
+
+
+def _scan(text: str, pos: int, safe: int, offset: int, reference_end: int) -> Tuple[List[Span], int, int]:
+    """
+    Scan text from pos, keeping spans that end by `safe`.
+    Returns (spans, resume position, reference_end); offsets are shifted by `offset`.
+    """
+    spans: List[Span] = []
+    resume = pos
+    for match in SCAN_PATTERN.finditer(text, pos):
+        kind = match.lastgroup
+        start, end = match.span(kind)
+        if end > safe:
+            # May change once more text arrives. Attempts that failed between
+            # safe and this match (e.g. "+91 " before a still-short number)
+            # may succeed too, so scan again from the earlier of the two
+            return spans, max(resume, min(match.start(), safe)), reference_end
+        resume = match.end()
+        if kind == "reference":
+            if match.start() + offset < reference_end:
+                continue
+            reference_end = end + offset
+        spans.append(Span(kind, start + offset, end + offset, match.group(kind)))
+    return spans, max(resume, safe), reference_end
+
+
+def scan_text(text: str) -> List[Span]:
+    """
+    Find PII and reference numbers in one pass.
+    Spans are in text order; only "reference" spans can overlap others.
+    """
+    if not text:
+        return []
+    return _scan(text, 0, len(text), 0, 0)[0]
+
+
+class StreamScanner:
+    """
+    scan_text for text arriving in chunks.
+
+    feed() returns the spans that later chunks cannot change; finish()
+    returns the rest. Together they equal scan_text of the joined text
+    (for spans up to SCAN_HOLDBACK characters). Only the unresolved tail
+    of the stream is kept in memory.
+    """
+
+    def __init__(self, holdback: int = SCAN_HOLDBACK):
+        self.holdback = holdback
+        self._buffer = ""
+        self._offset = 0          # Stream position of _buffer[0]
+        self._pos = 0             # Where scanning resumes in _buffer
+        self._reference_end = 0
 
-def detect_pii(text: str) -> List[Tuple[str, str]]:
+    def feed(self, chunk: str) -> List[Span]:
+        self._buffer += chunk
+        return self._scan_buffer(len(self._buffer) - self.holdback)
+
+    def finish(self) -> List[Span]:
+        spans = self._scan_buffer(len(self._buffer))
+        self._buffer = ""
+        return spans
+
+    def _scan_buffer(self, safe: int) -> List[Span]:
+        if safe <= self._pos:
+            return []
+        spans, resume, self._reference_end = _scan(
+            self._buffer, self._pos, safe, self._offset, self._reference_end
+        )
+        # Keep one character before the resume point for the \b checks
+        keep = max(resume - 1, 0)
+        self._buffer = self._buffer[keep:]
+        self._offset += keep
+        self._pos = resume - keep
+        return spans
+
+
+def scan_chunks(chunks: Iterable[str], holdback: int = SCAN_HOLDBACK) -> Iterator[Span]:
+    """Spans of a chunked text, yielded as soon as they are final"""
+    scanner = StreamScanner(holdback)
+    for chunk in chunks:
+        yield from scanner.feed(chunk)
+    yield from scanner.finish()
+
+
+def detect_pii(text: str, spans: Optional[Iterable[Span]] = None) -> List[Tuple[str, str]]:
     """
     Detect potential PII in text.
     Returns list of (pii_type, matched_text) tuples.
-    
+    Pass spans from scan_text/StreamScanner to reuse an earlier scan.
+
     NOTE: This is for warning users, not for storing/processing PII.
     """
-    found = []
-    
-    for pii_type, pattern in PII_PATTERNS.items():
-        matches = re.findall(pattern, text, re.IGNORECASE)
-        for match in matches:
-            found.append((pii_type, match))
-    
-    return found
+    if spans is None:
+        spans = scan_text(text)
+    return [(span.kind, span.text) for span in spans if span.kind in PII_KINDS]
 
 
-def warn_about_pii(text: str) -> dict:
+def warn_about_pii(text: str, spans: Optional[Iterable[Span]] = None) -> dict:
     """
     Check text for PII and return warnings.
     """
-    pii_found = detect_pii(text)
-    
+    pii_found = detect_pii(text, spans)
+
     if not pii_found:
         return {"has_pii": False, "warnings": []}
-    
-    warnings = []
+
     pii_types = set(p[0] for p in pii_found)
-    
-    warning_messages = {
-        "aadhaar": "⚠️ Aadhaar number detected. Consider if this is necessary.",
-        "pan": "⚠️ PAN number detected. Consider if this is necessary.",
-        "phone": "📱 Phone number detected. This will be included in your application.",
-        "email": "📧 Email detected. This will be included in your application.",
-        "bank_account": "⚠️ Possible bank account number detected. Remove if not required.",
-        "ifsc": "⚠️ IFSC code detected. Remove if not required."
-    }
-    
-    for pii_type in pii_types:
-        if pii_type in warning_messages:
-            warnings.append(warning_messages[pii_type])
-    
+
     return {
         "has_pii": True,
-        "warnings": warnings,
+        "warnings": [message for pii_type, message in PII_WARNINGS.items() if pii_type in pii_types],
         "types_found": list(pii_types)
     }
 
 
-def sanitize_for_logging(text: str) -> str:
+def _mask(span: Span) -> str:
+    if span.kind == "aadhaar":
+        return "XXXX XXXX " + span.text[-4:]
+    if span.kind == "pan":
+        return "XXXXX0000X"
+    if span.kind == "phone":
+        return "XXXXXX" + span.text[-4:]
+    if span.kind == "email":
+        return "****" + span.text[span.text.index("@"):]
+    return span.text
+
+
+def sanitize_for_logging(text: str, spans: Optional[Iterable[Span]] = None) -> str:
     """
     Sanitize text for logging by masking PII.
     Used for audit logs - never store actual PII.
+    Aadhaar and phone keep their last 4 digits, email its domain.
     """
-    sanitized = text
-    
-    # Mask Aadhaar
-    sanitized = re.sub(r'\b(\d{4})\s?(\d{4})\s?(\d{4})\b', r'XXXX XXXX \3', sanitized)
-    
-    # Mask PAN
-    sanitized = re.sub(r'\b[A-Z]{5}\d{4}[A-Z]\b', 'XXXXX0000X', sanitized)
-    
-    # Mask phone (keep last 4)
-    sanitized = re.sub(r'\b(?:\+91[\-\s]?)?([6-9]\d{5})(\d{4})\b', r'XXXXXX\2', sanitized)
-    
-    # Mask email (keep domain)
-    sanitized = re.sub(r'\b[A-Za-z0-9._%+-]+(@[A-Za-z0-9.-]+\.[A-Z|a-z]{2,})\b', r'****\1', sanitized)
-    
-    return sanitized
+    if spans is None:
+        spans = scan_text(text)
+
+    parts = []
+    position = 0
+    for span in spans:
+        if span.kind in ("aadhaar", "pan", "phone", "email"):
+            parts.append(text[position:span.start])
+            parts.append(_mask(span))
+            position = span.end
+    parts.append(text[position:])
+
+    return "".join(parts)
 
 
 def clean_input(text: str) -> str:
@@ -1,9 +1,16 @@
 """
 Tone Adjuster
 Adjusts document tone based on user preference
+
+The replacement tables are compiled once per tone into a single
+alternation regex (see _get_replacer), so a draft is scanned in one pass
+whatever the size of the tables. Edit the tables before first use: the
+compiled replacers are cached.
 """
 
-from typing import Dict, List
+from functools import lru_cache
+from itertools import product
+from typing import Callable, Dict, List, Tuple
 import re
 
 
@@ -76,34 +83,104 @@ TONE_PHRASES = {
 }
 
 
+def _case_preserving(new: str) -> Callable[["re.Match"], str]:
+    return lambda m: new if m.group().islower() else new.capitalize()
+
+
+def _apply_in_order(text: str, tables: List[Tuple[str, str]]) -> str:
+    """Apply (old, new) whole-word replacements one after another"""
+    for old, new in tables:
+        pattern = re.compile(r'\b' + re.escape(old) + r'\b', re.IGNORECASE)
+        text = pattern.sub(_case_preserving(new), text)
+    return text
+
+
+@lru_cache(maxsize=None)
+def _get_replacer(target_tone: str) -> Tuple["re.Pattern", Dict[str, str], Dict[str, str]]:
+    """
+    One regex and lookup tables for CASUAL_FIXES followed by the tone's
+    replacements, giving the same result as applying each entry in turn:
+    - every replacement is resolved through the entries after it (a word
+      produced by an earlier entry can be replaced again by a later one)
+    - multi-word tone phrases also match when written with abbreviations
+      that an earlier entry expands ("at ur convenience")
+    - an abbreviation ending in punctuation ("no.") is expanded into a word
+      that runs into the next one ("no.5" -> "number5"), which the tone
+      entries can then no longer match; the next word only gets the
+      abbreviation fixes (the `merged` group and second table)
+    
+    Returns (pattern, replacements, replacements right after a merging abbreviation).
+    """
+    casual = list(CASUAL_FIXES.items())
+    tone = list(TONE_REPLACEMENTS.get(target_tone, {}).items()) if target_tone in ["neutral", "formal", "assertive"] else []
+    entries = casual + tone
+
+    table: Dict[str, str] = {}
+    merged_table: Dict[str, str] = {}
+    for position, (old, new) in enumerate(entries):
+        table.setdefault(old.lower(), _apply_in_order(new, entries[position + 1:]))
+        if position < len(casual):
+            merged_table.setdefault(old.lower(), _apply_in_order(new, casual[position + 1:]))
+
+    abbreviations: Dict[str, List[str]] = {}
+    for abbr, full in casual:
+        abbreviations.setdefault(full.lower(), []).append(abbr.lower())
+
+    tone_keys = []
+    for old, _ in tone:
+        tone_keys.append(old.lower())
+        for variant in product(*([word] + abbreviations.get(word, []) for word in old.lower().split(" "))):
+            key = " ".join(variant)
+            if key not in table:
+                tone_keys.append(key)
+                table[key] = table[old.lower()]
+
+    def alternation(keys) -> str:
+        # Longest first, so a phrase wins over a word it starts with
+        return "|".join(re.escape(key) for key in sorted(set(keys), key=len, reverse=True))
+
+    merging = [abbr.lower() for abbr, full in casual if not re.match(r"\w", abbr[-1]) and re.match(r"\w", full[-1])]
+    after_merge = "|".join(r"(?<=\b" + re.escape(abbr) + ")" for abbr in merging)
+    not_after_merge = "".join(r"(?<!\b" + re.escape(abbr) + ")" for abbr in merging)
+
+    branches = []
+    if tone_keys:
+        branches.append(not_after_merge + "(?:" + alternation(tone_keys) + ")")
+    if merging:
+        branches.append(r"(?P<merged>" + after_merge + r")?(?:" + alternation(merged_table) + ")")
+    else:
+        branches.append(alternation(merged_table))
+
+    pattern = re.compile(r"\b(?:" + "|".join(branches) + r")\b", re.IGNORECASE)
+    return pattern, table, merged_table
+
+
 def adjust_tone(text: str, target_tone: str) -> str:
     """
     Adjust text tone to match target.
     
+    Common abbreviations are always expanded; target_tone 'formal' or
+    'assertive' also applies that tone's word replacements. Matching is
+    whole-word and case-insensitive; a replacement is capitalized unless
+    the matched text was all lowercase.
+    
     target_tone: 'neutral', 'formal', 'assertive'
     """
     if not text:
         return text
-
-    result = text
     
-    # 1. Expand common abbreviations (Always done first)
-    for abbr, full in CASUAL_FIXES.items():
-        # Match standalone words only (e.g. don't replace 'u' in 'house')
-        pattern = re.compile(r'\b' + re.escape(abbr) + r'\b', re.IGNORECASE)
-        result = pattern.sub(lambda m: full if m.group().islower() else full.capitalize(), result)
-
-    if target_tone not in ["neutral", "formal", "assertive"]:
-        return result
+    pattern, table, merged_table = _get_replacer(target_tone)
+    merged = pattern.groupindex.get("merged")
     
-    # 2. Apply tone-specific replacements
-    if target_tone in TONE_REPLACEMENTS:
-        for old, new in TONE_REPLACEMENTS[target_tone].items():
-            # Case-insensitive replacement, preserving case
-            pattern = re.compile(r'\b' + re.escape(old) + r'\b', re.IGNORECASE)
-            result = pattern.sub(lambda m: new if m.group().islower() else new.capitalize(), result)
+    def replace(match: "re.Match") -> str:
+        found = match.group()
+        if merged and match.group(merged) is not None:
+            new = merged_table[found.lower()]
+        else:
+            new = table[found.lower()]
+        return new if found.islower() else new.capitalize()
     
-    return result
+    return pattern.sub(replace, text)
 
 
 def get_tone_phrases(tone: str) -> Dict[str, str]:
@@ -0,0 +1,103 @@
+"""
+Middleware overhead microbenchmark
+
+Drives the ASGI app in-process (no server, no HTTP client) and compares the
+per-request latency of a cheap endpoint with and without the application
+middleware (CORS and the framework layers are kept in both). Logging from the app is disabled so only the middleware work is
+measured.
+
+Usage (from backend/):
+    python -m benchmarks.middleware_overhead
+    python -m benchmarks.middleware_overhead --path /api/authority/states --requests 5000
+"""
+
+import argparse
+import asyncio
+import os
+import statistics
+import time
+
+from loguru import logger
+
+
+def _build_scope(path: str) -> dict:
+    return {
+        "type": "http",
+        "asgi": {"version": "3.0"},
+        "http_version": "1.1",
+        "method": "GET",
+        "scheme": "http",
+        "path": path,
+        "raw_path": path.encode(),
+        "query_string": b"",
+        "root_path": "",
+        "headers": [(b"host", b"testserver"), (b"user-agent", b"bench")],
+        "client": ("127.0.0.1", 50000),
+        "server": ("testserver", 80),
+    }
+
+
+async def _measure(app, path: str, requests: int, warmup: int = 200) -> list:
+    """Per-request latencies in microseconds"""
+    scope = _build_scope(path)
+
+    async def receive():
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    status = []
+
+    async def send(message):
+        if message["type"] == "http.response.start":
+            status.append(message["status"])
+
+    for _ in range(warmup):
+        await app(dict(scope), receive, send)
+
+    samples = []
+    for _ in range(requests):
+        started = time.perf_counter()
+        await app(dict(scope), receive, send)
+        samples.append((time.perf_counter() - started) * 1e6)
+
+    if status[-1] != 200:
+        raise RuntimeError(f"{path} returned {status[-1]}")
+    return samples
+
+
+def _summary(samples: list) -> str:
+    ordered = sorted(samples)
+    p99 = ordered[int(len(ordered) * 0.99) - 1]
+    return f"mean={statistics.mean(samples):8.1f}us  p50={statistics.median(samples):8.1f}us  p99={p99:8.1f}us"
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Measure middleware overhead per request")
+    parser.add_argument("--path", default="/api/authority/states", help="Endpoint to call")
+    parser.add_argument("--requests", type=int, default=3000, help="Measured requests per variant")
+    args = parser.parse_args()
+
+    logger.disable("app")
+
+    # Effectively unlimited, so every request takes the full (allowed) path
+    os.environ["RATE_LIMIT_REQUESTS"] = str(10 ** 9)
+    from app.main import app
+
+    # Same app with only the framework layers and CORS, for the baseline
+    from fastapi.middleware.cors import CORSMiddleware
+    user_middleware = app.user_middleware
+    app.user_middleware = [m for m in user_middleware if m.cls is CORSMiddleware]
+    bare = app.build_middleware_stack()
+    app.user_middleware = user_middleware
+    full = app.build_middleware_stack()
+
+    bare_samples = asyncio.run(_measure(bare, args.path, args.requests))
+    full_samples = asyncio.run(_measure(full, args.path, args.requests))
+
+    print(f"GET {args.path}, {args.requests} requests")
+    print(f"  without          {_summary(bare_samples)}")
+    print(f"  with middleware  {_summary(full_samples)}")
+    print(f"  overhead         {statistics.mean(full_samples) - statistics.mean(bare_samples):8.1f}us per request")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,91 @@
+"""
+Translation backend regression check
+
+Translates a fixed bilingual sample set with the torch backend and a
+candidate backend (the converted CTranslate2 model by default) and reports
+latency, exact-match rate and BLEU of the candidate against the torch
+output, plus BLEU of both against the reference translations. Exits with
+status 1 if the candidate falls below the thresholds.
+
+Needs torch, transformers and ctranslate2, and a converted model
+(python -m app.services.nlp.translation_backend).
+
+Usage (from backend/):
+    python -m benchmarks.translation_backends
+    python -m benchmarks.translation_backends --compute-type int8_float32 --min-bleu 70
+"""
+
+import argparse
+import json
+import sys
+import time
+from pathlib import Path
+
+from loguru import logger
+
+SAMPLES_PATH = Path(__file__).with_name("translation_samples.json")
+
+
+def _run(backend, sentences: list, batch_size: int, repeats: int):
+    """Translations and mean seconds per pass (after one warm-up pass)"""
+    translations = backend.translate(sentences, batch_size=batch_size)
+    started = time.perf_counter()
+    for _ in range(repeats):
+        backend.translate(sentences, batch_size=batch_size)
+    return [t or "" for t in translations], (time.perf_counter() - started) / repeats
+
+
+def main() -> None:
+    from app.config import get_settings
+    from app.services.nlp.translation_backend import (
+        BACKEND_CTRANSLATE2, compare_translations, corpus_bleu, create_backend
+    )
+    from app.services.nlp.translator import MODEL_NAME
+
+    settings = get_settings()
+    parser = argparse.ArgumentParser(description="Compare a translation backend against the torch model")
+    parser.add_argument("--backend", default=BACKEND_CTRANSLATE2, help="Candidate backend")
+    parser.add_argument("--compute-type", default=settings.TRANSLATION_COMPUTE_TYPE, help="CTranslate2 weight type")
+    parser.add_argument("--intra-threads", type=int, default=settings.TRANSLATION_INTRA_THREADS)
+    parser.add_argument("--inter-threads", type=int, default=settings.TRANSLATION_INTER_THREADS)
+    parser.add_argument("--batch-size", type=int, default=settings.TRANSLATION_BATCH_SIZE)
+    parser.add_argument("--repeats", type=int, default=3, help="Timed passes over the sample set")
+    parser.add_argument("--min-bleu", type=float, default=60.0, help="Lowest BLEU against the torch output")
+    parser.add_argument("--min-exact", type=float, default=0.5, help="Lowest exact-match rate against the torch output")
+    args = parser.parse_args()
+
+    logger.disable("app")
+    samples = json.loads(SAMPLES_PATH.read_text(encoding="utf-8"))
+    sentences = [sample["en"] for sample in samples]
+    references = [sample["hi"] for sample in samples]
+
+    reference_backend = create_backend("torch", MODEL_NAME)
+    candidate_backend = create_backend(
+        args.backend, MODEL_NAME,
+        model_dir=settings.TRANSLATION_MODEL_DIR,
+        compute_type=args.compute_type,
+        intra_threads=args.intra_threads,
+        inter_threads=args.inter_threads
+    )
+
+    torch_output, torch_seconds = _run(reference_backend.load(), sentences, args.batch_size, args.repeats)
+    candidate_output, candidate_seconds = _run(candidate_backend.load(), sentences, args.batch_size, args.repeats)
+    agreement = compare_translations(candidate_output, torch_output)
+
+    print(f"{len(sentences)} sentences, batch size {args.batch_size}")
+    print(f"  torch              {torch_seconds * 1000:8.1f}ms per pass  BLEU vs reference {corpus_bleu(torch_output, references):6.2f}")
+    print(f"  {candidate_backend.model_id:<18} {candidate_seconds * 1000:8.1f}ms per pass  BLEU vs reference {corpus_bleu(candidate_output, references):6.2f}")
+    print(f"  vs torch: exact match {agreement['exact_match']:.0%}, BLEU {agreement['bleu']:.2f}")
+
+    for sentence, expected, actual in zip(sentences, torch_output, candidate_output):
+        if " ".join(expected.split()) != " ".join(actual.split()):
+            print(f"\n  {sentence}\n    torch:     {expected}\n    candidate: {actual}")
+
+    if agreement["bleu"] < args.min_bleu or agreement["exact_match"] < args.min_exact:
+        print(f"\nFAIL: below --min-bleu {args.min_bleu} / --min-exact {args.min_exact}")
+        sys.exit(1)
+    print("\nOK")
+
+
+if __name__ == "__main__":
+    main()
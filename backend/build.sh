@@ -13,4 +13,13 @@ pip install --no-cache-dir -r requirements.txt
 # Download spaCy model
 python -m spacy download en_core_web_sm
 
+# Precompute DistilBERT template embeddings (only when the semantic fallback is enabled)
+if [ "${ENABLE_DISTILBERT:-false}" = "true" ]; then
+    # Export the ONNX graph first so the index is built with the serving backend
+    if [ "${EMBEDDING_BACKEND:-torch}" = "onnx" ]; then
+        python -m app.services.nlp.embedding_backend
+    fi
+    python -m app.services.nlp.template_index
+fi
+
 echo "Build completed successfully!"
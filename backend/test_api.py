@@ -74,6 +74,26 @@ def test_infer_hindi():
                f"Intent: {data.get('intent')}, Language detected correctly")
     return passed
 
+def test_infer_batch():
+    """Test batch inference returns NDJSON results in input order"""
+    payload = {
+        "texts": [
+            "I want to file an RTI application to get information about road construction expenses under RTI Act 2005",
+            "The water supply has been cut off for 5 days in our area. This is causing severe hardship to residents."
+        ],
+        "language": "english"
+    }
+    response = client.post("/api/infer/batch", json=payload)
+    lines = [json.loads(line) for line in response.text.splitlines() if line]
+    passed = (
+        response.status_code == 200 and
+        [line.get("index") for line in lines] == [0, 1] and
+        lines[0].get("result", {}).get("intent") == "rti"
+    )
+    print_test("Batch Inference", passed,
+               f"Lines: {len(lines)}, Intents: {[(line.get('result') or {}).get('intent') for line in lines]}")
+    return passed
+
 def test_draft_rti():
     """Test RTI document generation"""
     payload = {
@@ -323,6 +343,7 @@ def main():
         ("RTI Inference", test_infer_rti),
         ("Complaint Inference", test_infer_complaint),
         ("Hindi Inference", test_infer_hindi),
+        ("Batch Inference", test_infer_batch),
         ("RTI Draft", test_draft_rti),
         ("Complaint Draft", test_draft_complaint),
         ("PDF Download", test_download_pdf),
@@ -0,0 +1,132 @@
+"""
+Tests for the bulk ZIP export
+Checks the streaming ZIP writer, entry order and naming, the index sheet,
+per-entry failures and executor saturation handling
+"""
+
+import pytest
+import asyncio
+import zipfile
+from io import BytesIO
+
+pytest.importorskip("openpyxl")
+
+import openpyxl
+
+from app.services.bulk_export import INDEX_FILENAME, STATUS_FAILED, STATUS_OK, BulkExport, BulkJob, entry_name
+from app.services.executor import BoundedExecutor, ExecutorSaturatedError
+from app.services.zip_writer import ZipStreamWriter, deflate_part, store_part
+
+DRAFT = (
+    "To,\nThe Public Information Officer,\nMunicipal Corporation, Jaipur\n\n"
+    "Subject: Request for information on road repairs\n\n"
+    + "Details of the work orders issued for road repair in Ward No. 45. " * 6
+)
+
+
+def collect(export: BulkExport):
+    async def run():
+        return [chunk async for chunk in export.stream()]
+    return asyncio.run(run())
+
+
+def read_index(archive: zipfile.ZipFile):
+    sheet = openpyxl.load_workbook(BytesIO(archive.read(INDEX_FILENAME))).active
+    return list(sheet.iter_rows(values_only=True))
+
+
+class SaturatedExecutor(BoundedExecutor):
+    """Rejects every call"""
+
+    async def run(self, stage, fn, *args, **kwargs):
+        raise ExecutorSaturatedError(stage, 0)
+
+
+@pytest.fixture
+def executor():
+    pool = BoundedExecutor(max_workers=2, max_queue=4, retry_after=0)
+    yield pool
+    pool.shutdown()
+
+
+class TestZipStreamWriter:
+    """Incremental archive writing"""
+
+    def test_chunks_form_a_valid_archive(self):
+        writer = ZipStreamWriter()
+        chunks = [
+            writer.entry(store_part("a.pdf", b"%PDF-1.4 stored")),
+            writer.entry(deflate_part("notes/b.txt", "नमस्ते ".encode("utf-8") * 50)),
+            writer.finish(),
+        ]
+        archive = zipfile.ZipFile(BytesIO(b"".join(chunks)))
+
+        assert archive.testzip() is None
+        assert archive.namelist() == ["a.pdf", "notes/b.txt"]
+        assert archive.getinfo("a.pdf").compress_type == zipfile.ZIP_STORED
+        assert archive.read("notes/b.txt").decode("utf-8") == "नमस्ते " * 50
+
+    def test_entry_names_are_numbered_and_path_safe(self):
+        assert entry_name(7, "grievance_Rahul_20240601.pdf") == "0007_grievance_Rahul_20240601.pdf"
+        assert "/" not in entry_name(1, "../../etc/passwd.pdf")
+
+
+class TestBulkExport:
+    """Streaming export of several documents"""
+
+    def test_entries_in_order_with_index(self, executor):
+        jobs = [
+            BulkJob(format, DRAFT, document_type, "Rahul Sharma", {"state": "Rajasthan"})
+            for document_type in ("information_request", "grievance")
+            for format in ("pdf", "docx", "xlsx")
+        ]
+        chunks = collect(BulkExport(jobs, concurrency=3, executor=executor))
+        archive = zipfile.ZipFile(BytesIO(b"".join(chunks)))
+
+        names = archive.namelist()
+        assert archive.testzip() is None
+        assert len(chunks) == len(jobs) + 2
+        assert names[-1] == INDEX_FILENAME
+        assert [name[:4] for name in names[:-1]] == [f"{n:04d}" for n in range(1, 7)]
+        assert [name.rsplit(".", 1)[1] for name in names[:-1]] == ["pdf", "docx", "xlsx"] * 2
+        assert archive.read(names[0]).startswith(b"%PDF")
+
+        rows = read_index(archive)
+        assert rows[0][0] == "#"
+        assert [row[1] for row in rows[1:]] == names[:-1]
+        assert all(row[-1] == STATUS_OK and row[5] == "Rajasthan" for row in rows[1:])
+        assert rows[2][7] == archive.getinfo(names[1]).file_size
+
+    def test_failed_entry_is_marked_not_fatal(self, executor):
+        jobs = [BulkJob("pdf", DRAFT, "grievance", "A"), BulkJob("txt", DRAFT, "grievance", "A"), BulkJob("docx", DRAFT, "grievance", "A")]
+        export = BulkExport(jobs, executor=executor)
+        archive = zipfile.ZipFile(BytesIO(b"".join(collect(export))))
+
+        assert export.failed == 1
+        assert len(archive.namelist()) == 3
+        assert [row[-1] for row in read_index(archive)[1:]] == [STATUS_OK, STATUS_FAILED, STATUS_OK]
+
+    def test_later_entries_wait_for_capacity(self):
+        """Entries rejected by a full executor are retried instead of dropped"""
+        pool = BoundedExecutor(max_workers=1, max_queue=0, retry_after=0)
+        try:
+            jobs = [BulkJob("pdf", DRAFT, "grievance", "A") for _ in range(4)]
+            export = BulkExport(jobs, concurrency=4, executor=pool)
+            archive = zipfile.ZipFile(BytesIO(b"".join(collect(export))))
+        finally:
+            pool.shutdown()
+
+        assert export.failed == 0
+        assert len(archive.namelist()) == 5
+
+    def test_saturated_first_entry_raises(self):
+        """Before any byte is sent, saturation surfaces as ExecutorSaturatedError (503)"""
+        export = BulkExport([BulkJob("pdf", DRAFT, "grievance", "A")], executor=SaturatedExecutor())
+
+        with pytest.raises(ExecutorSaturatedError):
+            collect(export)
+
+
+# Run tests with verbose output if executed directly
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
@@ -0,0 +1,146 @@
+"""
+Tests for the Byte-Budget Cache shared by the render and LLM response caches
+Checks LRU-by-bytes eviction, TTL, keyed hashing and the disk tier
+(atomic writes, purge of expired files, malformed files) with a fake clock
+"""
+
+import pytest
+import os
+import time
+from dataclasses import dataclass
+
+from app.services import byte_budget_cache
+from app.services.byte_budget_cache import ByteBudgetCache
+
+
+class FakeClock:
+    def __init__(self, now: float = 1000.0):
+        self.now = now
+
+    def __call__(self) -> float:
+        return self.now
+
+
+@dataclass
+class Blob:
+    data: bytes
+    stored_at: float = 0.0
+
+    @property
+    def size(self) -> int:
+        return len(self.data)
+
+
+class BlobCache(ByteBudgetCache[Blob]):
+    name = "Blob cache"
+    disk_suffix = ".blob"
+
+    def put(self, key: str, data: bytes) -> bool:
+        return self.put_entry(key, Blob(data, self.clock()))
+
+    def _encode(self, entry: Blob) -> bytes:
+        return entry.data
+
+    def _decode(self, data: bytes, stored_at: float) -> Blob:
+        if not data:
+            raise ValueError("empty entry")
+        return Blob(data, stored_at)
+
+
+class TestMemoryTier:
+    """Byte budget, LRU order and TTL"""
+
+    def test_lru_eviction_by_bytes(self):
+        cache = BlobCache(max_bytes=100, ttl_seconds=60)
+        cache.put("a", b"x" * 25)
+        cache.put("b", b"x" * 25)
+        cache.put("c", b"x" * 25)
+        cache.get("a")
+        cache.put("d", b"x" * 25)
+        cache.put("e", b"x" * 25)
+
+        assert cache.get("b") is None
+        assert cache.get("a") is not None
+        assert cache.get_stats()["bytes"] == 100 and cache.get_stats()["evictions"] == 1
+
+    def test_large_entries_are_not_cached(self):
+        cache = BlobCache(max_bytes=100, ttl_seconds=60)
+
+        assert cache.put("big", b"x" * 26) is False
+        assert cache.get("big") is None
+
+    def test_entries_expire(self):
+        clock = FakeClock()
+        cache = BlobCache(max_bytes=100, ttl_seconds=60, clock=clock)
+        cache.put("k", b"data")
+
+        clock.now += 59
+        assert cache.get("k") is not None
+        clock.now += 1
+        assert cache.get("k") is None
+        assert cache.get_stats()["bytes"] == 0
+
+    def test_keys_are_keyed_hashes(self):
+        fields = {"text": "my aadhaar is 1234 5678 9012", "format": "pdf"}
+        key = BlobCache(100, 60, key_secret="s").make_key(**fields)
+
+        assert "1234" not in key and len(key) == 64
+        assert key == BlobCache(100, 60, key_secret="s").make_key(**dict(reversed(fields.items())))
+        assert key != BlobCache(100, 60, key_secret="t").make_key(**fields)
+        assert BlobCache(100, 60).make_key(**fields) != BlobCache(100, 60).make_key(**fields)
+
+
+class TestDiskTier:
+    """Files shared between instances"""
+
+    def test_private_directory_and_atomic_writes(self, tmp_path):
+        directory = tmp_path / "cache"
+        cache = BlobCache(max_bytes=100, ttl_seconds=60, disk_dir=str(directory))
+        cache.put("k", b"data")
+
+        assert oct(os.stat(directory).st_mode & 0o777) == "0o700"
+        assert sorted(p.name for p in directory.iterdir()) == ["k.blob"]
+
+    def test_failed_write_leaves_no_temp_file(self, tmp_path, monkeypatch):
+        cache = BlobCache(max_bytes=100, ttl_seconds=60, disk_dir=str(tmp_path))
+        cache.put("k", b"data")
+
+        def fail_replace(src, dst):
+            raise OSError("disk full")
+
+        monkeypatch.setattr(byte_budget_cache.os, "replace", fail_replace)
+        cache.put("other", b"data")
+        monkeypatch.undo()
+
+        assert sorted(p.name for p in tmp_path.iterdir()) == ["k.blob"]
+        assert cache.get("other") is not None   # Still cached in memory
+
+    def test_malformed_file_is_dropped(self, tmp_path):
+        (tmp_path / "k.blob").write_bytes(b"")
+        cache = BlobCache(max_bytes=100, ttl_seconds=60, disk_dir=str(tmp_path))
+
+        assert cache.get("k") is None
+        assert not (tmp_path / "k.blob").exists()
+
+    def test_expired_files_are_purged(self, tmp_path):
+        clock = FakeClock(now=time.time())
+        cache = BlobCache(max_bytes=100, ttl_seconds=60, disk_dir=str(tmp_path), clock=clock)
+        (tmp_path / "old.blob").write_bytes(b"data")
+        os.utime(tmp_path / "old.blob", (clock.now - 120, clock.now - 120))
+
+        cache.put("new", b"data")
+
+        assert sorted(p.name for p in tmp_path.iterdir()) == ["new.blob"]
+
+    def test_clear_removes_files(self, tmp_path):
+        cache = BlobCache(max_bytes=100, ttl_seconds=60, disk_dir=str(tmp_path))
+        cache.put("k", b"data")
+        cache.clear()
+
+        assert cache.get("k") is None
+        assert not list(tmp_path.iterdir())
+
+
+# Run tests with verbose output if executed directly
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
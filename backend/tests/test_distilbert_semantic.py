@@ -9,6 +9,10 @@ import sys
 import os
 from unittest.mock import Mock, patch, MagicMock
 
+import numpy as np
+
+from app.services.nlp.embedding_backend import EmbeddingBackend
+
 # Add app to path
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'app'))
 
@@ -116,6 +120,103 @@ class TestEmbeddingCache:
         assert cache.get("c") == 3
 
 
+    def test_byte_budget_eviction_keeps_pinned(self):
+        """LRU evicts by bytes; pinned entries survive and are not counted"""
+        import numpy as np
+        from app.services.nlp.embedding_cache import EmbeddingCache
+        
+        vector = np.zeros(768, dtype=np.float32)  # 3 KB
+        cache = EmbeddingCache(max_bytes=2 * vector.nbytes)
+        cache.put("template", vector, pin=True)
+        cache.put("a", vector)
+        cache.put("b", vector)
+        cache.get("a")            # "b" is now least recently used
+        cache.put("c", vector)
+        
+        assert cache.get("b") is None
+        assert cache.get("a") is not None
+        assert cache.get("template") is not None
+        
+        stats = cache.get_stats()
+        assert stats["evictions"] == 1
+        assert stats["bytes"] == 2 * vector.nbytes <= stats["max_bytes"]
+        assert stats["pinned_entries"] == 1 and stats["pinned_bytes"] == vector.nbytes
+        
+        # Pinning an LRU entry moves it out of the budget; clear() keeps pinned entries
+        cache.put("a", vector, pin=True)
+        assert cache.get_stats()["bytes"] == vector.nbytes
+        cache.clear()
+        assert "a" in cache and "template" in cache and "c" not in cache
+        cache.clear(include_pinned=True)
+        assert len(cache) == 0
+    
+    def test_ttl_expiry(self):
+        """Entries past their expiry time count as misses"""
+        import numpy as np
+        from app.services.nlp.embedding_cache import EmbeddingCache
+        
+        now = [100.0]
+        cache = EmbeddingCache(max_bytes=1024 * 1024, ttl_seconds=60, clock=lambda: now[0])
+        vector = np.ones(4, dtype=np.float32)
+        cache.put("q", vector)
+        cache.put("template", vector, pin=True)
+        
+        now[0] += 30
+        assert cache.get("q") is not None
+        now[0] += 31
+        assert cache.get("q") is None
+        assert cache.get("template") is not None
+        
+        stats = cache.get_stats()
+        assert stats["expirations"] == 1
+        assert stats["hits"] == 2 and stats["misses"] == 1
+        assert stats["bytes"] == 0
+    
+    def test_key_normalization(self):
+        """Case and whitespace variants share one cache key"""
+        from app.services.nlp.embedding_cache import make_cache_key, normalize_cache_text
+        
+        assert normalize_cache_text("  Water  Supply\n issue ") == "water supply issue"
+        assert make_cache_key("Water  Supply\n issue") == make_cache_key("water supply issue")
+        assert make_cache_key("water supply") != make_cache_key("water supplies")
+
+
+    def test_persistent_store_roundtrip(self, tmp_path):
+        """Vectors survive reopening; opening with another model drops them"""
+        import numpy as np
+        from app.services.nlp.embedding_store import PersistentEmbeddingStore
+        
+        path = str(tmp_path / "cache" / "embeddings.sqlite3")
+        vectors = {f"k{i}": np.arange(4, dtype=np.float32) + i for i in range(3)}
+        
+        store = PersistentEmbeddingStore(path, "model-a")
+        store.put_many(vectors.items())
+        store.put_many([("k0", np.zeros(4, dtype=np.float32))])  # Existing rows are kept
+        assert store._connect().execute("PRAGMA journal_mode").fetchone()[0] == "wal"
+        
+        # Another worker reads the same vectors back
+        reopened = PersistentEmbeddingStore(path, "model-a")
+        found = reopened.get_many(["k0", "k1", "k2", "missing"])
+        assert sorted(found) == ["k0", "k1", "k2"]
+        assert all(np.array_equal(found[key], vectors[key]) for key in found)
+        assert found["k0"].dtype == np.float32
+        stats = reopened.get_stats()
+        assert stats["entries"] == 3 and stats["hits"] == 3 and stats["misses"] == 1
+        
+        # Rows are keyed by (model, key): another model never sees them
+        store_b = PersistentEmbeddingStore(path, "model-b")
+        assert store_b.get_many(["k0"]) == {}
+        store_b.put_many([("k0", np.ones(4, dtype=np.float32))])
+        rows = store_b._connect().execute(
+            "SELECT model, COUNT(*) FROM embeddings GROUP BY model"
+        ).fetchall()
+        assert rows == [("model-b", 1)]
+        
+        # Switching back drops model-b's rows
+        assert PersistentEmbeddingStore(path, "model-a").get_stats()["entries"] == 0
+        assert store_b.get_stats()["entries"] == 0
+
+
 class TestQueryClassification:
     """Tests for query type classification"""
     
@@ -206,6 +307,55 @@ class TestRankBySimilarity:
         assert "e" not in top_3
 
 
+class FakeTokenizer:
+    """One token per character; pads with 0"""
+    
+    def __call__(self, texts, truncation=True, max_length=512):
+        input_ids = [[ord(c) for c in text][:max_length] for text in texts]
+        return {"input_ids": input_ids, "attention_mask": [[1] * len(ids) for ids in input_ids]}
+    
+    def pad(self, encoded, return_tensors="np"):
+        width = max(len(ids) for ids in encoded["input_ids"])
+        return {
+            name: np.array([row + [0] * (width - len(row)) for row in rows])
+            for name, rows in encoded.items()
+        }
+
+
+class FakeEmbeddingBackend(EmbeddingBackend):
+    """Backend whose _run_batch records its inputs; embeds text as (length, sum, first code point)"""
+    
+    name = "fake"
+    
+    def __init__(self):
+        super().__init__("fake-model")
+        self.dim = 3
+        self.batches = []
+        self.padded_lengths = []
+    
+    def load(self):
+        self.tokenizer = FakeTokenizer()
+        return self
+    
+    @staticmethod
+    def vector(text):
+        ids = [ord(c) for c in text]
+        return np.array([len(ids), sum(ids), ids[0]], dtype=np.float32)
+    
+    def _run_batch(self, inputs):
+        texts = [
+            "".join(chr(i) for i, m in zip(ids, mask) if m)
+            for ids, mask in zip(inputs["input_ids"], inputs["attention_mask"])
+        ]
+        self.batches.append(texts)
+        self.padded_lengths.append(inputs["input_ids"].shape[1])
+        return np.stack([self.vector(text) for text in texts])
+    
+    @property
+    def forwarded(self):
+        return sorted(text for batch in self.batches for text in batch)
+
+
 class TestBatchProcessing:
     """Tests for batch processing functionality"""
     
@@ -225,6 +375,54 @@ class TestBatchProcessing:
         assert batches[0] == [0, 1, 2]
         assert batches[-1] == [9]
     
+    @pytest.fixture
+    def fake_backend(self, monkeypatch):
+        """embed_many on a fake backend with a fresh cache and no persistent store"""
+        from app.services.nlp import distilbert_semantic
+        from app.services.nlp.embedding_cache import EmbeddingCache
+        
+        backend = FakeEmbeddingBackend()
+        monkeypatch.setattr(distilbert_semantic, "_backend", backend)
+        monkeypatch.setattr(distilbert_semantic, "_embedding_cache", EmbeddingCache(max_bytes=1024 * 1024))
+        monkeypatch.setattr(distilbert_semantic, "_embedding_store_checked", True)
+        monkeypatch.setattr(distilbert_semantic, "_embedding_store", None)
+        return backend
+    
+    def test_length_bucketing_preserves_order(self, fake_backend):
+        """Texts sorted by length for batching come back in input order"""
+        import numpy as np
+        from app.services.nlp.distilbert_semantic import embed_many
+        
+        texts = ["a much longer text here", "hi", "medium text", "x", "another fairly long one"]
+        
+        embeddings = embed_many(texts, batch_size=2)
+        
+        expected = np.stack([fake_backend.vector(text) for text in texts])
+        expected /= np.linalg.norm(expected, axis=1, keepdims=True)
+        assert np.allclose(embeddings, expected)
+        # Each mini-batch holds neighbours by length and pads only to its own longest text
+        assert fake_backend.batches == [["x", "hi"], ["medium text", "a much longer text here"], ["another fairly long one"]]
+        assert fake_backend.padded_lengths == [2, 23, 23]
+    
+    def test_cache_hits_served_before_forward_pass(self, fake_backend):
+        """Only distinct uncached texts reach the model, each exactly once"""
+        from app.services.nlp.distilbert_semantic import _get_raw_embeddings, embed_many
+        
+        embed_many(["cached text"])
+        fake_backend.batches.clear()
+        
+        texts = ["cached text", "new text", "new text", "Cached  TEXT", "other text"]
+        embeddings, hits = _get_raw_embeddings(texts)
+        
+        assert fake_backend.forwarded == ["new text", "other text"]
+        assert hits == [True, False, False, True, False]
+        assert [e.tolist() for e in embeddings] == [fake_backend.vector(t).tolist() for t in
+                                                    ["cached text", "new text", "new text", "cached text", "other text"]]
+        
+        # Everything is cached now
+        embed_many(texts)
+        assert fake_backend.forwarded == ["new text", "other text"]
+    
     def test_parallel_processing_mock(self):
         """Test parallel processing logic (mocked)"""
         def mock_process_batch(batch):
@@ -424,6 +622,166 @@ class TestIntegration:
         assert score >= 0.7
 
 
+class TestTemplateIndex:
+    """Tests for the precomputed template embedding index"""
+    
+    def test_matrix_vector_matches_pairwise_cosine(self):
+        """One product against normalized rows equals per-template cosine"""
+        import numpy as np
+        
+        rng = np.random.default_rng(0)
+        templates = rng.normal(size=(6, 8))
+        query = rng.normal(size=8)
+        
+        matrix = (templates / np.linalg.norm(templates, axis=1, keepdims=True)).astype(np.float32)
+        scores = np.clip(matrix @ (query / np.linalg.norm(query)), 0.0, 1.0)
+        
+        pairwise = [
+            max(0.0, min(1.0, float(np.dot(query, t) / (np.linalg.norm(query) * np.linalg.norm(t)))))
+            for t in templates
+        ]
+        assert np.allclose(scores, pairwise, atol=1e-5)
+    
+    @staticmethod
+    def fake_embed(texts):
+        """Deterministic stand-in for the model: letter counts of each text"""
+        import numpy as np
+        return np.array([[text.count(c) for c in "aeiourst"] for text in texts], dtype=np.float64)
+    
+    TEMPLATES = {
+        "intent_rti": ["request for information", "copy of the records", "status of my application"],
+        "intent_complaint": ["file a complaint", "the road is broken"],
+    }
+    
+    def test_version_changes_with_templates_and_model(self):
+        """Index version hash covers model name and every template sentence"""
+        from app.services.nlp.template_index import compute_template_hash
+        
+        base = compute_template_hash("distilbert-base-uncased", self.TEMPLATES)
+        
+        assert compute_template_hash("distilbert-base-uncased", dict(self.TEMPLATES)) == base
+        assert compute_template_hash("other-model", self.TEMPLATES) != base
+        assert compute_template_hash("distilbert-base-uncased", {**self.TEMPLATES, "intent_rti": ["changed"]}) != base
+    
+    def test_save_and_memory_mapped_load(self, tmp_path):
+        """A saved index loads back memory-mapped with the same version and rows"""
+        import numpy as np
+        from app.services.nlp.template_index import (
+            create_template_index, load_template_index, save_template_index
+        )
+        
+        index = create_template_index(self.TEMPLATES, "fake-model", self.fake_embed)
+        assert index.matrix.dtype == np.float32
+        assert np.allclose(np.linalg.norm(index.matrix, axis=1), 1.0)
+        
+        matrix_path = save_template_index(index, str(tmp_path))
+        assert matrix_path.exists()
+        assert not list(tmp_path.glob("*.tmp"))
+        
+        loaded = load_template_index(self.TEMPLATES, "fake-model", str(tmp_path))
+        assert isinstance(loaded.matrix, np.memmap)
+        assert loaded.version == index.version
+        assert loaded.sentences == index.sentences
+        assert np.array_equal(loaded.matrix, index.matrix)
+        assert loaded.to_dict()["memory_mapped"] is True
+    
+    def test_stale_index_is_rejected(self, tmp_path):
+        """Changed templates, another model or a mismatching file load nothing"""
+        import json
+        from app.services.nlp.template_index import (
+            create_template_index, load_template_index, save_template_index
+        )
+        
+        index = create_template_index(self.TEMPLATES, "fake-model", self.fake_embed)
+        save_template_index(index, str(tmp_path))
+        changed = {**self.TEMPLATES, "intent_complaint": ["file a grievance"]}
+        
+        assert load_template_index(changed, "fake-model", str(tmp_path)) is None
+        assert load_template_index(self.TEMPLATES, "other-model", str(tmp_path)) is None
+        
+        # Metadata that does not describe the current templates is ignored
+        meta_path = next(tmp_path.glob("*.json"))
+        meta = json.loads(meta_path.read_text())
+        meta["sentences"] = meta["sentences"][::-1]
+        meta_path.write_text(json.dumps(meta))
+        assert load_template_index(self.TEMPLATES, "fake-model", str(tmp_path)) is None
+    
+    def test_group_slicing(self):
+        """Group row ranges select the right score columns"""
+        import numpy as np
+        from app.services.nlp.template_index import create_template_index
+        
+        index = create_template_index(self.TEMPLATES, "fake-model", self.fake_embed)
+        query = index.matrix[4]  # "the road is broken"
+        scores = index.scores(query)
+        
+        assert index.groups == {"intent_rti": (0, 3), "intent_complaint": (3, 5)}
+        assert index.group_scores(scores, "intent_rti").shape == (3,)
+        assert np.array_equal(index.group_scores(scores, "intent_complaint"), scores[3:5])
+        assert index.group_scores(scores, "intent_complaint")[1] == pytest.approx(1.0)
+        assert index.group_scores(index.scores(index.matrix[:2]), "intent_rti").shape == (2, 3)
+
+
+class TestEmbeddingBackend:
+    """Tests for the torch / ONNX Runtime embedding backends"""
+    
+    def test_mean_pool_ignores_padding(self):
+        """Padding positions do not change the pooled embedding"""
+        from app.services.nlp.embedding_backend import mean_pool
+        
+        rng = np.random.default_rng(0)
+        hidden = rng.normal(size=(1, 3, 4)).astype(np.float32)
+        padded = np.concatenate([hidden, rng.normal(size=(1, 2, 4)).astype(np.float32)], axis=1)
+        
+        pooled = mean_pool(hidden, np.array([[1, 1, 1]]))
+        pooled_padded = mean_pool(padded, np.array([[1, 1, 1, 0, 0]]))
+        
+        assert np.allclose(pooled, pooled_padded)
+        assert np.allclose(pooled[0], hidden[0].mean(axis=0))
+        assert pooled.dtype == np.float32
+        
+        # A fully masked row pools to zeros instead of dividing by zero
+        assert not mean_pool(hidden, np.array([[0, 0, 0]])).any()
+    
+    @pytest.mark.slow
+    @pytest.mark.requires_transformers
+    def test_onnx_parity_with_torch(self, tmp_path):
+        """ONNX (fp32 and int8) embeddings of CIVIC_TEMPLATES match the torch backend"""
+        pytest.importorskip("torch")
+        pytest.importorskip("transformers")
+        pytest.importorskip("onnxruntime")
+        import numpy as np
+        from app.services.nlp.distilbert_semantic import CIVIC_TEMPLATES, MODEL_NAME
+        from app.services.nlp.embedding_backend import (
+            OnnxEmbeddingBackend,
+            TorchEmbeddingBackend,
+            export_onnx_model,
+        )
+        
+        export_onnx_model(MODEL_NAME, str(tmp_path), quantize=True)
+        sentences = [s for group in CIVIC_TEMPLATES.values() for s in group]
+        
+        def normalized(backend):
+            matrix = backend.load().encode(sentences)
+            return matrix / np.linalg.norm(matrix, axis=1, keepdims=True)
+        
+        reference = normalized(TorchEmbeddingBackend(MODEL_NAME))
+        fp32 = normalized(OnnxEmbeddingBackend(MODEL_NAME, str(tmp_path), quantize=False))
+        int8 = normalized(OnnxEmbeddingBackend(MODEL_NAME, str(tmp_path), quantize=True))
+        
+        # Row-wise cosine against the torch embedding
+        assert (fp32 * reference).sum(axis=1).min() > 0.9999
+        assert (int8 * reference).sum(axis=1).min() > 0.98
+        
+        # Nearest-neighbour rankings between templates are preserved
+        ref_sims = reference @ reference.T
+        int8_sims = int8 @ int8.T
+        np.fill_diagonal(ref_sims, -1)
+        np.fill_diagonal(int8_sims, -1)
+        agreement = (ref_sims.argmax(axis=1) == int8_sims.argmax(axis=1)).mean()
+        assert agreement >= 0.9
+
+
 # Run tests with verbose output if executed directly
 if __name__ == "__main__":
     pytest.main([__file__, "-v"])
@@ -0,0 +1,286 @@
+"""
+Tests for the Document Generator renderers
+Checks that the fast canvas renderer draws the same page as Platypus, and
+that the DOCX/XLSX packages rendered from the base templates are valid
+
+Both PDF renderers are run on every letter template in app/templates, and the
+text drawing operations of the resulting PDFs (page, position, font, size,
+colour, word spacing and text of every line) are compared.
+"""
+
+import pytest
+import re
+import zipfile
+from io import BytesIO
+from pathlib import Path
+
+pytest.importorskip("reportlab")
+
+import reportlab.rl_config as rl_config
+
+from app.config import Settings
+from app.services import document_generator
+from app.services.document_generator import DocumentGenerator, _render_pdf_fast, _render_pdf_platypus
+from app.services.office_templates import BASE_DOCX, BASE_XLSX, get_base_package
+
+TEMPLATES_DIR = Path(__file__).resolve().parent.parent / "app" / "templates"
+
+SAMPLE_VALUES = {
+    "APPLICANT_NAME": "Rahul Kumar Sharma",
+    "APPLICANT_ADDRESS": "Flat 12-B, Shanti Apartments, Near City Hospital, Gandhi Nagar, Jaipur - 302015",
+    "DEPARTMENT_NAME": "Public Works Department (PWD)",
+    "DEPARTMENT_ADDRESS": "Secretariat Building, Jaipur, Rajasthan",
+    "INFORMATION_REQUESTED": (
+        "1. Copies of all work orders issued for road repair in Ward No. 45 between April 2023 "
+        "and March 2024, including the names of contractors & the sanctioned amounts.\n"
+        "2. Details of inspections carried out, with the names & designations of the "
+        "inspecting officers.\n"
+        "3. Present status of complaint no. PWD/2024/1123 <pending>."
+    ),
+}
+
+LONG_PARAGRAPH = (
+    "The road connecting the main market to the primary health centre has remained damaged for "
+    "more than eight months, with deep potholes, broken drainage covers and no street lighting, "
+    "causing repeated accidents involving two-wheelers, school children and elderly residents."
+)
+
+
+def fill_template(template: str) -> str:
+    """Replace every {PLACEHOLDER} with a sample value"""
+    return re.sub(r"\{([A-Z_]+)\}", lambda m: SAMPLE_VALUES.get(m.group(1), f"Sample {m.group(1).lower()}"), template)
+
+
+def _unescape_pdf_string(raw: str) -> str:
+    def replace(match):
+        value = match.group(1)
+        if value.isdigit():
+            return chr(int(value, 8))
+        return {"n": "\n", "r": "\r", "t": "\t", "b": "\b", "f": "\f"}.get(value, value)
+    return re.sub(r"\\([0-7]{1,3}|.)", replace, raw)
+
+
+_TOKEN = re.compile(rb"\((?:\\.|[^\\)])*\)|/[^\s/\[\]()<>]+|[^\s/\[\]()<>]+")
+
+
+def text_operations(pdf: bytes):
+    """
+    Every text line of an uncompressed PDF as (page, x, y, font, size, colour,
+    word space, text), in absolute page coordinates. Consecutive Tj operators
+    on one line (Platypus splits text at entities) are joined.
+    """
+    fonts = dict(
+        (name.decode(), base.decode())
+        for base, name in re.findall(rb"/BaseFont /(\S+) .*?/Name /(F\d+)", pdf)
+    )
+    streams = re.findall(rb"stream\r?\n(.*?)endstream", pdf, re.S)
+    ops = []
+
+    for page, stream in enumerate(s for s in streams if b"BT" in s or b" cm" in s):
+        stack = []
+        ctm = (0.0, 0.0)
+        colour = (0.0, 0.0, 0.0)
+        font = size = None
+        leading = word_space = 0.0
+        line = (0.0, 0.0)
+        operands = []
+        same_line = False
+
+        for token in _TOKEN.findall(stream):
+            if token.startswith(b"(") or re.fullmatch(rb"[-+.\d]+|/\S+", token):
+                operands.append(token)
+                continue
+
+            op = token.decode()
+            args = [t.decode("latin-1") for t in operands]
+            operands = []
+
+            if op in ("Tm", "Td", "T*", "BT"):
+                same_line = False
+
+            if op == "q":
+                stack.append((ctm, colour))
+            elif op == "Q":
+                ctm, colour = stack.pop()
+            elif op == "cm":
+                ctm = (ctm[0] + float(args[4]), ctm[1] + float(args[5]))
+            elif op == "rg":
+                colour = tuple(round(float(v), 3) for v in args)
+            elif op == "Tf":
+                font, size = fonts[args[0][1:]], float(args[1])
+            elif op == "TL":
+                leading = float(args[0])
+            elif op == "Tw":
+                word_space = float(args[0])
+            elif op == "Tm":
+                line = (float(args[4]), float(args[5]))
+            elif op == "Td":
+                line = (line[0] + float(args[0]), line[1] + float(args[1]))
+            elif op == "T*":
+                line = (line[0], line[1] - leading)
+            elif op == "Tj" and same_line:
+                ops[-1] = ops[-1][:-1] + (ops[-1][-1] + _unescape_pdf_string(args[0][1:-1]),)
+            elif op == "Tj":
+                same_line = True
+                ops.append((
+                    page,
+                    round(ctm[0] + line[0], 2),
+                    round(ctm[1] + line[1], 2),
+                    font,
+                    size,
+                    colour,
+                    round(word_space, 3),
+                    _unescape_pdf_string(args[0][1:-1])
+                ))
+
+    return ops
+
+
+def render_both(draft_text: str, metadata=None):
+    platypus = BytesIO()
+    fast = BytesIO()
+    _render_pdf_platypus(platypus, draft_text, metadata)
+    assert _render_pdf_fast(fast, draft_text, metadata) is True
+    return platypus.getvalue(), fast.getvalue()
+
+
+@pytest.fixture(autouse=True)
+def uncompressed_pages(monkeypatch):
+    monkeypatch.setattr(rl_config, "pageCompression", 0)
+
+
+TEMPLATE_FILES = sorted(TEMPLATES_DIR.glob("*/*.txt"))
+
+
+class TestFastPdfRenderer:
+    """Visual equivalence of the canvas renderer and Platypus"""
+
+    def test_templates_found(self):
+        assert len(TEMPLATE_FILES) >= 10
+
+    @pytest.mark.parametrize("template_path", TEMPLATE_FILES, ids=lambda p: f"{p.parent.name}/{p.stem}")
+    def test_template_matches_platypus(self, template_path):
+        """Every template renders to the same text operations in both modes"""
+        draft = fill_template(template_path.read_text(encoding="utf-8"))
+        platypus, fast = render_both(draft, {"generated_at": "2024-06-01T10:30:00"})
+
+        expected = text_operations(platypus)
+        assert len(expected) > 10
+        assert text_operations(fast) == expected
+
+    def test_multi_page_split_matches_platypus(self):
+        """Paragraphs split across pages (and orphan moves) match"""
+        draft = fill_template((TEMPLATES_DIR / "rti" / "information_request.txt").read_text(encoding="utf-8"))
+        draft = draft.replace("Thanking you,", "\n".join([LONG_PARAGRAPH * (i % 4 + 1) + "\n" for i in range(14)]) + "\nThanking you,")
+        platypus, fast = render_both(draft, {"generated_at": "2024-06-01T10:30:00"})
+
+        expected = text_operations(platypus)
+        assert max(op[0] for op in expected) >= 2
+        assert text_operations(fast) == expected
+
+    def test_subject_after_paragraph_matches_platypus(self):
+        """Space before the subject overlaps the previous paragraph's space after"""
+        draft = "To,\nThe Officer,\nSubject: Request for records\nSubject: Second subject\nBody text follows."
+        platypus, fast = render_both(draft)
+
+        assert text_operations(fast) == text_operations(platypus)
+
+    def test_unsupported_text_falls_back(self):
+        """Over-long words and soft hyphens are left to Platypus"""
+        assert _render_pdf_fast(BytesIO(), "To,\n" + "x" * 200, None) is False
+        assert _render_pdf_fast(BytesIO(), "To,\ninfor\xadmation", None) is False
+
+    @pytest.mark.parametrize("mode, fast_calls", [("platypus", 0), ("fast", 1)])
+    def test_fast_renderer_is_opt_in(self, monkeypatch, mode, fast_calls):
+        """Platypus is the default; the fast renderer runs only when selected"""
+        calls = []
+        monkeypatch.setattr(document_generator, "_render_pdf_fast", lambda *args: calls.append(args) or False)
+        generator = DocumentGenerator()
+        monkeypatch.setattr(generator.settings, "PDF_RENDER_MODE", mode)
+
+        buffer, _ = generator.generate_pdf("To,\nThe PIO", "rti", "Rahul Sharma")
+
+        assert Settings.model_fields["PDF_RENDER_MODE"].default == "platypus"
+        assert len(calls) == fast_calls
+        assert buffer.getvalue().startswith(b"%PDF")
+
+
+HINDI_TEMPLATE = TEMPLATES_DIR / "rti" / "information_request_hindi.txt"
+
+
+def _zip_is_valid(content: bytes) -> zipfile.ZipFile:
+    archive = zipfile.ZipFile(BytesIO(content))
+    assert archive.testzip() is None
+    return archive
+
+
+class TestOfficePackages:
+    """DOCX/XLSX rendered from the prebuilt base packages"""
+
+    def test_docx_opens_with_letter_structure(self):
+        """python-docx reads the generated body: bold subject, escaped text, Hindi"""
+        docx = pytest.importorskip("docx")
+        draft = "Subject: Records of ward 45\n" + fill_template(HINDI_TEMPLATE.read_text(encoding="utf-8"))
+        buffer, filename = DocumentGenerator().generate_docx(draft, "information_request", "Rahul", {"generated_at": "2024-06-01"})
+        _zip_is_valid(buffer.getvalue())
+
+        document = docx.Document(buffer)
+        texts = [p.text for p in document.paragraphs]
+        subject = next(p for p in document.paragraphs if p.text.lower().startswith("subject:"))
+
+        assert filename.endswith(".docx")
+        assert any("सूचना" in text for text in texts)
+        assert any("<pending>" in text for text in texts)
+        assert subject.runs[0].bold
+        assert texts[-1] == "Generated on: 2024-06-01"
+        assert document.paragraphs[-1].runs[0].italic
+        assert document.styles["Normal"].font.name == "Times New Roman"
+
+    def test_xlsx_opens_with_styles_and_merges(self):
+        """openpyxl reads both sheets with their fonts, merges and widths"""
+        openpyxl = pytest.importorskip("openpyxl")
+        draft = fill_template(HINDI_TEMPLATE.read_text(encoding="utf-8"))
+        buffer, _ = DocumentGenerator().generate_xlsx(
+            draft, "information_request", "Rahul",
+            {"name": "राहुल शर्मा", "phone": None}, None, None
+        )
+        _zip_is_valid(buffer.getvalue())
+
+        workbook = openpyxl.load_workbook(buffer)
+        tracker, content = workbook.worksheets
+
+        assert tracker.title == "Application Tracker"
+        assert tracker["A1"].value == "INFORMATION_REQUEST APPLICATION TRACKING SHEET"
+        assert tracker["A1"].font.b and tracker["A1"].font.sz == 14
+        assert "A1:D1" in {str(r) for r in tracker.merged_cells.ranges}
+        assert tracker.column_dimensions["B"].width == 40
+        values = {cell.value for row in tracker.iter_rows() for cell in row}
+        assert "राहुल शर्मा" in values
+        assert tracker["B17"].font.i
+
+        assert content["A1"].value == "DRAFT CONTENT"
+        assert content["A3"].value == draft.strip().split("\n")[0]
+
+    def test_illegal_characters_are_dropped(self):
+        """Control characters cannot break the XML"""
+        buffer, _ = DocumentGenerator().generate_docx("To,\nBad\x01 char\x0b here", "grievance", "A")
+        archive = _zip_is_valid(buffer.getvalue())
+
+        assert "Bad char here" in archive.read("word/document.xml").decode("utf-8")
+
+    def test_unchanged_parts_are_copied(self):
+        """Only the body / sheet parts differ from the base package"""
+        for name, fmt in ((BASE_DOCX, "docx"), (BASE_XLSX, "xlsx")):
+            package = get_base_package(name)
+            buffer, _, _ = DocumentGenerator().generate(fmt, "To,\nSome text", "grievance", "A")
+            archive = _zip_is_valid(buffer.getvalue())
+
+            with zipfile.ZipFile(package.path) as base:
+                changed = {n for n in base.namelist() if base.read(n) != archive.read(n)}
+            assert archive.namelist() == [part_name for part_name, _ in package.parts]
+            assert changed == set(package.templates)
+
+
+# Run tests with verbose output if executed directly
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
@@ -0,0 +1,95 @@
+"""
+Tests for the /api/download endpoints
+Checks the generic and shortcut routes, ETags, 304 revalidation and the
+render cache header
+"""
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.main import app
+
+DRAFT = (
+    "To,\nThe Public Information Officer,\nMunicipal Corporation, Jaipur\n\n"
+    "Please provide certified copies of the road repair work orders issued in 2024."
+)
+
+CONTENT_TYPES = {
+    "pdf": "application/pdf",
+    "docx": "application/vnd.openxmlformats-officedocument.wordprocessingml.document",
+    "xlsx": "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+}
+
+
+@pytest.fixture(scope="module")
+def client():
+    return TestClient(app)
+
+
+def download_request(format="pdf", **overrides):
+    body = {
+        "draft_text": DRAFT,
+        "document_type": "information_request",
+        "format": format,
+        "applicant": {"name": "Rahul Sharma", "address": "123, Gandhi Nagar, Jaipur", "state": "Rajasthan"},
+    }
+    body.update(overrides)
+    return body
+
+
+class TestDownload:
+    """POST /api/download and the per-format shortcuts"""
+
+    @pytest.mark.parametrize("format", list(CONTENT_TYPES))
+    def test_generic_route(self, client, format):
+        response = client.post("/api/download", json=download_request(format))
+
+        assert response.status_code == 200
+        assert response.headers["content-type"] == CONTENT_TYPES[format]
+        assert response.headers["etag"].startswith('"')
+        assert "attachment" in response.headers["content-disposition"]
+
+    @pytest.mark.parametrize("format", list(CONTENT_TYPES))
+    def test_shortcut_route(self, client, format):
+        # The body's format is overridden by the route
+        response = client.post(f"/api/download/{format}", json=download_request("pdf" if format != "pdf" else "docx"))
+
+        assert response.status_code == 200
+        assert response.headers["content-type"] == CONTENT_TYPES[format]
+        assert response.content
+
+    def test_invalid_format(self, client):
+        response = client.post("/api/download", json=download_request("odt"))
+
+        assert response.status_code == 400
+
+
+class TestRevalidation:
+    """ETag / If-None-Match"""
+
+    @pytest.mark.parametrize("path", ["/api/download", "/api/download/pdf", "/api/download/docx", "/api/download/xlsx"])
+    def test_matching_etag_returns_304(self, client, path):
+        body = download_request("docx" if path.endswith("docx") else "xlsx" if path.endswith("xlsx") else "pdf",
+                                draft_text=DRAFT + f"\n\nRef: {path}")
+        first = client.post(path, json=body)
+
+        second = client.post(path, json=body, headers={"If-None-Match": first.headers["etag"]})
+
+        assert first.status_code == 200
+        assert second.status_code == 304
+        assert second.content == b""
+        assert second.headers["etag"] == first.headers["etag"]
+        assert second.headers["x-render-cache"] == "hit"
+
+    def test_other_etag_returns_document(self, client):
+        body = download_request(draft_text=DRAFT + "\n\nOther ETag")
+
+        response = client.post("/api/download/pdf", json=body, headers={"If-None-Match": '"stale"'})
+
+        assert response.status_code == 200
+        assert response.content.startswith(b"%PDF")
+
+
+# Run tests with verbose output if executed directly
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
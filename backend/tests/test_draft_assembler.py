@@ -0,0 +1,130 @@
+"""
+Tests for the Draft Assembler
+Checks template compilation, filling and hot reload of edited template files
+"""
+
+import pytest
+import os
+import shutil
+from pathlib import Path
+
+from app.services.draft_assembler import DraftAssembler, Placeholder, TEMPLATE_DIR, compile_template
+from app.services.inference_orchestrator import DocumentType
+
+APPLICANT = dict(
+    applicant_name="Rahul Sharma",
+    applicant_address="12, MG Road, Jaipur",
+    applicant_state="Rajasthan",
+    issue_description="Street lights in Ward 45 have not worked for three months",
+)
+
+
+@pytest.fixture
+def template_dir(tmp_path):
+    for folder in ("rti", "complaint"):
+        shutil.copytree(TEMPLATE_DIR / folder, tmp_path / folder)
+    return tmp_path
+
+
+def touch_later(path: Path, text: str) -> None:
+    """Rewrite a file with an mtime clearly after the original"""
+    mtime = path.stat().st_mtime
+    path.write_text(text, encoding="utf-8")
+    os.utime(path, (mtime + 10, mtime + 10))
+
+
+class TestCompileTemplate:
+    """Splitting templates into segments"""
+
+    def test_segments_rebuild_the_template(self):
+        compiled = compile_template("Dear {NAME},\n{APPLICANT_CONTACT}\nDate: {DATE}", {"DATE": "today"})
+
+        assert compiled.placeholders == ("NAME", "APPLICANT_CONTACT", "DATE")
+        assert compiled.segments[0] == "Dear "
+        assert compiled.segments[-1] == Placeholder("DATE", "{DATE}", "today")
+        assert "".join(s if isinstance(s, str) else s.token + s.suffix for s in compiled.segments) == compiled.text
+
+    def test_removable_placeholder_owns_its_line_break(self):
+        compiled = compile_template("A\n{APPLICANT_CONTACT}\nB", {})
+
+        assert compiled.segments == ("A\n", Placeholder("APPLICANT_CONTACT", "{APPLICANT_CONTACT}", None, "\n"), "B")
+
+
+class TestAssembleDraft:
+    """Filling compiled templates"""
+
+    def test_fills_applicant_and_defaults(self):
+        result = DraftAssembler(watch_interval=0).assemble_draft(
+            DocumentType.GRIEVANCE, additional_context={"location": "Ward 45"}, **APPLICANT
+        )
+        draft = result["draft_text"]
+
+        assert "Rahul Sharma" in draft
+        assert "12, MG Road, Jaipur, Rajasthan" in draft
+        assert "{APPLICANT_CONTACT}" not in draft
+        assert result["placeholders_filled"]["APPLICANT_NAME"] == "Rahul Sharma"
+        assert result["placeholders_filled"]["AFFECTED_LOCATION"] == "Ward 45"
+        assert "IMPACT_DESCRIPTION" in result["placeholders_missing"]
+
+    def test_matches_sequential_replacement(self):
+        """Same text as replacing each placeholder in turn"""
+        assembler = DraftAssembler(watch_interval=0)
+        for doc_type in DraftAssembler.TEMPLATE_MAP:
+            for language in ("english", "hindi"):
+                result = assembler.assemble_draft(
+                    doc_type, applicant_phone="9876543210", language=language, **APPLICANT
+                )
+                expected = assembler._get_template(doc_type, language)
+                for name, value in result["placeholders_filled"].items():
+                    expected = expected.replace("{" + name + "}", value)
+                defaults = assembler.DEFAULT_PLACEHOLDERS_HINDI if language == "hindi" else assembler.DEFAULT_PLACEHOLDERS
+                for name in result["placeholders_missing"]:
+                    expected = expected.replace("{" + name + "}", defaults.get(name, "{" + name + "}"))
+
+                assert result["draft_text"] == expected
+
+    def test_hindi_falls_back_to_english_template_with_hindi_defaults(self):
+        result = DraftAssembler(watch_interval=0).assemble_draft(
+            DocumentType.INSPECTION_REQUEST, language="hindi", **APPLICANT
+        )
+
+        assert "RIGHT TO INFORMATION" in result["draft_text"].upper()
+        assert "भारतीय पोस्टल ऑर्डर" in result["draft_text"]
+
+
+class TestTemplateReload:
+    """Edited template files are picked up without a restart"""
+
+    def test_edit_is_recompiled(self, template_dir):
+        assembler = DraftAssembler(template_dir=template_dir, watch_interval=0.01)
+        assembler._next_check = 0
+        path = template_dir / "complaint" / "grievance.txt"
+
+        touch_later(path, "Complaint by {APPLICANT_NAME}\n{APPLICANT_CONTACT}\nEnd")
+        result = assembler.assemble_draft(DocumentType.GRIEVANCE, **APPLICANT)
+
+        assert result["draft_text"] == "Complaint by Rahul Sharma\nEnd"
+        assert assembler.templates["grievance_english"].startswith("Complaint by")
+
+    def test_unchanged_within_interval(self, template_dir):
+        assembler = DraftAssembler(template_dir=template_dir, watch_interval=3600)
+        before = assembler.assemble_draft(DocumentType.GRIEVANCE, **APPLICANT)["draft_text"]
+
+        touch_later(template_dir / "complaint" / "grievance.txt", "Edited")
+
+        assert assembler.assemble_draft(DocumentType.GRIEVANCE, **APPLICANT)["draft_text"] == before
+
+    def test_deleted_file_keeps_previous_version(self, template_dir):
+        assembler = DraftAssembler(template_dir=template_dir, watch_interval=0.01)
+        assembler._next_check = 0
+        before = assembler.templates["grievance_english"]
+
+        (template_dir / "complaint" / "grievance.txt").unlink()
+        assembler.assemble_draft(DocumentType.ESCALATION, **APPLICANT)
+
+        assert assembler.templates["grievance_english"] == before
+
+
+# Run tests with verbose output if executed directly
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
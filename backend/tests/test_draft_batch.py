@@ -0,0 +1,98 @@
+"""
+Tests for mail-merge draft generation
+Checks row parsing, the shared merge template and that merged drafts match
+drafts assembled one at a time
+"""
+
+import pytest
+import asyncio
+
+from app.services.draft_assembler import ROW_PLACEHOLDERS, DraftAssembler
+from app.services.draft_batch import merge_rows, parse_rows, prepare_shared_draft
+from app.services.inference_orchestrator import DocumentType
+
+DESCRIPTION = "The street lights in our colony have not been working for three weeks"
+
+ROWS = [
+    {"name": "Rahul Sharma", "address": "12, MG Road, Jaipur", "state": "Rajasthan", "phone": "9876543210"},
+    {"name": "Asha Devi", "address": "4, Station Road, Kota", "state": "Rajasthan",
+     "department_name": "Nagar Nigam", "department_address": "Civil Lines, Kota", "designation": "Commissioner"},
+]
+
+
+def prepare(document_type, **kwargs):
+    return asyncio.run(prepare_shared_draft(document_type, DESCRIPTION, **kwargs))
+
+
+class TestParseRows:
+    """CSV and JSONL input"""
+
+    def test_csv_with_quoted_fields(self):
+        rows = parse_rows('name,address,state,phone\nRahul,"12, MG Road, Jaipur",Rajasthan,\n', "csv")
+
+        assert rows == [({"name": "Rahul", "address": "12, MG Road, Jaipur", "state": "Rajasthan", "phone": None}, None)]
+
+    def test_jsonl_reports_bad_lines(self):
+        rows = parse_rows('{"name": "A"}\n\nnot json\n[1, 2]\n', "JSONL")
+
+        assert rows[0] == ({"name": "A"}, None)
+        assert rows[1][1].startswith("Invalid JSON on line 3")
+        assert rows[2] == (None, "Line 4 is not a JSON object")
+
+    def test_unknown_format(self):
+        with pytest.raises(ValueError):
+            parse_rows("a", "xml")
+
+
+class TestMergeTemplate:
+    """Shared body with per-row placeholders left open"""
+
+    def test_only_row_placeholders_remain(self):
+        merge = DraftAssembler(watch_interval=0).prepare_merge(DocumentType.GRIEVANCE, DESCRIPTION)
+
+        assert DESCRIPTION in merge.template.text
+        assert set(merge.template.placeholders) <= ROW_PLACEHOLDERS
+        assert "APPLICANT_NAME" in merge.template.placeholders
+
+    @pytest.mark.parametrize("document_type", list(DraftAssembler.TEMPLATE_MAP))
+    @pytest.mark.parametrize("language", ["english", "hindi"])
+    def test_merged_drafts_match_single_drafts(self, document_type, language):
+        shared = prepare(document_type, time_period="2024", language=language)
+        items = list(merge_rows(shared, [(row, None) for row in ROWS]))
+        assembler = DraftAssembler(watch_interval=0)
+
+        for item, row in zip(items, ROWS):
+            single = assembler.assemble_draft(
+                document_type,
+                applicant_name=row["name"],
+                applicant_address=row["address"],
+                applicant_state=row["state"],
+                issue_description=DESCRIPTION,
+                applicant_phone=row.get("phone"),
+                department_name=row.get("department_name", "The Concerned Department"),
+                department_address=row.get("department_address", "[Department Address]"),
+                authority_designation=row.get("designation"),
+                time_period="2024",
+                additional_context={},
+                language=language
+            )
+            result = item["result"]
+
+            assert item["error"] is None
+            assert result["draft_text"] == single["draft_text"]
+            assert result["placeholders"]["filled"] == single["placeholders_filled"]
+            assert sorted(result["placeholders"]["missing"]) == sorted(single["placeholders_missing"])
+
+    def test_invalid_rows_become_errors(self):
+        shared = prepare(DocumentType.INFORMATION_REQUEST)
+        items = list(merge_rows(shared, [({"name": "A", "state": "Goa"}, None), (None, "Invalid JSON on line 2"), (ROWS[0], None)]))
+
+        assert "name" in items[0]["error"] and "address" in items[0]["error"]
+        assert items[1]["error"] == "Invalid JSON on line 2"
+        assert [item["index"] for item in items] == [0, 1, 2]
+        assert "Rahul Sharma" in items[2]["result"]["draft_text"]
+
+
+# Run tests with verbose output if executed directly
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
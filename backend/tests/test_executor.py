@@ -0,0 +1,192 @@
+"""
+Unit tests for the Blocking Work Executor (app.services.executor)
+Tests admission control, back-pressure, per-stage timing and the forked
+inference workers
+"""
+
+import pytest
+import asyncio
+import gc
+import multiprocessing
+import os
+import time
+
+from app.config import get_settings
+from app.services import executor as executor_module
+from app.services.executor import (
+    EXECUTOR_PROCESS,
+    BoundedExecutor,
+    ExecutorSaturatedError,
+    get_executor,
+    get_inference_executor
+)
+
+
+@pytest.fixture
+def make_executor():
+    """BoundedExecutor factory; pools are shut down after the test"""
+    created = []
+
+    def factory(**kwargs):
+        executor = BoundedExecutor(**kwargs)
+        created.append(executor)
+        return executor
+
+    yield factory
+    for executor in created:
+        executor.shutdown()
+
+
+class TestAdmission:
+    """At most max_workers + max_queue calls in flight"""
+
+    def test_rejects_when_workers_and_queue_are_full(self, make_executor):
+        """Calls beyond max_workers + max_queue are rejected with Retry-After"""
+        executor = make_executor(max_workers=2, max_queue=1, retry_after=3)
+
+        async def scenario():
+            running = [asyncio.create_task(executor.run("slow", time.sleep, 0.1)) for _ in range(3)]
+            await asyncio.sleep(0.01)
+            stats = executor.get_stats()
+            with pytest.raises(ExecutorSaturatedError) as exc_info:
+                await executor.run("slow", time.sleep, 0.1)
+            await asyncio.gather(*running)
+            return stats, exc_info.value
+
+        stats, error = asyncio.run(scenario())
+
+        assert stats["in_flight"] == 3 and stats["queued"] == 1
+        assert error.stage == "slow" and error.retry_after == 3
+        assert executor.get_stats()["stages"]["slow"]["rejected"] == 1
+        assert executor.get_stats()["in_flight"] == 0
+
+    def test_slot_is_released_after_completion(self, make_executor):
+        """A full executor admits again once a call finishes"""
+        executor = make_executor(max_workers=1, max_queue=0)
+
+        async def scenario():
+            first = asyncio.create_task(executor.run("slow", time.sleep, 0.05))
+            await asyncio.sleep(0.01)
+            with pytest.raises(ExecutorSaturatedError):
+                await executor.run("slow", time.sleep, 0)
+            await first
+            return await executor.run("slow", sum, [1, 2, 3])
+
+        assert asyncio.run(scenario()) == 6
+        assert executor.get_stats()["in_flight"] == 0
+
+    def test_slot_is_held_until_work_finishes_after_cancel(self, make_executor):
+        """A cancelled caller does not free the slot while its worker still runs"""
+        executor = make_executor(max_workers=1, max_queue=0)
+
+        async def scenario():
+            task = asyncio.create_task(executor.run("slow", time.sleep, 0.1))
+            await asyncio.sleep(0.01)
+            task.cancel()
+            await asyncio.sleep(0.01)
+            in_flight = executor.get_stats()["in_flight"]
+            await asyncio.sleep(0.15)
+            return in_flight
+
+        assert asyncio.run(scenario()) == 1
+        assert executor.get_stats()["in_flight"] == 0
+
+    def test_errors_propagate_and_free_the_slot(self, make_executor):
+        """Exceptions raised in the worker reach the caller"""
+        executor = make_executor(max_workers=1, max_queue=0)
+
+        async def scenario():
+            with pytest.raises(ValueError):
+                await executor.run("parse", int, "not a number")
+            return await executor.run("parse", int, "42")
+
+        assert asyncio.run(scenario()) == 42
+        assert executor.get_stats()["stages"]["parse"]["errors"] == 1
+
+    def test_unknown_kind_is_rejected(self):
+        with pytest.raises(ValueError):
+            BoundedExecutor(kind="fiber")
+
+
+class TestStageStats:
+    """Queue wait and run time per stage"""
+
+    def test_queued_call_records_wait_time(self, make_executor):
+        """A call waiting for a free worker records queue wait separately from run time"""
+        executor = make_executor(max_workers=1, max_queue=1)
+
+        async def scenario():
+            await asyncio.gather(
+                executor.run("first", time.sleep, 0.05),
+                executor.run("second", time.sleep, 0.05)
+            )
+
+        asyncio.run(scenario())
+        stages = executor.get_stats()["stages"]
+
+        assert stages["first"]["calls"] == 1 and stages["second"]["calls"] == 1
+        assert stages["first"]["run_ms_avg"] >= 40
+        assert stages["second"]["run_ms_avg"] >= 40
+        assert stages["second"]["wait_ms_avg"] >= 40
+        assert stages["first"]["wait_ms_avg"] < 40
+
+
+_PRELOADED = None
+
+
+def _preload():
+    global _PRELOADED
+    _PRELOADED = {"model": list(range(1000)), "loaded_by": os.getpid()}
+
+
+def _uses_preloaded(n):
+    return os.getpid(), _PRELOADED and _PRELOADED["loaded_by"], n * 2
+
+
+class TestForkedWorkers:
+    """Inference workers forked after preloading"""
+
+    @pytest.mark.skipif("fork" not in multiprocessing.get_all_start_methods(), reason="fork not available")
+    def test_workers_inherit_preloaded_models(self, make_executor):
+        """Objects loaded in the parent before forking are visible in every worker"""
+        global _PRELOADED
+        executor = make_executor(kind=EXECUTOR_PROCESS, max_workers=2, max_queue=2, preload=_preload)
+
+        async def scenario():
+            return await asyncio.gather(*(executor.run("inference", _uses_preloaded, n) for n in range(4)))
+
+        try:
+            executor.start()
+            results = asyncio.run(scenario())
+        finally:
+            gc.unfreeze()
+            _PRELOADED = None
+
+        assert all(pid != os.getpid() for pid, _, _ in results)
+        assert all(loaded_by == os.getpid() for _, loaded_by, _ in results)
+        assert [doubled for _, _, doubled in results] == [0, 2, 4, 6]
+        assert executor.get_stats()["stages"]["inference"]["calls"] == 4
+
+
+class TestSharedExecutors:
+    """Module-level executors configured from settings"""
+
+    def test_inference_uses_shared_executor_without_workers(self, monkeypatch):
+        monkeypatch.setattr(get_settings(), "INFERENCE_WORKERS", 0)
+
+        assert get_inference_executor() is get_executor()
+
+    def test_inference_workers_are_a_process_pool(self, monkeypatch):
+        monkeypatch.setattr(get_settings(), "INFERENCE_WORKERS", 2)
+        monkeypatch.setattr(executor_module, "_inference_executor", None)
+
+        executor = get_inference_executor()
+
+        assert executor.kind == EXECUTOR_PROCESS and executor.max_workers == 2
+        assert executor is not get_executor()
+        assert executor.get_stats()["in_flight"] == 0
+
+
+# Run tests with verbose output if executed directly
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
@@ -0,0 +1,146 @@
+"""
+Tests for POST /api/infer/batch
+Checks chunked execution on the inference executor, NDJSON ordering,
+503 admission and mid-stream failures (with a stand-in for the NLP pipeline)
+"""
+
+import pytest
+import json
+from fastapi.testclient import TestClient
+
+from app.api import infer
+from app.main import app
+from app.services.executor import BoundedExecutor, ExecutorSaturatedError
+from app.services.inference_orchestrator import DocumentType, InferenceResult, IntentType
+from app.services.nlp.confidence_gate import ConfidenceLevel
+
+TEXTS = [
+    "I want to know the expenditure on road construction",
+    "<p>short</p>",  # Too short once the tags are stripped
+    "The street lights in our colony are not working",
+    "Copies of the tender documents for the new bridge",
+    "Water supply has been irregular for two months",
+]
+
+
+def fake_result(text):
+    return InferenceResult(
+        intent=IntentType.RTI,
+        document_type=DocumentType.INFORMATION_REQUEST,
+        confidence=0.9,
+        confidence_level=ConfidenceLevel.HIGH,
+        requires_confirmation=False,
+        extracted_entities={},
+        key_phrases=[],
+        legal_triggers={},
+        department_mapping={},
+        sentiment="neutral",
+        suggestions=[],
+        explanation=text,
+        decision_path=[]
+    )
+
+
+class FakeExecutor:
+    """Runs calls inline; raises ExecutorSaturatedError for the listed call numbers"""
+
+    kind = "thread"
+
+    def __init__(self, saturated_calls=()):
+        self.saturated_calls = set(saturated_calls)
+        self.calls = 0
+
+    async def run(self, stage, fn, *args):
+        self.calls += 1
+        if self.calls in self.saturated_calls:
+            raise ExecutorSaturatedError(stage, 0)
+        return fn(*args)
+
+
+@pytest.fixture
+def client():
+    return TestClient(app)
+
+
+class FakeModel:
+    """Stands in for run_inference_batch; records the texts of each chunk"""
+
+    def __init__(self):
+        self.chunks = []
+        self.fail_on = None
+
+    def run_inference_batch(self, texts, language, batch_size, n_process):
+        self.chunks.append(list(texts))
+        for text in texts:
+            if text == self.fail_on:
+                raise RuntimeError("model crashed")
+            yield fake_result(text)
+
+
+@pytest.fixture
+def model(monkeypatch):
+    """Fake model, chunks of 2 texts"""
+    fake = FakeModel()
+    monkeypatch.setattr(infer, "run_inference_batch", fake.run_inference_batch)
+    monkeypatch.setattr(infer.settings, "INFER_BATCH_SIZE", 2)
+    monkeypatch.setattr(infer.settings, "INFER_BATCH_N_PROCESS", 1)
+    return fake
+
+
+
+
+def lines(response):
+    return [json.loads(line) for line in response.text.splitlines()]
+
+
+class TestBatchStream:
+    """Chunks on the executor, results in input order"""
+
+    def test_results_in_order_across_chunks(self, client, monkeypatch, model):
+        executor = BoundedExecutor(max_workers=2, max_queue=4)
+        monkeypatch.setattr(infer, "get_inference_executor", lambda: executor)
+
+        response = client.post("/api/infer/batch", json={"texts": TEXTS})
+        items = lines(response)
+
+        assert response.status_code == 200
+        assert [item["index"] for item in items] == list(range(len(TEXTS)))
+        assert items[1]["error"].startswith("Input text too short")
+        assert [item["result"]["explanation"] for item in items if item["result"]] == [TEXTS[0]] + TEXTS[2:]
+        assert model.chunks == [[TEXTS[0], TEXTS[2]], TEXTS[3:]]
+        assert executor.get_stats()["stages"]["inference_batch"]["calls"] == 2
+        executor.shutdown()
+
+    def test_saturated_executor_is_503(self, client, monkeypatch, model):
+        monkeypatch.setattr(infer, "get_inference_executor", lambda: FakeExecutor(saturated_calls={1}))
+
+        response = client.post("/api/infer/batch", json={"texts": TEXTS})
+
+        assert response.status_code == 503
+        assert "retry-after" in response.headers
+        assert model.chunks == []
+
+    def test_later_chunks_wait_for_a_slot(self, client, monkeypatch, model):
+        executor = FakeExecutor(saturated_calls={2, 3})
+        monkeypatch.setattr(infer, "get_inference_executor", lambda: executor)
+
+        items = lines(client.post("/api/infer/batch", json={"texts": TEXTS}))
+
+        assert all(item["error"] is None for item in items if item["index"] != 1)
+        assert executor.calls == 4
+
+    def test_failed_chunk_aborts_the_rest(self, client, monkeypatch, model):
+        model.fail_on = TEXTS[3]
+        monkeypatch.setattr(infer, "get_inference_executor", lambda: FakeExecutor())
+
+        items = lines(client.post("/api/infer/batch", json={"texts": TEXTS}))
+
+        assert items[0]["result"] is not None
+        assert items[2]["result"] is not None
+        assert items[3]["error"] == "Inference processing failed: model crashed"
+        assert items[4]["error"] == "Batch aborted"
+
+
+# Run tests with verbose output if executed directly
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
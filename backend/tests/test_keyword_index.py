@@ -0,0 +1,199 @@
+"""
+Unit tests for the Keyword Index (app.services.rule_engine.keyword_index)
+Tests the single-pass Aho-Corasick matcher and the keyword tables the
+intent, issue and legal trigger rules register with it
+"""
+
+import pytest
+import re
+from typing import List, Set, Tuple
+
+from app.services.rule_engine import intent_rules, issue_rules, legal_triggers
+from app.services.rule_engine.keyword_index import (
+    TABLE_GRIEVANCE,
+    TABLE_INTENT,
+    TABLE_ISSUE,
+    TABLE_RTI_SECTION,
+    TABLE_SUB_TYPE,
+    KeywordIndex,
+    get_keyword_index,
+    group_hits,
+    scan_keywords,
+    unique_keywords
+)
+
+# Sample tables (subset of the rule engine tables)
+RTI_KEYWORDS = {"right to information": 0.3, "rti": 0.3, "rti act": 0.3, "information": 0.1}
+COMPLAINT_KEYWORDS = {"complaint": 0.3, "bribe": 0.2, "not working": 0.1}
+ISSUE_KEYWORDS = {"water": [("water", 0.3), ("water supply", 0.3), ("tap", 0.15)],
+                  "education": [("tc", 0.2), ("school", 0.3)]}
+
+SAMPLE_TEXTS = [
+    "I request information under the RTI Act about the water supply",
+    "Complaint: the tap is not working and the school asked for a bribe",
+    "rti/rti-act (rti) RTIs information_request",
+    "The municipal officer demanded a bribe for my birth certificate. No reply after 30 days, "
+    "I want to file a first appeal and know the status of my application",
+    "Street lights not working, garbage not collected, potholes on the road near the hospital",
+    "",
+]
+
+
+@pytest.fixture
+def index():
+    idx = KeywordIndex()
+    idx.register("intent", [("rti", k, w) for k, w in RTI_KEYWORDS.items()] +
+                 [("complaint", k, w) for k, w in COMPLAINT_KEYWORDS.items()], word_boundary=True)
+    idx.register("issue", [(c, k, w) for c, kws in ISSUE_KEYWORDS.items() for k, w in kws])
+    return idx
+
+
+def naive_matches(text_lower: str, table: str, entries, word_boundary: bool) -> Set[Tuple[str, str, str, int]]:
+    """Reference implementation: one regex (intent rules) or substring search per keyword"""
+    matches = set()
+    for category, keyword, _ in entries:
+        keyword = keyword.lower()
+        if word_boundary and " " not in keyword:
+            pattern = rf'\b{re.escape(keyword)}\b'
+        else:
+            pattern = f'(?={re.escape(keyword)})'
+        matches.update((table, category, keyword, m.start()) for m in re.finditer(pattern, text_lower))
+    return matches
+
+
+def rule_engine_tables() -> List[Tuple[str, list, bool]]:
+    """The tables as defined by the rule modules: (table, entries, word_boundary)"""
+    return [
+        (TABLE_INTENT, [
+            (category, keyword, weight)
+            for category, keywords in intent_rules.INTENT_KEYWORD_TABLES.items()
+            for keyword, weight in keywords.items()
+        ], True),
+        (TABLE_SUB_TYPE, [
+            (sub_type.value, indicator, 0.0)
+            for sub_type, indicators in intent_rules.SUB_TYPE_INDICATORS.items()
+            for indicator in indicators
+        ], False),
+        (TABLE_ISSUE, [
+            (category.value, keyword, weight)
+            for category, data in issue_rules.ISSUE_DEPARTMENT_MAP.items()
+            for keyword, weight in data["keywords"]
+        ], False),
+        (TABLE_RTI_SECTION, [
+            (section_id, trigger, 0.0)
+            for section_id, triggers in legal_triggers.RTI_SECTION_TRIGGERS.items()
+            for trigger in triggers
+        ], False),
+        (TABLE_GRIEVANCE, [
+            (marker_id, trigger, 0.0)
+            for marker_id, marker_data in legal_triggers.GRIEVANCE_MARKERS.items()
+            for trigger in marker_data["triggers"]
+        ], False),
+    ]
+
+
+class TestOverlappingMatches:
+    """Aho-Corasick must report overlapping keywords"""
+
+    def test_nested_keywords_all_reported(self, index):
+        hits = index.scan("filed under the rti act")
+        keywords = {h.keyword for h in hits}
+        assert "rti" in keywords
+        assert "rti act" in keywords
+
+    def test_phrase_and_contained_word(self, index):
+        hits = index.scan("my right to information")
+        keywords = {h.keyword for h in hits}
+        assert "right to information" in keywords
+        assert "information" in keywords
+
+    def test_repeated_keyword_counted_each_time(self, index):
+        hits = [h for h in index.scan("bribe after bribe") if h.keyword == "bribe"]
+        assert [h.position for h in hits] == [0, 12]
+
+
+class TestMatchingSemantics:
+    """Table-specific matching rules are preserved"""
+
+    def test_word_boundary_for_intent_tables(self, index):
+        hits = index.scan("the prti shop")
+        assert not any(h.keyword == "rti" for h in hits)
+
+    def test_boundary_allows_punctuation(self, index):
+        hits = index.scan("filed an rti, then waited")
+        assert any(h.keyword == "rti" for h in hits)
+
+    def test_underscore_is_word_char(self, index):
+        hits = index.scan("my_rti")
+        assert not any(h.keyword == "rti" for h in hits)
+
+    def test_substring_semantics_for_issue_tables(self, index):
+        hits = index.scan("please watch the stream")
+        assert any(h.keyword == "tc" and h.table == "issue" for h in hits)
+
+    def test_hits_tagged_with_metadata(self, index):
+        hits = [h for h in index.scan("no water supply") if h.keyword == "water supply"]
+        assert len(hits) == 1
+        assert hits[0].table == "issue"
+        assert hits[0].category == "water"
+        assert hits[0].weight == 0.3
+        assert hits[0].position == 3
+
+    def test_table_filter(self, index):
+        hits = index.scan("rti about the water supply", tables=["issue"])
+        assert hits and all(h.table == "issue" for h in hits)
+
+
+class TestRegistration:
+    """Tables can be added after first use"""
+
+    def test_register_after_scan_recompiles(self, index):
+        assert not any(h.table == "extra" for h in index.scan("pothole"))
+        index.register("extra", [("roads", "pothole", 0.3)])
+        hits = index.scan("pothole")
+        assert [(h.table, h.category) for h in hits] == [("extra", "roads")]
+
+    def test_stats_count_tables(self, index):
+        stats = index.get_stats()
+        assert stats["keywords"] == 12
+        assert stats["table_intent"] == 7 and stats["table_issue"] == 5
+
+
+class TestHitHelpers:
+    """group_hits / unique_keywords"""
+
+    def test_group_hits_follows_table_order(self, index):
+        grouped = group_hits(index.scan("the rti act, the right to information"), "intent")
+        assert [h.keyword for h in grouped["rti"]] == ["right to information", "rti", "rti act", "information"]
+
+    def test_unique_keywords(self, index):
+        hits = group_hits(index.scan("bribe after bribe"), "intent")["complaint"]
+        assert unique_keywords(hits) == ["bribe"]
+
+
+class TestRuleEngineTables:
+    """The shared index holds the tables registered by the rule modules"""
+
+    def test_every_table_is_registered(self):
+        stats = get_keyword_index().get_stats()
+        for table, entries, _ in rule_engine_tables():
+            assert stats[f"table_{table}"] == len(entries) > 0
+
+    @pytest.mark.parametrize("text", SAMPLE_TEXTS)
+    def test_parity_with_per_keyword_matching(self, text):
+        """One scan agrees with the per-keyword checks it replaces, table by table"""
+        text_lower = text.lower()
+        hits = scan_keywords(text_lower)
+
+        for table, entries, word_boundary in rule_engine_tables():
+            found = {(h.table, h.category, h.keyword, h.position) for h in hits if h.table == table}
+            assert found == naive_matches(text_lower, table, entries, word_boundary), table
+
+    def test_sample_texts_hit_every_table(self):
+        tables = {h.table for text in SAMPLE_TEXTS for h in scan_keywords(text.lower())}
+        assert tables == {TABLE_INTENT, TABLE_SUB_TYPE, TABLE_ISSUE, TABLE_RTI_SECTION, TABLE_GRIEVANCE}
+
+
+# Run tests with verbose output if executed directly
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
@@ -0,0 +1,121 @@
+"""
+Tests for the LLM response cache
+Checks key normalization, the byte-bounded LRU, TTL and the disk tier
+"""
+
+import pytest
+
+from app.services.llm.response_cache import LLMResponseCache, normalize_prompt_text
+
+
+class FakeClock:
+    def __init__(self, now=1000.0):
+        self.now = now
+
+    def __call__(self):
+        return self.now
+
+
+def store(cache, key, text="polished"):
+    cache.put(key, enhanced_text=text, model_used="gpt-4o-mini", tokens_used=150, changes_made=["Text polished"])
+
+
+class TestKeys:
+    """Keyed hashes of normalized input and settings"""
+
+    def test_normalization_keeps_paragraphs(self):
+        assert normalize_prompt_text("  Dear  Sir,\r\n\r\n\r\n\tThe road\t is broken.  \n") == "Dear Sir,\n\nThe road is broken."
+
+    def test_whitespace_variants_share_a_key(self):
+        cache = LLMResponseCache()
+
+        assert cache.make_key("a  b\n", mode="polish") == cache.make_key("a b", mode="polish")
+        assert cache.make_key("a b", mode="polish") != cache.make_key("a b", mode="clarify")
+        assert cache.make_key("a\n\nb", mode="polish") != cache.make_key("a b", mode="polish")
+
+    def test_keys_depend_on_secret(self):
+        assert LLMResponseCache(key_secret="x").make_key("a") == LLMResponseCache(key_secret="x").make_key("a")
+        assert LLMResponseCache(key_secret="x").make_key("a") != LLMResponseCache(key_secret="y").make_key("a")
+
+
+class TestMemoryTier:
+    """Byte-bounded LRU with TTL"""
+
+    def test_hit_and_miss(self):
+        cache = LLMResponseCache()
+        store(cache, "k")
+
+        entry = cache.get("k")
+
+        assert entry.enhanced_text == "polished" and entry.tokens_used == 150
+        assert cache.get("other") is None
+        assert cache.get_stats()["hits"] == 1 and cache.get_stats()["misses"] == 1
+
+    def test_evicts_least_recently_used_by_bytes(self):
+        cache = LLMResponseCache(max_bytes=100)
+        store(cache, "a", "x" * 20)
+        store(cache, "b", "x" * 20)
+        cache.get("a")
+        for key in "cde":
+            store(cache, key, "x" * 20)
+        store(cache, "f", "x" * 20)
+
+        assert cache.get("b") is None
+        assert cache.get("a") is not None
+        assert cache.get_stats()["bytes"] <= 100
+
+    def test_large_entries_are_not_cached(self):
+        cache = LLMResponseCache(max_bytes=100)
+        store(cache, "k", "x" * 26)
+
+        assert cache.get("k") is None
+
+    def test_entries_expire(self):
+        clock = FakeClock()
+        cache = LLMResponseCache(ttl_seconds=60, clock=clock)
+        store(cache, "k")
+
+        clock.now += 59
+        assert cache.get("k") is not None
+        clock.now += 1
+        assert cache.get("k") is None
+        assert cache.get_stats()["entries"] == 0
+
+
+class TestDiskTier:
+    """JSON files shared by processes with the same key secret"""
+
+    def test_entries_survive_a_new_process(self, tmp_path):
+        store(LLMResponseCache(disk_dir=str(tmp_path), key_secret="s"), "k", "पॉलिश किया गया")
+
+        cache = LLMResponseCache(disk_dir=str(tmp_path), key_secret="s")
+        entry = cache.get("k")
+
+        assert entry.enhanced_text == "पॉलिश किया गया"
+        assert entry.changes_made == ["Text polished"]
+        assert cache.get_stats()["disk_hits"] == 1
+
+    def test_expired_and_corrupt_files_are_dropped(self, tmp_path):
+        cache = LLMResponseCache(ttl_seconds=60, disk_dir=str(tmp_path))
+        store(cache, "old")
+        (tmp_path / "bad.json").write_text("{not json", encoding="utf-8")
+        cache.clock = FakeClock(cache.clock() + 120)
+        cache._entries.clear()
+
+        assert cache.get("old") is None
+        assert cache.get("bad") is None
+        assert list(tmp_path.glob("*.json")) == []
+
+    def test_clear_removes_files(self, tmp_path):
+        cache = LLMResponseCache(disk_dir=str(tmp_path))
+        store(cache, "k")
+
+        cache.clear()
+
+        assert cache.get("k") is None
+        assert list(tmp_path.glob("*.json")) == []
+
+
+# Run tests with verbose output if executed directly
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
@@ -0,0 +1,202 @@
+"""
+Tests for RequestPipelineMiddleware
+Runs a small FastAPI app through TestClient to check security headers,
+rate limiting, the optional API key and the 500 mapping of route errors
+"""
+
+import pytest
+import asyncio
+from fastapi import FastAPI
+from fastapi.responses import JSONResponse
+from fastapi.testclient import TestClient
+
+from app.config import get_settings
+from app.middleware import RequestPipelineMiddleware
+from app.services.rate_limiter import InMemoryRateLimitBackend, SQLiteRateLimitBackend
+
+LIMIT = 3
+
+
+class RecordingSQLiteBackend(SQLiteRateLimitBackend):
+    """SQLite backend noting whether each check ran on the event loop"""
+
+    def __init__(self, path):
+        super().__init__(path)
+        self.on_event_loop = []
+
+    def check(self, key, now, limit, window):
+        try:
+            asyncio.get_running_loop()
+            self.on_event_loop.append(True)
+        except RuntimeError:
+            self.on_event_loop.append(False)
+        return super().check(key, now, limit, window)
+
+
+def create_app(rate_limit_backend=None) -> FastAPI:
+    if rate_limit_backend is None:
+        rate_limit_backend = InMemoryRateLimitBackend()
+
+    test_app = FastAPI()
+    test_app.add_middleware(
+        RequestPipelineMiddleware,
+        requests_per_window=LIMIT,
+        window_seconds=60,
+        rate_limit_backend=rate_limit_backend
+    )
+
+    @test_app.get("/health")
+    async def health():
+        return {"status": "healthy"}
+
+    @test_app.get("/api/ok")
+    async def ok():
+        return {"ok": True}
+
+    @test_app.get("/api/cached")
+    async def cached():
+        return JSONResponse({"ok": True}, headers={"Cache-Control": "private, max-age=60"})
+
+    @test_app.get("/api/boom")
+    async def boom():
+        raise RuntimeError("database is on fire")
+
+    return test_app
+
+
+@pytest.fixture
+def settings(monkeypatch):
+    """Settings read by the middleware on each request; API key off, rate limit on"""
+    settings = get_settings()
+    monkeypatch.setattr(settings, "RATE_LIMIT_ENABLED", True)
+    monkeypatch.setattr(settings, "API_KEY_ENABLED", False)
+    monkeypatch.setattr(settings, "API_KEYS", ["secret-key"])
+    return settings
+
+
+@pytest.fixture
+def client(settings):
+    return TestClient(create_app())
+
+
+class TestSecurityHeaders:
+    """Security headers on responses produced by the application only"""
+
+    def test_app_response_has_security_and_no_cache_headers(self, client):
+        response = client.get("/api/ok")
+
+        assert response.status_code == 200
+        assert response.headers["x-content-type-options"] == "nosniff"
+        assert response.headers["x-frame-options"] == "DENY"
+        assert response.headers["referrer-policy"] == "strict-origin-when-cross-origin"
+        assert response.headers["cache-control"] == "no-store, no-cache, must-revalidate"
+        assert "x-process-time-ms" in response.headers
+
+    def test_endpoint_cache_control_is_kept(self, client):
+        response = client.get("/api/cached")
+
+        assert response.headers["cache-control"] == "private, max-age=60"
+        assert response.headers["x-frame-options"] == "DENY"
+
+    def test_rejections_have_no_security_headers(self, client, settings):
+        settings.API_KEY_ENABLED = True
+
+        response = client.get("/api/ok")
+
+        assert response.status_code == 401
+        assert "x-frame-options" not in response.headers
+        assert "cache-control" not in response.headers
+
+
+class TestRateLimiting:
+    """Per-client limit with rate limit headers"""
+
+    def test_limit_exceeded_is_429(self, client):
+        responses = [client.get("/api/ok") for _ in range(LIMIT + 1)]
+
+        assert [r.status_code for r in responses] == [200] * LIMIT + [429]
+        assert [r.headers["x-ratelimit-remaining"] for r in responses] == ["2", "1", "0", "0"]
+        assert all(r.headers["x-ratelimit-limit"] == str(LIMIT) for r in responses)
+
+        rejected = responses[-1]
+        assert rejected.json()["error"] == "rate_limit_exceeded"
+        assert int(rejected.headers["retry-after"]) == rejected.json()["retry_after_seconds"] == 20
+        assert "x-ratelimit-reset" in rejected.headers
+        assert "x-frame-options" not in rejected.headers
+
+    def test_clients_are_limited_separately(self, client):
+        for _ in range(LIMIT):
+            client.get("/api/ok", headers={"X-Forwarded-For": "10.0.0.1"})
+
+        assert client.get("/api/ok", headers={"X-Forwarded-For": "10.0.0.1, 172.16.0.1"}).status_code == 429
+        assert client.get("/api/ok", headers={"X-Forwarded-For": "10.0.0.2"}).status_code == 200
+
+    def test_sqlite_backend_runs_off_the_event_loop(self, settings, tmp_path):
+        backend = RecordingSQLiteBackend(str(tmp_path / "rate_limits.sqlite3"))
+        client = TestClient(create_app(backend))
+        try:
+            responses = [client.get("/api/ok") for _ in range(LIMIT + 1)]
+        finally:
+            backend.close()
+
+        assert [r.status_code for r in responses] == [200] * LIMIT + [429]
+        assert backend.on_event_loop == [False] * (LIMIT + 1)
+
+    def test_health_is_exempt(self, client):
+        responses = [client.get("/health") for _ in range(LIMIT + 2)]
+
+        assert all(r.status_code == 200 for r in responses)
+        assert "x-ratelimit-limit" not in responses[-1].headers
+
+    def test_disabled(self, client, settings):
+        settings.RATE_LIMIT_ENABLED = False
+
+        assert all(client.get("/api/ok").status_code == 200 for _ in range(LIMIT + 2))
+
+
+class TestApiKey:
+    """Optional API key authentication"""
+
+    @pytest.fixture(autouse=True)
+    def api_key_enabled(self, settings):
+        settings.API_KEY_ENABLED = True
+
+    def test_missing_key_is_401(self, client, settings):
+        response = client.get("/api/ok")
+
+        assert response.status_code == 401
+        assert response.json()["error"] == "missing_api_key"
+        assert settings.API_KEY_HEADER in response.json()["message"]
+
+    def test_invalid_key_is_403(self, client, settings):
+        response = client.get("/api/ok", headers={settings.API_KEY_HEADER: "wrong-key"})
+
+        assert response.status_code == 403
+        assert response.json()["error"] == "invalid_api_key"
+
+    def test_valid_key_is_accepted(self, client, settings):
+        response = client.get("/api/ok", headers={settings.API_KEY_HEADER: "secret-key"})
+
+        assert response.status_code == 200
+        assert response.headers["x-frame-options"] == "DENY"
+
+    def test_public_paths_need_no_key(self, client):
+        assert client.get("/health").status_code == 200
+
+
+class TestErrorHandling:
+    """Unhandled route exceptions become a generic 500"""
+
+    def test_route_exception_is_500(self, client):
+        response = client.get("/api/boom")
+
+        assert response.status_code == 500
+        body = response.json()
+        assert body["error"] == "internal_server_error"
+        assert body["path"] == "/api/boom"
+        assert "fire" not in response.text
+
+
+# Run tests with verbose output if executed directly
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
@@ -0,0 +1,351 @@
+"""
+Tests for the OpenAI service against a local fake OpenAI-compatible server
+Checks that calls do not block the event loop, retries (Retry-After,
+5xx, timeouts), the in-flight limit, the latency/token histograms and the
+response cache
+"""
+
+import pytest
+import asyncio
+import socket
+import threading
+import time
+from collections import deque
+from email.utils import format_datetime
+from datetime import datetime, timedelta, timezone
+
+import uvicorn
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse
+
+from app.config import Settings
+from app.services.llm import text_enhancer
+from app.services.llm.openai_service import (
+    Histogram,
+    LLMMode,
+    OpenAIService,
+    parse_retry_after
+)
+
+
+class FakeOpenAI:
+    """/v1/chat/completions replying with the user message upper-cased (or reply(message))"""
+
+    def __init__(self):
+        self.app = FastAPI()
+        self.app.post("/v1/chat/completions")(self.completions)
+        self.reset()
+
+    def reset(self):
+        self.script = deque()     # (status, headers) for the next requests
+        self.delay = 0.0
+        self.reply = str.upper
+        self.requests = 0
+        self.active = 0
+        self.max_active = 0
+
+    async def completions(self, request: Request):
+        body = await request.json()
+        self.requests += 1
+        self.active += 1
+        self.max_active = max(self.max_active, self.active)
+        try:
+            status, headers = self.script.popleft() if self.script else (200, {})
+            if status != 200:
+                return JSONResponse({"error": {"message": "fake failure", "type": "server_error"}}, status_code=status, headers=headers)
+            await asyncio.sleep(self.delay)
+            return {
+                "id": "chatcmpl-test",
+                "object": "chat.completion",
+                "created": 0,
+                "model": body["model"],
+                "choices": [{
+                    "index": 0,
+                    "message": {"role": "assistant", "content": self.reply(body["messages"][-1]["content"])},
+                    "finish_reason": "stop"
+                }],
+                "usage": {"prompt_tokens": 120, "completion_tokens": 30, "total_tokens": 150}
+            }
+        finally:
+            self.active -= 1
+
+
+@pytest.fixture(scope="module")
+def fake_server():
+    fake = FakeOpenAI()
+    sock = socket.socket()
+    sock.bind(("127.0.0.1", 0))
+    server = uvicorn.Server(uvicorn.Config(fake.app, log_level="warning"))
+    thread = threading.Thread(target=server.run, kwargs={"sockets": [sock]}, daemon=True)
+    thread.start()
+    while not server.started:
+        time.sleep(0.01)
+
+    fake.url = f"http://127.0.0.1:{sock.getsockname()[1]}/v1"
+    yield fake
+
+    server.should_exit = True
+    thread.join(timeout=5)
+
+
+@pytest.fixture
+def fake(fake_server):
+    fake_server.reset()
+    return fake_server
+
+
+def make_service(fake, **overrides):
+    settings = dict(
+        OPENAI_API_KEY="test-key",
+        OPENAI_BASE_URL=fake.url,
+        ENABLE_LLM_ENHANCEMENT=True,
+        OPENAI_RETRY_BASE_SECONDS=0.01,
+        OPENAI_RETRY_MAX_SECONDS=1.0
+    )
+    settings.update(overrides)
+    return OpenAIService(Settings(**settings))
+
+
+def run(service, scenario):
+    async def main():
+        try:
+            return await scenario()
+        finally:
+            await service.aclose()
+    return asyncio.run(main())
+
+
+class TestCalls:
+    """Successful calls and their stats"""
+
+    def test_enhances_text_and_records_histograms(self, fake):
+        service = make_service(fake)
+
+        result = run(service, lambda: service.enhance_text("please fix the road", LLMMode.POLISH))
+
+        assert result.enhanced_text == "PLEASE FIX THE ROAD"
+        assert result.tokens_used == 150
+        assert not result.fallback_used
+        stats = service.get_stats()
+        assert stats["calls"] == 1 and stats["errors"] == 0 and stats["in_flight"] == 0
+        assert stats["latency_ms"]["count"] == 1
+        assert stats["prompt_tokens"]["sum"] == 120
+        assert stats["prompt_tokens"]["buckets"]["le_250"] == 1
+        assert stats["completion_tokens"]["buckets"]["le_100"] == 1
+
+    def test_does_not_block_the_event_loop(self, fake):
+        fake.delay = 0.3
+        service = make_service(fake)
+        ticks = 0
+
+        async def ticker():
+            nonlocal ticks
+            while True:
+                await asyncio.sleep(0.01)
+                ticks += 1
+
+        async def scenario():
+            task = asyncio.create_task(ticker())
+            result = await service.enhance_text("text", LLMMode.POLISH)
+            task.cancel()
+            return result
+
+        result = run(service, scenario)
+
+        assert not result.fallback_used
+        assert ticks >= 10
+
+    def test_unavailable_without_api_key(self, fake):
+        service = make_service(fake, OPENAI_API_KEY=None)
+
+        result = run(service, lambda: service.enhance_text("text", LLMMode.POLISH))
+
+        assert result.fallback_used and result.enhanced_text == "text"
+        assert fake.requests == 0
+
+
+class TestRetries:
+    """429/5xx/timeouts are retried, other errors are not"""
+
+    def test_429_waits_for_retry_after(self, fake):
+        fake.script.append((429, {"retry-after": "0.3"}))
+        service = make_service(fake)
+
+        started = time.monotonic()
+        result = run(service, lambda: service.enhance_text("text", LLMMode.POLISH))
+
+        assert time.monotonic() - started >= 0.3
+        assert not result.fallback_used
+        assert fake.requests == 2
+        assert service.stats.retries == 1
+
+    def test_5xx_retried_then_falls_back(self, fake):
+        fake.script.extend([(503, {})] * 3)
+        service = make_service(fake, OPENAI_MAX_RETRIES=2)
+
+        result = run(service, lambda: service.enhance_text("text", LLMMode.POLISH))
+
+        assert result.fallback_used and result.enhanced_text == "text"
+        assert fake.requests == 3
+        assert service.stats.retries == 2 and service.stats.errors == 1
+
+    def test_client_errors_are_not_retried(self, fake):
+        fake.script.append((400, {}))
+        service = make_service(fake)
+
+        result = run(service, lambda: service.enhance_text("text", LLMMode.POLISH))
+
+        assert result.fallback_used
+        assert fake.requests == 1
+
+    def test_long_retry_after_falls_back_immediately(self, fake):
+        fake.script.append((429, {"retry-after": "60"}))
+        service = make_service(fake)
+
+        started = time.monotonic()
+        result = run(service, lambda: service.enhance_text("text", LLMMode.POLISH))
+
+        assert result.fallback_used
+        assert time.monotonic() - started < 5
+        assert fake.requests == 1
+
+    def test_timeouts_are_retried(self, fake):
+        fake.delay = 0.5
+        service = make_service(fake, OPENAI_TIMEOUT_SECONDS=0.1, OPENAI_MAX_RETRIES=1)
+
+        result = run(service, lambda: service.enhance_text("text", LLMMode.POLISH))
+
+        assert result.fallback_used
+        assert fake.requests == 2
+
+
+class TestConcurrency:
+    """OPENAI_MAX_CONCURRENCY calls in flight, the rest wait or fall back"""
+
+    def test_in_flight_calls_are_bounded(self, fake):
+        fake.delay = 0.1
+        service = make_service(fake, OPENAI_MAX_CONCURRENCY=2)
+
+        async def scenario():
+            return await asyncio.gather(*(service.enhance_text(f"text {i}", LLMMode.POLISH) for i in range(6)))
+
+        results = run(service, scenario)
+
+        assert [r.enhanced_text for r in results] == [f"TEXT {i}" for i in range(6)]
+        assert fake.max_active == 2
+
+    def test_queue_timeout_falls_back(self, fake):
+        fake.delay = 0.3
+        service = make_service(fake, OPENAI_MAX_CONCURRENCY=1, OPENAI_QUEUE_TIMEOUT_SECONDS=0.05)
+
+        async def scenario():
+            return await asyncio.gather(*(service.enhance_text(f"text {i}", LLMMode.POLISH) for i in range(2)))
+
+        results = run(service, scenario)
+
+        assert sorted(r.fallback_used for r in results) == [False, True]
+        assert "busy" in [r.error for r in results if r.fallback_used][0]
+        assert service.stats.rejected == 1
+
+
+    def test_identical_calls_share_one_request(self, fake):
+        fake.delay = 0.1
+        service = make_service(fake)
+
+        async def scenario():
+            return await asyncio.gather(
+                *(service.enhance_text("same draft", LLMMode.POLISH) for _ in range(3)),
+                service.enhance_text("same draft", LLMMode.CLARIFY)
+            )
+
+        results = run(service, scenario)
+
+        assert [r.enhanced_text for r in results] == ["SAME DRAFT"] * 4
+        assert fake.requests == 2
+        assert service.stats.calls == 2
+
+
+class TestResponseCache:
+    """Stored (validated) enhancements answer repeats without an API call"""
+
+    def test_stored_response_is_reused(self, fake):
+        service = make_service(fake)
+
+        async def scenario():
+            first = await service.enhance_text("please  fix the road\n", LLMMode.POLISH)
+            stored = service.cache_response(first)
+            second = await service.enhance_text("please fix the road", LLMMode.POLISH)
+            return first, stored, second
+
+        first, stored, second = run(service, scenario)
+
+        assert stored and not first.cached
+        assert second.cached and second.tokens_used == 0
+        assert second.enhanced_text == first.enhanced_text
+        assert fake.requests == 1
+        assert service.get_stats()["cache"]["hits"] == 1
+
+    def test_key_covers_mode_context_and_settings(self, fake):
+        service = make_service(fake)
+        key = service.cache_key("text", LLMMode.TONE_ADJUST, {"tone": "formal"})
+
+        assert key == service.cache_key(" text ", LLMMode.TONE_ADJUST, {"tone": "formal"})
+        assert key != service.cache_key("text", LLMMode.TONE_ADJUST, {"tone": "assertive"})
+        assert key != service.cache_key("text", LLMMode.POLISH)
+        assert key != make_service(fake, OPENAI_TEMPERATURE=0.7).cache_key("text", LLMMode.TONE_ADJUST, {"tone": "formal"})
+
+    def test_fallbacks_are_not_stored(self, fake):
+        fake.script.append((400, {}))
+        service = make_service(fake)
+
+        response = run(service, lambda: service.enhance_text("text", LLMMode.POLISH))
+
+        assert response.fallback_used
+        assert not service.cache_response(response)
+
+    @pytest.mark.parametrize("reply, cached", [(str.upper, True), (lambda text: text.replace("{APPLICANT_NAME}", "Sir"), False)])
+    def test_draft_enhancement_cached_only_if_placeholders_kept(self, fake, monkeypatch, reply, cached):
+        fake.reply = reply
+        service = make_service(fake)
+        monkeypatch.setattr(text_enhancer, "get_openai_service", lambda: service)
+        monkeypatch.setattr(text_enhancer, "is_llm_available", service.is_available)
+        draft = "From {APPLICANT_NAME}: the street lights are not working."
+
+        async def scenario():
+            first = await text_enhancer.enhance_draft_text(draft)
+            second = await text_enhancer.enhance_draft_text(draft)
+            return first, second
+
+        first, second = run(service, scenario)
+
+        assert first.was_enhanced == cached
+        assert second.enhanced_text == first.enhanced_text
+        assert fake.requests == (1 if cached else 2)
+
+
+class TestHelpers:
+    """Retry-After parsing and histogram quantiles"""
+
+    def test_parse_retry_after(self):
+        retry_at = format_datetime(datetime.now(timezone.utc) + timedelta(seconds=30), usegmt=True)
+
+        assert parse_retry_after({"retry-after-ms": "250"}) == 0.25
+        assert parse_retry_after({"retry-after": "2"}) == 2.0
+        assert 25 < parse_retry_after({"retry-after": retry_at}) <= 30
+        assert parse_retry_after({"retry-after": "soon"}) is None
+        assert parse_retry_after({}) is None
+
+    def test_histogram_quantiles(self):
+        histogram = Histogram((10, 100))
+        for value in (1, 5, 50, 500):
+            histogram.observe(value)
+
+        assert histogram.counts == [2, 1, 1]
+        assert histogram.quantile(0.5) == 10
+        assert histogram.quantile(0.75) == 100
+        assert histogram.quantile(1.0) == float("inf")
+
+
+# Run tests with verbose output if executed directly
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
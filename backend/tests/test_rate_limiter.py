@@ -0,0 +1,220 @@
+"""
+Unit tests for the Rate Limiter (app.services.rate_limiter)
+Tests GCRA decisions, sharded LRU capping, idle eviction and the SQLite
+backend with a fake clock
+"""
+
+import pytest
+from concurrent.futures import ThreadPoolExecutor
+
+from app.services.rate_limiter import (
+    InMemoryRateLimitBackend,
+    RateLimiter,
+    SQLiteRateLimitBackend,
+    create_rate_limit_backend,
+    gcra_update
+)
+
+
+class FakeClock:
+    def __init__(self, now: float = 1000.0):
+        self.now = now
+
+    def __call__(self) -> float:
+        return self.now
+
+
+@pytest.fixture
+def sqlite_path(tmp_path):
+    return str(tmp_path / "limits" / "rate_limits.sqlite3")
+
+
+class TestGCRA:
+    """Tests for the GCRA decision function"""
+
+    def test_allows_burst_up_to_limit(self):
+        """A new client may send `limit` requests at once, then is rejected"""
+        tat, decisions = None, []
+        for _ in range(4):
+            decision, new_tat = gcra_update(tat, 1000.0, 3, 60)
+            tat = new_tat if new_tat is not None else tat
+            decisions.append(decision)
+
+        assert [d.allowed for d in decisions] == [True, True, True, False]
+        assert [d.remaining for d in decisions] == [2, 1, 0, 0]
+        # One request's worth of quota comes back after window / limit seconds
+        assert decisions[3].retry_after == pytest.approx(20.0)
+        assert decisions[3].reset_after == pytest.approx(60.0)
+
+    def test_rejection_leaves_tat_unchanged(self):
+        decision, new_tat = gcra_update(1060.0, 1000.0, 3, 60)
+
+        assert not decision.allowed
+        assert new_tat is None
+
+    def test_past_tat_counts_as_fresh_client(self):
+        """A TAT in the past carries no state"""
+        assert gcra_update(500.0, 1000.0, 3, 60) == gcra_update(None, 1000.0, 3, 60)
+
+    def test_quota_refills_evenly(self):
+        """Quota refills at limit / window, not all at once at the window end"""
+        backend = InMemoryRateLimitBackend()
+        for _ in range(3):
+            backend.check("client", 1000.0, 3, 60)
+
+        assert backend.check("client", 1019.0, 3, 60).allowed is False
+        assert backend.check("client", 1020.0, 3, 60).allowed is True
+        assert backend.check("client", 1020.0, 3, 60).allowed is False
+
+    def test_rejected_requests_do_not_consume_quota(self):
+        """Hammering while limited does not push the retry time further out"""
+        backend = InMemoryRateLimitBackend()
+        for _ in range(10):
+            backend.check("client", 1000.0, 2, 10)
+
+        assert backend.check("client", 1005.0, 2, 10).allowed is True
+
+
+class TestInMemoryBackend:
+    """Sharded, LRU-capped in-process state"""
+
+    def test_state_is_capped(self):
+        """Many distinct clients never exceed the per-shard cap"""
+        backend = InMemoryRateLimitBackend(max_keys=40, shards=4)
+        for i in range(1000):
+            backend.check(f"10.0.{i // 256}.{i % 256}", 1000.0, 100, 60)
+
+        assert len(backend) <= 40
+        assert backend.overflow_evictions >= 960
+
+    def test_least_recently_seen_client_is_dropped(self):
+        """A full shard drops the client seen longest ago, not the oldest inserted"""
+        backend = InMemoryRateLimitBackend(max_keys=2, shards=1)
+        backend.check("a", 1000.0, 3, 60)
+        backend.check("b", 1000.0, 3, 60)
+        backend.check("a", 1001.0, 3, 60)
+        backend.check("c", 1002.0, 3, 60)
+
+        assert backend.overflow_evictions == 1
+        # "a" keeps its two requests, "b" starts over with a full quota
+        assert backend.check("a", 1003.0, 3, 60).remaining == 0
+        assert backend.check("b", 1003.0, 3, 60).remaining == 2
+
+    def test_eviction_is_not_blocked_by_a_busy_client(self):
+        """Expired clients seen after a client with a far-future TAT are still evicted"""
+        backend = InMemoryRateLimitBackend(shards=1)
+        for _ in range(10):
+            backend.check("busy", 1000.0, 10, 60)     # TAT 1060
+        backend.check("idle-1", 1001.0, 10, 60)       # TAT 1007
+        backend.check("idle-2", 1002.0, 10, 60)       # TAT 1008
+
+        assert backend.evict_idle(1030.0) == 2
+        assert len(backend) == 1
+        assert backend.check("busy", 1030.0, 10, 60).remaining == 4
+
+    def test_clients_spread_over_shards(self):
+        backend = InMemoryRateLimitBackend(max_keys=1000, shards=4)
+        for i in range(100):
+            backend.check(f"client-{i}", 1000.0, 10, 60)
+
+        assert all(backend._shards)
+        assert len(backend) == 100
+
+    def test_idle_clients_are_evicted(self):
+        """Clients whose bucket has refilled carry no state and are removed"""
+        backend = InMemoryRateLimitBackend()
+        backend.check("idle", 1000.0, 10, 60)
+        backend.check("busy", 1055.0, 10, 60)
+
+        assert backend.evict_idle(1010.0) == 1
+        assert len(backend) == 1
+
+        # An evicted client gets the same decision as before eviction
+        assert backend.check("idle", 1010.0, 10, 60).remaining == 9
+
+
+class TestSQLiteBackend:
+    """Host-wide state in one SQLite file"""
+
+    def test_backends_share_state(self, sqlite_path):
+        """Two workers (backends on the same file) see one shared TAT"""
+        worker_a = SQLiteRateLimitBackend(sqlite_path)
+        worker_b = SQLiteRateLimitBackend(sqlite_path)
+        try:
+            assert worker_a.check("client", 1000.0, 2, 60).allowed is True
+            assert worker_b.check("client", 1000.0, 2, 60).allowed is True
+            decision = worker_a.check("client", 1000.0, 2, 60)
+            assert decision.allowed is False
+            assert decision.retry_after == pytest.approx(30.0)
+            assert len(worker_b) == 1
+        finally:
+            worker_a.close()
+            worker_b.close()
+
+    def test_concurrent_checks_never_over_admit(self, sqlite_path):
+        """BEGIN IMMEDIATE serializes the read-modify-write of each check"""
+        backend = SQLiteRateLimitBackend(sqlite_path)
+        try:
+            with ThreadPoolExecutor(max_workers=8) as pool:
+                decisions = list(pool.map(lambda _: backend.check("client", 1000.0, 5, 60), range(40)))
+        finally:
+            backend.close()
+
+        assert sum(d.allowed for d in decisions) == 5
+
+    def test_idle_clients_are_evicted(self, sqlite_path):
+        backend = SQLiteRateLimitBackend(sqlite_path)
+        try:
+            backend.check("idle", 1000.0, 10, 60)
+            backend.check("busy", 1055.0, 10, 60)
+
+            assert backend.evict_idle(1010.0) == 1
+            assert len(backend) == 1
+        finally:
+            backend.close()
+
+    def test_eviction_uses_tat_index(self, sqlite_path):
+        """Idle eviction is an index range delete, not a full table scan"""
+        backend = SQLiteRateLimitBackend(sqlite_path)
+        try:
+            plan = backend._connect().execute(
+                "EXPLAIN QUERY PLAN DELETE FROM rate_limits WHERE tat <= ?", (1000.0,)
+            ).fetchall()
+        finally:
+            backend.close()
+
+        assert any("rate_limits_tat" in row[-1] for row in plan)
+
+
+class TestRateLimiter:
+    """Limiter over a backend, with periodic idle eviction"""
+
+    def test_counts_and_periodic_eviction(self):
+        clock = FakeClock()
+        limiter = RateLimiter(InMemoryRateLimitBackend(), limit=2, window=10, evict_interval=30, clock=clock)
+
+        assert [limiter.check("client").allowed for _ in range(3)] == [True, True, False]
+
+        clock.now += 20
+        limiter.check("other")
+        assert limiter.evicted == 0
+
+        clock.now += 15
+        limiter.check("other")
+        stats = limiter.get_stats()
+        assert stats["allowed"] == 4 and stats["rejected"] == 1
+        assert stats["evicted"] == 2
+        assert stats["clients"] == 1 and stats["backend"] == "memory"
+
+    def test_create_backend(self, sqlite_path):
+        assert isinstance(create_rate_limit_backend("memory", sqlite_path, 100), InMemoryRateLimitBackend)
+        backend = create_rate_limit_backend("sqlite", sqlite_path, 100)
+        assert isinstance(backend, SQLiteRateLimitBackend)
+        backend.close()
+        with pytest.raises(ValueError):
+            create_rate_limit_backend("redis", sqlite_path, 100)
+
+
+# Run tests with verbose output if executed directly
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
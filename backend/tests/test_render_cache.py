@@ -0,0 +1,166 @@
+"""
+Unit tests for the Render Cache
+Tests keyed hashing, byte-bounded LRU, TTL, ETags and the disk tier
+"""
+
+import pytest
+import time
+
+from app.services.render_cache import RenderCache, compute_etag, etag_matches
+
+
+class FakeClock:
+    def __init__(self, now=1000.0):
+        self.now = now
+
+    def __call__(self):
+        return self.now
+
+
+DRAFT = "To,\nThe Public Information Officer,\nMunicipal Corporation, Jaipur"
+
+
+def store(cache, key, content):
+    return cache.put(key, content, "draft.pdf", "application/pdf", "2024-01-01T00:00:00")
+
+
+# ============================================================================
+# TESTS
+# ============================================================================
+
+class TestRenderCacheKeys:
+    """Tests for privacy-preserving cache keys"""
+
+    def test_key_has_no_plaintext(self):
+        """Keys are fixed-size hex digests that reveal nothing of the draft"""
+        cache = RenderCache()
+        key = cache.make_key(format="pdf", draft_text=DRAFT, applicant={"name": "Rahul Sharma"})
+
+        assert len(key) == 64
+        assert "Rahul" not in key and "Jaipur" not in key
+
+    def test_key_depends_on_every_field(self):
+        """Changing the format or any applicant field changes the key"""
+        cache = RenderCache()
+        base = dict(format="pdf", draft_text=DRAFT, document_type="information_request", applicant={"name": "A", "state": "Goa"})
+
+        assert cache.make_key(**base) == cache.make_key(**dict(base))
+        assert cache.make_key(**base) != cache.make_key(**dict(base, format="docx"))
+        assert cache.make_key(**base) != cache.make_key(**dict(base, applicant={"name": "A", "state": "Kerala"}))
+
+    def test_key_is_secret_dependent(self):
+        """Without the secret a key cannot be recomputed from a guessed draft"""
+        fields = dict(format="pdf", draft_text=DRAFT)
+
+        assert RenderCache().make_key(**fields) != RenderCache().make_key(**fields)
+        assert RenderCache(key_secret="s").make_key(**fields) == RenderCache(key_secret="s").make_key(**fields)
+
+
+class TestRenderCacheEntries:
+    """Tests for bounds, expiry and ETags"""
+
+    def test_lru_respects_byte_budget(self):
+        """Least recently used entries are dropped once the budget is exceeded"""
+        cache = RenderCache(max_bytes=1000)
+        for name in ("a", "b", "c"):
+            store(cache, name, b"x" * 200)
+        cache.get("a")
+        for name in ("d", "e"):
+            store(cache, name, b"x" * 200)
+        store(cache, "f", b"x" * 200)
+
+        assert cache.get_stats()["bytes"] <= 1000
+        assert cache.get("a") is not None
+        assert cache.get("b") is None
+
+    def test_oversized_entry_not_cached(self):
+        """A single file larger than a quarter of the budget is served but not kept"""
+        cache = RenderCache(max_bytes=1000)
+        entry = store(cache, "big", b"x" * 400)
+
+        assert entry.etag == compute_etag(b"x" * 400)
+        assert cache.get("big") is None
+
+    def test_entries_expire(self):
+        """Entries are not served after the TTL"""
+        clock = FakeClock()
+        cache = RenderCache(ttl_seconds=300, clock=clock)
+        store(cache, "k", b"pdf bytes")
+
+        clock.now += 299
+        assert cache.get("k") is not None
+        clock.now += 2
+        assert cache.get("k") is None
+        assert cache.get_stats()["bytes"] == 0
+
+    def test_disk_tier_shared_between_instances(self, tmp_path):
+        """A second process (same secret, same dir) reads the first one's render"""
+        clock = FakeClock(now=time.time())
+        writer = RenderCache(disk_dir=str(tmp_path), key_secret="shared", clock=clock)
+        reader = RenderCache(disk_dir=str(tmp_path), key_secret="shared", clock=clock)
+        key = writer.make_key(format="pdf", draft_text=DRAFT)
+        store(writer, key, b"%PDF-1.4 rendered")
+
+        entry = reader.get(reader.make_key(format="pdf", draft_text=DRAFT))
+        assert entry.content == b"%PDF-1.4 rendered"
+        assert entry.filename == "draft.pdf" and entry.content_type == "application/pdf"
+        assert entry.etag == compute_etag(b"%PDF-1.4 rendered")
+
+        clock.now += 301
+        assert RenderCache(disk_dir=str(tmp_path), key_secret="shared", clock=clock).get(key) is None
+
+
+    def test_disk_tier_drops_expired_files(self, tmp_path):
+        """An expired file is deleted on lookup, and clear() empties the directory"""
+        clock = FakeClock(now=time.time())
+        cache = RenderCache(ttl_seconds=60, disk_dir=str(tmp_path), clock=clock)
+        store(cache, "old", b"%PDF old")
+        store(cache, "new", b"%PDF new")
+
+        clock.now += 61
+        assert RenderCache(ttl_seconds=60, disk_dir=str(tmp_path), clock=clock).get("old") is None
+        assert not (tmp_path / "old.bin").exists()
+
+        cache.clear()
+        assert list(tmp_path.glob("*.bin")) == []
+
+    def test_stats(self):
+        cache = RenderCache()
+        store(cache, "k", b"pdf bytes")
+        cache.get("k")
+        cache.get("missing")
+
+        stats = cache.get_stats()
+        assert stats["entries"] == 1 and stats["bytes"] == len(b"pdf bytes")
+        assert stats["hits"] == 1 and stats["misses"] == 1
+
+
+class TestETags:
+    """Tests for If-None-Match evaluation"""
+
+    def test_etag_is_strong_and_content_based(self):
+        etag = compute_etag(b"document")
+
+        assert etag.startswith('"') and not etag.startswith("W/")
+        assert etag == compute_etag(b"document")
+        assert etag != compute_etag(b"document v2")
+
+    @pytest.mark.parametrize("header,expected", [
+        (None, False),
+        ('"other"', False),
+        ("MATCH", True),
+        ('"other", MATCH', True),
+        ("W/MATCH", True),
+        ("*", True),
+    ])
+    def test_if_none_match(self, header, expected):
+        etag = compute_etag(b"document")
+        if header:
+            header = header.replace("MATCH", etag)
+
+        assert etag_matches(header, etag) is expected
+
+
+# Run tests with verbose output if executed directly
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
@@ -0,0 +1,190 @@
+"""
+Tests for single-flight call coalescing
+Checks that concurrent identical calls run once (threads and asyncio),
+that outcomes are shared, cancellation semantics and the wiring into the
+translator and embedding paths
+"""
+
+import pytest
+import asyncio
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+from app.services.nlp import distilbert_semantic, translator
+from app.services.nlp.embedding_cache import EmbeddingCache
+from app.services.nlp.translation_memory import TranslationMemory
+from app.services.single_flight import SingleFlight, get_single_flight
+
+
+class SlowCall:
+    """Counts runs; each run blocks until released"""
+
+    def __init__(self, result="done", error=None):
+        self.runs = 0
+        self.result = result
+        self.error = error
+        self.release = threading.Event()
+
+    def __call__(self, *args):
+        self.runs += 1
+        self.release.wait(5)
+        if self.error:
+            raise self.error
+        return self.result
+
+    async def run_async(self, *args):
+        self.runs += 1
+        await asyncio.sleep(0.05)
+        if self.error:
+            raise self.error
+        return self.result
+
+
+def wait_for(predicate):
+    deadline = time.monotonic() + 5
+    while not predicate() and time.monotonic() < deadline:
+        time.sleep(0.005)
+
+
+def run_in_threads(group, key, call, n):
+    """n concurrent group.do calls; returns futures once all are waiting"""
+    pool = ThreadPoolExecutor(n)
+    futures = [pool.submit(group.do, key, call) for _ in range(n)]
+    wait_for(lambda: group.calls + group.coalesced == n)
+    call.release.set()
+    pool.shutdown(wait=True)
+    return futures
+
+
+class TestThreads:
+    """do(): blocking calls from worker threads"""
+
+    def test_concurrent_calls_run_once(self):
+        group = SingleFlight("test")
+        call = SlowCall()
+
+        futures = run_in_threads(group, "k", call, 4)
+
+        assert [f.result() for f in futures] == ["done"] * 4
+        assert call.runs == 1
+        assert group.get_stats()["coalesced"] == 3 and group.get_stats()["in_flight"] == 0
+
+    def test_errors_are_shared(self):
+        group = SingleFlight("test")
+        call = SlowCall(error=ValueError("model crashed"))
+
+        futures = run_in_threads(group, "k", call, 3)
+
+        for future in futures:
+            with pytest.raises(ValueError):
+                future.result()
+        assert call.runs == 1
+
+    def test_finished_calls_are_not_reused(self):
+        group = SingleFlight("test")
+        call = SlowCall()
+        call.release.set()
+
+        group.do("k", call)
+        group.do("k", call)
+        group.do("other", call)
+
+        assert call.runs == 3
+
+
+class TestAsync:
+    """do_async(): coroutines, with cancellation safety"""
+
+    def test_concurrent_calls_run_once(self):
+        group = SingleFlight("test")
+        call = SlowCall()
+
+        async def scenario():
+            return await asyncio.gather(*(group.do_async("k", call.run_async) for _ in range(5)))
+
+        assert asyncio.run(scenario()) == ["done"] * 5
+        assert call.runs == 1
+        assert group.coalesced == 4
+
+    def test_cancelled_caller_does_not_cancel_the_others(self):
+        group = SingleFlight("test")
+        call = SlowCall()
+
+        async def scenario():
+            first = asyncio.create_task(group.do_async("k", call.run_async))
+            second = asyncio.create_task(group.do_async("k", call.run_async))
+            await asyncio.sleep(0.01)
+            first.cancel()
+            return await second, first.cancelled()
+
+        assert asyncio.run(scenario()) == ("done", True)
+        assert call.runs == 1 and group.cancelled == 0
+
+    def test_call_cancelled_when_every_caller_left(self):
+        group = SingleFlight("test")
+        finished = []
+
+        async def work():
+            await asyncio.sleep(0.2)
+            finished.append(True)
+
+        async def scenario():
+            callers = [asyncio.create_task(group.do_async("k", work)) for _ in range(2)]
+            await asyncio.sleep(0.01)
+            for caller in callers:
+                caller.cancel()
+            await asyncio.sleep(0.3)
+            # A new caller starts a fresh run
+            await group.do_async("k", work)
+
+        asyncio.run(scenario())
+
+        assert finished == [True]
+        assert group.cancelled == 1 and group.calls == 2
+        assert group.get_stats()["in_flight"] == 0
+
+
+class TestWiring:
+    """Duplicate translator and embedding requests share one model call"""
+
+    def test_translator(self, monkeypatch):
+        call = SlowCall()
+        monkeypatch.setattr(translator, "_translation_memory", TranslationMemory(100))
+        monkeypatch.setattr(translator, "_translate_segments", lambda segments: [call() for _ in segments])
+        group = get_single_flight("translation")
+        coalesced = group.coalesced
+
+        with ThreadPoolExecutor(3) as pool:
+            futures = [pool.submit(translator.translate_to_hindi, "The road is broken.") for _ in range(3)]
+            wait_for(lambda: group.coalesced == coalesced + 2)
+            call.release.set()
+
+        assert [f.result() for f in futures] == ["done"] * 3
+        assert call.runs == 1
+        assert group.coalesced == coalesced + 2
+
+    def test_embedding(self, monkeypatch):
+        call = SlowCall(result=np.ones((1, distilbert_semantic.EMBEDDING_DIM), dtype=np.float32))
+        monkeypatch.setattr(distilbert_semantic, "_embedding_cache", EmbeddingCache(max_bytes=1024 * 1024))
+        monkeypatch.setattr(distilbert_semantic, "_embedding_store_checked", True)
+        monkeypatch.setattr(distilbert_semantic, "_embedding_store", None)
+        monkeypatch.setattr(distilbert_semantic, "_forward_pooled", call)
+        group = get_single_flight("embedding")
+        coalesced = group.coalesced
+
+        with ThreadPoolExecutor(3) as pool:
+            futures = [pool.submit(distilbert_semantic.get_embedding, "street lights not working") for _ in range(3)]
+            wait_for(lambda: group.coalesced == coalesced + 2)
+            call.release.set()
+
+        assert all(f.result()[0].shape == (distilbert_semantic.EMBEDDING_DIM,) for f in futures)
+        assert call.runs == 1
+        assert group.coalesced == coalesced + 2
+
+
+# Run tests with verbose output if executed directly
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
@@ -0,0 +1,129 @@
+"""
+Tests for the Text Sanitizer
+Checks the single-pass PII/reference scanner, PII warnings, log masking and
+the chunked (streaming) scanner
+"""
+
+import pytest
+import random
+
+from app.services.analysis_context import AnalysisContext
+from app.utils.text_sanitizer import (
+    PII_WARNINGS, StreamScanner, detect_pii, sanitize_for_logging, scan_chunks, scan_text, warn_about_pii
+)
+
+TEXT = (
+    "Complaint No. CMP/2024/118 filed on 12 March. Contact 9876543210 or rahul.sharma@mail.com. "
+    "Aadhaar 1234 5678 9012, PAN ABCDE1234F, account 123456789012345 at SBIN0001234. "
+    "Earlier ref: RTI/456/2023."
+)
+
+
+def kinds(text):
+    return [(span.kind, span.text) for span in scan_text(text)]
+
+
+class TestScanText:
+    """Typed spans from one pass"""
+
+    def test_finds_every_kind(self):
+        assert kinds(TEXT) == [
+            ("reference", "CMP/2024/118"),
+            ("phone", "9876543210"),
+            ("email", "rahul.sharma@mail.com"),
+            ("aadhaar", "1234 5678 9012"),
+            ("pan", "ABCDE1234F"),
+            ("bank_account", "123456789012345"),
+            ("ifsc", "SBIN0001234"),
+            ("reference", "RTI/456/2023"),
+            ("reference_code", "RTI/456/2023"),
+        ]
+
+    def test_spans_point_into_text(self):
+        assert all(TEXT[span.start:span.end] == span.text for span in scan_text(TEXT))
+
+    def test_one_kind_per_number(self):
+        """A phone is not also a bank account, an Aadhaar not also an account"""
+        assert kinds("call 9876543210") == [("phone", "9876543210")]
+        assert kinds("id 123456789012") == [("aadhaar", "123456789012")]
+        assert kinds("mail 9876543210@mail.com") == [("email", "9876543210@mail.com")]
+
+    def test_phone_keeps_country_code(self):
+        assert kinds("call +91 9876543210 now") == [("phone", "+91 9876543210")]
+
+    def test_reference_does_not_hide_following_pii(self):
+        assert kinds("complaint no 9876543210") == [("reference", "9876543210"), ("phone", "9876543210")]
+
+    def test_empty(self):
+        assert scan_text("") == []
+
+
+class TestWarnings:
+    """Warnings and masking reuse the spans"""
+
+    def test_warnings_in_fixed_order(self):
+        result = warn_about_pii(TEXT)
+
+        assert result["has_pii"] is True
+        assert result["warnings"] == list(PII_WARNINGS.values())
+        assert set(result["types_found"]) == set(PII_WARNINGS)
+
+    def test_no_pii(self):
+        assert warn_about_pii("The road in ward 45 is broken") == {"has_pii": False, "warnings": []}
+
+    def test_precomputed_spans_are_used(self):
+        spans = scan_text(TEXT)
+
+        assert detect_pii("", spans) == detect_pii(TEXT)
+        assert sanitize_for_logging(TEXT, spans) == sanitize_for_logging(TEXT)
+
+    def test_log_masking(self):
+        masked = sanitize_for_logging("Call +91 9876543210, mail a.b@mail.com, Aadhaar 1234 5678 9012, PAN ABCDE1234F")
+
+        assert masked == "Call XXXXXX3210, mail ****@mail.com, Aadhaar XXXX XXXX 9012, PAN XXXXX0000X"
+
+    def test_context_scans_once(self):
+        context = AnalysisContext(TEXT)
+
+        assert context.spans is context.spans
+        assert "spans" in context.get_stats()["computed"]
+
+
+class TestStreamScanner:
+    """Chunked scanning gives the spans of the whole text"""
+
+    def test_random_chunking_matches_scan_text(self):
+        rng = random.Random(7)
+        text = (TEXT + " Call +91 9876543210 now. ") * 20
+        expected = scan_text(text)
+
+        for _ in range(50):
+            cuts = sorted(rng.sample(range(len(text)), rng.randint(1, 40)))
+            chunks = [text[a:b] for a, b in zip([0] + cuts, cuts + [len(text)])]
+            assert list(scan_chunks(chunks, holdback=rng.choice([32, 256]))) == expected
+
+    def test_failed_attempt_before_held_back_span_is_retried(self):
+        """A prefix that fails only because the text is cut short is scanned again"""
+        text = "filler text " * 30 + "call +91 9876543210 now"
+        cut = text.index("+91") + 13
+
+        assert list(scan_chunks([text[:cut], text[cut:]])) == scan_text(text)
+        assert scan_text(text)[0].text == "+91 9876543210"
+
+    def test_feed_reports_final_spans_early(self):
+        scanner = StreamScanner(holdback=32)
+        early = scanner.feed("Contact 9876543210 today." + " " * 40)
+
+        assert early == [scan_text("Contact 9876543210 today.")[0]]
+        assert scanner.feed("PAN ABCDE") == []
+        assert scanner.finish() == []
+
+    def test_span_split_between_chunks(self):
+        spans = list(scan_chunks(["Contact 98765", "43210 or a@mail", ".com"]))
+
+        assert [(span.kind, span.text, span.start) for span in spans] == [("phone", "9876543210", 8), ("email", "a@mail.com", 22)]
+
+
+# Run tests with verbose output if executed directly
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
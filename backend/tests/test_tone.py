@@ -0,0 +1,87 @@
+"""
+Tests for the Tone Adjuster
+Checks that the single-pass replacer gives the same text as applying the
+replacement tables entry by entry
+"""
+
+import pytest
+import random
+import re
+from pathlib import Path
+
+from app.utils.tone import CASUAL_FIXES, TONE_REPLACEMENTS, adjust_tone
+
+TEMPLATES_DIR = Path(__file__).resolve().parent.parent / "app" / "templates"
+
+
+# ============================================================================
+# INLINE DEFINITIONS (copied from the previous utils.tone.adjust_tone)
+# ============================================================================
+
+def adjust_tone_reference(text, target_tone):
+    if not text:
+        return text
+
+    result = text
+    for abbr, full in CASUAL_FIXES.items():
+        pattern = re.compile(r'\b' + re.escape(abbr) + r'\b', re.IGNORECASE)
+        result = pattern.sub(lambda m: full if m.group().islower() else full.capitalize(), result)
+
+    if target_tone not in ["neutral", "formal", "assertive"]:
+        return result
+
+    if target_tone in TONE_REPLACEMENTS:
+        for old, new in TONE_REPLACEMENTS[target_tone].items():
+            pattern = re.compile(r'\b' + re.escape(old) + r'\b', re.IGNORECASE)
+            result = pattern.sub(lambda m: new if m.group().islower() else new.capitalize(), result)
+
+    return result
+
+
+TONES = ["neutral", "formal", "assertive", "casual"]
+
+WORDS = (
+    list(CASUAL_FIXES) + list(CASUAL_FIXES.values())
+    + [word for table in TONE_REPLACEMENTS.values() for pair in table.items() for word in pair]
+    + ["at ur convenience", "house", "use", "no.5", "no. 5", "u_r", "12yr", "रिपोर्ट"]
+)
+
+
+# ============================================================================
+# TESTS
+# ============================================================================
+
+class TestAdjustTone:
+    """Single-pass replacement against the entry-by-entry reference"""
+
+    @pytest.mark.parametrize("tone", TONES)
+    def test_templates_unchanged_from_reference(self, tone):
+        for path in sorted(TEMPLATES_DIR.glob("*/*.txt")):
+            text = path.read_text(encoding="utf-8")
+            assert adjust_tone(text, tone) == adjust_tone_reference(text, tone), path.name
+
+    @pytest.mark.parametrize("tone", TONES)
+    def test_random_text_matches_reference(self, tone):
+        rng = random.Random(tone)
+        separators = [" ", " ", ", ", ".", "\n", "-", "_", "", "(", "'"]
+        for _ in range(2000):
+            text = "".join(
+                rng.choice([str.lower, str.upper, str.capitalize])(rng.choice(WORDS)) + rng.choice(separators)
+                for _ in range(rng.randint(1, 12))
+            )
+            assert adjust_tone(text, tone) == adjust_tone_reference(text, tone), repr(text)
+
+    def test_case_is_preserved(self):
+        assert adjust_tone("pls tell u", "formal") == "please inform you"
+        assert adjust_tone("Pls Tell U", "formal") == "Please Inform You"
+
+    def test_chained_and_merged_replacements(self):
+        """Abbreviations expand into tone phrases; "no." runs into the next word"""
+        assert adjust_tone("at ur convenience", "assertive") == "without delay"
+        assert adjust_tone("no.bad", "formal") == "numberbad"
+        assert adjust_tone("no. bad", "formal") == "no. unsatisfactory"
+
+
+# Run tests with verbose output if executed directly
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
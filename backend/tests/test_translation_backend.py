@@ -0,0 +1,71 @@
+"""
+Tests for the translation backends
+Checks backend selection, the missing-model errors and the BLEU /
+exact-match regression metrics (models themselves are not loaded)
+"""
+
+import pytest
+
+from app.services.nlp import translator
+from app.services.nlp.translation_backend import (
+    CTranslate2TranslationBackend, TorchTranslationBackend, compare_translations, corpus_bleu, create_backend
+)
+
+HINDI = ["कृपया जल्द से जल्द जानकारी प्रदान करें।", "हमारे क्षेत्र से दस दिनों से कचरा नहीं उठाया गया है।"]
+
+
+class TestBackends:
+    """Selection and loading"""
+
+    def test_create_backend(self, tmp_path):
+        assert isinstance(create_backend("torch", "m"), TorchTranslationBackend)
+
+        backend = create_backend("ctranslate2", "org/m", model_dir=str(tmp_path), compute_type="int8", intra_threads=2)
+        assert isinstance(backend, CTranslate2TranslationBackend)
+        assert backend.model_id == "org/m@ct2-int8"
+        assert backend.model_dir == tmp_path / "org--m-ct2-int8"
+        assert backend.get_info()["intra_threads"] == 2
+
+        with pytest.raises(ValueError):
+            create_backend("onnx", "m")
+
+    def test_missing_model_is_reported(self, tmp_path):
+        with pytest.raises(RuntimeError):
+            create_backend("ctranslate2", "org/m", model_dir=str(tmp_path)).load()
+
+    def test_translator_falls_back_when_load_fails(self, monkeypatch, tmp_path):
+        monkeypatch.setattr(translator, "TRANSFORMERS_AVAILABLE", True)
+        monkeypatch.setattr(translator, "_backend", create_backend("ctranslate2", "org/m", model_dir=str(tmp_path)))
+
+        assert translator.get_translator() is None
+
+
+class TestRegressionMetrics:
+    """BLEU and exact match against the torch output"""
+
+    def test_identical_output(self):
+        assert corpus_bleu(HINDI, HINDI) == 100.0
+        assert compare_translations(HINDI, HINDI) == {"samples": 2, "exact_match": 1.0, "bleu": 100.0}
+
+    def test_whitespace_is_not_a_difference(self):
+        assert compare_translations(["कृपया  जानकारी दें"], ["कृपया जानकारी दें "])["exact_match"] == 1.0
+
+    def test_partial_overlap(self):
+        candidate = ["कृपया जल्द से जल्द सूचना प्रदान करें।", HINDI[1]]
+        result = compare_translations(candidate, HINDI)
+
+        assert result["exact_match"] == 0.5
+        assert 0 < result["bleu"] < 100
+
+    def test_short_output_is_penalized(self):
+        truncated = [" ".join(HINDI[0].split()[:4]), HINDI[1]]
+
+        assert corpus_bleu(truncated, HINDI) < corpus_bleu(HINDI, HINDI)
+
+    def test_no_overlap(self):
+        assert corpus_bleu(["a b c d"], ["e f g h"]) == 0.0
+
+
+# Run tests with verbose output if executed directly
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
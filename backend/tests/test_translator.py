@@ -0,0 +1,114 @@
+"""
+Tests for the Translator Service
+Checks sentence segmentation, the single batched model call and the
+translation memory (with a stand-in for the opus-mt model)
+"""
+
+import pytest
+
+from app.services.draft_batch import translate_inputs
+from app.services.nlp import translator
+from app.services.nlp.translation_memory import TranslationMemory
+from app.services.nlp.translator import segment_text, translate_many, translate_to_hindi
+
+DESCRIPTION = (
+    "The street light at Ward No. 45 is broken. I paid Rs. 10/- to Mr. A. K. Sharma!\n"
+    "Kindly provide the information at the earliest."
+)
+
+
+class FakeBackend:
+    """Records calls; "translates" by tagging each segment"""
+
+    def __init__(self, fail=False):
+        self.calls = []
+        self.fail = fail
+
+    def translate(self, segments, **kwargs):
+        self.calls.append((list(segments), kwargs))
+        if self.fail:
+            raise RuntimeError("model crashed")
+        return [f"<hi>{segment}</hi>" for segment in segments]
+
+
+@pytest.fixture
+def pipeline(monkeypatch):
+    fake = FakeBackend()
+    monkeypatch.setattr(translator, "get_translator", lambda: fake)
+    monkeypatch.setattr(translator, "_translation_memory", TranslationMemory(100))
+    return fake
+
+
+class TestSegmentText:
+    """Sentence boundaries, not fixed widths"""
+
+    def test_sentences_and_lines(self):
+        segments = segment_text(DESCRIPTION)
+
+        assert [segment for segment, _ in segments] == [
+            "The street light at Ward No. 45 is broken.",
+            "I paid Rs. 10/- to Mr. A. K. Sharma!",
+            "Kindly provide the information at the earliest.",
+        ]
+        assert "".join(segment + separator for segment, separator in segments) == DESCRIPTION
+
+    def test_hindi_danda_ends_sentences(self):
+        assert len(segment_text("सड़क टूटी है। कृपया मरम्मत करें।")) == 2
+
+    def test_long_sentence_split_at_clauses(self):
+        sentence = ", ".join(["the drain near the school is blocked"] * 30) + "."
+        segments = segment_text(sentence, max_chars=100)
+
+        assert len(segments) > 1
+        assert all(len(segment) <= 100 for segment, _ in segments)
+        assert " ".join(segment for segment, _ in segments) == sentence
+
+
+class TestTranslateMany:
+    """One batched call for every field, memory for repeats"""
+
+    def test_one_call_for_all_fields(self, pipeline):
+        outputs = translate_many([DESCRIPTION, "Copies of the work orders.", None])
+
+        assert len(pipeline.calls) == 1
+        segments, kwargs = pipeline.calls[0]
+        assert len(segments) == 4
+        assert kwargs["batch_size"] > 0
+        assert outputs[0].startswith("<hi>The street light at Ward No. 45 is broken.</hi> <hi>I paid")
+        assert "</hi>\n<hi>Kindly" in outputs[0]
+        assert outputs[1] == "<hi>Copies of the work orders.</hi>"
+        assert outputs[2] is None
+
+    def test_memory_skips_known_segments(self, pipeline):
+        translate_to_hindi(DESCRIPTION)
+        translate_to_hindi("Kindly  provide the information at the earliest.  Thank you.")
+
+        assert pipeline.calls[1][0] == ["Thank you."]
+        assert translator.get_translation_memory().hits == 1
+
+    def test_repeated_segment_translated_once(self, pipeline):
+        translate_many(["Please help. Please help.", "Please help."])
+
+        assert pipeline.calls[0][0] == ["Please help."]
+
+    def test_failure_returns_original(self, pipeline):
+        pipeline.fail = True
+
+        assert translate_to_hindi(DESCRIPTION) == DESCRIPTION
+        assert len(translator.get_translation_memory()) == 0
+
+    def test_model_unavailable(self, monkeypatch):
+        monkeypatch.setattr(translator, "get_translator", lambda: None)
+
+        assert translate_many(["Hello there.", "12/45"]) == ["Hello there.", "12/45"]
+
+    def test_draft_inputs_share_one_call(self, pipeline):
+        description, specific = translate_inputs(DESCRIPTION, "Copies of the work orders.")
+
+        assert len(pipeline.calls) == 1
+        assert description.startswith("<hi>") and specific.startswith("<hi>")
+
+
+# Run tests with verbose output if executed directly
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])